@@ -3,7 +3,7 @@ import time
 import os
 import sys
 
-from qbittorrentapi import Client
+from qbittorrentapi import Client, TorrentDictionary
 import regex as re
 import argparse
 
@@ -18,6 +18,7 @@ log_file_name = "qbit_torrent_unchecker_log"
 
 # Import everything from the script in that directory
 from komga_cover_extractor import *
+import komga_cover_extractor
 
 # state filter
 target_states = ["pausedDL", "stoppedDL"]
@@ -145,6 +146,16 @@ if parser.paths is not None:
                 f"\t\t\textensions: {str(item.path_extensions)}",
             )
 
+
+# Loads cached_paths.txt into the script's cached paths, without the ones that no
+# longer exist. It's the same store cache_path() adds to, so anything still waiting
+# to be written to the file is written first.
+def load_cached_paths():
+    store = komga_cover_extractor.cached_paths
+    store.flush()
+    return store.load(ignore=set(paths + download_folders), check_paths=True)
+
+
 # Load cached_paths.txt into cached_paths
 if (
     os.path.isfile(cached_paths_path)
@@ -152,14 +163,7 @@ if (
     and not cached_paths
     and cached_paths_toggle
 ):
-    cached_paths = get_lines_from_file(
-        cached_paths_path,
-        ignore=paths + download_folders,
-        check_paths=True,
-    )
-
-    # get rid of non-valid paths
-    cached_paths = [x for x in cached_paths if os.path.isdir(x)]
+    cached_paths = load_cached_paths()
 
 # Cache the paths if the user doesn't have a cached_paths.txt file
 if (
@@ -188,14 +192,79 @@ def filter_torrents(torrents):
     ]
 
 
+# Keeps a local copy of the torrents in qBittorrent, kept up to date through the
+# incremental sync/maindata feed. Each sync only returns the torrents that changed,
+# and the fields that changed on them, since the last response id (rid).
+# The file lists fetched are kept until their torrent changes.
+class TorrentStore:
+    def __init__(self):
+        self.reset()
+
+    # Starts over with a full update on the next sync, used after logging in again
+    def reset(self):
+        self.rid = 0
+        self.torrents = {}  # hash -> fields
+        self.files = {}  # hash -> files
+
+    def sync(self, qb):
+        data = qb.sync_maindata(rid=self.rid)
+
+        if data.get("full_update"):
+            self.torrents = {}
+            self.files = {}
+
+        for torrent_hash, fields in (data.get("torrents") or {}).items():
+            self.torrents.setdefault(torrent_hash, {"hash": torrent_hash}).update(
+                fields
+            )
+            self.files.pop(torrent_hash, None)
+
+        for torrent_hash in data.get("torrents_removed") or []:
+            self.torrents.pop(torrent_hash, None)
+            self.files.pop(torrent_hash, None)
+
+        self.rid = data.get("rid", self.rid)
+
+    # Returns the files of the torrent, only fetching them if they aren't known yet.
+    # Empty until qBittorrent has the torrent's metadata.
+    def get_files(self, torrent):
+        files = self.files.get(torrent.hash)
+
+        if files is None:
+            files = torrent.files.data
+            if files:
+                self.files[torrent.hash] = files
+
+        return files
+
+    # Returns the torrents, or just the ones in the category, as TorrentDictionary objects
+    def get_torrents(self, qb, category=None):
+        return [
+            TorrentDictionary(dict(fields), qb)
+            for fields in self.torrents.values()
+            if category is None or fields.get("category") == category
+        ]
+
+
+torrent_store = TorrentStore()
+
+
 # Checks if the passed torrent still exists in qBittorrent
 def torrent_exists(torrent, qb):
-    return torrent in get_torrents(qb)
+    torrent_store.sync(qb)
+    return torrent.hash in torrent_store.torrents
+
+
+# Syncs the local torrent state with qBittorrent and returns the torrents,
+# or just the ones in the category.
+def get_torrents(qb, category=None):
+    torrent_store.sync(qb)
+    return torrent_store.get_torrents(qb, category=category)
 
 
-# Get torrents
-def get_torrents(qb):
-    return [torrent for torrent in qb.torrents.info() if torrent.files.data]
+# Returns the files of the torrent, empty until qBittorrent has its metadata
+def get_torrent_files(torrent):
+    return torrent_store.get_files(torrent)
 
 
 # Returns a list of any files containing unacceptable keywords
@@ -261,36 +330,188 @@ def process_file_names(files, files_to_exclude):
     return file_names
 
 
-# Organizes the file names into volumes
+# Organizes the file names into volumes, parsing the files in each folder together
 def organize_files(torrent, file_names):
     volumes = []
+    folders = {}
 
     for name in file_names:
         dir_name = os.path.basename(os.path.dirname(name)) or torrent.name
-        volume_name = os.path.basename(name)
-
-        volume = upgrade_to_volume_class(
-            upgrade_to_file_class(
-                [volume_name],
-                f"/{dir_name}",
-                is_correct_extensions_feature=convertable_file_extensions
-                + file_extensions,
+        folders.setdefault(dir_name, []).append(os.path.basename(name))
+
+    for dir_name, volume_names in folders.items():
+        volumes.extend(
+            upgrade_to_volume_class(
+                upgrade_to_file_class(
+                    volume_names,
+                    f"/{dir_name}",
+                    is_correct_extensions_feature=convertable_file_extensions
+                    + file_extensions,
+                    test_mode=True,
+                ),
+                skip_release_year=True,
+                skip_release_group=True,
+                skip_extras=True,
+                skip_publisher=True,
+                skip_premium_content=True,
+                skip_subtitle=True,
                 test_mode=True,
-            ),
-            skip_release_year=True,
-            skip_release_group=True,
-            skip_extras=True,
-            skip_publisher=True,
-            skip_premium_content=True,
-            skip_subtitle=True,
-            test_mode=True,
+            )
         )
-        if volume:
-            volumes.append(volume[0])
 
     return volumes
 
 
+# Same as check_upgrade()'s check that the existing folder holds the same
+# kind of files (manga/novel, chapter/volume) as the download.
+def is_matching_folder_type(volume, existing_files):
+    def matches(download, existing, **kwargs):
+        return (
+            get_folder_type(download, **kwargs) >= required_matching_percentage
+            and get_folder_type(existing, **kwargs) >= required_matching_percentage
+        )
+
+    existing_names = [existing_file.name for existing_file in existing_files]
+
+    return (
+        matches([volume.name], existing_names, extensions=manga_extensions)
+        or matches([volume.name], existing_names, extensions=novel_extensions)
+    ) and (
+        matches([volume], existing_files, file_type="chapter")
+        or matches([volume], existing_files, file_type="volume")
+    )
+
+
+# An in-memory lookup of the library's series folders and the volumes within them,
+# so a torrent's files are decided on without walking the library for each series.
+# The series folders are only listed again when a library path, the parent folder
+# of a cached path, or cached_paths.txt changes, and a folder's volumes are only
+# read again when the folder changes.
+class LibraryLookup:
+    def __init__(self):
+        self.path_mtimes = {}
+        self.cached_paths_mtime = None
+        self.folders = {}  # series folder -> (mtime, volumes)
+
+    @staticmethod
+    def get_mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    # Brings the series index in line with the library if any of its folders changed,
+    # reloading cached_paths.txt if the main script has written to it since.
+    def refresh(self):
+        global cached_paths
+
+        reloaded = False
+        cached_paths_mtime = self.get_mtime(cached_paths_path)
+
+        if cached_paths_mtime != self.cached_paths_mtime:
+            self.cached_paths_mtime = cached_paths_mtime
+
+            if (
+                cached_paths_mtime is not None
+                and check_for_existing_series_toggle
+                and cached_paths_toggle
+            ):
+                cached_paths = load_cached_paths()
+                reloaded = True
+
+        # the cached paths can be nested deeper than the library paths' series folders
+        watched_paths = remove_duplicates(
+            paths
+            + [p.path for p in paths_with_types]
+            + [os.path.dirname(path) for path in cached_paths]
+        )
+        path_mtimes = {path: self.get_mtime(path) for path in watched_paths}
+
+        if path_mtimes == self.path_mtimes and not reloaded:
+            return
+
+        self.path_mtimes = path_mtimes
+        series_index.sync(
+            list(cached_paths)
+            + get_library_series_folders(paths, paths_with_types, download_folders)
+        )
+
+    # Returns the volumes in the series folder, reading them if it's new or has changed
+    def get_volumes(self, folder):
+        mtime = self.get_mtime(folder)
+        cached = self.folders.get(folder)
+
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        volumes = (
+            upgrade_to_volume_class(
+                upgrade_to_file_class(
+                    directory_cache.get_files(folder), folder, clean=True
+                ),
+                skip_release_year=True,
+                skip_release_group=True,
+                skip_extras=True,
+                skip_publisher=True,
+                skip_premium_content=True,
+                skip_subtitle=True,
+            )
+            if mtime is not None
+            else []
+        )
+        self.folders[folder] = (mtime, volumes)
+        return volumes
+
+    # Returns the existing volumes of the series the volume belongs to, if any
+    def find(self, volume):
+        series_name = clean_str(volume.series_name, skip_bracket=True).lower().strip()
+
+        for path in series_index.get_candidates(series_name, required_similarity_score):
+            if path in download_folders:
+                continue
+
+            # Skip any paths that don't contain the file type or extension
+            if any(
+                path.startswith(item.path)
+                and (
+                    volume.file_type not in item.path_formats
+                    or volume.extension not in item.path_extensions
+                )
+                for item in paths_with_types
+            ):
+                continue
+
+            name = series_index.names[path]
+            if (
+                name != series_name
+                and similar(name, series_name) < required_similarity_score
+            ):
+                continue
+
+            existing_files = self.get_volumes(path)
+            if existing_files and is_matching_folder_type(volume, existing_files):
+                send_message_alt(
+                    f"\n\tMatched: '{volume.series_name}' to {path}", log=False
+                )
+                return existing_files
+
+        # Not in the index, walk the rest of the library with similar(),
+        # the indexed folders that can't reach the score are passed over
+        return (
+            check_for_existing_series(
+                test_mode=[volume],
+                test_download_folders=download_folders or [ROOT_DIR],
+                test_paths=paths,
+                test_paths_with_types=paths_with_types,
+                test_cached_paths=cached_paths,
+            )
+            or []
+        )
+
+
+library_lookup = LibraryLookup()
+
+
 # Checks volumes for matches
 def process_volumes(
     volumes,
@@ -320,13 +541,7 @@ def process_volumes(
         existing_files = cached_series.get(key, [])
 
         if not existing_files:
-            existing_files = check_for_existing_series(
-                test_mode=[volume],
-                test_download_folders=download_folders or [ROOT_DIR],
-                test_paths=paths,
-                test_paths_with_types=paths_with_types,
-                test_cached_paths=cached_paths,
-            )
+            existing_files = library_lookup.find(volume)
             if key not in cached_series:
                 cached_series[key] = existing_files
 
@@ -343,7 +558,6 @@ def process_volumes(
             if torrent_file_item:
                 files_to_exclude.append(torrent_file_item)
                 print(f"\n\t\tUnchecking: {og_volume_base}")
-                uncheck_files(torrent, torrent_file_item, qb)
 
     return files_to_exclude
 
@@ -376,7 +590,6 @@ def check_files(torrent, files, qb):
             base_name = os.path.basename(excluded_file.name)
             print(f"\n\t\tFile: {base_name} contains an unacceptable keyword.")
             print(f"\t\t\tUnchecking: {base_name}")
-            uncheck_files(torrent, excluded_file, qb)
 
     print(
         f"\n\tOrganizing {len(files)-len(files_to_exclude)} file names into volumes..."
@@ -391,15 +604,20 @@ def check_files(torrent, files, qb):
     # base name : file_object
     files_dict = {os.path.basename(file.name): file for file in files}
 
-    files_to_exclude = process_volumes(
-        volumes,
-        no_matches,
-        cached_series,
-        files_dict,
-        files_to_exclude,
-        torrent,
-        qb,
-    )
+    try:
+        process_volumes(
+            volumes,
+            no_matches,
+            cached_series,
+            files_dict,
+            files_to_exclude,
+            torrent,
+            qb,
+        )
+    finally:
+        # Uncheck all of the excluded files at once, including the ones
+        # excluded before anything went wrong
+        uncheck_files(torrent, files_to_exclude, qb)
 
     # Display summary information
     display_summary(files, files_to_exclude)
@@ -407,10 +625,15 @@ def check_files(torrent, files, qb):
     return files_to_exclude
 
 
-# Unchecks the specified files in the torrent
-def uncheck_files(torrent, file, qb):
+# Unchecks the specified files in the torrent, in a single request
+def uncheck_files(torrent, files, qb):
+    if not files:
+        return
+
     # Set the priority of files to exclude to 0 (do not download)
-    qb.torrents.file_priority(torrent.hash, file_ids=[file.index], priority=0)
+    qb.torrents.file_priority(
+        torrent.hash, file_ids=[file.index for file in files], priority=0
+    )
 
 
 # Starts the torrent
@@ -424,8 +647,10 @@ def delete_torrent(torrent):
 
 
 # Process a single torrent
-def process_torrent(torrent, qb):
-    files = torrent.files.data
+def process_torrent(torrent, qb, files=None):
+    if files is None:
+        files = get_torrent_files(torrent)
+
     files_to_exclude = check_files(torrent, files, qb)
 
     if len(files_to_exclude) != len(files):
@@ -515,6 +740,9 @@ def main():
         )
         return None
 
+    # Index the library's series folders up front
+    library_lookup.refresh()
+
     send_message_alt(
         "\nWatching for new torrents... (QBit Unchecker)",
     )
@@ -536,29 +764,43 @@ def main():
                         send_message_alt(
                             "\tConnected to qBittorrent.",
                         )
+                        torrent_store.reset()
                     else:
                         send_message_alt(
                             f"\tFailed to connect to qBittorrent, retrying in {qbit_sleep_time} seconds...",
                         )
                         time.sleep(qbit_sleep_time)
 
-            torrents = get_torrents(qb)
+            torrents = get_torrents(qb, category=qbittorrent_target_category)
             filtered_torrents = filter_torrents(torrents)
 
+            # Only the torrents about to be checked have their files fetched,
+            # skipping any that are still waiting on their metadata
+            torrent_files = {
+                torrent.hash: get_torrent_files(torrent)
+                for torrent in filtered_torrents
+            }
+            filtered_torrents = [
+                torrent for torrent in filtered_torrents if torrent_files[torrent.hash]
+            ]
+
             if filtered_torrents:
                 send_message_alt(
                     f"\tTorrents found: {len(filtered_torrents)}",
                 )
 
+                # Pick up any series folders added to the library since the last check
+                library_lookup.refresh()
+
                 # sort torrents by number of files, lowest to highest
-                filtered_torrents.sort(key=lambda x: len(x.files.data))
+                filtered_torrents.sort(key=lambda x: len(torrent_files[x.hash]))
 
                 for torrent in filtered_torrents:
                     try:
                         send_message_alt(
                             f"\t\tChecking torrent: '{torrent.name}'",
                         )
-                        process_torrent(torrent, qb)
+                        process_torrent(torrent, qb, torrent_files[torrent.hash])
                     except Exception as e:
                         send_message_alt(
                             f"Error processing torrent '{torrent.name}': {e}",
@@ -0,0 +1,1116 @@
+#!/usr/bin/env python3
+import argparse
+import ast
+import contextlib
+import csv
+import functools
+import inspect
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import timeit
+
+import numpy as np
+from PIL import Image
+
+import komga_cover_extractor
+from komga_cover_extractor import *
+
+from benchmarks import reference_parsing
+from benchmarks.reference_classes import FileOriginal, PublisherOriginal, VolumeOriginal
+from benchmarks.reference_images import (
+    is_blank_image_original,
+    is_image_black_and_white_python,
+)
+from benchmarks.reference_logging import write_to_file_original
+from benchmarks.reference_network import (
+    SleepingLimiter,
+    check_qbit_files_original,
+    get_qbit_torrents_to_check_original,
+    send_discord_message_original,
+)
+from benchmarks.stand_ins import BookwalkerStandIn, DiscordStandIn, QbittorrentStandIn
+from benchmarks.synthetic_library import (
+    create_synthetic_library,
+    get_synthetic_series_names,
+    synthetic_name_words,
+)
+
+
+# Returns the strings in tests.py (and manga_novel_dataset.csv when it's there),
+# along with a few spacing variants, to run normalize_str() over.
+def get_normalize_str_fixtures():
+    root_dir = os.path.dirname(os.path.abspath(__file__))
+
+    with open(os.path.join(root_dir, "tests.py"), "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+
+    strings = {
+        node.value
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Constant) and isinstance(node.value, str)
+    }
+
+    csv_file = os.path.join(root_dir, "manga_novel_dataset.csv")
+    if os.path.isfile(csv_file):
+        with open(csv_file, "r", newline="", encoding="utf-8") as f:
+            strings.update(value for row in csv.reader(f) for value in row)
+
+    variants = set()
+    for string in strings:
+        variants.update([f"  {string} ", string.replace(" ", "  "), string.upper()])
+
+    return sorted(strings | variants)
+
+
+# Every combination of normalize_str() skip flags, skip_type_keywords is left out
+# as the original would fail on it.
+normalize_str_flag_combinations = [
+    (common, editions, False, particles, misc, storefront)
+    for common, editions, particles, misc, storefront in itertools.product(
+        [False, True], repeat=5
+    )
+]
+
+
+# Compares the original and precompiled versions of normalize_str()
+def benchmark_normalize_str(number=1, repeat=3):
+    fixtures = get_normalize_str_fixtures()
+    normalize_str_uncached = normalize_str.__wrapped__
+
+    for flags in normalize_str_flag_combinations:
+        for fixture in fixtures:
+            expected = reference_parsing.normalize_str_original(fixture, *flags)
+            assert normalize_str_uncached(fixture, *flags) == expected, (
+                fixture,
+                flags,
+            )
+
+    def run(function):
+        for flags in normalize_str_flag_combinations:
+            for fixture in fixtures:
+                function(fixture, *flags)
+
+    print_timings(
+        f"normalize_str ({len(fixtures)} strings x {len(normalize_str_flag_combinations)} flag combinations, identical output)",
+        {
+            "original": lambda: run(reference_parsing.normalize_str_original),
+            "precompiled": lambda: run(normalize_str_uncached),
+        },
+        number,
+        repeat,
+    )
+
+
+# Returns the file names in the normalize_str() fixtures, along with
+# underscored and square bracketed variants of each.
+def get_filename_fixtures():
+    names = {
+        fixture
+        for fixture in get_normalize_str_fixtures()
+        if get_file_extension(fixture) in file_extensions
+    }
+    variants = set()
+    for name in names:
+        variants.update(
+            [name.replace(" ", "_"), name.replace("(", "[").replace(")", "]")]
+        )
+
+    return sorted(names | variants)
+
+
+# Parses the file name the way upgrade_to_file_class() and upgrade_to_volume_class() do,
+# using the passed parsers.
+def parse_file_name(name, parsers):
+    chapter = not parsers["contains_volume_keywords"](name) and parsers[
+        "contains_chapter_keywords"
+    ](name)
+    number = parsers["get_release_number"](name, chapter)
+    series_name = (
+        get_series_name_from_chapter(name, "", number)
+        if chapter
+        else parsers["get_series_name_from_volume"](name, "", test_mode=True)
+    )
+
+    return (
+        chapter,
+        number,
+        series_name,
+        parsers["get_release_year"](name),
+        (
+            parsers["check_for_multi_volume_file"](name, chapter)
+            if "-" in name
+            else False
+        ),
+        parsers["get_file_part"](name, chapter, series_name),
+        parsers["get_extras"](name, chapter, series_name),
+    )
+
+
+release_parser_names = [
+    "contains_chapter_keywords",
+    "contains_volume_keywords",
+    "get_series_name_from_volume",
+    "check_for_multi_volume_file",
+    "get_release_number",
+    "get_release_year",
+    "get_file_part",
+    "get_extras",
+]
+
+
+# Compares the original and pre-compiled release parsing,
+# every cache is cleared before each run.
+def benchmark_release_parsing(number=1, repeat=3):
+    fixtures = get_filename_fixtures()
+    parsers = {
+        "original": {
+            name: getattr(reference_parsing, f"{name}_original")
+            for name in release_parser_names
+        },
+        "precompiled": {
+            name: getattr(komga_cover_extractor, name) for name in release_parser_names
+        },
+    }
+
+    def run(label):
+        for value in vars(komga_cover_extractor).values():
+            if hasattr(value, "cache_clear"):
+                value.cache_clear()
+
+        # Quiets the "Not a float" messages a few of the fixtures print
+        with contextlib.redirect_stdout(io.StringIO()):
+            return [parse_file_name(name, parsers[label]) for name in fixtures]
+
+    assert run("precompiled") == run("original")
+
+    print_timings(
+        f"release parsing ({len(fixtures)} file names, identical output)",
+        {label: functools.partial(run, label) for label in parsers},
+        number,
+        repeat,
+    )
+
+
+# Creates the images used by the black and white benchmark
+#  - manga: grayscale noise, the usual first page of a chapter
+#  - color: random rgb noise, the usual cover of a volume
+#  - halftone: grayscale with 8% colored pixels, just under the cutoff
+def create_black_and_white_images(width=1400, height=2000, seed=0):
+    rng = np.random.default_rng(seed)
+
+    gray = rng.integers(0, 256, (height, width), dtype=np.uint8)
+    manga = Image.fromarray(gray, "L")
+
+    color = Image.fromarray(
+        rng.integers(0, 256, (height, width, 3), dtype=np.uint8), "RGB"
+    )
+
+    halftone = np.stack([gray] * 3, axis=-1)
+    colored = rng.random((height, width)) < 0.08
+    halftone[colored, 0] = 255
+    halftone[colored, 2] = 0
+    halftone = Image.fromarray(halftone, "RGB")
+
+    return {"manga": manga, "color": color, "halftone": halftone}
+
+
+# The results of every benchmark run, written out by --json.
+results = []
+
+
+# Prints the best time of a benchmark and adds it to the results.
+def record_result(name, label, best, config=None, note=""):
+    print(f"\t{label:<28} {best * 1000:>10.2f} ms{note}")
+    results.append(
+        {
+            "benchmark": name,
+            "label": label,
+            "best_ms": round(best * 1000, 3),
+            "config": config or {},
+        }
+    )
+
+
+# Prints the best time of each implementation in milliseconds
+def print_timings(name, functions, number, repeat):
+    print(f"\n{name}:")
+    for label, function in functions.items():
+        best = min(timeit.repeat(function, number=number, repeat=repeat)) / number
+        record_result(name, label, best, {"number": number, "repeat": repeat})
+
+
+# Writes the results, along with what they were run on, to path as json.
+def write_results(path):
+    with open(path, "w") as file:
+        json.dump(
+            {
+                "script_version": script_version,
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "processor": platform.processor() or platform.machine(),
+                "cpu_count": os.cpu_count(),
+                "time": datetime.now().isoformat(timespec="seconds"),
+                "results": results,
+            },
+            file,
+            indent=4,
+        )
+
+
+# Compares the python and numpy versions of is_image_black_and_white()
+def benchmark_is_image_black_and_white(number=1, repeat=3, sample_size=1024):
+    for name, image in create_black_and_white_images().items():
+        expected = is_image_black_and_white_python(image)
+        assert is_image_black_and_white(image) == expected, name
+        assert (
+            is_image_black_and_white(image, sample_size=sample_size) == expected
+        ), name
+
+        print_timings(
+            f"is_image_black_and_white ({name}, {expected})",
+            {
+                "python": lambda: is_image_black_and_white_python(image),
+                "numpy": lambda: is_image_black_and_white(image),
+                f"numpy (sample {sample_size})": lambda: is_image_black_and_white(
+                    image, sample_size=sample_size
+                ),
+            },
+            number,
+            repeat,
+        )
+
+
+# Creates the jpg covers used by the blank cover benchmark
+#  - cover: random rgb noise, a cover that's clearly not blank
+#  - white: a blank white page with a small logo
+#  - black: a blank black page with a small logo
+def create_blank_cover_images(width=1400, height=2000, seed=0):
+    rng = np.random.default_rng(seed)
+
+    cover = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+
+    white = np.full((height, width, 3), 255, dtype=np.uint8)
+    white[height // 2 : height // 2 + 100, width // 2 : width // 2 + 200] = 0
+
+    black = 255 - white
+
+    return {
+        name: cv2.imencode(".jpg", image)[1].tobytes()
+        for name, image in {"cover": cover, "white": white, "black": black}.items()
+    }
+
+
+# Compares the original and preloaded blank cover checks
+def benchmark_is_blank_cover(number=1, repeat=3):
+    if not blank_white_image_path or not blank_black_image_path:
+        print("\nis_blank_cover: skipped, the blank images are missing.")
+        return
+
+    # loaded outside of the timings, as main() would
+    get_blank_cover_references()
+
+    for name, image_data in create_blank_cover_images().items():
+        expected = is_blank_image_original(image_data)
+        assert is_blank_cover(image_data, silent=True) == expected, name
+
+        print_timings(
+            f"is_blank_cover ({name}, {expected})",
+            {
+                "original": lambda: is_blank_image_original(image_data),
+                f"preloaded {blank_cover_comparison_size}": lambda: is_blank_cover(
+                    image_data, silent=True
+                ),
+            },
+            number,
+            repeat,
+        )
+
+
+# Runs the searches check_for_new_volumes_on_bookwalker() would for the series
+# through the fetcher, queuing the searches of the upcoming series like it does.
+def run_bookwalker_searches(fetcher, series_names):
+    window = fetcher.workers * 2
+    results = []
+
+    komga_cover_extractor.bookwalker_fetcher = fetcher
+    with contextlib.redirect_stdout(io.StringIO()):
+        for index, series in enumerate(series_names):
+            if index == 0:
+                upcoming = series_names[:window]
+            else:
+                upcoming = series_names[index + window - 1 : index + window]
+
+            for name in upcoming:
+                fetcher.submit(prefetch_bookwalker_search, name, "m")
+            results.append(search_bookwalker(series, "m"))
+
+    fetcher.shutdown()
+    return [[(book.volume_number, book.url) for book in books] for books in results]
+
+
+# Compares the original's 2s sleep between requests to sequential, concurrent,
+# cached and revalidated bookwalker searches under the shipped rate limit,
+# against the local stand-in. The runs that send requests are bound by the
+# pacing, so they're only timed once.
+def benchmark_bookwalker(number=1, repeat=3, series_count=3, latency=0.02):
+    series_names = [f"Series {index:03}" for index in range(series_count)]
+    original_fetcher = komga_cover_extractor.bookwalker_fetcher
+    original_search_url = komga_cover_extractor.bookwalker_search_url
+
+    def get_fetcher(workers, cache, limiter=None):
+        return PageFetcher(
+            limiter
+            or RateLimiter(bookwalker_requests_per_second, bookwalker_request_burst),
+            cache,
+            workers=workers,
+        )
+
+    try:
+        with BookwalkerStandIn(
+            latency=latency, pages=1, volumes_per_page=3
+        ) as stand_in:
+            komga_cover_extractor.bookwalker_search_url = stand_in.search_url
+            # fill the cache used by the cached and revalidated runs
+            warm_cache = ResponseCache(ttl=3600, memory_entries=10000)
+            expected = run_bookwalker_searches(
+                get_fetcher(4, warm_cache, RateLimiter(0)), series_names
+            )
+
+            # every page has passed its ttl, but is unchanged
+            def get_expired_cache():
+                for entry in warm_cache.entries.values():
+                    entry["fetched"] = 0
+                return warm_cache
+
+            runs = {
+                "original (2s between requests)": lambda: get_fetcher(
+                    1, ResponseCache(ttl=0, memory_entries=0), SleepingLimiter(2)
+                ),
+                "sequential": lambda: get_fetcher(
+                    1, ResponseCache(ttl=0, memory_entries=0)
+                ),
+                "concurrent (4 workers)": lambda: get_fetcher(
+                    4, ResponseCache(ttl=3600, memory_entries=10000)
+                ),
+                "cached": lambda: get_fetcher(4, warm_cache),
+                "revalidated (ETag)": lambda: get_fetcher(4, get_expired_cache()),
+            }
+
+            print(
+                f"\nbookwalker ({series_count} series, {latency * 1000:.0f} ms latency, "
+                f"{bookwalker_requests_per_second} requests/s, burst of {bookwalker_request_burst}):"
+            )
+            for label, get_run_fetcher in runs.items():
+                best = None
+                for _ in range(repeat if label == "cached" else 1):
+                    fetcher = get_run_fetcher()
+                    requests_before = stand_in.requests
+                    not_modified_before = stand_in.not_modified
+
+                    start = time.perf_counter()
+                    assert (
+                        run_bookwalker_searches(fetcher, series_names) == expected
+                    ), label
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+
+                requests = stand_in.requests - requests_before
+                not_modified = stand_in.not_modified - not_modified_before
+                record_result(
+                    "bookwalker",
+                    label,
+                    best,
+                    {
+                        "series_count": series_count,
+                        "latency": latency,
+                        "requests": requests,
+                        "not_modified": not_modified,
+                    },
+                    f"   {requests} requests ({not_modified} not modified)",
+                )
+    finally:
+        komga_cover_extractor.bookwalker_fetcher = original_fetcher
+        komga_cover_extractor.bookwalker_search_url = original_search_url
+
+
+# Returns the notifications a run sends, count grouped ones and
+# count // 3 sent on their own like new volume releases are.
+def get_discord_notifications(count):
+    return [
+        (
+            index % 4 == 3,
+            Embed(
+                handle_fields(
+                    DiscordEmbed(title=f"Renamed File {index}", color=purple_color),
+                    [
+                        {
+                            "name": "From",
+                            "value": f"```Series {index} - Volume 01.cbz```",
+                            "inline": False,
+                        },
+                        {
+                            "name": "To",
+                            "value": f"```Series {index} v01.cbz```",
+                            "inline": False,
+                        },
+                    ],
+                ),
+                None,
+            ),
+        )
+        for index in range(count)
+    ]
+
+
+# Compares how long the original synchronous sends and the dispatcher hold up
+# the run for the same notifications, against a rate-limited stand-in.
+def benchmark_discord(number=1, repeat=3, notifications=40, latency=0.02):
+    print(
+        f"\ndiscord ({notifications} notifications, {latency * 1000:.0f} ms latency):"
+    )
+
+    def run_original(hook):
+        grouped = []
+        for on_its_own, embed in get_discord_notifications(notifications):
+            if on_its_own:
+                send_discord_message_original(hook, [embed])
+                continue
+            if len(grouped) >= discord_embed_limit:
+                send_discord_message_original(hook, grouped)
+                grouped = []
+            grouped.append(embed)
+        if grouped:
+            send_discord_message_original(hook, grouped)
+
+    def run_dispatcher(hook, dispatcher):
+        for _, embed in get_discord_notifications(notifications):
+            dispatcher.submit(hook, embeds=[embed])
+
+    runs = ["synchronous (original)", "dispatcher (blocked)", "dispatcher (delivered)"]
+    best = {}
+    for _ in range(repeat):
+        for label in runs[:2]:
+            with DiscordStandIn(latency=latency) as stand_in:
+                dispatcher = DiscordDispatcher(linger=0.2)
+                start = time.perf_counter()
+                if label == runs[0]:
+                    run_original(stand_in.url)
+                else:
+                    run_dispatcher(stand_in.url, dispatcher)
+                elapsed = time.perf_counter() - start
+
+                dispatcher.flush()
+                delivered = time.perf_counter() - start
+                dispatcher.shutdown()
+
+                results = {label: elapsed}
+                if label == runs[1]:
+                    results[runs[2]] = delivered
+                for key, seconds in results.items():
+                    if key not in best or seconds < best[key][0]:
+                        best[key] = (
+                            seconds,
+                            len(stand_in.messages),
+                            stand_in.rate_limited,
+                        )
+
+    for label in runs:
+        seconds, messages, rate_limited = best[label]
+        record_result(
+            "discord",
+            label,
+            seconds,
+            {
+                "notifications": notifications,
+                "latency": latency,
+                "messages": messages,
+                "rate_limited": rate_limited,
+            },
+            f"   {messages} messages ({rate_limited} rate-limited)",
+        )
+
+
+# Compares the original and buffered versions of write_to_file(), writing lines
+# that are checked for duplicates like the ones extract_covers() logs.
+def benchmark_write_to_file(number=1, repeat=3, lines=2000, duplicates=0.25):
+    rng = random.Random(0)
+    unique = int(lines * (1 - duplicates))
+    messages = [f"Series {index} v{index % 30:02d}.cbz" for index in range(unique)]
+    messages += rng.choices(messages, k=lines - unique)
+    rng.shuffle(messages)
+
+    def run(function, temp_dir):
+        for message in messages:
+            function(
+                "changes.txt",
+                message,
+                without_timestamp=True,
+                check_for_dup=True,
+                write_to=temp_dir,
+            )
+
+    def run_buffered(temp_dir):
+        run(functools.partial(write_to_file, can_write_log=True), temp_dir)
+        log_writer.close()
+
+    def read_log(temp_dir):
+        with open(os.path.join(temp_dir, "changes.txt")) as f:
+            return f.read()
+
+    with tempfile.TemporaryDirectory() as original_dir:
+        with tempfile.TemporaryDirectory() as buffered_dir:
+            run(write_to_file_original, original_dir)
+            run_buffered(buffered_dir)
+            assert read_log(original_dir) == read_log(buffered_dir)
+
+    def timed(function):
+        def run_in_temp_dir():
+            with tempfile.TemporaryDirectory() as temp_dir:
+                function(temp_dir)
+
+        return run_in_temp_dir
+
+    print_timings(
+        f"write_to_file ({lines} lines, {duplicates:.0%} duplicates, identical output)",
+        {
+            "original": timed(lambda temp_dir: run(write_to_file_original, temp_dir)),
+            "buffered": timed(run_buffered),
+        },
+        number,
+        repeat,
+    )
+
+
+# Imports the qbit unchecker addon, which parses its arguments on import
+def import_qbit_torrent_unchecker(library):
+    sys.path.insert(0, os.path.join(ROOT_DIR, "addons", "qbit_torrent_unchecker"))
+    argv, saved_paths = sys.argv, list(paths)
+
+    try:
+        sys.argv = ["qbit_torrent_unchecker.py", "-p", library]
+        with contextlib.redirect_stdout(io.StringIO()):
+            import qbit_torrent_unchecker
+    finally:
+        sys.argv = argv
+        paths[:] = saved_paths
+        paths_with_types.clear()
+
+    return qbit_torrent_unchecker
+
+
+# The addon's polling through sync/maindata, as its main() does it
+def get_qbit_torrents_to_check(addon, qb):
+    filtered_torrents = addon.filter_torrents(
+        addon.get_torrents(qb, category=addon.qbittorrent_target_category)
+    )
+    return {
+        torrent.hash: addon.get_torrent_files(torrent) for torrent in filtered_torrents
+    }
+
+
+# Compares the qbit unchecker addon's original full polling with the sync/maindata
+# polling over a number of cycles, against a stand-in with torrent_count torrents.
+def benchmark_qbit(number=1, repeat=3, torrent_count=2000, cycles=5, changes=50):
+    try:
+        import qbittorrentapi
+    except ImportError:
+        print("\nqbit: qbittorrent-api isn't installed, skipping...")
+        return
+
+    with tempfile.TemporaryDirectory() as library:
+        addon = import_qbit_torrent_unchecker(library)
+
+    addon.qbittorrent_target_category = "manga"
+    print(f"\nqbit ({torrent_count} torrents, {cycles} polling cycles):")
+
+    def run(get_torrents_to_check):
+        with QbittorrentStandIn(torrent_count) as stand_in:
+            qb = qbittorrentapi.Client(host="127.0.0.1", port=stand_in.port)
+            addon.torrent_store.reset()
+            found = []
+
+            start = time.perf_counter()
+            for _ in range(cycles):
+                found.append(get_torrents_to_check(addon, qb))
+                stand_in.tick(changes)
+            elapsed = time.perf_counter() - start
+
+            return elapsed, found, stand_in.requests, stand_in.bytes_sent
+
+    runs = {
+        "torrents/info (original)": get_qbit_torrents_to_check_original,
+        "sync/maindata": get_qbit_torrents_to_check,
+    }
+    best = {}
+    for _ in range(repeat):
+        for label, function in runs.items():
+            elapsed, found, requests, bytes_sent = run(function)
+            if label not in best or elapsed < best[label][0]:
+                best[label] = (elapsed, found, requests, bytes_sent)
+
+    found = [result[1] for result in best.values()]
+    assert all(
+        [sorted(cycle) for cycle in x] == [sorted(cycle) for cycle in found[0]]
+        for x in found
+    )
+
+    for label, (elapsed, _, requests, bytes_sent) in best.items():
+        record_result(
+            "qbit",
+            label,
+            elapsed / cycles,
+            {
+                "torrents": torrent_count,
+                "cycles": cycles,
+                "changes_per_cycle": changes,
+                "requests": sum(requests.values()),
+                "bytes": bytes_sent,
+            },
+            f"   per cycle, {sum(requests.values()) / cycles:.0f} requests,"
+            f" {bytes_sent / cycles / 1024:.0f} KiB",
+        )
+
+
+# Returns the file names of a pack with volume_count volumes of each series in the
+# library, so the first volumes are the library's volumes again from other release
+# groups, and volume_count volumes of new_series_count series that aren't in it.
+def get_qbit_pack_file_names(library, volume_count=50, new_series_count=0):
+    file_names = []
+    series_names = os.listdir(library)
+    new_series_names = [
+        name
+        for name in get_synthetic_series_names(len(series_names) + new_series_count)
+        if name not in series_names
+    ]
+    for series in new_series_names[:new_series_count]:
+        for number in range(1, volume_count + 1):
+            file_names.append(f"{series}/{series} v{number:02} (2020) (Digital).cbz")
+
+    for series in sorted(os.listdir(library)):
+        existing = sorted(os.listdir(os.path.join(library, series)))
+        extension = get_file_extension(existing[0])
+        year = re.search(r"\((\d{4})\)", existing[0]).group(1)
+        for number in range(1, volume_count + 1):
+            group = synthetic_name_words["release_groups"][number % 6]
+            file_names.append(
+                f"{series}/{series} v{number:02} ({year}) (Digital) ({group}){extension}"
+            )
+
+    return file_names
+
+
+# Times how long the qbit unchecker addon takes to decide on the files of a pack,
+# the original check_for_existing_series() and per-file requests against the
+# in-memory library lookup and a single batched request.
+def benchmark_qbit_pack(
+    number=1, repeat=3, series_count=8, volume_count=50, new_series_count=2
+):
+    try:
+        import qbittorrentapi
+    except ImportError:
+        print("\nqbit_pack: qbittorrent-api isn't installed, skipping...")
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        library, _ = create_synthetic_library(
+            temp_dir, series_count, volumes_per_series=8, pages_per_volume=1
+        )
+        addon = import_qbit_torrent_unchecker(library)
+        addon.qbittorrent_target_category = "manga"
+        file_names = get_qbit_pack_file_names(library, volume_count, new_series_count)
+        print(
+            f"\nqbit_pack ({len(file_names)} files, {series_count} series in the library"
+            f" and {new_series_count} that aren't):"
+        )
+
+        def run(check):
+            saved_paths, saved_logs_dir = list(paths), komga_cover_extractor.LOGS_DIR
+            paths[:] = [library]
+            komga_cover_extractor.LOGS_DIR = os.path.join(temp_dir, "logs")
+            komga_cover_extractor.directory_cache = DirectoryCache()
+            series_index.sync([])
+            addon.library_lookup = addon.LibraryLookup()
+
+            try:
+                with QbittorrentStandIn(0) as stand_in:
+                    torrent_hash = stand_in.add_torrent("Pack", "manga", file_names)
+                    qb = qbittorrentapi.Client(host="127.0.0.1", port=stand_in.port)
+                    addon.torrent_store.reset()
+                    torrent = addon.get_torrents(qb)[0]
+                    files = addon.get_torrent_files(torrent)
+
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        start = time.perf_counter()
+                        excluded = check(torrent, files, qb)
+                        elapsed = time.perf_counter() - start
+
+                    return (
+                        elapsed,
+                        sorted(file.index for file in excluded),
+                        stand_in.requests["torrents/filePrio"],
+                    )
+            finally:
+                paths[:] = saved_paths
+                komga_cover_extractor.LOGS_DIR = saved_logs_dir
+                log_writer.close()
+
+        runs = {
+            "check_for_existing_series (original)": lambda *args: (
+                check_qbit_files_original(addon, *args)
+            ),
+            "library lookup": lambda torrent, files, qb: (
+                addon.library_lookup.refresh(),
+                addon.check_files(torrent, files, qb),
+            )[1],
+        }
+        best = {}
+        for _ in range(repeat):
+            for label, check in runs.items():
+                result = run(check)
+                if label not in best or result[0] < best[label][0]:
+                    best[label] = result
+
+    excluded = [result[1] for result in best.values()]
+    assert all(x == excluded[0] for x in excluded), "different files excluded"
+
+    for label, (elapsed, excluded, priority_requests) in best.items():
+        record_result(
+            "qbit_pack",
+            label,
+            elapsed,
+            {
+                "files": len(file_names),
+                "series_count": series_count,
+                "new_series_count": new_series_count,
+                "excluded": len(excluded),
+                "priority_requests": priority_requests,
+            },
+            f"   {len(excluded)} unchecked in {priority_requests} requests",
+        )
+
+
+# Points the script at the library and download folder, with every cache
+# emptied and every prompt turned off, so each run starts from scratch.
+def reset_end_to_end_state(library, downloads):
+    module = komga_cover_extractor
+    logs = os.path.join(os.path.dirname(library), "logs")
+
+    # in place, the functions' default arguments are bound to these lists
+    module.paths[:] = [library]
+    module.download_folders[:] = [downloads]
+    module.paths_with_types[:] = []
+    module.log_to_file = False
+    module.watchdog_toggle = False
+    module.manual_rename = False
+    module.manual_delete = False
+
+    module.cached_paths = CachedPathStore()
+    module.series_index = SeriesIndex(os.path.join(logs, "series_index.json"))
+    module.library_manifest = LibraryManifest(
+        os.path.join(logs, "library_manifest.json")
+    )
+    module.parsed_file_cache = ParsedFileCache(os.path.join(logs, "parsed_files.json"))
+    module.cover_fingerprint_index = CoverFingerprintIndex(
+        os.path.join(logs, "cover_fingerprints.json")
+    )
+    module.directory_cache = DirectoryCache()
+    module.archive_infos.clear()
+
+    # main() walks the download folders through a snapshot shared by its stages
+    module.download_snapshot = DownloadFolderSnapshot()
+    module.download_snapshot.start([downloads])
+
+    module.transferred_files = []
+    module.transferred_dirs = []
+    module.processed_files = []
+    module.moved_files = []
+    module.checked_series = []
+    module.root_modification_times = {}
+    module.image_count = 0
+    module.file_counters = {x: 0 for x in file_extensions}
+
+    module.publishers_joined_regex = re.compile(
+        rf"(?<=[\(\[\{{])({module.publishers_joined})(?=[\)\]\}}])", re.IGNORECASE
+    )
+    module.release_groups_joined_regex = re.compile(
+        rf"(?<=[\(\[\{{])({module.release_groups_joined})(?=[\)\]\}}])",
+        re.IGNORECASE,
+    )
+
+
+# Returns the steps of main() the end-to-end benchmark times, in the order
+# main() runs them.
+def get_end_to_end_steps(library, downloads, workers):
+    module = komga_cover_extractor
+    return {
+        "convert_to_cbz": lambda: convert_to_cbz(workers=workers),
+        "rename_files": lambda: rename_files(download_folders=[downloads]),
+        "check_for_duplicate_volumes": lambda: check_for_duplicate_volumes([downloads]),
+        "extract_covers": lambda: extract_covers(
+            paths_to_process=[library], workers=workers
+        ),
+        "check_for_existing_series": lambda: (
+            cache_existing_library_paths(
+                paths=[library],
+                download_folders=[downloads],
+                cached_paths=module.cached_paths,
+            ),
+            check_for_existing_series(),
+        ),
+    }
+
+
+# Runs main()'s steps over copies of a synthetic library, timing each step.
+def benchmark_end_to_end(
+    number=1,
+    repeat=3,
+    series_count=10,
+    volumes_per_series=8,
+    workers=1,
+    seed=0,
+):
+    config = {
+        "series_count": series_count,
+        "volumes_per_series": volumes_per_series,
+        "workers": workers,
+        "seed": seed,
+    }
+    timings = {}
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        template = os.path.join(temp_dir, "template")
+        library, downloads = create_synthetic_library(
+            template, series_count, volumes_per_series, seed=seed
+        )
+        config["library_files"] = sum(len(files) for _, _, files in os.walk(library))
+        config["download_files"] = sum(len(files) for _, _, files in os.walk(downloads))
+
+        for run in range(repeat):
+            run_dir = os.path.join(temp_dir, f"run-{run}")
+            shutil.copytree(template, run_dir)
+            library = os.path.join(run_dir, "library")
+            downloads = os.path.join(run_dir, "downloads")
+            reset_end_to_end_state(library, downloads)
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                for step, function in get_end_to_end_steps(
+                    library, downloads, workers
+                ).items():
+                    start = time.perf_counter()
+                    function()
+                    timings.setdefault(step, []).append(time.perf_counter() - start)
+
+            komga_cover_extractor.download_snapshot.clear()
+            shutil.rmtree(run_dir)
+
+    print(
+        f"\nend_to_end ({config['library_files']} library files, "
+        f"{config['download_files']} downloaded files, {workers} workers):"
+    )
+    for step, step_timings in timings.items():
+        record_result("end_to_end", step, min(step_timings), config)
+    record_result(
+        "end_to_end", "total", min(sum(run) for run in zip(*timings.values())), config
+    )
+
+
+# Returns the peak rss of this process in bytes
+def get_peak_rss():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# Prints the peak rss of a memory benchmark and adds it to the results.
+def record_memory_result(name, label, peak, growth, config=None):
+    print(
+        f"\t{label:<28} {peak / 1048576:>10.1f} MB peak rss, {growth / 1048576:.1f} MB for the objects"
+    )
+    results.append(
+        {
+            "benchmark": name,
+            "label": label,
+            "peak_rss_mb": round(peak / 1048576, 1),
+            "growth_mb": round(growth / 1048576, 1),
+            "config": config or {},
+        }
+    )
+
+
+# Builds the File and Volume objects a scan of a library makes, the way
+# upgrade_to_file_class() and upgrade_to_volume_class() fill them in,
+# without parsing the names.
+def get_scanned_objects(classes, series_names, volumes_per_series):
+    file_class, volume_class, publisher_class = classes
+    file_fields = inspect.signature(file_class).parameters
+    volume_fields = inspect.signature(volume_class).parameters
+    files, volumes = [], []
+
+    for series in series_names:
+        root = os.path.join("/library", series)
+        for number in range(1, volumes_per_series + 1):
+            name = f"{series} v{number:03d} (2020) (Digital) (danke-Empire).cbz"
+            path = os.path.join(root, name)
+            # the slotted classes work out the extensionless fields themselves
+            fields = {
+                "name": name,
+                "extensionless_name": get_extensionless_name(name),
+                "basename": name[: len(series)],
+                "extension": get_file_extension(name),
+                "root": root,
+                "path": path,
+                "extensionless_path": get_extensionless_name(path),
+                "volume_number": number,
+                "file_type": "volume",
+                "header_extension": None,
+            }
+            file = file_class(
+                **{key: value for key, value in fields.items() if key in file_fields}
+            )
+            files.append(file)
+            fields.update(
+                {
+                    "series_name": file.basename,
+                    "shortened_series_name": "",
+                    "volume_year": name[-28:-24],
+                    "volume_part": "",
+                    "index_number": number,
+                    "release_group": name[-17:-5],
+                    "extras": [name[-28:-18]],
+                    "publisher": publisher_class(None, None),
+                    "is_premium": False,
+                    "subtitle": "",
+                    "multi_volume": False,
+                    "is_one_shot": False,
+                }
+            )
+            volumes.append(
+                volume_class(
+                    **{
+                        key: value
+                        for key, value in fields.items()
+                        if key in volume_fields
+                    }
+                )
+            )
+
+    return files, volumes
+
+
+memory_benchmark_classes = {
+    "original": (FileOriginal, VolumeOriginal, PublisherOriginal),
+    "slotted": (File, Volume, Publisher),
+}
+
+
+# Builds the scanned objects with the labelled classes in a fresh process,
+# sending back the peak rss before and after.
+def measure_scanned_objects(label, series_count, volumes_per_series, connection):
+    series_names = get_synthetic_series_names(series_count)
+    baseline = get_peak_rss()
+    objects = get_scanned_objects(
+        memory_benchmark_classes[label], series_names, volumes_per_series
+    )
+    connection.send((get_peak_rss(), get_peak_rss() - baseline, len(objects[0])))
+
+
+# Compares the peak rss of the File and Volume objects of a large library
+# scan, before and after they were slotted and had their strings interned.
+def benchmark_memory(number=1, repeat=1, series_count=3000, volumes_per_series=100):
+    context = multiprocessing.get_context("spawn")
+    config = {"series": series_count, "volumes_per_series": volumes_per_series}
+
+    print(f"\nmemory ({series_count * volumes_per_series} files):")
+    for label in memory_benchmark_classes:
+        best = None
+        for _ in range(repeat):
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(
+                target=measure_scanned_objects,
+                args=(label, series_count, volumes_per_series, sender),
+            )
+            process.start()
+            result = receiver.recv()
+            process.join()
+            if best is None or result[0] < best[0]:
+                best = result
+
+        peak, growth, file_count = best
+        assert file_count == series_count * volumes_per_series
+        record_memory_result("memory", label, peak, growth, config)
+
+
+benchmarks = {
+    "discord": benchmark_discord,
+    "write_to_file": benchmark_write_to_file,
+    "qbit": benchmark_qbit,
+    "qbit_pack": benchmark_qbit_pack,
+    "end_to_end": benchmark_end_to_end,
+    "bookwalker": benchmark_bookwalker,
+    "is_image_black_and_white": benchmark_is_image_black_and_white,
+    "is_blank_cover": benchmark_is_blank_cover,
+    "normalize_str": benchmark_normalize_str,
+    "release_parsing": benchmark_release_parsing,
+    "memory": benchmark_memory,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runs the benchmarks.")
+    parser.add_argument(
+        "benchmarks",
+        nargs="*",
+        help=f"The benchmarks to run, all of them if none are passed. ({', '.join(benchmarks)})",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--json",
+        help="Writes the results to this file as json, for comparing across versions.",
+    )
+    parser.add_argument(
+        "--series",
+        type=int,
+        default=10,
+        help="The number of series in the end_to_end library.",
+    )
+    parser.add_argument(
+        "--volumes",
+        type=int,
+        default=8,
+        help="The number of volumes of each series in the end_to_end library.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="The workers end_to_end's extract_covers() and convert_to_cbz() use.",
+    )
+    args = parser.parse_args()
+
+    for name in args.benchmarks:
+        if name not in benchmarks:
+            parser.error(f"unknown benchmark: {name}")
+
+    for name in args.benchmarks or benchmarks:
+        if name == "end_to_end":
+            benchmark_end_to_end(
+                repeat=args.repeat,
+                series_count=args.series,
+                volumes_per_series=args.volumes,
+                workers=args.workers,
+            )
+        else:
+            benchmarks[name](repeat=args.repeat)
+
+    if args.json:
+        write_results(args.json)
+        print(f"\nWrote the results to {args.json}")
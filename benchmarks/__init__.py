@@ -0,0 +1 @@
+# The reference implementations, stand-ins and fixtures benchmark.py runs with.
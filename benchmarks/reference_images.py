@@ -0,0 +1,36 @@
+# The image checks benchmark.py compares the current ones against,
+# copied as they were before the change they're measuring.
+from komga_cover_extractor import *
+
+
+# The original pure-python is_image_black_and_white(), kept as the reference
+# the numpy version is checked and timed against.
+def is_image_black_and_white_python(image, tolerance=15):
+    pixels = list(image.convert("RGB").getdata())
+    grayscale_count = 0
+
+    for r, g, b in pixels:
+        if abs(r - g) <= tolerance and abs(g - b) <= tolerance:
+            grayscale_count += 1
+
+    return grayscale_count / len(pixels) > 0.9
+
+
+# The original blank cover check from find_and_extract_cover(), kept as the
+# reference the preloaded version is checked and timed against.
+def is_blank_image_original(image_data):
+    ssim_score_white = prep_images_for_similarity(
+        blank_white_image_path, image_data, silent=True
+    )
+    ssim_score_black = prep_images_for_similarity(
+        blank_black_image_path, image_data, silent=True
+    )
+
+    return (
+        ssim_score_white is not None
+        and ssim_score_black is not None
+        and (
+            ssim_score_white >= blank_cover_required_similarity_score
+            or ssim_score_black >= blank_cover_required_similarity_score
+        )
+    )
@@ -0,0 +1,33 @@
+# The log writing benchmark.py compares the buffered LogWriter against,
+# copied as it was before the change it's measuring.
+from komga_cover_extractor import *
+
+
+# The original write_to_file(), which reopened the log file for every line and
+# read the whole file back to check for duplicates, kept as the reference the
+# buffered LogWriter is checked and timed against.
+def write_to_file_original(
+    file,
+    message,
+    without_timestamp=False,
+    overwrite=False,
+    check_for_dup=False,
+    write_to=None,
+):
+    log_file_path = os.path.join(write_to, file)
+    message = re.sub("\t|\n", "", str(message), flags=re.IGNORECASE).strip()
+
+    contains = False
+    if check_for_dup and os.path.isfile(log_file_path):
+        with open(log_file_path, "r") as f:
+            contains = any(line.strip() == message.strip() for line in f)
+
+    if not contains or overwrite:
+        append_write = "a" if os.path.exists(log_file_path) and not overwrite else "w"
+        with open(log_file_path, append_write) as f:
+            if without_timestamp:
+                f.write(f"\n {message}")
+            else:
+                f.write(f"\n{datetime.now().strftime('%d/%m/%Y %H:%M:%S')} {message}")
+        return True
+    return False
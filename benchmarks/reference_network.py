@@ -0,0 +1,100 @@
+# The network code benchmark.py compares the current versions against,
+# the bookwalker pacing, discord sends and the qbit unchecker addon's checks,
+# copied as they were before the change they're measuring.
+from komga_cover_extractor import *
+
+
+# The original's pacing, a fixed sleep between requests on top of their own time
+class SleepingLimiter(RateLimiter):
+    def __init__(self, sleep=2):
+        super().__init__(0)
+        self.sleep = sleep
+        self.first = True
+
+    def acquire(self):
+        if not self.first:
+            time.sleep(self.sleep)
+        self.first = False
+
+
+# The original synchronous send_discord_message(), kept as the reference the
+# dispatcher is timed against. Sends the embeds and waits out any rate limit.
+def send_discord_message_original(hook, embeds):
+    webhook = DiscordWebhook(url=hook, rate_limit_retry=True)
+    for embed in embeds[:10]:
+        webhook.add_embed(embed.embed)
+    webhook.execute()
+
+
+# The addon's original polling: every torrent, and every torrent's files, each cycle
+def get_qbit_torrents_to_check_original(addon, qb):
+    torrents = [torrent for torrent in qb.torrents.info() if torrent.files.data]
+    filtered_torrents = addon.filter_torrents(torrents)
+    filtered_torrents.sort(key=lambda x: len(x.files.data))
+    return {torrent.hash: torrent.files.data for torrent in filtered_torrents}
+
+
+# The addon's original check of a torrent's files, kept as the reference the
+# in-memory library lookup is checked and timed against. Runs
+# check_for_existing_series() for each new series and unchecks each file on its own.
+def check_qbit_files_original(addon, torrent, files, qb):
+    files_to_exclude = []
+    volumes = []
+
+    for name in [file.name for file in files]:
+        dir_name = os.path.basename(os.path.dirname(name)) or torrent.name
+        volume = upgrade_to_volume_class(
+            upgrade_to_file_class(
+                [os.path.basename(name)],
+                f"/{dir_name}",
+                is_correct_extensions_feature=convertable_file_extensions
+                + file_extensions,
+                test_mode=True,
+            ),
+            skip_release_year=True,
+            skip_release_group=True,
+            skip_extras=True,
+            skip_publisher=True,
+            skip_premium_content=True,
+            skip_subtitle=True,
+            test_mode=True,
+        )
+        if volume:
+            volumes.append(volume[0])
+
+    no_matches = []
+    cached_series = {}
+    files_dict = {os.path.basename(file.name): file for file in files}
+
+    for volume in volumes:
+        og_volume_base = os.path.basename(volume.path)
+        key = f"{volume.series_name} - {volume.file_type} - {volume.extension}"
+
+        if key in no_matches:
+            continue
+
+        existing_files = cached_series.get(key, [])
+        if not existing_files:
+            existing_files = check_for_existing_series(
+                test_mode=[volume],
+                test_download_folders=download_folders or [addon.ROOT_DIR],
+                test_paths=paths,
+                test_paths_with_types=paths_with_types,
+                test_cached_paths=addon.cached_paths,
+            )
+            if key not in cached_series:
+                cached_series[key] = existing_files
+
+        if not existing_files:
+            no_matches.append(key)
+            continue
+
+        if volume.name not in addon.check_upgrade_or_new(volume, existing_files):
+            torrent_file_item = files_dict.get(og_volume_base)
+            if torrent_file_item:
+                files_to_exclude.append(torrent_file_item)
+                qb.torrents.file_priority(
+                    torrent.hash, file_ids=[torrent_file_item.index], priority=0
+                )
+
+    return files_to_exclude
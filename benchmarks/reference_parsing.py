@@ -0,0 +1,610 @@
+# The file name parsing benchmark.py compares the current functions against,
+# copied as they were before the change they're measuring.
+from komga_cover_extractor import *
+
+
+# The original normalize_str(), kept as the reference the
+# precompiled version is checked and timed against.
+def normalize_str_original(
+    s,
+    skip_common_words=False,
+    skip_editions=False,
+    skip_type_keywords=False,
+    skip_japanese_particles=False,
+    skip_misc_words=False,
+    skip_storefront_keywords=False,
+):
+    if len(s) <= 1:
+        return s
+
+    words_to_remove = []
+
+    if not skip_common_words:
+        words_to_remove.extend(normalize_str_common_words)
+
+    if not skip_editions:
+        words_to_remove.extend(normalize_str_editions)
+
+    if not skip_type_keywords:
+        type_keywords = normalize_str_type_keywords
+        words_to_remove.extend(type_keywords)
+
+    if not skip_japanese_particles:
+        words_to_remove.extend(normalize_str_japanese_particles)
+
+    if not skip_misc_words:
+        words_to_remove.extend(normalize_str_misc_words)
+
+    if not skip_storefront_keywords:
+        words_to_remove.extend(normalize_str_storefront_keywords)
+
+    for word in words_to_remove:
+        pattern = rf"\b{word}\b" if word not in type_keywords else rf"{word}\s"
+        s = re.sub(pattern, " ", s, flags=re.IGNORECASE).strip()
+
+        s = remove_dual_space(s)
+
+    return s.strip()
+
+
+# The release parsing functions as they were before their patterns were
+# pre-compiled, kept as the reference the current versions are checked against.
+volume_number_search_pattern = re.compile(
+    r"\b(?<![\[\(\{])(%s)((\.)|)(\s+)?([0-9]+)(([-_.])([0-9]+)|)+\b"
+    % volume_regex_keywords,
+    re.IGNORECASE,
+)
+rx_search_chapters = re.compile(
+    r"([0-9]+)(([-_.])([0-9]+)|)+((x|#)([0-9]+)(([-_.])([0-9]+)|)+)", re.IGNORECASE
+)
+rx_remove_x_hash = re.compile(r"((x|#))", re.IGNORECASE)
+
+
+# check if volume file name is a chapter
+def contains_chapter_keywords_original(file_name):
+    # Replace "_extra"
+    file_name_clean = file_name.replace("_extra", ".5")
+
+    # Replace underscores
+    file_name_clean = (
+        replace_underscores(file_name_clean).strip()
+        if "_" in file_name_clean
+        else file_name_clean
+    )
+
+    # Remove dual spaces
+    file_name_clean = remove_dual_space(file_name_clean).strip()
+
+    # Use compiled patterns for searching
+    found = False
+    for pattern in chapter_search_patterns_comp:
+        result = pattern.search(file_name_clean)
+        if result:
+            result = result.group()
+
+            if not (
+                starts_with_bracket(result)
+                and ends_with_bracket(result)
+                and (len(result[1:-1]) == 4 and result[1:-1].isdigit())
+            ):
+                found = True
+                break
+
+    if not found and not contains_volume_keywords_original(file_name):
+        # Remove volume year
+        without_year = volume_year_pattern.sub("", file_name)
+        chapter_numbers_found = None
+
+        # Remove any 2000-2999 numbers at the end
+        if any(map(str.isdigit, without_year)):
+            without_year = without_year_pattern.sub("", without_year)
+
+            # Check for chapter numbers
+            chapter_numbers_found = chapter_numbers_check_pattern.search(without_year)
+
+        if chapter_numbers_found:
+            found = True
+
+    return found
+
+
+# Checks if the passed string contains volume keywords
+def contains_volume_keywords_original(file):
+    # Replace _extra
+    file = file.replace("_extra", ".5")
+
+    # Remove dual spaces
+    file = remove_dual_space(file).strip()
+
+    # Remove brackets
+    clean_file = remove_brackets(file) if contains_brackets(file) else file
+
+    # Replace underscores
+    clean_file = (
+        replace_underscores(clean_file).strip()
+        if "_" in clean_file
+        else clean_file.strip()
+    )
+
+    # Remove dual spaces
+    clean_file = remove_dual_space(clean_file).strip()
+
+    return bool(volume_regex.search(clean_file))
+
+
+# Retrieves the series name through various regexes
+# Removes the volume number and anything to the right of it, and strips it.
+def get_series_name_from_volume_original(name, root, test_mode=False, second=False):
+    # Remove starting brackets
+    # EX: "[WN] Series Name" -> "Series Name"
+    if starts_with_bracket(name) and re.search(
+        r"^(\[[^\]]*\]|\([^\)]*\)|\{[^}]*\})+(\s+[A-Za-z]{2})", name
+    ):
+        # remove the brackets only
+        name = re.sub(r"^(\[[^\]]*\]|\([^\)]*\)|\{[^}]*\})+\s+", "", name).strip()
+
+    # replace _extra
+    name = remove_dual_space(name.replace("_extra", ".5")).strip()
+
+    # Replace "- One-shot" after series name
+    if "one" in name.lower() and "shot" in name.lower():
+        name = re.sub(r"(-\s*)Ones?(-|)shot\s*", "", name, flags=re.IGNORECASE).strip()
+
+    # replace underscores
+    name = replace_underscores(name) if "_" in name else name
+
+    # remove brackets
+    # name = remove_brackets(name) if contains_brackets(name) else name
+
+    if is_one_shot(name, root, test_mode=test_mode):
+        name = re.sub(
+            r"([-_ ]+|)(((\[|\(|\{).*(\]|\)|\}))|LN)([-_. ]+|)(%s|).*"
+            % file_extensions_regex.replace(r"\.", ""),
+            "",
+            name,
+            flags=re.IGNORECASE,
+        ).strip()
+    else:
+        if re.search(
+            r"(\b|\s)(?<![A-Za-z])((\s|)-(\s|)|)(Part|)(\[|\(|\{)?(%s)(\.|)([-_. ]|)([0-9]+)(\b|\s).*"
+            % volume_regex_keywords,
+            name,
+            flags=re.IGNORECASE,
+        ):
+            name = (
+                re.sub(
+                    r"(\b|\s)(?<![A-Za-z])((\s|)-(\s|)|)(Part|)(\[|\(|\{)?(%s)(\.|)([-_. ]|)([0-9]+)(\b|\s).*"
+                    % volume_regex_keywords,
+                    "",
+                    name,
+                    flags=re.IGNORECASE,
+                )
+            ).strip()
+        else:
+            name = re.sub(
+                r"(\d+)?([-_. ]+)?((\[|\(|\})(.*)(\]|\)|\}))?([-_. ]+)?(%s)$"
+                % file_extensions_regex,
+                "",
+                name,
+                flags=re.IGNORECASE,
+            ).strip()
+
+    # Remove a trailing comma at the end of the name
+    if name.endswith(","):
+        name = name[:-1].strip()
+
+    # Remove the file extension if still remaining
+    if get_file_extension(name) in file_extensions:
+        name = re.sub(r"(%s)$" % file_extensions_regex, "", name).strip()
+
+    # Remove "- Complete" from the end
+    # "Series Name - Complete" -> "Series Name"
+    # EX File: Series Name - Complete v01 [Premium] [Publisher].epub
+    if name.lower().endswith("complete"):
+        name = re.sub(r"(-|:)\s*Complete$", "", name, flags=re.IGNORECASE).strip()
+
+    # Default to the root folder name if we have nothing left
+    # As long as it's not in our download folders or paths
+    if (
+        not name
+        and not second
+        and root
+        and (
+            os.path.basename(root) not in str(download_folders) or not download_folders
+        )
+        and (os.path.basename(root) not in str(paths) or not paths)
+        and not contains_keyword(os.path.basename(root))
+    ):
+        # Get the series namne from the root folder
+        # EX: "Kindaichi 37-sai no Jikenbo -v01-v12-"" -> "Kindaichi 37-sai no Jikenbo"
+        name = get_series_name_from_volume_original(
+            os.path.basename(root), root, test_mode=test_mode, second=True
+        )
+
+        # Remove any brackets
+        name = remove_brackets(name) if contains_brackets(name) else name
+
+    return name
+
+
+# Determines if a volume file is a multi-volume file or not
+# EX: TRUE == series_title v01-03.cbz
+# EX: FALSE == series_title v01.cbz
+def check_for_multi_volume_file_original(file_name, chapter=False):
+    # Set the list of keywords to search for
+    keywords = volume_regex_keywords if not chapter else chapter_regex_keywords + "|"
+
+    # Search for a multi-volume or multi-chapter pattern in the file name, ignoring any bracketed information in the name
+    if "-" in file_name and re.search(
+        # Use regular expressions to search for the pattern of multiple volumes or chapters
+        r"(\b({})(\.)?(\s+)?([0-9]+(\.[0-9]+)?)([-]([0-9]+(\.[0-9]+)?))+\b)".format(
+            keywords
+        ),
+        remove_brackets(file_name) if contains_brackets(file_name) else file_name,
+        re.IGNORECASE,  # Ignore case when searching
+    ):
+        # If the pattern is found, return True
+        return True
+    else:
+        # If the pattern is not found, return False
+        return False
+
+
+# Finds the volume/chapter number(s) in the file name.
+def get_release_number_original(file, chapter=False):
+
+    # Cleans up the chapter's series name
+    def clean_series_name(name):
+        # Removes starting period
+        # EX: "series_name. 031 (2023).cbz" -> "'. 031 (2023)"" -> "031 (2023)"
+        if "." in name:
+            name = re.sub(r"^\s*(\.)", "", name, re.IGNORECASE).strip()
+
+        # Remove any subtitle
+        # EX: "series_name 179.1 - Epilogue 01 (2023) (Digital) (release_group).cbz" ->
+        # "" 179.1 - Epilogue 01"  -> "179.1"
+        if ("-" in name or ":" in name) and re.search(r"(^\d+)", name.strip()):
+            name = re.sub(r"((\s+(-)|:)\s+).*$", "", name, re.IGNORECASE).strip()
+
+        # Removes # from the number
+        # EX: #001 -> 001
+        if "#" in name:
+            name = re.sub(r"($#)", "", name, re.IGNORECASE).strip()
+
+            # Removes # from bewteen the numbers
+            # EX: 154#3 -> 154
+            if "#" in name and re.search(r"(\d+#\d+)", name):
+                name = re.sub(r"((#)([0-9]+)(([-_.])([0-9]+)|)+)", "", name).strip()
+
+        # removes part from chapter number
+        # EX: 053x1 or c053x1 -> 053 or c053
+        if "x" in name:
+            name = re.sub(r"(x[0-9]+)", "", name, re.IGNORECASE).strip()
+
+        # removes the bracketed info from the end of the string, empty or not
+        if contains_brackets(name):
+            name = remove_brackets(name).strip()
+
+        # Removes the - characters.extension from the end of the string, with
+        # the dash and characters being optional
+        # EX:  - prologue.extension or .extension
+        name_extension = get_file_extension(name)
+        if name_extension in file_extensions:
+            if "-" in name:
+                name = re.sub(
+                    r"(((\s+)?-(\s+)?([A-Za-z]+))?(%s))" % file_extensions_regex,
+                    "",
+                    name,
+                    re.IGNORECASE,
+                ).strip()
+            else:
+                name = name.replace(name_extension, "").strip()
+
+        if "-" in name:
+            # - #404 - -> #404
+            if name.startswith("- "):
+                name = name[1:].strip()
+            if name.endswith(" -"):
+                name = name[:-1].strip()
+
+        # remove # at the beginning of the string
+        # EX: #001 -> 001
+        if name.startswith("#"):
+            name = name[1:].strip()
+
+        return name
+
+    results = []
+    is_multi_volume = False
+    keywords = volume_regex_keywords if not chapter else chapter_regex_keywords
+    result = None
+
+    # Replace _extra
+    file = remove_dual_space(file.replace("_extra", ".5")).strip()
+
+    # Replace underscores
+    file = replace_underscores(file) if "_" in file else file
+
+    is_multi_volume = (
+        check_for_multi_volume_file_original(file, chapter=chapter)
+        if "-" in file
+        else False
+    )
+
+    if not chapter:  # Search for a volume number
+        result = volume_number_search_pattern.search(file)
+    else:  # Prep for a chapter search
+        if has_multiple_numbers(file) and ("-" in file or "#" in file):
+            extension_less_file = get_extensionless_name(file)
+
+            if chapter_number_search_pattern.search(extension_less_file):
+                file = chapter_number_search_pattern.sub("", extension_less_file)
+
+                # Remove - at the end of the string
+                if file.endswith("-") and not re.search(
+                    r"-(\s+)?(#)?([0-9]+)(([-_.])([0-9]+)|)+(x[0-9]+)?(\s+)?-", file
+                ):
+                    file = file[:-1].strip()
+
+        # Search for a chapter match
+        result = next(
+            (
+                r
+                for pattern in chapter_search_patterns_comp
+                if (r := pattern.search(file))
+            ),
+            None,
+        )
+
+    if result:
+        try:
+            file = result.group().strip() if hasattr(result, "group") else ""
+
+            # Clean the series name
+            if chapter:
+                file = clean_series_name(file)
+
+            # Remove volume/chapter keywords from the file name
+            if contains_non_numeric(file):
+                file = re.sub(
+                    r"\b({})(\.|)([-_. ])?".format(keywords),
+                    "",
+                    file,
+                    flags=re.IGNORECASE,
+                ).strip()
+
+                if contains_non_numeric(file) and re.search(
+                    r"\b[0-9]+({})[0-9]+\b".format(keywords),
+                    file,
+                    re.IGNORECASE,
+                ):
+                    file = (
+                        re.sub(
+                            r"({})".format(keywords),
+                            ".",
+                            file,
+                            flags=re.IGNORECASE,
+                        )
+                    ).strip()
+
+            try:
+                if is_multi_volume or (
+                    ("-" in file or "_" in file)
+                    and re.search(
+                        r"([0-9]+(\.[0-9]+)?)([-_]([0-9]+(\.[0-9]+)?))+", file
+                    )
+                ):
+                    if not is_multi_volume:
+                        is_multi_volume = True
+
+                    multi_numbers = get_min_and_max_numbers(file)
+                    if multi_numbers:
+                        results.extend(
+                            (
+                                int(volume_number)
+                                if float(volume_number).is_integer()
+                                else float(volume_number)
+                            )
+                            for volume_number in multi_numbers
+                        )
+                        if len(multi_numbers) == 1:
+                            is_multi_volume = False
+                            results = (
+                                int(results[0])
+                                if float(results[0]).is_integer()
+                                else float(results[0])
+                            )
+                else:
+                    # Remove trailing ".0" so conversion doesn't fail
+                    if file.endswith("0") and ".0" in file:
+                        file = file.split(".0")[0]
+                    results = int(file) if float(file).is_integer() else float(file)
+
+            except ValueError as v:
+                send_message(f"Not a float: {file}: ERROR: {v}", error=True)
+        except AttributeError:
+            send_message(str(AttributeError.with_traceback), error=True)
+
+    if results or results == 0:
+        if is_multi_volume:
+            return tuple(results)
+        elif chapter:
+            return results
+        elif results < 2000:
+            return results
+
+    return ""
+
+
+# Get the release year from the file metadata, if present, otherwise from the file name
+def get_release_year_original(name, metadata=None):
+    result = None
+
+    # Drop the bracketed year from the file name
+    match = volume_year_pattern.search(name)
+    if match:
+        result = match.group()[1:-1]
+
+    # Check the internal metadata for a year if the file name didn't have one
+    if not result and metadata:
+        release_year_from_file = None
+
+        # Avoid the metadata year if there's no summary/description
+        # (likely a wrong year since there's no proper metadata)
+        if "Summary" in metadata and "Year" in metadata:
+            release_year_from_file = metadata["Year"]
+        elif "dc:description" in metadata and "dc:date" in metadata:
+            release_year_from_file = metadata["dc:date"].strip()
+            release_year_from_file = release_year_from_file.split("-")[0]
+
+        if release_year_from_file and not (
+            len(release_year_from_file) == 4 and release_year_from_file.isdigit()
+        ):
+            release_year_from_file = None
+
+        if release_year_from_file:
+            result = int(release_year_from_file)
+            if result < 1950:
+                result = None
+
+    return result
+
+
+# Retrieves and returns the file part from the file name
+def get_file_part_original(file, chapter=False, series_name=None, subtitle=None):
+    result = ""
+
+    contains_keyword = (
+        re.search(r"\bpart\b", file, re.IGNORECASE) if "part" in file.lower() else ""
+    )
+    contains_indicator = "#" in file or "x" in file
+
+    if not contains_keyword and not contains_indicator:
+        return result
+
+    if series_name:
+        # remove it from the file name
+        file = re.sub(re.escape(series_name), "", file, flags=re.IGNORECASE).strip()
+    if subtitle:
+        # remove it from the file name
+        file = re.sub(re.escape(subtitle), "", file, flags=re.IGNORECASE).strip()
+
+    if not chapter:
+        if contains_keyword:
+            # Remove the matched string from the input file name
+            file = rx_remove.sub("", file).strip()
+            search = rx_search_part.search(file)
+            if search:
+                result = search.group(1)
+                result = re.sub(
+                    r"Part([-_. ]|)+", " ", result, flags=re.IGNORECASE
+                ).strip()
+    else:
+        if contains_indicator:
+            search = rx_search_chapters.search(file)
+            if search:
+                part_search = re.search(
+                    r"((x|#)([0-9]+)(([-_.])([0-9]+)|)+)", search.group(), re.IGNORECASE
+                )
+                if part_search:
+                    # remove the x or # from the string
+                    result = rx_remove_x_hash.sub("", part_search.group())
+
+    # Set the number as float or int
+    result = set_num_as_float_or_int(result)
+
+    return result
+
+
+# Retrieves any bracketed information in the name that isn't the release year.
+def get_extras_original(
+    file_name, chapter=False, series_name="", subtitle="", extension=""
+):
+    # Helper function to remove matching patterns from text
+    def remove_matching(text, pattern):
+        return re.sub(
+            rf"\b{re.escape(pattern)}\b", "", text, flags=re.IGNORECASE
+        ).strip()
+
+    # Helper function to extract unique patterns from text
+    def extract_unique_patterns(text):
+        results = re.findall(
+            r"((?:\{|\(|\[).*?(?:\]|\)|\}))", text, flags=re.IGNORECASE
+        )
+        return results
+
+    # Helper function to remove specific patterns from a list
+    def remove_patterns(items, patterns):
+        pattern_combined_regex = "|".join(patterns)
+        items = [
+            item
+            for item in items
+            if not re.search(pattern_combined_regex, item, re.IGNORECASE)
+        ]
+        return items
+
+    # Get the file extension
+    extension = extension or get_file_extension(file_name)
+
+    # Remove series name and subtitle if provided
+    if series_name:
+        file_name = remove_matching(file_name, series_name)
+
+    if subtitle:
+        file_name = remove_matching(file_name, subtitle)
+
+    # Extract unique patterns from the file name
+    results = extract_unique_patterns(file_name)
+
+    # Define patterns and exclude patterns for removal
+    patterns = [
+        r"((\{|\(|\[)(Premium|J-Novel Club Premium)(\]|\)|\}))",
+        r"(\((\d{4})\))",
+    ]
+
+    if chapter:
+        patterns.append(r"((\{|\(|\[)Part([-_. ]|)([0-9]+)(\]|\)|\}))")
+
+    # Remove specified patterns from the results
+    results = remove_patterns(results, patterns)
+
+    # Remove any possible dupcliates
+    results = remove_duplicates(results)
+
+    # Generate file extension modifiers for keywords
+    modifiers = {
+        ext: (
+            "[%s]"
+            if ext in novel_extensions
+            else "(%s)" if ext in manga_extensions else ""
+        )
+        for ext in file_extensions
+    }
+
+    # Check for and add "Part" patterns to the results
+    part_search = (
+        re.search(r"(\s|\b)Part([-_. ]|)([0-9]+)", file_name, re.IGNORECASE)
+        if "part" in file_name.lower()
+        else None
+    )
+    if part_search:
+        result = part_search.group()
+        modified_result = modifiers[extension] % result.strip()
+        if modified_result not in results:
+            results.append(modified_result)
+
+    # Check for and add keywords to the results
+    if "premium" in file_name.lower():
+        modified_keyword = modifiers[extension] % "Premium"
+        if modified_keyword not in results:
+            results.append(modified_keyword)
+
+    premium_items, non_premium_items = [], []
+    modified = results.copy()
+    for item in modified:
+        if "premium" in item.lower():
+            premium_items.append(item)
+        else:
+            non_premium_items.append(item)
+
+    return premium_items + non_premium_items
@@ -0,0 +1,426 @@
+# Local stand-ins for the services benchmark.py talks to, bookwalker,
+# a discord webhook and qBittorrent's web api.
+import collections
+import email
+import hashlib
+import http.server
+import json
+import random
+import threading
+import time
+import urllib.parse
+
+from komga_cover_extractor import *
+
+from benchmarks.synthetic_library import get_synthetic_series_names
+
+
+# A local stand-in for bookwalker, serving generated search and book pages
+# in the layout search_bookwalker() parses. Every search is for a series with
+# volumes_per_page volumes on each of its pages.
+#  - latency: the time taken to answer each request
+#  - forbidden_requests: the number of requests answered with a 403 first
+class BookwalkerStandIn:
+    def __init__(self, latency=0.02, pages=2, volumes_per_page=5, forbidden_requests=0):
+        self.latency = latency
+        self.pages = pages
+        self.volumes_per_page = volumes_per_page
+        self.forbidden_requests = forbidden_requests
+        self.requests = 0
+        self.not_modified = 0
+        self.lock = threading.Lock()
+
+        stand_in = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                stand_in.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.search_url = f"{self.url}/search/?word="
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def handle(self, request):
+        with self.lock:
+            self.requests += 1
+            forbidden = self.requests <= self.forbidden_requests
+
+        time.sleep(self.latency)
+
+        if forbidden:
+            request.send_response(403)
+            request.end_headers()
+            return
+
+        parsed = urllib.parse.urlparse(request.path)
+        query = urllib.parse.parse_qs(parsed.query)
+
+        if parsed.path.startswith("/book/"):
+            body = self.get_book_page(*parsed.path.split("/")[2:4])
+        elif "page" in query:
+            body = self.get_search_page(query["word"][0], int(query["page"][0]))
+        else:
+            body = self.get_search_page(query["word"][0], None)
+
+        body = body.encode("utf-8")
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+
+        if request.headers.get("If-None-Match") == etag:
+            with self.lock:
+                self.not_modified += 1
+            request.send_response(304)
+            request.send_header("ETag", etag)
+            request.end_headers()
+            return
+
+        request.send_response(200)
+        request.send_header("Content-Type", "text/html; charset=utf-8")
+        request.send_header("Content-Length", str(len(body)))
+        request.send_header("ETag", etag)
+        request.end_headers()
+        request.wfile.write(body)
+
+    def get_search_page(self, series, page):
+        # the series only search, a single series tile
+        if page is None:
+            return '<ul class="o-tile-list"><li class="o-tile"></li></ul>'
+
+        pager = "".join(f"<li>{number}</li>" for number in range(1, self.pages + 1))
+        tiles = ""
+        for index in range(self.volumes_per_page):
+            volume = (page - 1) * self.volumes_per_page + index + 1
+            book_url = f"{self.url}/book/{urllib.parse.quote(series)}/{volume}"
+            tiles += f"""
+            <li class="o-tile"><div class="o-tile-book-info">
+                <div class="m-tile-thumb-box"><a class="a-tile-thumb-img" href="{book_url}">
+                    <img data-srcset="{book_url}.jpg 1x, {book_url}-2x.jpg 2x"></a></div>
+                <ul class="m-tile-tag-box"><li class="m-tile-tag"><div class="a-tag-manga">Manga</div></li></ul>
+                <h2 class="a-tile-ttl">{series} Volume {volume}</h2>
+            </div></li>"""
+
+        return f"""<html><body>
+            <div class="pager-area"><ul class="clearfix">{pager}</ul></div>
+            <ul class="o-tile-list">{tiles}</ul>
+        </body></html>"""
+
+    def get_book_page(self, series, volume):
+        series = urllib.parse.unquote(series)
+        return f"""<html><head><meta property="og:image" content="{self.url}/{volume}.jpg"></head>
+        <body><div class="product-detail-inner"><table class="product-detail">
+            <tr><th>Series Title</th><td>{series}</td></tr>
+            <tr><th>Available since</th><td>Jan 01, 2020</td></tr>
+        </table></div>
+        <div itemprop="description"><p class="synopsis-text">Volume {volume} of {series}.</p></div>
+        </body></html>"""
+
+
+# A local stand-in for a discord webhook, with Discord's per-webhook rate limit
+# of limit messages every window seconds. Requests over it are answered with a 429.
+#  - latency: the time taken to answer each request
+#  - rate_limited_requests: the number of requests answered with a 429 first
+class DiscordStandIn:
+    def __init__(self, latency=0.02, limit=5, window=1.0, rate_limited_requests=0):
+        self.latency = latency
+        self.limit = limit
+        self.window = window
+        self.rate_limited_requests = rate_limited_requests
+        self.requests = 0
+        self.rate_limited = 0
+        self.messages = []  # the payload of each message received
+        self.sent_times = []
+        self.lock = threading.Lock()
+
+        stand_in = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_POST(self):
+                stand_in.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/webhook"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+    # Returns the json payload of the request, which is a part of it when it has files
+    @staticmethod
+    def get_payload(request, body):
+        content_type = request.headers.get("Content-Type", "")
+        if not content_type.startswith("multipart/"):
+            return json.loads(body)
+
+        message = email.message_from_bytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode() + body
+        )
+        for part in message.walk():
+            if part.get_param("name", header="content-disposition") == "payload_json":
+                return json.loads(part.get_payload(decode=True))
+        return {}
+
+    def handle(self, request):
+        body = request.rfile.read(int(request.headers.get("Content-Length", 0)))
+        time.sleep(self.latency)
+
+        with self.lock:
+            self.requests += 1
+            now = time.monotonic()
+            self.sent_times = [x for x in self.sent_times if now - x < self.window]
+
+            if (
+                self.requests <= self.rate_limited_requests
+                or len(self.sent_times) >= self.limit
+            ):
+                self.rate_limited += 1
+                retry_after = (
+                    self.window - (now - self.sent_times[0])
+                    if len(self.sent_times) >= self.limit
+                    else 0.05
+                )
+                response = json.dumps({"retry_after": round(retry_after, 3)})
+                request.send_response(429)
+                request.send_header("Content-Type", "application/json")
+                request.send_header("Via", "1.1 google")
+                request.send_header("Retry-After", str(round(retry_after, 3)))
+                request.end_headers()
+                request.wfile.write(response.encode())
+                return
+
+            self.sent_times.append(now)
+            self.messages.append(self.get_payload(request, body))
+            remaining = self.limit - len(self.sent_times)
+            reset_after = self.window - (now - self.sent_times[0])
+
+        request.send_response(200)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("X-RateLimit-Limit", str(self.limit))
+        request.send_header("X-RateLimit-Remaining", str(remaining))
+        request.send_header("X-RateLimit-Reset-After", f"{reset_after:.3f}")
+        request.end_headers()
+        request.wfile.write(b"{}")
+
+
+# A local stand-in for qBittorrent's web api, serving the endpoints the qbit
+# unchecker addon uses. sync/maindata returns only the fields that changed since
+# the rid that's passed, like qBittorrent does.
+class QbittorrentStandIn:
+    def __init__(
+        self,
+        torrent_count=2000,
+        files_per_torrent=10,
+        target_category="manga",
+        paused_count=5,
+        seed=0,
+    ):
+        rng = random.Random(seed)
+        self.rng = rng
+        self.rid = 1
+        self.torrents = {}  # hash -> fields
+        self.field_rids = {}  # hash -> {field: rid it last changed at}
+        self.removed = {}  # hash -> rid it was removed at
+        self.files = {}
+        self.requests = collections.Counter()
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+
+        series_names = get_synthetic_series_names(max(1, torrent_count // 10), seed)
+        for index in range(torrent_count):
+            torrent_hash = hashlib.sha1(str(index).encode()).hexdigest()
+            series_name = series_names[index % len(series_names)]
+            paused = index < paused_count
+            self.torrents[torrent_hash] = {
+                "name": f"{series_name} v{index % 20 + 1:02d}-{index % 20 + 5:02d}",
+                "category": (
+                    target_category
+                    if paused or index % 3 == 0
+                    else rng.choice(["anime", "linux", "music"])
+                ),
+                "state": (
+                    "stoppedDL"
+                    if paused
+                    else rng.choice(["uploading", "stalledUP", "downloading"])
+                ),
+                "progress": 0 if paused else rng.random(),
+                "size": rng.randint(10**8, 10**10),
+                "dlspeed": 0,
+                "upspeed": rng.randint(0, 10**6),
+                "num_seeds": rng.randint(0, 50),
+                "num_leechs": rng.randint(0, 50),
+                "ratio": rng.random() * 3,
+                "eta": 8640000,
+                "added_on": 1700000000 + index,
+                "completion_on": -1,
+                "save_path": f"/downloads/{series_name}",
+                "tags": "",
+                "tracker": "udp://tracker.example.org:1337/announce",
+                "amount_left": 0,
+                "total_size": 0,
+                "priority": 0,
+                "seq_dl": False,
+                "super_seeding": False,
+                "auto_tmm": False,
+            }
+            self.field_rids[torrent_hash] = {}
+            self.files[torrent_hash] = [
+                {
+                    "index": file_index,
+                    "name": f"{series_name}/{series_name} v{file_index + 1:02d}.cbz",
+                    "size": rng.randint(10**7, 10**9),
+                    "progress": 0,
+                    "priority": 1,
+                    "is_seed": False,
+                    "piece_range": [0, 100],
+                    "availability": 1,
+                }
+                for file_index in range(files_per_torrent)
+            ]
+
+        stand_in = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                stand_in.handle(self)
+
+            def do_POST(self):
+                stand_in.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.port = self.server.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.server.shutdown()
+        self.server.server_close()
+
+    # Adds a paused torrent with the passed files, returning its hash
+    def add_torrent(self, name, category, file_names):
+        with self.lock:
+            self.rid += 1
+            torrent_hash = hashlib.sha1(name.encode()).hexdigest()
+            self.torrents[torrent_hash] = {
+                "name": name,
+                "category": category,
+                "state": "stoppedDL",
+                "progress": 0,
+            }
+            self.field_rids[torrent_hash] = {
+                field: self.rid for field in self.torrents[torrent_hash]
+            }
+            self.files[torrent_hash] = [
+                {"index": index, "name": file_name, "priority": 1, "progress": 0}
+                for index, file_name in enumerate(file_names)
+            ]
+            return torrent_hash
+
+    # Changes the progress and speeds of count downloading torrents
+    def tick(self, count):
+        with self.lock:
+            self.rid += 1
+            downloading = [
+                torrent_hash
+                for torrent_hash, torrent in self.torrents.items()
+                if torrent["state"] == "downloading"
+            ]
+            for torrent_hash in self.rng.sample(
+                downloading, min(count, len(downloading))
+            ):
+                torrent = self.torrents[torrent_hash]
+                torrent["progress"] = min(1, torrent["progress"] + 0.01)
+                torrent["dlspeed"] = self.rng.randint(0, 10**7)
+                for field in ["progress", "dlspeed"]:
+                    self.field_rids[torrent_hash][field] = self.rid
+
+    def get_maindata(self, rid):
+        if not rid or rid > self.rid:
+            torrents = self.torrents
+            response = {"full_update": True}
+        else:
+            torrents = {
+                torrent_hash: {
+                    field: self.torrents[torrent_hash][field]
+                    for field, field_rid in self.field_rids[torrent_hash].items()
+                    if field_rid > rid
+                }
+                for torrent_hash in self.torrents
+                if any(
+                    field_rid > rid
+                    for field_rid in self.field_rids[torrent_hash].values()
+                )
+            }
+            response = {
+                "torrents_removed": [
+                    torrent_hash
+                    for torrent_hash, removed_rid in self.removed.items()
+                    if removed_rid > rid
+                ]
+            }
+
+        response.update({"rid": self.rid, "torrents": torrents, "server_state": {}})
+        return response
+
+    def handle(self, request):
+        url = urllib.parse.urlparse(request.path)
+        query = urllib.parse.parse_qs(url.query)
+        body = request.rfile.read(int(request.headers.get("Content-Length") or 0))
+        query.update(urllib.parse.parse_qs(body.decode()))
+        endpoint = url.path.removeprefix("/api/v2/")
+
+        with self.lock:
+            self.requests[endpoint] += 1
+
+            if endpoint == "app/webapiVersion":
+                response = "2.11.2"
+            elif endpoint == "app/version":
+                response = "v5.0.0"
+            elif endpoint == "sync/maindata":
+                response = self.get_maindata(int(query.get("rid", ["0"])[0]))
+            elif endpoint == "torrents/info":
+                response = [
+                    {"hash": torrent_hash, **torrent}
+                    for torrent_hash, torrent in self.torrents.items()
+                ]
+            elif endpoint == "torrents/files":
+                response = self.files.get(query.get("hash", [""])[0], [])
+            else:
+                response = ""
+
+            data = (
+                response if isinstance(response, str) else json.dumps(response)
+            ).encode()
+            self.bytes_sent += len(data)
+
+        request.send_response(200)
+        request.send_header(
+            "Content-Type",
+            "text/plain" if isinstance(response, str) else "application/json",
+        )
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
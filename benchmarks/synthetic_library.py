@@ -0,0 +1,296 @@
+# Generates the synthetic library and download folder the end-to-end
+# and qbit benchmarks in benchmark.py run over.
+import io
+import os
+import random
+import zipfile
+
+import numpy as np
+import py7zr
+from PIL import Image
+
+from komga_cover_extractor import *
+
+# The words synthetic series names, publishers and release groups are made from.
+synthetic_name_words = {
+    "adjectives": [
+        "Ascendant",
+        "Crimson",
+        "Eternal",
+        "Forgotten",
+        "Hidden",
+        "Last",
+        "Lonely",
+        "Quiet",
+        "Reincarnated",
+        "Silver",
+        "Strongest",
+        "Wandering",
+    ],
+    "nouns": [
+        "Alchemist",
+        "Bookworm",
+        "Dragon",
+        "Frontier",
+        "Garden",
+        "Knight",
+        "Labyrinth",
+        "Magician",
+        "Princess",
+        "Saint",
+        "Sword",
+        "Witch",
+    ],
+    "publishers": ["J-Novel Club", "Kodansha", "Seven Seas", "VIZ Media", "Yen Press"],
+    "release_groups": ["1r0n", "danke-Empire", "LuCaZ", "Oak", "Stick", "Ushi"],
+}
+
+
+# Returns count unique, title-like series names.
+def get_synthetic_series_names(count, seed=0):
+    rng = random.Random(seed)
+    adjectives = synthetic_name_words["adjectives"]
+    nouns = synthetic_name_words["nouns"]
+    formats = [
+        "The {adjective} {noun}",
+        "The {noun} of the {adjective} {noun2}",
+        "{adjective} {noun} and the {noun2}",
+        "My Life as the {adjective} {noun}",
+        "{noun} {noun2} Chronicles",
+    ]
+
+    names = []
+    while len(names) < count:
+        name = rng.choice(formats).format(
+            adjective=rng.choice(adjectives),
+            noun=rng.choice(nouns),
+            noun2=rng.choice(nouns),
+        )
+        if name not in names:
+            names.append(name)
+    return names
+
+
+# Returns a jpg cover, a gradient with a few blocks on it so no two
+# volumes share the same cover.
+def create_synthetic_cover(rng, width, height):
+    top = np.array([rng.randrange(256) for _ in range(3)], dtype=np.float32)
+    bottom = np.array([rng.randrange(256) for _ in range(3)], dtype=np.float32)
+    gradient = np.linspace(0, 1, height, dtype=np.float32)[:, None, None]
+    pixels = np.repeat(top + (bottom - top) * gradient, width, axis=1)
+
+    for _ in range(6):
+        x, y = rng.randrange(width), rng.randrange(height)
+        pixels[y : y + height // 6, x : x + width // 4] = rng.randrange(256)
+
+    buffer = io.BytesIO()
+    Image.fromarray(pixels.astype(np.uint8)).save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+# Returns a black and white page, for the pages after the cover.
+def create_synthetic_page(rng, width, height):
+    pixels = np.full((height, width), 235, dtype=np.uint8)
+    for _ in range(12):
+        x, y = rng.randrange(width), rng.randrange(height)
+        pixels[y : y + height // 8, x : x + width // 8] = rng.randrange(64)
+
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="JPEG", quality=75)
+    return buffer.getvalue()
+
+
+# Writes a cbz with a ComicInfo.xml, a cover and the pages.
+def write_synthetic_cbz(path, volume, cover, pages):
+    comic_info = f"""<?xml version="1.0" encoding="utf-8"?>
+<ComicInfo>
+  <Title>{volume["series"]} Volume {volume["number"]}</Title>
+  <Series>{volume["series"]}</Series>
+  <Volume>{volume["number"]}</Volume>
+  <Number>{volume["number"]}</Number>
+  <Year>{volume["year"]}</Year>
+  <Publisher>{volume["publisher"]}</Publisher>
+  <Summary>Volume {volume["number"]} of {volume["series"]}.</Summary>
+  <PageCount>{len(pages) + 1}</PageCount>
+  <Manga>Yes</Manga>
+</ComicInfo>"""
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("ComicInfo.xml", comic_info)
+        archive.writestr("001.jpg", cover, compress_type=zipfile.ZIP_STORED)
+        for index, page in enumerate(pages, start=2):
+            archive.writestr(f"{index:03}.jpg", page, compress_type=zipfile.ZIP_STORED)
+
+
+# Writes an epub with its container.xml, an OPF declaring the cover, and a chapter.
+def write_synthetic_epub(path, volume, cover):
+    container = """<?xml version="1.0" encoding="utf-8"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles>
+    <rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>
+  </rootfiles>
+</container>"""
+
+    opf = f"""<?xml version="1.0" encoding="utf-8"?>
+<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="isbn">
+  <metadata xmlns:dc="http://purl.org/dc/elements/1.1/">
+    <dc:title>{volume["series"]}: Volume {volume["number"]}</dc:title>
+    <dc:creator>{volume["author"]}</dc:creator>
+    <dc:publisher>{volume["publisher"]}</dc:publisher>
+    <dc:identifier id="isbn">{volume["isbn"]}</dc:identifier>
+    <dc:date>{volume["year"]}-01-01</dc:date>
+    <dc:language>en</dc:language>
+    <dc:description>Volume {volume["number"]} of {volume["series"]}.</dc:description>
+    <meta name="cover" content="cover-image"/>
+    <meta property="belongs-to-collection" id="series">{volume["series"]}</meta>
+    <meta refines="#series" property="group-position">{volume["number"]}</meta>
+  </metadata>
+  <manifest>
+    <item id="cover-image" href="Images/cover.jpg" media-type="image/jpeg" properties="cover-image"/>
+    <item id="chapter-1" href="Text/chapter-1.xhtml" media-type="application/xhtml+xml"/>
+  </manifest>
+  <spine>
+    <itemref idref="chapter-1"/>
+  </spine>
+</package>"""
+
+    chapter = f"""<?xml version="1.0" encoding="utf-8"?>
+<html xmlns="http://www.w3.org/1999/xhtml"><body>
+<h1>Chapter 1</h1><p>{"The story continues. " * 200}</p>
+</body></html>"""
+
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("mimetype", "application/epub+zip", zipfile.ZIP_STORED)
+        archive.writestr("META-INF/container.xml", container)
+        archive.writestr("OEBPS/content.opf", opf)
+        archive.writestr("OEBPS/Images/cover.jpg", cover, zipfile.ZIP_STORED)
+        archive.writestr("OEBPS/Text/chapter-1.xhtml", chapter)
+
+
+# Writes a 7z of the cover and the pages, for convert_to_cbz() to repack.
+def write_synthetic_7z(path, cover, pages):
+    with py7zr.SevenZipFile(path, "w") as archive:
+        archive.writestr(cover, "001.jpg")
+        for index, page in enumerate(pages, start=2):
+            archive.writestr(page, f"{index:03}.jpg")
+
+
+# Generates a library and a download folder under root, and returns their paths.
+#  - series_count: the number of series in the library, every third one a novel series
+#  - volumes_per_series: the number of volumes of each series in the library
+#  - pages_per_volume: the number of pages after the cover in each manga volume
+#
+# For each series the download folder gets some of:
+#  - the next volume, for check_for_existing_series() to move into the library
+#  - a release of a library volume, in the "Volume 03" style rename_files() renames
+#  - the same volume from two release groups, for check_for_duplicate_volumes()
+#  - a 7z of the next volume, for convert_to_cbz() to repack
+# half of them in a folder for the series, the rest loose.
+def create_synthetic_library(
+    root,
+    series_count=10,
+    volumes_per_series=8,
+    pages_per_volume=3,
+    cover_size=(600, 900),
+    seed=0,
+):
+    rng = random.Random(seed)
+    library = os.path.join(root, "library")
+    downloads = os.path.join(root, "downloads")
+    os.makedirs(library, exist_ok=True)
+    os.makedirs(downloads, exist_ok=True)
+
+    pages = [
+        create_synthetic_page(rng, cover_size[0], cover_size[1])
+        for _ in range(pages_per_volume)
+    ]
+
+    for index, series in enumerate(get_synthetic_series_names(series_count, seed)):
+        is_novel = index % 3 == 2
+        extension = ".epub" if is_novel else ".cbz"
+        publisher = rng.choice(synthetic_name_words["publishers"])
+        first_year = rng.randrange(2005, 2020)
+
+        def get_volume(number):
+            return {
+                "series": series,
+                "number": number,
+                "year": first_year + number // 2,
+                "publisher": publisher,
+                "author": f"Author {index:03}",
+                "isbn": f"978{rng.randrange(10**9, 10**10)}",
+            }
+
+        def write_volume(path, volume):
+            cover = create_synthetic_cover(rng, *cover_size)
+            if is_novel:
+                write_synthetic_epub(path, volume, cover)
+            else:
+                write_synthetic_cbz(path, volume, cover, pages)
+
+        def get_file_name(volume, release_group, style="library"):
+            if style == "unrenamed":
+                return (
+                    f"{series} - Volume {volume['number']:02} "
+                    f"[{volume['year']}] [Digital] [{release_group}]{extension}"
+                )
+            return (
+                f"{series} v{volume['number']:02} ({volume['year']}) "
+                f"(Digital) ({release_group}){extension}"
+            )
+
+        release_group = rng.choice(synthetic_name_words["release_groups"])
+        series_folder = os.path.join(library, series)
+        os.makedirs(series_folder, exist_ok=True)
+        for number in range(1, volumes_per_series + 1):
+            volume = get_volume(number)
+            write_volume(
+                os.path.join(series_folder, get_file_name(volume, release_group)),
+                volume,
+            )
+
+        download_folder = downloads
+        if index % 2 == 0:
+            download_folder = os.path.join(downloads, series)
+            os.makedirs(download_folder, exist_ok=True)
+
+        next_volume = get_volume(volumes_per_series + 1)
+        write_volume(
+            os.path.join(download_folder, get_file_name(next_volume, release_group)),
+            next_volume,
+        )
+
+        if rng.random() < 0.6:
+            volume = get_volume(rng.randrange(1, volumes_per_series + 1))
+            other_group = rng.choice(synthetic_name_words["release_groups"])
+            write_volume(
+                os.path.join(
+                    download_folder, get_file_name(volume, other_group, "unrenamed")
+                ),
+                volume,
+            )
+
+        if rng.random() < 0.4 and index % 2 == 0:
+            volume = get_volume(volumes_per_series + 2)
+            for duplicate_group in rng.sample(
+                synthetic_name_words["release_groups"], 2
+            ):
+                write_volume(
+                    os.path.join(
+                        download_folder, get_file_name(volume, duplicate_group)
+                    ),
+                    volume,
+                )
+
+        if not is_novel and rng.random() < 0.3:
+            volume = get_volume(volumes_per_series + 3)
+            write_synthetic_7z(
+                os.path.join(
+                    download_folder,
+                    get_file_name(volume, release_group).replace(".cbz", ".7z"),
+                ),
+                create_synthetic_cover(rng, *cover_size),
+                pages,
+            )
+
+    return library, downloads
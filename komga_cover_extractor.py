@@ -1,23 +1,32 @@
 #!/usr/bin/env python3
 import argparse
+import atexit
+import base64
+import concurrent.futures
+import contextlib
 import cProfile
 import hashlib
 import io
+import json
+import marshal
+import multiprocessing
 import os
+import queue
 import re
 import shutil
 import string
 import struct
 import subprocess
 import sys
-import tempfile
 import threading
 import time
 import traceback
 import urllib.request
 import xml.etree.ElementTree as ET
 import zipfile
+import zlib
 from base64 import b64encode
+from collections import namedtuple
 from datetime import datetime
 from difflib import SequenceMatcher
 from functools import lru_cache
@@ -28,11 +37,12 @@ import cv2
 import filetype
 import numpy as np
 import py7zr
+import py7zr.io
 import rarfile
 import regex as re
 import requests
 import scandir
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from discord_webhook import DiscordEmbed, DiscordWebhook
 from lxml import etree
 from PIL import Image
@@ -137,11 +147,137 @@ blank_black_image_path = (
     else None
 )
 
-# Cached paths from the users existing library. Read from cached_paths.txt
-cached_paths = []
+
+# An ordered, set-backed store of the cached paths from the user's existing library.
+# Membership checks are O(1), and new paths are appended to cached_paths.txt
+# in batches instead of rescanning the whole file for every path.
+class CachedPathStore:
+    def __init__(self, file_path=None, flush_every=250):
+        self.file_path = file_path
+        self.flush_every = flush_every
+        self.items = []
+        self.lookup = set()
+        self.pending = []
+
+        # paths that are already in the file, or waiting to be written to it
+        self.written = set()
+
+    def __contains__(self, path):
+        return path in self.lookup
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __add__(self, other):
+        return self.items + list(other)
+
+    def __radd__(self, other):
+        return list(other) + self.items
+
+    # Queues the path to be written to the file, if it isn't already in it
+    def persist(self, path):
+        if path in self.written:
+            return
+
+        self.written.add(path)
+        self.pending.append(path)
+
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+
+    def append(self, path, persist=True):
+        if path in self.lookup:
+            return False
+
+        self.items.append(path)
+        self.lookup.add(path)
+
+        if persist:
+            self.persist(path)
+        else:
+            self.written.add(path)
+        return True
+
+    def extend(self, paths_to_add, persist=True):
+        for path in paths_to_add:
+            self.append(path, persist=persist)
+
+    # Inserts the path at the passed index, moving it there if it's already present
+    def insert(self, index, path):
+        if path in self.lookup:
+            self.items.remove(path)
+        else:
+            self.lookup.add(path)
+            self.persist(path)
+        self.items.insert(index, path)
+
+    def remove(self, path):
+        self.items.remove(path)
+        self.lookup.discard(path)
+
+    def clear(self):
+        self.items = []
+        self.lookup = set()
+        self.pending = []
+        self.written = set()
+
+    # Loads the store from the file in a single pass, skipping duplicates,
+    # ignored lines, and any path that no longer exists.
+    def load(self, ignore=[], check_paths=False):
+        self.clear()
+
+        if not self.file_path or not os.path.isfile(self.file_path):
+            return self
+
+        lines = get_lines_from_file(self.file_path)
+
+        # Every line is already in the file, including the ones skipped below
+        self.written.update(lines)
+
+        self.extend(
+            [
+                line
+                for line in lines
+                if line not in ignore
+                and not (check_paths and paths and not line.startswith(tuple(paths)))
+                and os.path.isdir(line)
+            ],
+            persist=False,
+        )
+        return self
+
+    # Appends any pending paths to the file with a single write.
+    def flush(self, can_write_log=None):
+        can_write_log = log_to_file if can_write_log is None else can_write_log
+
+        if not self.pending or not self.file_path or not can_write_log:
+            return False
+
+        try:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            with open(self.file_path, "a") as f:
+                f.write("".join(f"\n {path}" for path in self.pending))
+            self.pending = []
+            return True
+        except Exception as e:
+            send_message(str(e), error=True, log=False)
+            return False
+
 
 cached_paths_path = os.path.join(LOGS_DIR, "cached_paths.txt")
 
+# Cached paths from the users existing library. Read from cached_paths.txt
+cached_paths = CachedPathStore(cached_paths_path)
+
+# Make sure any paths still waiting to be written aren't lost on exit
+atexit.register(cached_paths.flush)
+
 # Cached identifier results, aka successful matches via series_id or isbn
 cached_identifier_results = []
 
@@ -185,12 +321,13 @@ file_formats = ["chapter", "volume"]
 # when running extract_covers() with watchdog enabled
 root_modification_times = {}
 
+# Ignores library_manifest.json and processes every folder.
+# Pass in via cli
+full_rescan_toggle = False
+
 # Stores all the new series paths for series that were added to an existing library
 moved_folders = []
 
-# Profiles the execution - for dev use
-profile_code = ""
-
 # get all of the non-callable variables
 settings = [
     var
@@ -379,9 +516,6 @@ chapter_search_patterns_comp = [
 # also allows them to be sent in number order.
 messages_to_send = []
 
-# Used to store multiple embeds to be sent in one message
-grouped_notifications = []
-
 # Discord's maximum amount of embeds that can be sent in one message
 discord_embed_limit = 10
 
@@ -389,9 +523,31 @@ discord_embed_limit = 10
 # the watchdog event handler.
 sleep_timer = 10
 
-# The time to wait before scraping another bookwalker page in
-# the bookwalker_check feature.
-sleep_timer_bk = 2
+# The maximum number of bookwalker pages fetched at the same time in the bookwalker_check feature.
+# Set through bookwalker_workers in settings.py.
+bookwalker_workers = getattr(settings_file, "bookwalker_workers", 4)
+
+# The number of requests per second sent to bookwalker, and how many can be sent in a burst.
+# Set through bookwalker_requests_per_second and bookwalker_request_burst in settings.py.
+bookwalker_requests_per_second = getattr(
+    settings_file, "bookwalker_requests_per_second", 0.5
+)
+bookwalker_request_burst = getattr(settings_file, "bookwalker_request_burst", 1)
+
+# How long (in seconds) a cached bookwalker book page is used before it's revalidated.
+# Set through bookwalker_cache_ttl in settings.py.
+bookwalker_cache_ttl = getattr(settings_file, "bookwalker_cache_ttl", 43200)
+
+# How long (in seconds) a cached bookwalker search page is used before it's revalidated,
+# kept short so newly listed volumes show up.
+# Set through bookwalker_search_cache_ttl in settings.py.
+bookwalker_search_cache_ttl = getattr(
+    settings_file, "bookwalker_search_cache_ttl", 3600
+)
+
+# The time to wait after being rate-limited by bookwalker,
+# doubled each time it happens again after waiting.
+bookwalker_backoff_time = 30
 
 # The fill values for the chapter and volume files when renaming.
 # # VOLUME
@@ -489,12 +645,506 @@ release_groups_joined = ""
 # instead of jpg format.
 output_covers_as_webp = False
 
+# The (width, height) that detected covers are compared against the blank images at.
+# Set through blank_cover_comparison_size in settings.py.
+blank_cover_comparison_size = tuple(
+    getattr(settings_file, "blank_cover_comparison_size", (200, 300))
+)
+
+# The number of worker processes used by extract_covers(), 1 = no worker processes.
+# Set through cover_extraction_workers in settings.py or --workers in the cli.
+cover_extraction_workers = getattr(settings_file, "cover_extraction_workers", 1)
+
+# The number of worker processes used by convert_to_cbz() to repack archives (CPU bound).
+# Set through archive_conversion_workers in settings.py or --conversion_workers in the cli.
+archive_conversion_workers = getattr(settings_file, "archive_conversion_workers", 1)
+
+# The number of threads used to read file headers when correcting extensions (I/O bound).
+# Set through header_sniffing_workers in settings.py or --header_workers in the cli.
+header_sniffing_workers = getattr(settings_file, "header_sniffing_workers", 4)
+
+# The format the per-stage metrics of each run are written in, "json" or "prometheus".
+# Nothing is recorded when empty.
+# Set through metrics_format in settings.py or --metrics in the cli.
+metrics_format = getattr(settings_file, "metrics_format", "")
+
+# Where the metrics are written, logs/metrics.json or logs/metrics.prom when empty.
+# Set through metrics_path in settings.py.
+metrics_path = getattr(settings_file, "metrics_path", "")
+
+
+# The methods of the regex module and its patterns that are counted as regex calls
+counted_regex_methods = {
+    "search",
+    "match",
+    "fullmatch",
+    "sub",
+    "subn",
+    "findall",
+    "finditer",
+    "split",
+}
+
+
+# A compiled pattern that counts the calls made through it.
+class CountingPattern:
+    def __init__(self, pattern):
+        self.pattern = pattern
+
+    def __getattr__(self, name):
+        if name in counted_regex_methods:
+            metrics.count("regex_calls")
+        return getattr(self.pattern, name)
+
+    def __hash__(self):
+        return hash(self.pattern)
+
+    def __eq__(self, other):
+        if isinstance(other, CountingPattern):
+            other = other.pattern
+        return self.pattern == other
+
+
+# Stands in for the regex module while metrics are recorded, counting the calls
+# made through it and the patterns it compiles. Patterns compiled before
+# enable_metrics() aren't counted.
+class CountingRegex:
+    def __init__(self, module):
+        self.module = module
+
+    def __getattr__(self, name):
+        attribute = getattr(self.module, name)
+
+        if name in counted_regex_methods:
+            metrics.count("regex_calls")
+            return lambda pattern, *args, **kwargs: attribute(
+                (
+                    getattr(pattern, "pattern", pattern)
+                    if isinstance(pattern, CountingPattern)
+                    else pattern
+                ),
+                *args,
+                **kwargs,
+            )
+        elif name == "compile":
+            return lambda *args, **kwargs: CountingPattern(attribute(*args, **kwargs))
+
+        return attribute
+
+
+# Returns {function name: (hits, misses)} for every lru_cache'd function.
+def get_lru_cache_totals():
+    return {
+        name: function.cache_info()[:2]
+        for name, function in list(globals().items())
+        if callable(function) and hasattr(function, "cache_info")
+    }
+
+
+# Records the wall time and counters of each stage of a run, such as the files
+# examined, archives opened, bytes read and cache hits, along with the calls and
+# cache hits of the lru_cache'd functions like similar(). Counters go to the
+# innermost stage, those recorded outside of any stage go to "other".
+class MetricsRegistry:
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.started = time.time()
+        self.stages = {}
+
+        # [stage name, start time, lru cache totals when last charged]
+        self.stack = []
+
+    def get_stage(self, name):
+        return self.stages.setdefault(name, {"seconds": 0.0, "runs": 0, "counters": {}})
+
+    def count(self, counter, amount=1):
+        if not self.enabled:
+            return
+
+        with self.lock:
+            counters = self.get_stage(self.stack[-1][0] if self.stack else "other")[
+                "counters"
+            ]
+            counters[counter] = counters.get(counter, 0) + amount
+
+    # Counts a hit or a miss for the cache
+    def cache_result(self, cache, hit):
+        self.count(f"{cache}_hits" if hit else f"{cache}_misses")
+
+    # Adds the counters recorded elsewhere, like in a worker process, to the current stage
+    def merge(self, counters):
+        for counter, amount in (counters or {}).items():
+            self.count(counter, amount)
+
+    # Adds the lru_cache calls made since the stage was last charged to it
+    def charge_lru_caches(self, entry):
+        totals = get_lru_cache_totals()
+
+        for name, (hits, misses) in totals.items():
+            last_hits, last_misses = entry[2].get(name, (0, 0))
+
+            # the cache was cleared in between
+            if hits < last_hits or misses < last_misses:
+                last_hits, last_misses = 0, 0
+
+            hits, misses = hits - last_hits, misses - last_misses
+            if hits or misses:
+                counters = self.get_stage(entry[0])["counters"]
+                for counter, amount in (
+                    (f"{name}_calls", hits + misses),
+                    (f"{name}_hits", hits),
+                    (f"{name}_misses", misses),
+                ):
+                    counters[counter] = counters.get(counter, 0) + amount
+
+        entry[2] = totals
+
+    # Times the code within it as the named stage
+    @contextlib.contextmanager
+    def stage(self, name):
+        if not self.enabled:
+            yield
+            return
+
+        with self.lock:
+            if self.stack:
+                self.charge_lru_caches(self.stack[-1])
+            self.stack.append([name, time.perf_counter(), get_lru_cache_totals()])
+
+        try:
+            yield
+        finally:
+            with self.lock:
+                entry = self.stack.pop()
+                self.charge_lru_caches(entry)
+
+                stage = self.get_stage(name)
+                stage["seconds"] += time.perf_counter() - entry[1]
+                stage["runs"] += 1
+
+                if self.stack:
+                    self.stack[-1][2] = get_lru_cache_totals()
+
+    # Removes the stage and returns its counters
+    def pop_stage(self, name):
+        with self.lock:
+            return self.stages.pop(name, {}).get("counters", {})
+
+    # Returns {cache: hit rate} for every cache with hits or misses in the counters
+    @staticmethod
+    def get_hit_rates(counters):
+        hit_rates = {}
+        for counter in counters:
+            if counter.endswith(("_hits", "_misses")):
+                cache = counter.rsplit("_", 1)[0]
+                hits = counters.get(f"{cache}_hits", 0)
+                misses = counters.get(f"{cache}_misses", 0)
+                if hits + misses:
+                    hit_rates[cache] = round(hits / (hits + misses), 4)
+        return hit_rates
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "script_version": script_version_text,
+                "started": datetime.fromtimestamp(self.started).isoformat(
+                    timespec="seconds"
+                ),
+                "seconds": round(time.time() - self.started, 3),
+                "stages": {
+                    name: {
+                        "seconds": round(stage["seconds"], 3),
+                        "runs": stage["runs"],
+                        "counters": dict(sorted(stage["counters"].items())),
+                        "hit_rates": self.get_hit_rates(stage["counters"]),
+                    }
+                    for name, stage in self.stages.items()
+                },
+            }
+
+    # Returns the metrics in the Prometheus text format, for node_exporter's textfile collector
+    def to_prometheus(self):
+        data = self.to_dict()
+        prefix = "komga_cover_extractor"
+
+        def escape(value):
+            return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+        lines = [
+            f"# HELP {prefix}_run_seconds The wall time of the last run.",
+            f"# TYPE {prefix}_run_seconds gauge",
+            f"{prefix}_run_seconds {data['seconds']}",
+            f"# HELP {prefix}_run_timestamp_seconds When the last run started.",
+            f"# TYPE {prefix}_run_timestamp_seconds gauge",
+            f"{prefix}_run_timestamp_seconds {int(self.started)}",
+            f"# HELP {prefix}_stage_seconds The wall time of each stage of the last run.",
+            f"# TYPE {prefix}_stage_seconds gauge",
+        ]
+        for name, stage in data["stages"].items():
+            lines.append(
+                f'{prefix}_stage_seconds{{stage="{escape(name)}"}} {stage["seconds"]}'
+            )
+
+        lines += [
+            f"# HELP {prefix}_stage_count The counters of each stage of the last run.",
+            f"# TYPE {prefix}_stage_count gauge",
+        ]
+        for name, stage in data["stages"].items():
+            for counter, value in stage["counters"].items():
+                lines.append(
+                    f'{prefix}_stage_count{{stage="{escape(name)}",counter="{escape(counter)}"}} {value}'
+                )
+
+        lines += [
+            f"# HELP {prefix}_stage_cache_hit_ratio The cache hit rates of each stage of the last run.",
+            f"# TYPE {prefix}_stage_cache_hit_ratio gauge",
+        ]
+        for name, stage in data["stages"].items():
+            for cache, value in stage["hit_rates"].items():
+                lines.append(
+                    f'{prefix}_stage_cache_hit_ratio{{stage="{escape(name)}",cache="{escape(cache)}"}} {value}'
+                )
+
+        return "\n".join(lines) + "\n"
+
+    # Writes the metrics to the path, or to the one for the format in LOGS_DIR
+    def save(self, path=None, format=None):
+        format = format or metrics_format or "json"
+        path = path or metrics_path
+        if not path:
+            path = os.path.join(
+                LOGS_DIR, "metrics.prom" if format == "prometheus" else "metrics.json"
+            )
+
+        try:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.tmp"
+
+            with open(temp_path, "w", encoding="utf-8") as f:
+                if format == "prometheus":
+                    f.write(self.to_prometheus())
+                else:
+                    json.dump(self.to_dict(), f, indent=4)
+
+            os.replace(temp_path, path)
+            return True
+        except Exception as e:
+            send_message(f"Failed to save {path}: {e}", error=True)
+            return False
+
+
+metrics = MetricsRegistry()
+
+
+# Starts recording metrics, counting the regex calls from here on.
+def enable_metrics():
+    global re
+
+    metrics.enabled = True
+    if not isinstance(re, CountingRegex):
+        re = CountingRegex(re)
+
+
+# The stages profiled, "main" for the whole run, "watchdog" for each whole
+# watchdog run, or "all" for every stage of main().
+# Set through profile_stages in settings.py or --profile in the cli.
+profile_stages = getattr(settings_file, "profile_stages", [])
+
+# "cprofile" records every call, "sampling" records the call stack every
+# profile_sampling_interval seconds instead, cheap enough to leave on.
+# Set through profile_mode in settings.py or --profile_mode in the cli.
+profile_mode = getattr(settings_file, "profile_mode", "cprofile")
+profile_sampling_interval = getattr(settings_file, "profile_sampling_interval", 0.01)
+
+
+# Records the call stack of a thread every interval seconds from a background thread.
+# The samples are turned into pstats stats, where the call counts are sample counts.
+class StackSampler:
+    def __init__(self, thread_id, interval=0.01):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = {}  # stack of (file, line, function), outermost first -> count
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if not frame:
+                continue
+
+            stack = []
+            while frame:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+
+            stack = tuple(reversed(stack))
+            self.samples[stack] = self.samples.get(stack, 0) + 1
+
+    # Returns the samples as the stats pstats.Stats() loads,
+    # {function: (calls, calls, own time, cumulative time, {caller: (...)})}
+    def get_stats(self):
+        stats = {}
+
+        for stack, count in self.samples.items():
+            seconds = count * self.interval
+            seen = set()
+
+            for index, function in enumerate(stack):
+                entry = stats.setdefault(function, [0, 0, 0.0, 0.0, {}])
+                is_leaf = index == len(stack) - 1
+
+                # recursive functions are only counted once per sample
+                if function not in seen:
+                    seen.add(function)
+                    entry[0] += count
+                    entry[1] += count
+                    entry[3] += seconds
+                if is_leaf:
+                    entry[2] += seconds
+
+                if index:
+                    caller = entry[4].setdefault(stack[index - 1], [0, 0, 0.0, 0.0])
+                    caller[0] += count
+                    caller[1] += count
+                    caller[3] += seconds
+                    if is_leaf:
+                        caller[2] += seconds
+
+        return {
+            function: (
+                *entry[:4],
+                {caller: tuple(values) for caller, values in entry[4].items()},
+            )
+            for function, entry in stats.items()
+        }
+
+
+# Profiles the stages in profile_stages, writing a .pstats file for each stage
+# of each run into LOGS_DIR/profiles, where they can be read with pstats or snakeviz.
+class StageProfiler:
+    # The number of profiles kept for each stage, the oldest are removed
+    keep_files = 20
+
+    def __init__(self):
+        self.runs = 0
+
+        # only one cProfile can run at a time
+        self.active_profile = None
+
+    def is_profiled(self, name):
+        stages = profile_stages
+        if isinstance(stages, str):
+            stages = [stage.strip() for stage in stages.split(",") if stage.strip()]
+
+        return name in stages or ("all" in stages and name not in ["main", "watchdog"])
+
+    # Profiles the code within it as the named stage, if it's in profile_stages
+    @contextlib.contextmanager
+    def profile(self, name):
+        if not self.is_profiled(name):
+            yield
+            return
+
+        if profile_mode == "sampling":
+            sampler = StackSampler(threading.get_ident(), profile_sampling_interval)
+            sampler.start()
+            try:
+                yield
+            finally:
+                sampler.stop()
+                if sampler.samples:
+                    self.write(
+                        name, lambda path: write_marshal(path, sampler.get_stats())
+                    )
+                else:
+                    print(f"\n\t{name} finished before it could be sampled.")
+        elif self.active_profile:
+            # already covered by the profile of the stage it's in
+            yield
+        else:
+            profile = cProfile.Profile()
+            self.active_profile = profile
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+                self.active_profile = None
+                self.write(name, profile.dump_stats)
+
+    def write(self, name, dump):
+        folder = os.path.join(LOGS_DIR, "profiles")
+        self.runs += 1
+        path = os.path.join(
+            folder,
+            f"{name}-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{self.runs}.pstats",
+        )
+
+        try:
+            os.makedirs(folder, exist_ok=True)
+            dump(path)
+            print(f"\n\tProfile of {name} written to: {path}")
+
+            # remove the oldest profiles of the stage
+            profiles = sorted(
+                (
+                    entry
+                    for entry in os.scandir(folder)
+                    if entry.name.startswith(f"{name}-")
+                    and entry.name.endswith(".pstats")
+                ),
+                key=lambda entry: entry.stat().st_mtime_ns,
+            )
+            for entry in profiles[: -self.keep_files]:
+                os.remove(entry.path)
+        except Exception as e:
+            send_message(f"Failed to write the profile of {name}: {e}", error=True)
+
+
+# Writes the data to the path with marshal, the format pstats reads.
+def write_marshal(path, data):
+    with open(path, "wb") as f:
+        marshal.dump(data, f)
+
+
+stage_profiler = StageProfiler()
+
+
+# Runs the code within it as the named stage of main(), recording its metrics
+# and profiling it if asked to.
+@contextlib.contextmanager
+def pipeline_stage(name):
+    with metrics.stage(name), stage_profiler.profile(name):
+        yield
+
+
 series_cover_path = ""
 
 # The cutoff image count limit for a file to be
 # considered a chapter.
 average_chapter_image_count = 85
 
+# The longest side the first image of a file is sampled down to
+# before checking if it's black and white, None = check every pixel.
+# Set through black_and_white_sample_size in settings.py.
+black_and_white_sample_size = getattr(
+    settings_file, "black_and_white_sample_size", None
+)
+
 # The patterns used when finding a cover image
 #
 # REMINDER: ORDER IS IMPORTANT, Top to bottom is the order it will be checked in.
@@ -514,8 +1164,16 @@ compiled_cover_patterns = [
 ]
 
 
+# Returns the interned string, so the many files of a series share
+# one copy of their series name, root and extension.
+def intern_string(value):
+    return sys.intern(value) if type(value) is str else value
+
+
 # Folder Class
 class Folder:
+    __slots__ = ("root", "dirs", "basename", "folder_name", "files")
+
     def __init__(self, root, dirs, basename, folder_name, files):
         self.root = root
         self.dirs = dirs
@@ -532,33 +1190,61 @@ class Folder:
 
 
 # File Class
-class File:
-    def __init__(
-        self,
+# Tuple-backed, as a file is only ever read once it's been scanned,
+# which keeps the many made on a library scan small and safe to share.
+class File(
+    namedtuple(
+        "File",
+        [
+            "name",
+            "basename",
+            "extension",
+            "root",
+            "path",
+            "volume_number",
+            "file_type",
+            "header_extension",
+        ],
+    )
+):
+    __slots__ = ()
+
+    def __new__(
+        cls,
         name,
-        extensionless_name,
         basename,
         extension,
         root,
         path,
-        extensionless_path,
         volume_number,
         file_type,
         header_extension,
     ):
-        self.name = name
-        self.extensionless_name = extensionless_name
-        self.basename = basename
-        self.extension = extension
-        self.root = root
-        self.path = path
-        self.extensionless_path = extensionless_path
-        self.volume_number = volume_number
-        self.file_type = file_type
-        self.header_extension = header_extension
+        return super().__new__(
+            cls,
+            name,
+            intern_string(basename),
+            intern_string(extension),
+            intern_string(root),
+            path,
+            volume_number,
+            file_type,
+            header_extension,
+        )
+
+    # The extensionless name and path are worked out when asked for, not stored
+    @property
+    def extensionless_name(self):
+        return get_extensionless_name(self.name)
+
+    @property
+    def extensionless_path(self):
+        return get_extensionless_name(self.path)
 
 
 class Publisher:
+    __slots__ = ("from_meta", "from_name")
+
     def __init__(self, from_meta, from_name):
         self.from_meta = from_meta
         self.from_name = from_name
@@ -573,6 +1259,29 @@ class Publisher:
 
 # Volume Class
 class Volume:
+    __slots__ = (
+        "file_type",
+        "series_name",
+        "shortened_series_name",
+        "volume_year",
+        "volume_number",
+        "volume_part",
+        "index_number",
+        "release_group",
+        "name",
+        "basename",
+        "extension",
+        "root",
+        "path",
+        "extras",
+        "publisher",
+        "is_premium",
+        "subtitle",
+        "header_extension",
+        "multi_volume",
+        "is_one_shot",
+    )
+
     def __init__(
         self,
         file_type,
@@ -584,12 +1293,10 @@ class Volume:
         index_number,
         release_group,
         name,
-        extensionless_name,
         basename,
         extension,
         root,
         path,
-        extensionless_path,
         extras,
         publisher,
         is_premium,
@@ -599,20 +1306,18 @@ class Volume:
         is_one_shot=None,
     ):
         self.file_type = file_type
-        self.series_name = series_name
-        self.shortened_series_name = shortened_series_name
+        self.series_name = intern_string(series_name)
+        self.shortened_series_name = intern_string(shortened_series_name)
         self.volume_year = volume_year
         self.volume_number = volume_number
         self.volume_part = volume_part
         self.index_number = index_number
-        self.release_group = release_group
+        self.release_group = intern_string(release_group)
         self.name = name
-        self.extensionless_name = extensionless_name
-        self.basename = basename
-        self.extension = extension
-        self.root = root
+        self.basename = intern_string(basename)
+        self.extension = intern_string(extension)
+        self.root = intern_string(root)
         self.path = path
-        self.extensionless_path = extensionless_path
         self.extras = extras
         self.publisher = publisher
         self.is_premium = is_premium
@@ -621,6 +1326,14 @@ class Volume:
         self.multi_volume = multi_volume
         self.is_one_shot = is_one_shot
 
+    @property
+    def extensionless_name(self):
+        return get_extensionless_name(self.name)
+
+    @property
+    def extensionless_path(self):
+        return get_extensionless_name(self.path)
+
 
 # Custom sorting key function, sort by index_number
 def get_sort_key(index_number):
@@ -643,6 +1356,16 @@ def sort_volumes(volumes):
 
 # Path Class
 class Path:
+    __slots__ = (
+        "path",
+        "path_formats",
+        "path_extensions",
+        "library_types",
+        "translation_source_types",
+        "source_languages",
+        "series_folders",
+    )
+
     def __init__(
         self,
         path,
@@ -658,6 +1381,7 @@ class Path:
         self.library_types = library_types
         self.translation_source_types = translation_source_types
         self.source_languages = source_languages
+        self.series_folders = ()  # the folder names in the path, when listed
 
     # to string
     def __str__(self):
@@ -671,10 +1395,13 @@ class Path:
 class Watcher:
     def __init__(self):
         self.observers = []
-        self.lock = threading.Lock()
+        self.tracker = TransferTracker(
+            file_quiet_period=watchdog_file_transferred_check_interval,
+            batch_quiet_period=watchdog_discover_new_files_check_interval,
+        )
 
     def run(self):
-        event_handler = Handler(self.lock)
+        event_handler = Handler(self.tracker)
         for folder in download_folders:
             observer = Observer()
             self.observers.append(observer)
@@ -683,7 +1410,8 @@ class Watcher:
 
         try:
             while True:
-                time.sleep(sleep_timer)
+                time.sleep(watchdog_file_transferred_check_interval or 1)
+                self.check_transfers()
         except Exception as e:
             print(f"ERROR in Watcher.run(): {e}")
             for observer in self.observers:
@@ -693,6 +1421,27 @@ class Watcher:
                 observer.join()
                 print("Observer Joined")
 
+    # Polls the tracked files, running main() once the whole batch is transferred
+    def check_transfers(self):
+        for path in self.tracker.poll(accept=is_watchdog_file_accepted):
+            print(f"\n\tFile Found: {path}")
+
+        if not self.tracker.is_batch_transferred():
+            return
+
+        # Pick up anything in the download folders the events missed,
+        # those get tracked for another check before the batch is ran.
+        for folder in download_folders:
+            for path in get_all_files_recursively_in_dir_watchdog(folder):
+                if path not in self.tracker.files:
+                    self.tracker.record(path, now=self.tracker.last_event_time)
+
+        if self.tracker.poll(accept=is_watchdog_file_accepted):
+            return
+
+        with stage_profiler.profile("watchdog"):
+            run_watchdog_batch(self.tracker.pop_batch())
+
 
 # Handles our embed object along with any associated file
 class Embed:
@@ -752,38 +1501,6 @@ def get_library_type(files, required_match_percentage=None):
     return None
 
 
-# Checks if the file is fully transferred by checking the file size
-def is_file_transferred(file_path):
-    # Check if the file path exists and is a file
-    if not os.path.isfile(file_path):
-        return False
-
-    try:
-        # Get the file size before waiting for 1 second
-        before_file_size = os.path.getsize(file_path)
-
-        # Wait for 1 second
-        time.sleep(watchdog_file_transferred_check_interval)
-
-        # Get the file size after waiting for 1 second
-        after_file_size = os.path.getsize(file_path)
-
-        # Check if both file sizes are not None and not equal
-        if (
-            before_file_size is not None
-            and after_file_size is not None
-            and before_file_size != after_file_size
-        ):
-            return False
-
-        # If the file size is None or the same, return True, indicating the file transfer is complete
-        return True
-
-    except Exception as e:
-        send_message(f"ERROR in is_file_transferred(): {e}")
-        return False
-
-
 # Gets the file's file size
 def get_file_size(file_path):
     # Check if the file path exists and is a file
@@ -801,7 +1518,7 @@ def get_file_size(file_path):
 def get_all_folders_recursively_in_dir(dir_path):
     results = []
 
-    for root, dirs, files in scandir.walk(dir_path):
+    for root, dirs, files in download_snapshot.walk(dir_path):
         if root in download_folders + paths:
             continue
 
@@ -851,252 +1568,293 @@ def create_folder_obj(root, dirs=None, files=None):
     )
 
 
-class Handler(FileSystemEventHandler):
-    def __init__(self, lock):
-        self.lock = lock
+# Tracks the files being transferred into the download folders from watchdog events.
+#
+# The observer threads only record which paths had an event, the watcher loop then
+# polls every tracked file in one pass. A file is transferred once it's been closed
+# or its size and mtime have stopped changing for file_quiet_period seconds, and the
+# batch is transferred once every file is and no events have come in for
+# batch_quiet_period seconds.
+class TransferTracker:
+    def __init__(self, file_quiet_period=1, batch_quiet_period=5):
+        self.file_quiet_period = file_quiet_period
+        self.batch_quiet_period = batch_quiet_period
+        self.lock = threading.Lock()
 
-    def on_created(self, event):
-        with self.lock:
-            start_time = time.time()
-            global grouped_notifications
+        # path -> whether the latest event was the file being closed
+        self.events = {}
+        self.last_event_time = 0
 
-            try:
-                global transferred_files, transferred_dirs
-
-                extension = get_file_extension(event.src_path)
-                base_name = os.path.basename(event.src_path)
-                is_hidden = base_name.startswith(".")
-                is_valid_file = os.path.isfile(event.src_path)
-                in_file_extensions = extension in file_extensions
-
-                if not event.event_type == "created":
-                    return None
-
-                if not is_valid_file or extension in image_extensions or is_hidden:
-                    return None
-
-                print(f"\n\tEvent Type: {event.event_type}")
-                print(f"\tEvent Src Path: {event.src_path}")
-
-                # if not extension was found, return None
-                if not extension:
-                    print("\t\t -No extension found, skipped.")
-                    return None
-
-                # if the event is a directory, return None
-                if event.is_directory:
-                    print("\t\t -Is a directory, skipped.")
-                    return None
-
-                # if transferred_files, and the file is already in transferred_files
-                # then it already has been processed, so return None
-                elif transferred_files and event.src_path in transferred_files:
-                    print("\t\t -Already processed, skipped.")
-                    return None
-
-                # check if the extension is not in our accepted file extensions
-                elif not in_file_extensions:
-                    # if we don't have delete_unacceptable_files_toggle enabled, return None
-                    # if delete_unacceptable_files_toggle, we let it past so it can purge it with delete_unacceptable_files()
-                    if not delete_unacceptable_files_toggle:
-                        print(
-                            "\t\t -Not in file extensions and delete_unacceptable_files_toggle is not enabled, skipped."
-                        )
-                        return None
-                    elif (
-                        (delete_unacceptable_files_toggle or convert_to_cbz_toggle)
-                        and (
-                            extension not in unacceptable_keywords
-                            and "\\" + extension not in unacceptable_keywords
-                        )
-                        and not (
-                            convert_to_cbz_toggle
-                            and extension in convertable_file_extensions
-                        )
-                    ):
-                        print("\t\t -Not in file extensions, skipped.")
-                        return None
+        # path -> [size, mtime_ns, last change time, closed since last change]
+        self.files = {}
 
-                # Finally if all checks are passed and the file was just created, we can process it
-                # Take any action here when a file is first created.
+    def __len__(self):
+        return len(self.files)
 
-                send_message("\nStarting Execution (WATCHDOG)", discord=False)
+    # Records an event for the path, called from the observer threads.
+    def record(self, path, closed=False, now=None):
+        with self.lock:
+            self.events[path] = closed
+            self.last_event_time = now if now is not None else time.monotonic()
 
-                embed = handle_fields(
-                    DiscordEmbed(
-                        title="Starting Execution (WATCHDOG)",
-                        color=purple_color,
-                    ),
-                    [
-                        {
-                            "name": "File Found",
-                            "value": f"```{event.src_path}```",
-                            "inline": False,
-                        }
-                    ],
-                )
+    # Checks every tracked file once, starting to track any new
+    # paths that pass accept(). Returns the newly tracked paths.
+    def poll(self, accept=None, now=None):
+        now = now if now is not None else time.monotonic()
 
-                send_discord_message(
-                    None,
-                    [Embed(embed, None)],
-                )
+        with self.lock:
+            events, self.events = self.events, {}
 
-                print(f"\n\tFile Found: {event.src_path}\n")
+        new_files = []
+        for path, closed in events.items():
+            if path not in self.files:
+                if not os.path.isfile(path) or (accept and not accept(path)):
+                    continue
+                self.files[path] = [None, None, now, closed]
+                new_files.append(path)
+            else:
+                self.files[path][2:] = [now, closed]
 
-                if not os.path.isfile(event.src_path):
-                    return None
+        for path, state in list(self.files.items()):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # deleted or moved away
+                del self.files[path]
+                continue
 
-                # Get a list of all files in the root directory and its subdirectories.
-                files = [
-                    file
-                    for folder in download_folders
-                    for file in get_all_files_recursively_in_dir_watchdog(folder)
-                ]
+            if state[0] is not None and (stat.st_size, stat.st_mtime_ns) != (
+                state[0],
+                state[1],
+            ):
+                state[2:] = [now, False]
+            state[0], state[1] = stat.st_size, stat.st_mtime_ns
 
-                # Check if all files in the root directory and its subdirectories are fully transferred.
-                while True:
-                    all_files_transferred = True
-                    print(f"\nTotal files: {len(files)}")
+        return new_files
 
-                    for file in files:
-                        print(
-                            f"\t[{files.index(file) + 1}/{len(files)}] {os.path.basename(file)}"
-                        )
+    def is_file_transferred(self, path, now=None):
+        now = now if now is not None else time.monotonic()
+        state = self.files[path]
+        return state[3] or now - state[2] >= self.file_quiet_period
 
-                        if file in transferred_files:
-                            print("\t\t-already transferred")
-                            continue
+    def is_batch_transferred(self, now=None):
+        now = now if now is not None else time.monotonic()
 
-                        is_transferred = is_file_transferred(file)
-
-                        if is_transferred:
-                            print("\t\t-fully transferred")
-                            transferred_files.append(file)
-                            dir_path = os.path.dirname(file)
-                            if dir_path not in download_folders + transferred_dirs:
-                                transferred_dirs.append(os.path.dirname(file))
-                        elif not os.path.isfile(file):
-                            print("\t\t-file no longer exists")
-                            all_files_transferred = False
-                            files.remove(file)
-                            break
-                        else:
-                            print("\t\t-still transferreing...")
-                            all_files_transferred = False
-                            break
+        with self.lock:
+            if self.events or now - self.last_event_time < self.batch_quiet_period:
+                return False
 
-                    if all_files_transferred:
-                        time.sleep(watchdog_discover_new_files_check_interval)
+        return bool(self.files) and all(
+            self.is_file_transferred(path, now) for path in self.files
+        )
 
-                        # The current list of files in the root directory and its subdirectories.
-                        new_files = [
-                            file
-                            for folder in download_folders
-                            for file in get_all_files_recursively_in_dir_watchdog(
-                                folder
-                            )
-                        ]
+    # Returns the transferred batch and stops tracking it.
+    def pop_batch(self):
+        batch = sorted(self.files)
+        self.files = {}
+        return batch
 
-                        # If any new files started transferring while we were checking the current files,
-                        # then we have more files to check.
-                        if files != new_files:
-                            all_files_transferred = False
-                            if len(new_files) > len(files):
-                                print(
-                                    f"\tNew transfers: +{len(new_files) - len(files)}"
-                                )
-                                files = new_files
-                            elif len(new_files) < len(files):
-                                break
-                        elif files == new_files:
-                            break
 
-                    time.sleep(watchdog_discover_new_files_check_interval)
+# Determines if watchdog should wait on the file and run main() for it
+def is_watchdog_file_accepted(path):
+    extension = get_file_extension(path)
 
-                # Proceed with the next steps here.
-                print("\nAll files are transferred.")
+    if (
+        not extension
+        or extension in image_extensions
+        or os.path.basename(path).startswith(".")
+    ):
+        return False
 
-                # Make sure all items are a folder object
-                transferred_dirs = [
-                    create_folder_obj(x) if not isinstance(x, Folder) else x
-                    for x in transferred_dirs
-                ]
+    # already processed
+    if transferred_files and path in transferred_files:
+        return False
 
-            except Exception as e:
-                send_message(f"Error with watchdog on_any_event(): {e}", error=True)
+    # if delete_unacceptable_files_toggle, we let it past so it can purge it with delete_unacceptable_files()
+    if extension not in file_extensions:
+        if not delete_unacceptable_files_toggle:
+            return False
+        elif (
+            (delete_unacceptable_files_toggle or convert_to_cbz_toggle)
+            and (
+                extension not in unacceptable_keywords
+                and "\\" + extension not in unacceptable_keywords
+            )
+            and not (convert_to_cbz_toggle and extension in convertable_file_extensions)
+        ):
+            return False
 
-            if profile_code == "main()":
-                cProfile.run(profile_code, sort="cumtime")
-            else:
-                main()
-
-            end_time = time.time()
-            minute_keyword = ""
-            second_keyword = ""
-
-            # get the execution time
-            execution_time = end_time - start_time
-            minutes, seconds = divmod(execution_time, 60)
-            minutes = int(minutes)
-            seconds = int(seconds)
-
-            if minutes:
-                if minutes == 1:
-                    minute_keyword = "minute"
-                elif minutes > 1:
-                    minute_keyword = "minutes"
-            if seconds:
-                if seconds == 1:
-                    second_keyword = "second"
-                elif seconds > 1:
-                    second_keyword = "seconds"
-
-            execution_time_message = ""
-
-            if minutes and seconds:
-                execution_time_message = (
-                    f"{minutes} {minute_keyword} and {seconds} {second_keyword}"
-                )
-            elif minutes:
-                execution_time_message = f"{minutes} {minute_keyword}"
-            elif seconds:
-                execution_time_message = f"{seconds} {second_keyword}"
-            else:
-                execution_time_message = "less than 1 second"
+    return True
 
-            # Terminal Message
-            send_message(
-                f"\nFinished Execution (WATCHDOG)\n\tExecution Time: {execution_time_message}",
-                discord=False,
-            )
 
-            # Discord Message
-            embed = handle_fields(
-                DiscordEmbed(
-                    title="Finished Execution (WATCHDOG)",
-                    color=purple_color,
-                ),
-                [
-                    {
-                        "name": "Execution Time",
-                        "value": f"```{execution_time_message}```",
-                        "inline": False,
-                    }
-                ],
-            )
+# The files and folders the script moved or renamed since the last watchdog run started,
+# their moved events are passed over so the script's own changes don't start another run.
+script_moved_paths = set()
 
-            # Add it to the queue
-            grouped_notifications = group_notification(
-                grouped_notifications, Embed(embed, None)
-            )
 
-            # Send any remaining queued notifications to Discord
-            if grouped_notifications:
-                sent_status = send_discord_message(None, grouped_notifications)
-                if sent_status:
-                    grouped_notifications = []
+# Records a file or folder the script moved or renamed, when watchdog is running.
+def record_script_move(path):
+    if watchdog_toggle:
+        script_moved_paths.add(path)
+
+
+# Determines if the path, or a folder it's in, was moved there by the script
+def is_script_move(path):
+    while path not in script_moved_paths:
+        parent = os.path.dirname(path)
+        if parent == path:
+            return False
+        path = parent
+    return True
+
+
+# Passes the file events from the observers along to the transfer tracker
+class Handler(FileSystemEventHandler):
+    def __init__(self, tracker):
+        self.tracker = tracker
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.tracker.record(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.tracker.record(event.src_path)
+
+    def on_closed(self, event):
+        if not event.is_directory:
+            self.tracker.record(event.src_path, closed=True)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.tracker.record(event.src_path)
+
+            if not is_script_move(event.dest_path):
+                self.tracker.record(event.dest_path)
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.tracker.record(event.src_path)
+
+
+# Runs main() on a transferred batch of files from the download folders
+def run_watchdog_batch(files):
+    global transferred_files, transferred_dirs
+
+    start_time = time.time()
+
+    # The moves from the last run have been seen by now
+    script_moved_paths.clear()
+
+    try:
+        send_message("\nStarting Execution (WATCHDOG)", discord=False)
+
+        files_found = "\n".join(files[:10])
+        if len(files) > 10:
+            files_found += f"\n...and {len(files) - 10} more"
+
+        embed = handle_fields(
+            DiscordEmbed(
+                title="Starting Execution (WATCHDOG)",
+                color=purple_color,
+            ),
+            [
+                {
+                    "name": "Files Found",
+                    "value": f"```{files_found}```",
+                    "inline": False,
+                }
+            ],
+        )
+
+        send_discord_message(
+            None,
+            [Embed(embed, None)],
+        )
+
+        print(f"\nAll files are transferred. ({len(files)})")
+
+        for file in files:
+            if file not in transferred_files:
+                transferred_files.append(file)
+
+            dir_path = os.path.dirname(file)
+            if dir_path not in download_folders and dir_path not in [
+                x.root if isinstance(x, Folder) else x for x in transferred_dirs
+            ]:
+                transferred_dirs.append(dir_path)
+
+        # Make sure all items are a folder object
+        transferred_dirs = [
+            create_folder_obj(x) if not isinstance(x, Folder) else x
+            for x in transferred_dirs
+        ]
+
+    except Exception as e:
+        send_message(f"Error with watchdog run_watchdog_batch(): {e}", error=True)
+
+    with stage_profiler.profile("main"):
+        main()
+
+    end_time = time.time()
+    minute_keyword = ""
+    second_keyword = ""
+
+    # get the execution time
+    execution_time = end_time - start_time
+    minutes, seconds = divmod(execution_time, 60)
+    minutes = int(minutes)
+    seconds = int(seconds)
+
+    if minutes:
+        if minutes == 1:
+            minute_keyword = "minute"
+        elif minutes > 1:
+            minute_keyword = "minutes"
+    if seconds:
+        if seconds == 1:
+            second_keyword = "second"
+        elif seconds > 1:
+            second_keyword = "seconds"
+
+    execution_time_message = ""
+
+    if minutes and seconds:
+        execution_time_message = (
+            f"{minutes} {minute_keyword} and {seconds} {second_keyword}"
+        )
+    elif minutes:
+        execution_time_message = f"{minutes} {minute_keyword}"
+    elif seconds:
+        execution_time_message = f"{seconds} {second_keyword}"
+    else:
+        execution_time_message = "less than 1 second"
+
+    # Terminal Message
+    send_message(
+        f"\nFinished Execution (WATCHDOG)\n\tExecution Time: {execution_time_message}",
+        discord=False,
+    )
+
+    # Discord Message
+    embed = handle_fields(
+        DiscordEmbed(
+            title="Finished Execution (WATCHDOG)",
+            color=purple_color,
+        ),
+        [
+            {
+                "name": "Execution Time",
+                "value": f"```{execution_time_message}```",
+                "inline": False,
+            }
+        ],
+    )
 
-            send_message("\nWatching for changes... (WATCHDOG)", discord=False)
+    # Add it to the queue
+    group_notification(Embed(embed, None))
+
+    send_message("\nWatching for changes... (WATCHDOG)", discord=False)
 
 
 # Read all the lines from a text file, excluding specified lines.
@@ -1104,6 +1862,9 @@ def get_lines_from_file(file_path, ignore=[], check_paths=False):
     # Initialize an empty list to store the lines of the file
     results = []
 
+    # The lines already added to results, for quick duplicate checks
+    seen = set()
+
     try:
         # Open the file in read mode
         with open(file_path, "r") as file:
@@ -1115,13 +1876,14 @@ def get_lines_from_file(file_path, ignore=[], check_paths=False):
                 if not line:
                     continue
 
-                if line in ignore + results:
+                if line in ignore or line in seen:
                     continue
 
                 if check_paths and paths and not line.startswith(tuple(paths)):
                     continue
 
                 results.append(line)
+                seen.add(line)
 
     # Handle file not found exception
     except FileNotFoundError as e:
@@ -1439,6 +2201,47 @@ def parse_my_args():
         help="Outputs the covers as WebP format instead of jpg format.",
         required=False,
     )
+    parser.add_argument(
+        "--workers",
+        help="The number of worker processes used when extracting covers.",
+        required=False,
+    )
+    parser.add_argument(
+        "--conversion_workers",
+        help="The number of worker processes used when converting archives to cbz.",
+        required=False,
+    )
+    parser.add_argument(
+        "--header_workers",
+        help="The number of threads used when reading file headers to correct file extensions.",
+        required=False,
+    )
+    parser.add_argument(
+        "--full-rescan",
+        "--full_rescan",
+        dest="full_rescan",
+        help="Ignores the library manifest and processes every series folder, even if unchanged since the last run.",
+        nargs="?",
+        const="True",
+        required=False,
+    )
+    parser.add_argument(
+        "--metrics",
+        help="Records the timings and counters of each stage of the run and writes them out at the end, as json or prometheus.",
+        choices=["json", "prometheus"],
+        required=False,
+    )
+    parser.add_argument(
+        "--profile",
+        help="Profiles the passed stages (comma separated), main for the whole run, watchdog for each whole watchdog run, or all for every stage. Writes a .pstats file for each into logs/profiles.",
+        required=False,
+    )
+    parser.add_argument(
+        "--profile_mode",
+        help="cprofile records every call, sampling records the call stack at an interval instead, cheap enough to leave on.",
+        choices=["cprofile", "sampling"],
+        required=False,
+    )
 
     parser = parser.parse_args()
 
@@ -1540,6 +2343,60 @@ def parse_my_args():
         output_covers_as_webp = parse_bool_argument(parser.output_covers_as_webp)
     print(f"\toutput_covers_as_webp: {output_covers_as_webp}")
 
+    if parser.workers:
+        global cover_extraction_workers
+        if parser.workers.isdigit() and int(parser.workers) > 0:
+            cover_extraction_workers = int(parser.workers)
+        else:
+            send_message(
+                f"Invalid --workers value: {parser.workers}, using {cover_extraction_workers}.",
+                error=True,
+            )
+    print(f"\tworkers: {cover_extraction_workers}")
+
+    if parser.conversion_workers:
+        global archive_conversion_workers
+        if parser.conversion_workers.isdigit() and int(parser.conversion_workers) > 0:
+            archive_conversion_workers = int(parser.conversion_workers)
+        else:
+            send_message(
+                f"Invalid --conversion_workers value: {parser.conversion_workers}, using {archive_conversion_workers}.",
+                error=True,
+            )
+    print(f"\tconversion_workers: {archive_conversion_workers}")
+
+    if parser.header_workers:
+        global header_sniffing_workers
+        if parser.header_workers.isdigit() and int(parser.header_workers) > 0:
+            header_sniffing_workers = int(parser.header_workers)
+        else:
+            send_message(
+                f"Invalid --header_workers value: {parser.header_workers}, using {header_sniffing_workers}.",
+                error=True,
+            )
+    print(f"\theader_workers: {header_sniffing_workers}")
+
+    if parser.full_rescan:
+        global full_rescan_toggle
+        full_rescan_toggle = parse_bool_argument(parser.full_rescan)
+    print(f"\tfull_rescan: {full_rescan_toggle}")
+
+    if parser.metrics:
+        global metrics_format
+        metrics_format = parser.metrics
+    print(f"\tmetrics: {metrics_format or False}")
+
+    if parser.profile:
+        global profile_stages
+        profile_stages = [
+            stage.strip() for stage in parser.profile.split(",") if stage.strip()
+        ]
+    if parser.profile_mode:
+        global profile_mode
+        profile_mode = parser.profile_mode
+    if profile_stages:
+        print(f"\tprofile: {profile_stages} ({profile_mode})")
+
     if not parser.paths and not parser.download_folders:
         print("No paths or download folders were passed to the script.")
         print("Exiting...")
@@ -1725,14 +2582,6 @@ def compress_image(image_path, quality=60, to_jpg=False, raw_data=None):
     return new_filename if not raw_data else buffer.getvalue()
 
 
-# Check the text file line by line for the passed message
-def check_text_file_for_message(text_file, message):
-    # Open the file in read mode using a context manager
-    with open(text_file, "r") as f:
-        # Check if any line in the file matches the message
-        return any(line.strip() == message.strip() for line in f)
-
-
 # Adjusts discord embeds fields to fit the discord embed field limits
 def handle_fields(embed, fields):
     if fields:
@@ -1786,10 +2635,244 @@ def pick_webhook(hook, passed_webhook=None, url=None):
     return hook
 
 
-webhook_obj = DiscordWebhook(url=None)
+# The number of discord messages that can be waiting to be sent,
+# any sent while it's full are dropped.
+# Set through discord_queue_size in settings.py.
+discord_queue_size = getattr(settings_file, "discord_queue_size", 1000)
+
+# Discord's maximum amount of characters across the embeds of one message
+discord_embed_character_limit = 6000
+
+
+# Returns the number of characters of the embed that count towards Discord's limit.
+def get_embed_size(embed):
+    size = len(getattr(embed, "title", None) or "")
+    size += len(getattr(embed, "description", None) or "")
+    size += len((getattr(embed, "footer", None) or {}).get("text", "") or "")
+    size += len((getattr(embed, "author", None) or {}).get("name", "") or "")
+    for field in getattr(embed, "fields", None) or []:
+        size += len(field.get("name", "") or "") + len(field.get("value", "") or "")
+    return size
+
+
+# Sends the discord messages from a background thread, so the script never waits on
+# Discord. The embeds queued for a webhook within linger seconds of each other are
+# packed into as few messages as Discord allows, and each webhook's rate limit
+# headers are honoured before sending to it again.
+class DiscordDispatcher:
+    def __init__(self, queue_size=1000, linger=1, max_retries=5, timeout=10):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.linger = linger
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.thread = None
+        self.lock = threading.Lock()
+
+        # webhook -> time.monotonic() it can be sent to again, "*" for all of them
+        self.blocked_until = {}
+
+        self.sent = 0
+        self.failed = 0
+        self.dropped = 0
+
+        atexit.register(self.shutdown)
+
+    def start(self):
+        with self.lock:
+            if self.thread and self.thread.is_alive():
+                return
+
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+
+    # Queues the message, or the embeds, to be sent to the webhook.
+    # Returns False if the queue is full.
+    def submit(self, hook, message=None, embeds=[]):
+        self.start()
+
+        try:
+            self.queue.put_nowait((hook, message, list(embeds)))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            send_message(
+                "\tThe discord queue is full, dropping a message.",
+                error=True,
+                discord=False,
+            )
+            return False
+
+    # Sends everything queued so far, waiting up to timeout seconds for it.
+    # Returns False if it didn't finish in time.
+    def flush(self, timeout=None):
+        if not self.thread or not self.thread.is_alive():
+            return True
+
+        flushed = threading.Event()
+        self.queue.put(flushed)
+        return flushed.wait(timeout)
+
+    # Sends everything queued, then stops the thread.
+    def shutdown(self, timeout=60):
+        if not self.thread or not self.thread.is_alive():
+            return
+
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+
+        self.thread.join(timeout)
+
+    def run(self):
+        # webhook -> {"embeds": [Embed], "started": time.monotonic()}
+        batches = {}
+
+        while True:
+            timeout = None
+            if batches:
+                oldest = min(batch["started"] for batch in batches.values())
+                timeout = max(0, oldest + self.linger - time.monotonic())
+
+            try:
+                job = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                # send the batches that waited long enough for more embeds
+                for hook, batch in list(batches.items()):
+                    if time.monotonic() - batch["started"] >= self.linger:
+                        self.send(hook, embeds=batches.pop(hook)["embeds"])
+                continue
+
+            # flush or shutdown
+            if job is None or isinstance(job, threading.Event):
+                for hook in list(batches):
+                    self.send(hook, embeds=batches.pop(hook)["embeds"])
+
+                if job is None:
+                    return
+
+                job.set()
+                continue
+
+            hook, message, embeds = job
+
+            if not embeds:
+                # keep the order of the webhook's messages
+                if hook in batches:
+                    self.send(hook, embeds=batches.pop(hook)["embeds"])
+                self.send(hook, message=message)
+                continue
+
+            batch = batches.setdefault(
+                hook, {"embeds": [], "started": time.monotonic()}
+            )
+            for embed in embeds:
+                if batch["embeds"] and not self.fits(batch["embeds"], embed):
+                    self.send(hook, embeds=batch["embeds"])
+                    batch["embeds"] = []
+                batch["embeds"].append(embed)
+
+            if len(batch["embeds"]) >= discord_embed_limit:
+                self.send(hook, embeds=batches.pop(hook)["embeds"])
+
+    # Whether the embed can be added to the embeds of a message
+    @staticmethod
+    def fits(embeds, embed):
+        return (
+            len(embeds) < discord_embed_limit
+            and sum(get_embed_size(x.embed) for x in embeds + [embed])
+            <= discord_embed_character_limit
+        )
+
+    # Waits until the webhook can be sent to again
+    def wait_for_rate_limit(self, hook):
+        delay = (
+            max(self.blocked_until.get(hook, 0), self.blocked_until.get("*", 0))
+            - time.monotonic()
+        )
+        if delay > 0:
+            time.sleep(delay)
+
+    # Records when the webhook can be sent to again from the response's rate limit headers
+    def update_rate_limit(self, hook, response):
+        delay = None
+
+        if response.status_code == 429:
+            try:
+                body = response.json()
+            except ValueError:
+                body = {}
+
+            delay = float(
+                body.get("retry_after") or response.headers.get("Retry-After") or 1
+            )
+            if body.get("global") or response.headers.get("X-RateLimit-Global"):
+                hook = "*"
+        elif response.headers.get("X-RateLimit-Remaining") == "0":
+            delay = float(response.headers.get("X-RateLimit-Reset-After") or 1)
+
+        if delay is not None:
+            self.blocked_until[hook] = max(
+                self.blocked_until.get(hook, 0), time.monotonic() + delay
+            )
+
+    def send(self, hook, message=None, embeds=[]):
+        webhook = DiscordWebhook(url=hook, timeout=self.timeout)
+
+        if embeds:
+            for index, embed in enumerate(embeds, start=1):
+                if embed.file:
+                    file_name = (
+                        "cover.jpg" if len(embeds) == 1 else f"cover_{index}.jpg"
+                    )
+                    webhook.add_file(file=embed.file, filename=file_name)
+                    embed.embed.set_image(url=f"attachment://{file_name}")
+                webhook.add_embed(embed.embed)
+        elif message:
+            webhook.content = message
+        else:
+            return True
+
+        error = None
+        for attempt in range(self.max_retries + 1):
+            self.wait_for_rate_limit(hook)
+
+            try:
+                response = webhook.api_post_request()
+            except requests.RequestException as e:
+                error = e
+                time.sleep(min(2**attempt, 30))
+                continue
+
+            self.update_rate_limit(hook, response)
+
+            if response.ok:
+                self.sent += 1
+                return True
+
+            error = f"{response.status_code} {response.text[:200]}"
+
+            if response.status_code == 429:
+                continue
+            elif response.status_code >= 500:
+                time.sleep(min(2**attempt, 30))
+                continue
+
+            # the message itself was rejected, sending it again won't help
+            break
+
+        self.failed += 1
+        send_message(
+            f"\tFailed to send a discord message: {error}", error=True, discord=False
+        )
+        return False
+
+
+discord_dispatcher = DiscordDispatcher(discord_queue_size)
 
 
-# Sends a discord message using the users webhook url
+# Queues a discord message to be sent to the users webhook url,
+# returns True if it was queued.
 def send_discord_message(
     message,
     embeds=[],
@@ -1800,56 +2883,25 @@ def send_discord_message(
     image=None,
     image_local=None,
 ):
-    global grouped_notifications, webhook_obj
-
-    sent_status = False
-    hook = None
-    hook = pick_webhook(hook, passed_webhook, url)
-
-    try:
-        if hook:
-            webhook_obj.url = hook
-
-            if rate_limit:
-                webhook_obj.rate_limit_retry = rate_limit
+    hook = pick_webhook(None, passed_webhook, url)
 
-            if embeds:
-                # Limit the number of embeds to 10
-                for index, embed in enumerate(embeds[:10], start=1):
-                    if script_version_text:
-                        embed.embed.set_footer(text=script_version_text)
-
-                    if timestamp and (
-                        not hasattr(embed.embed, "timestamp")
-                        or not embed.embed.timestamp
-                    ):
-                        embed.embed.set_timestamp()
-
-                    if image and not image_local:
-                        embed.embed.set_image(url=image)
-                    elif embed.file:
-                        file_name = (
-                            "cover.jpg" if len(embeds) == 1 else f"cover_{index}.jpg"
-                        )
-                        webhook_obj.add_file(file=embed.file, filename=file_name)
-                        embed.embed.set_image(url=f"attachment://{file_name}")
+    if not hook:
+        return False
 
-                    webhook_obj.add_embed(embed.embed)
-            elif message:
-                webhook_obj.content = message
+    for embed in embeds:
+        if script_version_text:
+            embed.embed.set_footer(text=script_version_text)
 
-            webhook_obj.execute()
-            sent_status = True
-    except Exception as e:
-        send_message(f"{e}", error=True, discord=False)
-        # Reset the webhook object
-        webhook_obj = DiscordWebhook(url=None)
-        return sent_status
+        if timestamp and (
+            not hasattr(embed.embed, "timestamp") or not embed.embed.timestamp
+        ):
+            embed.embed.set_timestamp()
 
-    # Reset the webhook object
-    webhook_obj = DiscordWebhook(url=None)
+        if image and not image_local:
+            embed.embed.set_image(url=image)
+            embed.file = None
 
-    return sent_status
+    return discord_dispatcher.submit(hook, message if not embeds else None, embeds)
 
 
 # Removes hidden files
@@ -2063,12 +3115,7 @@ def cache_path(path):
 
     global cached_paths
     cached_paths.append(path)
-    write_to_file(
-        "cached_paths.txt",
-        path,
-        without_timestamp=True,
-        check_for_dup=True,
-    )
+    series_index.add(path)
 
 
 # Cleans and sorts the passed files and directories
@@ -2092,7 +3139,9 @@ def clean_and_sort(
     if (
         check_for_existing_series_toggle
         and not test_mode
-        and root not in cached_paths + download_folders + paths
+        and root not in cached_paths
+        and root not in download_folders
+        and root not in paths
         and not any(root.startswith(path) for path in download_folders)
     ):
         cache_path(root)
@@ -2171,6 +3220,8 @@ def process_files_and_folders(
     is_correct_extensions_feature=[],
     test_mode=False,
 ):
+    metrics.count("files_examined", len(files))
+
     in_download_folders = (
         watchdog_toggle
         and download_folders
@@ -2221,6 +3272,33 @@ def get_header_extension(file):
         return None
 
 
+# Folders with fewer files than this have their headers read on the calling thread,
+# handing them to the threads costs more than it saves.
+header_sniffing_min_files = 8
+
+# The threads shared by the get_header_extensions() calls, by their number of workers
+header_sniffing_executors = {}
+
+
+# Returns get_header_extension() for each of the files, in order,
+# reading them across header_sniffing_workers threads.
+def get_header_extensions(files, workers=None):
+    workers = workers or header_sniffing_workers
+
+    if workers <= 1 or len(files) < header_sniffing_min_files:
+        return [get_header_extension(file) for file in files]
+
+    executor = header_sniffing_executors.get(workers)
+    if not executor:
+        executor = header_sniffing_executors[workers] = (
+            concurrent.futures.ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="header_sniffing"
+            )
+        )
+
+    return list(executor.map(get_header_extension, files))
+
+
 # Returns an extensionless name
 def get_extensionless_name(file):
     return os.path.splitext(file)[0]
@@ -2257,72 +3335,245 @@ def get_series_name_from_contents(
     return series_name.strip()
 
 
-# Creates and returns file objects from the passed files and root
-def upgrade_to_file_class(
-    files,
-    root,
-    skip_get_header_extension=True,
-    is_correct_extensions_feature=[],
-    test_mode=False,
-    clean=False,
-):
-    if not files:
-        return []
+# Stores the parsed fields of File and Volume objects on disk, so unchanged
+# files don't have to go through the filename parsers again on the next run.
+#
+# Entries are stamped with the file's size and mtime, and its folder's mtime
+# (is_one_shot() looks at the other files in the folder). The whole cache is
+# dropped when the script version or any of the lists/settings the parsers
+# rely on change.
+class ParsedFileCache:
+    def __init__(self, cache_path=None, max_entries=250000):
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self.entries = {}
+        self.fingerprint = None
+        self.settings_state = None
+        self.loaded = False
+        self.dirty = False
+
+    def __len__(self):
+        return len(self.entries)
+
+    def load(self):
+        self.loaded = True
+
+        if not self.cache_path or not os.path.isfile(self.cache_path):
+            return False
 
-    # Avoid any features that require an actual file
-    if test_mode:
-        skip_get_header_extension = True
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
 
-    # Clean up the files array before usage
-    if clean:
-        files = clean_and_sort(
+            if data.get("script_version") == list(script_version):
+                self.fingerprint = data.get("fingerprint")
+                self.entries = data.get("entries", {})
+            return True
+        except Exception as e:
+            send_message(f"Failed to load {self.cache_path}: {e}", error=True)
+            return False
+
+    # Resets the cache if the settings used by the parsers have changed.
+    def check_settings(self):
+        if not self.loaded:
+            self.load()
+
+        # Only rehash the settings when something could've changed,
+        # release_groups and publishers are appended to during a run.
+        state = (
+            len(release_groups),
+            len(publishers),
+            len(paths),
+            len(download_folders),
+        )
+        if state == self.settings_state:
+            return
+
+        self.settings_state = state
+        fingerprint = hashlib.sha1(
+            repr(
+                (
+                    release_groups,
+                    publishers,
+                    paths,
+                    download_folders,
+                    exception_keywords,
+                    manga_extensions,
+                    add_publisher_name_to_file_name_when_renaming,
+                    search_and_add_premium_to_file_name,
+                    average_chapter_image_count,
+                )
+            ).encode("utf-8")
+        ).hexdigest()
+
+        if fingerprint != self.fingerprint:
+            self.fingerprint = fingerprint
+            self.entries = {}
+            self.dirty = True
+
+    # Returns the stamp used to validate the entry for the file,
+    # or None if the file can't be cached.
+    @staticmethod
+    def get_stamp(path, root_stats):
+        root = os.path.dirname(path)
+
+        try:
+            if root not in root_stats:
+                root_stats[root] = os.stat(root).st_mtime_ns
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        return [root_stats[root], stat.st_size, stat.st_mtime_ns]
+
+    # Returns the cached values for the key if the stamp still matches.
+    def get(self, key, stamp):
+        if not stamp:
+            return None
+
+        self.check_settings()
+        entry = self.entries.get(key)
+
+        if not entry or entry[0] != stamp:
+            metrics.cache_result("parsed_file_cache", False)
+            return None
+
+        metrics.cache_result("parsed_file_cache", True)
+        return entry[1]
+
+    def set(self, key, stamp, values):
+        if not stamp:
+            return
+
+        self.check_settings()
+
+        # re-insert to keep the most recently used entries at the end
+        self.entries.pop(key, None)
+        self.entries[key] = [stamp, values]
+        self.dirty = True
+
+    def save(self):
+        if not self.cache_path or not self.dirty or not log_to_file:
+            return False
+
+        # drop the least recently used entries
+        if len(self.entries) > self.max_entries:
+            for key in list(self.entries)[: len(self.entries) - self.max_entries]:
+                del self.entries[key]
+
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            temp_path = f"{self.cache_path}.tmp"
+
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "script_version": list(script_version),
+                        "fingerprint": self.fingerprint,
+                        "entries": self.entries,
+                    },
+                    f,
+                )
+
+            os.replace(temp_path, self.cache_path)
+            self.dirty = False
+            return True
+        except Exception as e:
+            send_message(f"Failed to save {self.cache_path}: {e}", error=True)
+            return False
+
+
+parsed_file_cache = ParsedFileCache(os.path.join(LOGS_DIR, "parsed_files.json"))
+
+
+# Creates and returns file objects from the passed files and root
+def upgrade_to_file_class(
+    files,
+    root,
+    skip_get_header_extension=True,
+    is_correct_extensions_feature=[],
+    test_mode=False,
+    clean=False,
+):
+    if not files:
+        return []
+
+    # Avoid any features that require an actual file
+    if test_mode:
+        skip_get_header_extension = True
+
+    # Clean up the files array before usage
+    if clean:
+        files = clean_and_sort(
             root,
             files,
             is_correct_extensions_feature=is_correct_extensions_feature,
             test_mode=test_mode,
         )[0]
 
-    # Create a list of tuples with arguments to pass to the File constructor
-    file_types = [
-        (
-            "chapter"
-            if not contains_volume_keywords(file) and contains_chapter_keywords(file)
-            else "volume"
-        )
-        for file in files
-    ]
+    # Read the headers up front, spread over threads as it's mostly waiting on I/O
+    header_extensions = (
+        get_header_extensions([os.path.join(root, file) for file in files])
+        if not skip_get_header_extension
+        else [None] * len(files)
+    )
 
-    chapter_numbers = [
-        get_release_number_cache(file, chapter=file_type == "chapter")
-        for file, file_type in zip(files, file_types)
-    ]
+    results = []
+    root_stats = {}
 
-    file_args = [
-        (
-            file,
-            get_extensionless_name(file),
-            (
+    # The File objects already parsed from the folder in this run, if it's a download folder
+    snapshot_objects = (
+        download_snapshot.get_objects(root)
+        if skip_get_header_extension and not test_mode
+        else None
+    )
+
+    for file, header_extension in zip(files, header_extensions):
+        if snapshot_objects is not None and file in snapshot_objects:
+            results.append(snapshot_objects[file])
+            continue
+
+        path = os.path.join(root, file)
+        stamp = parsed_file_cache.get_stamp(path, root_stats) if not test_mode else None
+        cache_key = f"file|{path}"
+        cached = parsed_file_cache.get(cache_key, stamp)
+
+        if cached:
+            file_type, chapter_number, basename = cached
+        else:
+            file_type = (
+                "chapter"
+                if not contains_volume_keywords(file)
+                and contains_chapter_keywords(file)
+                else "volume"
+            )
+            chapter_number = get_release_number_cache(
+                file, chapter=file_type == "chapter"
+            )
+            basename = (
                 get_series_name_from_chapter(file, root, chapter_number)
                 if file_type == "chapter"
                 else get_series_name_from_volume(file, root, test_mode=test_mode)
+            ) or get_series_name_from_contents(os.path.basename(root), [file])
+            parsed_file_cache.set(
+                cache_key, stamp, [file_type, chapter_number, basename]
             )
-            or get_series_name_from_contents(os.path.basename(root), [file]),
+
+        file_object = File(
+            file,
+            basename,
             get_file_extension(file),
             root,
-            os.path.join(root, file),
-            get_extensionless_name(os.path.join(root, file)),
+            path,
             chapter_number,
             file_type,
-            (
-                get_header_extension(os.path.join(root, file))
-                if not skip_get_header_extension
-                else None
-            ),
+            header_extension,
         )
-        for file, file_type, chapter_number in zip(files, file_types, chapter_numbers)
-    ]
 
-    results = [File(*args) for args in file_args]
+        if snapshot_objects is not None:
+            snapshot_objects[file] = file_object
+
+        results.append(file_object)
 
     return results
 
@@ -2347,39 +3598,39 @@ def get_novel_cover(novel_path):
     }
 
     try:
-        with zipfile.ZipFile(novel_path) as z:
-            t = etree.fromstring(z.read("META-INF/container.xml"))
-            rootfile_path = t.xpath(
-                "/u:container/u:rootfiles/u:rootfile", namespaces=namespaces
+        z = get_archive_info(novel_path)
+        t = etree.fromstring(z.read("META-INF/container.xml"))
+        rootfile_path = t.xpath(
+            "/u:container/u:rootfiles/u:rootfile", namespaces=namespaces
+        )
+        if rootfile_path:
+            rootfile_path = rootfile_path[0].get("full-path")
+            t = etree.fromstring(z.read(rootfile_path))
+            cover_id = t.xpath(
+                "//opf:metadata/opf:meta[@name='cover']", namespaces=namespaces
             )
-            if rootfile_path:
-                rootfile_path = rootfile_path[0].get("full-path")
-                t = etree.fromstring(z.read(rootfile_path))
-                cover_id = t.xpath(
-                    "//opf:metadata/opf:meta[@name='cover']", namespaces=namespaces
-                )
-                if cover_id:
-                    cover_id = cover_id[0].get("content")
-                    cover_href = t.xpath(
-                        f"//opf:manifest/opf:item[@id='{cover_id}']",
-                        namespaces=namespaces,
+            if cover_id:
+                cover_id = cover_id[0].get("content")
+                cover_href = t.xpath(
+                    f"//opf:manifest/opf:item[@id='{cover_id}']",
+                    namespaces=namespaces,
+                )
+                if cover_href:
+                    cover_href = cover_href[0].get("href")
+                    if "%" in cover_href:
+                        cover_href = urllib.parse.unquote(cover_href)
+                    cover_path = os.path.join(
+                        os.path.dirname(rootfile_path), cover_href
                     )
-                    if cover_href:
-                        cover_href = cover_href[0].get("href")
-                        if "%" in cover_href:
-                            cover_href = urllib.parse.unquote(cover_href)
-                        cover_path = os.path.join(
-                            os.path.dirname(rootfile_path), cover_href
-                        )
-                        return cover_path
-                    else:
-                        print("\t\t\tNo cover_href found in get_novel_cover()")
+                    return cover_path
                 else:
-                    print("\t\t\tNo cover_id found in get_novel_cover()")
+                    print("\t\t\tNo cover_href found in get_novel_cover()")
             else:
-                print(
-                    "\t\t\tNo rootfile_path found in META-INF/container.xml in get_novel_cover()"
-                )
+                print("\t\t\tNo cover_id found in get_novel_cover()")
+        else:
+            print(
+                "\t\t\tNo rootfile_path found in META-INF/container.xml in get_novel_cover()"
+            )
     except Exception as e:
         send_message(str(e), error=True)
     return None
@@ -2424,7 +3675,9 @@ def is_one_shot(file_name, root=None, skip_folder_check=False, test_mode=False):
         return False
 
     if not skip_folder_check:
-        files = clean_and_sort(root, os.listdir(root))[0]
+        files = directory_cache.get_derived(
+            root, "is_one_shot", lambda names: clean_and_sort(root, names)[0]
+        )
 
     if (len(files) == 1 or skip_folder_check) or (
         download_folders and root in download_folders
@@ -2482,12 +3735,14 @@ def get_file_hash(file, is_internal=False, internal_file_name=None):
 
         if is_internal:
             with zipfile.ZipFile(file) as zip:
+                metrics.count("archives_opened")
                 with zip.open(internal_file_name) as internal_file:
                     while True:
                         data = internal_file.read(BUF_SIZE)
                         if not data:
                             break
                         hash_obj.update(data)
+                        metrics.count("bytes_read", len(data))
         else:
             with open(file, "rb") as f:
                 while True:
@@ -2495,6 +3750,7 @@ def get_file_hash(file, is_internal=False, internal_file_name=None):
                     if not data:
                         break
                     hash_obj.update(data)
+                    metrics.count("bytes_read", len(data))
 
         return hash_obj.hexdigest()
     except FileNotFoundError as e:
@@ -2607,24 +3863,47 @@ def contains_keyword(file_string, chapter=False):
     )
 
 
+# Pre-compiled series name patterns
+starting_brackets_search_pattern = re.compile(
+    r"^(\[[^\]]*\]|\([^\)]*\)|\{[^}]*\})+(\s+[A-Za-z]{2})"
+)
+starting_brackets_pattern = re.compile(r"^(\[[^\]]*\]|\([^\)]*\)|\{[^}]*\})+\s+")
+one_shot_keyword_pattern = re.compile(r"(-\s*)Ones?(-|)shot\s*", re.IGNORECASE)
+one_shot_series_pattern = re.compile(
+    r"([-_ ]+|)(((\[|\(|\{).*(\]|\)|\}))|LN)([-_. ]+|)(%s|).*"
+    % file_extensions_regex.replace(r"\.", ""),
+    re.IGNORECASE,
+)
+volume_series_pattern = re.compile(
+    r"(\b|\s)(?<![A-Za-z])((\s|)-(\s|)|)(Part|)(\[|\(|\{)?(%s)(\.|)([-_. ]|)([0-9]+)(\b|\s).*"
+    % volume_regex_keywords,
+    re.IGNORECASE,
+)
+volume_series_extension_pattern = re.compile(
+    r"(\d+)?([-_. ]+)?((\[|\(|\})(.*)(\]|\)|\}))?([-_. ]+)?(%s)$"
+    % file_extensions_regex,
+    re.IGNORECASE,
+)
+ending_extension_pattern = re.compile(r"(%s)$" % file_extensions_regex)
+ending_complete_pattern = re.compile(r"(-|:)\s*Complete$", re.IGNORECASE)
+
+
 # Retrieves the series name through various regexes
 # Removes the volume number and anything to the right of it, and strips it.
 @lru_cache(maxsize=3500)
 def get_series_name_from_volume(name, root, test_mode=False, second=False):
     # Remove starting brackets
     # EX: "[WN] Series Name" -> "Series Name"
-    if starts_with_bracket(name) and re.search(
-        r"^(\[[^\]]*\]|\([^\)]*\)|\{[^}]*\})+(\s+[A-Za-z]{2})", name
-    ):
+    if starts_with_bracket(name) and starting_brackets_search_pattern.search(name):
         # remove the brackets only
-        name = re.sub(r"^(\[[^\]]*\]|\([^\)]*\)|\{[^}]*\})+\s+", "", name).strip()
+        name = starting_brackets_pattern.sub("", name).strip()
 
     # replace _extra
     name = remove_dual_space(name.replace("_extra", ".5")).strip()
 
     # Replace "- One-shot" after series name
     if "one" in name.lower() and "shot" in name.lower():
-        name = re.sub(r"(-\s*)Ones?(-|)shot\s*", "", name, flags=re.IGNORECASE).strip()
+        name = one_shot_keyword_pattern.sub("", name).strip()
 
     # replace underscores
     name = replace_underscores(name) if "_" in name else name
@@ -2633,37 +3912,14 @@ def get_series_name_from_volume(name, root, test_mode=False, second=False):
     # name = remove_brackets(name) if contains_brackets(name) else name
 
     if is_one_shot(name, root, test_mode=test_mode):
-        name = re.sub(
-            r"([-_ ]+|)(((\[|\(|\{).*(\]|\)|\}))|LN)([-_. ]+|)(%s|).*"
-            % file_extensions_regex.replace(r"\.", ""),
-            "",
-            name,
-            flags=re.IGNORECASE,
-        ).strip()
+        name = one_shot_series_pattern.sub("", name).strip()
     else:
-        if re.search(
-            r"(\b|\s)(?<![A-Za-z])((\s|)-(\s|)|)(Part|)(\[|\(|\{)?(%s)(\.|)([-_. ]|)([0-9]+)(\b|\s).*"
-            % volume_regex_keywords,
-            name,
-            flags=re.IGNORECASE,
-        ):
-            name = (
-                re.sub(
-                    r"(\b|\s)(?<![A-Za-z])((\s|)-(\s|)|)(Part|)(\[|\(|\{)?(%s)(\.|)([-_. ]|)([0-9]+)(\b|\s).*"
-                    % volume_regex_keywords,
-                    "",
-                    name,
-                    flags=re.IGNORECASE,
-                )
-            ).strip()
+        # Cut the name at the volume keyword, the match runs to the end of the name
+        search = volume_series_pattern.search(name)
+        if search:
+            name = name[: search.start()].strip()
         else:
-            name = re.sub(
-                r"(\d+)?([-_. ]+)?((\[|\(|\})(.*)(\]|\)|\}))?([-_. ]+)?(%s)$"
-                % file_extensions_regex,
-                "",
-                name,
-                flags=re.IGNORECASE,
-            ).strip()
+            name = volume_series_extension_pattern.sub("", name).strip()
 
     # Remove a trailing comma at the end of the name
     if name.endswith(","):
@@ -2671,13 +3927,13 @@ def get_series_name_from_volume(name, root, test_mode=False, second=False):
 
     # Remove the file extension if still remaining
     if get_file_extension(name) in file_extensions:
-        name = re.sub(r"(%s)$" % file_extensions_regex, "", name).strip()
+        name = ending_extension_pattern.sub("", name).strip()
 
     # Remove "- Complete" from the end
     # "Series Name - Complete" -> "Series Name"
     # EX File: Series Name - Complete v01 [Premium] [Publisher].epub
     if name.lower().endswith("complete"):
-        name = re.sub(r"(-|:)\s*Complete$", "", name, flags=re.IGNORECASE).strip()
+        name = ending_complete_pattern.sub("", name).strip()
 
     # Default to the root folder name if we have nothing left
     # As long as it's not in our download folders or paths
@@ -2779,18 +4035,16 @@ def chapter_file_name_cleaning(
 def get_series_name_from_chapter(name, root, chapter_number="", second=False):
     # Remove starting brackets
     # EX: "[WN] Series Name" -> "Series Name"
-    if starts_with_bracket(name) and re.search(
-        r"^(\[[^\]]*\]|\([^\)]*\)|\{[^}]*\})+(\s+[A-Za-z]{2})", name
-    ):
+    if starts_with_bracket(name) and starting_brackets_search_pattern.search(name):
         # remove the brackets only
-        name = re.sub(r"^(\[[^\]]*\]|\([^\)]*\)|\{[^}]*\})+\s+", "", name).strip()
+        name = starting_brackets_pattern.sub("", name).strip()
 
     # Replace _extra
     name = name.replace("_extra", ".5")
 
     # Replace "- One-shot" after series name
     if "one" in name.lower() and "shot" in name.lower():
-        name = re.sub(r"(-\s*)Ones?(-|)shot\s*", "", name, flags=re.IGNORECASE).strip()
+        name = one_shot_keyword_pattern.sub("", name).strip()
 
     # Remove dual space
     name = remove_dual_space(name).strip()
@@ -2876,22 +4130,30 @@ def get_folder_type(files, extensions=None, file_type=None):
     return (count / len(files)) * 100
 
 
+# Pre-compiled check_for_multi_volume_file() patterns, by whether it's a chapter
+multi_volume_patterns = {
+    chapter: re.compile(
+        # The pattern of multiple volumes or chapters
+        r"(\b({})(\.)?(\s+)?([0-9]+(\.[0-9]+)?)([-]([0-9]+(\.[0-9]+)?))+\b)".format(
+            keywords
+        ),
+        re.IGNORECASE,  # Ignore case when searching
+    )
+    for chapter, keywords in [
+        (False, volume_regex_keywords),
+        (True, chapter_regex_keywords + "|"),
+    ]
+}
+
+
 # Determines if a volume file is a multi-volume file or not
 # EX: TRUE == series_title v01-03.cbz
 # EX: FALSE == series_title v01.cbz
 @lru_cache(maxsize=3500)
 def check_for_multi_volume_file(file_name, chapter=False):
-    # Set the list of keywords to search for
-    keywords = volume_regex_keywords if not chapter else chapter_regex_keywords + "|"
-
     # Search for a multi-volume or multi-chapter pattern in the file name, ignoring any bracketed information in the name
-    if "-" in file_name and re.search(
-        # Use regular expressions to search for the pattern of multiple volumes or chapters
-        r"(\b({})(\.)?(\s+)?([0-9]+(\.[0-9]+)?)([-]([0-9]+(\.[0-9]+)?))+\b)".format(
-            keywords
-        ),
-        remove_brackets(file_name) if contains_brackets(file_name) else file_name,
-        re.IGNORECASE,  # Ignore case when searching
+    if "-" in file_name and multi_volume_patterns[bool(chapter)].search(
+        remove_brackets(file_name) if contains_brackets(file_name) else file_name
     ):
         # If the pattern is found, return True
         return True
@@ -2953,6 +4215,19 @@ chapter_number_search_pattern = re.compile(
     flags=re.IGNORECASE,
 )
 
+# Pre-compiled keyword removal for get_release_number(), by whether it's a chapter
+release_keyword_patterns = {
+    chapter: (
+        re.compile(r"\b({})(\.|)([-_. ])?".format(keywords), re.IGNORECASE),
+        re.compile(r"\b[0-9]+({})[0-9]+\b".format(keywords), re.IGNORECASE),
+        re.compile(r"({})".format(keywords), re.IGNORECASE),
+    )
+    for chapter, keywords in [
+        (False, volume_regex_keywords),
+        (True, chapter_regex_keywords),
+    ]
+}
+
 # Pre-compiled volume-keyword search for get_release_number()
 volume_number_search_pattern = re.compile(
     r"\b(?<![\[\(\{])(%s)((\.)|)(\s+)?([0-9]+)(([-_.])([0-9]+)|)+\b"
@@ -2960,6 +4235,9 @@ volume_number_search_pattern = re.compile(
     re.IGNORECASE,
 )
 
+# Pre-compiled number range search for get_release_number()
+release_range_pattern = re.compile(r"([0-9]+(\.[0-9]+)?)([-_]([0-9]+(\.[0-9]+)?))+")
+
 
 # Finds the volume/chapter number(s) in the file name.
 @lru_cache(maxsize=3500)
@@ -3028,7 +4306,9 @@ def get_release_number(file, chapter=False):
 
     results = []
     is_multi_volume = False
-    keywords = volume_regex_keywords if not chapter else chapter_regex_keywords
+    keyword_pattern, joined_keyword_pattern, any_keyword_pattern = (
+        release_keyword_patterns[bool(chapter)]
+    )
     result = None
 
     # Replace _extra
@@ -3068,7 +4348,7 @@ def get_release_number(file, chapter=False):
 
     if result:
         try:
-            file = result.group().strip() if hasattr(result, "group") else ""
+            file = result.group().strip()
 
             # Clean the series name
             if chapter:
@@ -3076,33 +4356,14 @@ def get_release_number(file, chapter=False):
 
             # Remove volume/chapter keywords from the file name
             if contains_non_numeric(file):
-                file = re.sub(
-                    r"\b({})(\.|)([-_. ])?".format(keywords),
-                    "",
-                    file,
-                    flags=re.IGNORECASE,
-                ).strip()
+                file = keyword_pattern.sub("", file).strip()
 
-                if contains_non_numeric(file) and re.search(
-                    r"\b[0-9]+({})[0-9]+\b".format(keywords),
-                    file,
-                    re.IGNORECASE,
-                ):
-                    file = (
-                        re.sub(
-                            r"({})".format(keywords),
-                            ".",
-                            file,
-                            flags=re.IGNORECASE,
-                        )
-                    ).strip()
+                if contains_non_numeric(file) and joined_keyword_pattern.search(file):
+                    file = any_keyword_pattern.sub(".", file).strip()
 
             try:
                 if is_multi_volume or (
-                    ("-" in file or "_" in file)
-                    and re.search(
-                        r"([0-9]+(\.[0-9]+)?)([-_]([0-9]+(\.[0-9]+)?))+", file
-                    )
+                    ("-" in file or "_" in file) and release_range_pattern.search(file)
                 ):
                     if not is_multi_volume:
                         is_multi_volume = True
@@ -3250,6 +4511,9 @@ rx_search_part = re.compile(r"(\b(Part)([-_. ]|)([0-9]+)\b)", re.IGNORECASE)
 rx_search_chapters = re.compile(
     r"([0-9]+)(([-_.])([0-9]+)|)+((x|#)([0-9]+)(([-_.])([0-9]+)|)+)", re.IGNORECASE
 )
+rx_search_chapter_part = re.compile(
+    r"((x|#)([0-9]+)(([-_.])([0-9]+)|)+)", re.IGNORECASE
+)
 rx_remove_x_hash = re.compile(r"((x|#))", re.IGNORECASE)
 
 
@@ -3287,9 +4551,7 @@ def get_file_part(file, chapter=False, series_name=None, subtitle=None):
         if contains_indicator:
             search = rx_search_chapters.search(file)
             if search:
-                part_search = re.search(
-                    r"((x|#)([0-9]+)(([-_.])([0-9]+)|)+)", search.group(), re.IGNORECASE
-                )
+                part_search = rx_search_chapter_part.search(search.group())
                 if part_search:
                     # remove the x or # from the string
                     result = rx_remove_x_hash.sub("", part_search.group())
@@ -3325,7 +4587,7 @@ def get_publisher_from_meta(metadata):
 
 
 # Function to determine if an image is black and white with better handling for halftones
-def is_image_black_and_white(image, tolerance=15):
+def is_image_black_and_white(image, tolerance=15, sample_size=None, rows_per_chunk=256):
     """
     Determines if an image is black and white by verifying that
     most pixels are grayscale (R == G == B) and fall within the black or white range.
@@ -3333,34 +4595,53 @@ def is_image_black_and_white(image, tolerance=15):
     Args:
         image (PIL.Image): The image to check.
         tolerance (int): The allowed difference between R, G, and B for a pixel to be considered grayscale.
+        sample_size (int): If passed, larger images are sampled down (nearest neighbor, so no
+            colors are blended) until their longest side fits before being checked.
+        rows_per_chunk (int): The number of rows checked at a time, allowing an early exit
+            once the result can no longer change.
 
     Returns:
         bool: True if the image is black and white or grayscale, False otherwise.
     """
     try:
-        # Convert the image to RGB (ensures consistent handling of image modes)
-        image_rgb = image.convert("RGB")
+        if sample_size and max(image.size) > sample_size:
+            scale = sample_size / max(image.size)
+            image = image.resize(
+                (
+                    max(1, round(image.width * scale)),
+                    max(1, round(image.height * scale)),
+                ),
+                Image.NEAREST,
+            )
 
-        # Extract pixel data
-        pixels = list(image_rgb.getdata())
+        # Convert the image to RGB (ensures consistent handling of image modes)
+        # int16 so the channel differences can't wrap around
+        pixels = np.asarray(image.convert("RGB"), dtype=np.int16)
+        total = pixels.shape[0] * pixels.shape[1]
 
-        # Count pixels that are grayscale and black/white
+        # Count pixels that are grayscale within the tolerance
         grayscale_count = 0
+        checked_count = 0
 
-        for r, g, b in pixels:
-            # Check if the pixel is grayscale within the tolerance
-            if abs(r - g) <= tolerance and abs(g - b) <= tolerance:
-                # Further check if it is black or white
-                if r == 0 or r == 255:
-                    grayscale_count += 1
-                elif 0 < r < 255:
-                    grayscale_count += 1
+        for start in range(0, pixels.shape[0], rows_per_chunk):
+            chunk = pixels[start : start + rows_per_chunk]
+            red, green, blue = chunk[..., 0], chunk[..., 1], chunk[..., 2]
 
-        # If enough pixels are grayscale or black/white, return True
-        if grayscale_count / len(pixels) > 0.9:
-            return True
+            grayscale_count += np.count_nonzero(
+                (np.abs(red - green) <= tolerance) & (np.abs(green - blue) <= tolerance)
+            )
+            checked_count += chunk.shape[0] * chunk.shape[1]
+
+            # Already enough grayscale pixels
+            if grayscale_count / total > 0.9:
+                return True
 
-        return False  # Otherwise, it's not black and white
+            # Not enough pixels left for it to become black and white
+            if (grayscale_count + total - checked_count) / total <= 0.9:
+                return False
+
+        # If enough pixels are grayscale or black/white, return True
+        return grayscale_count / total > 0.9
     except Exception as e:
         send_message(f"Error checking if image is black and white: {e}", error=True)
         return False
@@ -3369,17 +4650,13 @@ def is_image_black_and_white(image, tolerance=15):
 # Function to check if the first image in a zip file is black and white
 def is_first_image_black_and_white(zip_path):
     try:
-        with zipfile.ZipFile(zip_path, "r") as zip_file:
-            # Sort files alphabetically and get the first one
-            sorted_files = sorted(zip_file.namelist())
-            if not sorted_files:
-                return False  # No files in the archive
-
-            first_file = sorted_files[0]
-            if get_file_extension(first_file) in image_extensions:
-                with zip_file.open(first_file) as image_file:
-                    image = Image.open(io.BytesIO(image_file.read()))
-                    return is_image_black_and_white(image)
+        # The first file alphabetically, if it's an image
+        image_data = get_archive_info(zip_path).first_image_data
+        if image_data:
+            image = Image.open(io.BytesIO(image_data))
+            return is_image_black_and_white(
+                image, sample_size=black_and_white_sample_size
+            )
         return False
     except Exception as e:
         send_message(f"Error processing zip file {zip_path}: {e}", error=True)
@@ -3389,13 +4666,7 @@ def is_first_image_black_and_white(zip_path):
 # Return the number of image files in the .cbz archive.
 def count_images_in_cbz(file_path):
     try:
-        with zipfile.ZipFile(file_path, "r") as archive:
-            images = [
-                f
-                for f in archive.namelist()
-                if f.lower().endswith(tuple(image_extensions))
-            ]
-            return len(images)
+        return len(get_archive_info(file_path).image_names)
     except zipfile.BadZipFile:
         send_message(f"Skipping corrupted file: {file_path}", error=True)
         return 0
@@ -3422,8 +4693,32 @@ def upgrade_to_volume_class(
         skip_publisher = True
         skip_premium_content = True
 
+    # The options that change what gets parsed, part of each cache key
+    options = (
+        f"{skip_release_year:d}{skip_file_part:d}{skip_release_group:d}"
+        f"{skip_extras:d}{skip_publisher:d}{skip_premium_content:d}"
+        f"{skip_subtitle:d}{skip_multi_volume:d}"
+    )
+
     results = []
+    root_stats = {}
+
     for file in files:
+        stamp = (
+            parsed_file_cache.get_stamp(file.path, root_stats)
+            if not test_mode
+            else None
+        )
+        cache_key = (
+            f"volume|{options}|{file.path}|{file.file_type}|"
+            f"{file.volume_number}|{file.basename}"
+        )
+        cached = parsed_file_cache.get(cache_key, stamp)
+
+        if cached:
+            results.append(get_volume_from_cache(file, cached))
+            continue
+
         internal_metadata = None
         publisher = Publisher(None, None)
 
@@ -3461,12 +4756,10 @@ def upgrade_to_volume_class(
                 else ""
             ),
             file.name,
-            file.extensionless_name,
             file.basename,
             file.extension,
             file.root,
             file.path,
-            file.extensionless_path,
             [],
             publisher,
             (
@@ -3547,10 +4840,66 @@ def upgrade_to_volume_class(
             else:
                 file_obj.index_number = file_obj.volume_number
 
+        parsed_file_cache.set(cache_key, stamp, get_volume_cache_values(file_obj))
         results.append(file_obj)
     return results
 
 
+# The parsed fields of a Volume that are stored in the parsed file cache
+volume_cache_fields = [
+    "file_type",
+    "series_name",
+    "shortened_series_name",
+    "volume_year",
+    "volume_number",
+    "volume_part",
+    "index_number",
+    "release_group",
+    "extras",
+    "is_premium",
+    "subtitle",
+    "multi_volume",
+    "is_one_shot",
+]
+
+
+# Returns the values of the volume to be stored in the parsed file cache
+def get_volume_cache_values(volume):
+    return [getattr(volume, field) for field in volume_cache_fields] + [
+        volume.publisher.from_meta,
+        volume.publisher.from_name,
+    ]
+
+
+# Rebuilds the volume for the file from the values in the parsed file cache
+def get_volume_from_cache(file, values):
+    fields = dict(zip(volume_cache_fields, values))
+    publisher = Publisher(*values[len(volume_cache_fields) :])
+
+    return Volume(
+        fields["file_type"],
+        fields["series_name"],
+        fields["shortened_series_name"],
+        fields["volume_year"],
+        fields["volume_number"],
+        fields["volume_part"],
+        fields["index_number"],
+        fields["release_group"],
+        file.name,
+        file.basename,
+        file.extension,
+        file.root,
+        file.path,
+        fields["extras"],
+        publisher,
+        fields["is_premium"],
+        fields["subtitle"],
+        file.header_extension,
+        fields["multi_volume"],
+        fields["is_one_shot"],
+    )
+
+
 # The RankedKeywordResult class is a container for the total score and the keywords
 class RankedKeywordResult:
     def __init__(self, total_score, keywords):
@@ -3678,42 +5027,24 @@ def remove_images(path):
         remove_file(volume_cover, silent=True)
 
 
-# Handles adding our embed to the list of grouped notifications
-# If the list is at the limit, it will send the list and clear it
-# Also handles setting the timestamp on the embed of when it was added
-def group_notification(notifications, embed, passed_webhook=None):
-    failed_attempts = 0
-
-    if len(notifications) >= discord_embed_limit:
-        while notifications:
-            message_status = send_discord_message(
-                None, notifications, passed_webhook=passed_webhook
-            )
-            if (
-                message_status
-                or (failed_attempts >= len(discord_webhook_url) and not passed_webhook)
-                or (passed_webhook and failed_attempts >= 1)
-            ):
-                notifications = []
-            else:
-                failed_attempts += 1
-
+# Sets the timestamp on the embed of when it was added and hands it to the
+# discord dispatcher, which packs it into a message with the embeds queued around it.
+def group_notification(embed, passed_webhook=None):
     # Set timestamp on embed
     embed.embed.set_timestamp()
 
-    # Add embed to list
-    if embed not in notifications:
-        notifications.append(embed)
-
-    return notifications
+    send_discord_message(None, [embed], passed_webhook=passed_webhook)
 
 
 # Removes the specified folder and all of its contents.
 def remove_folder(folder):
     result = False
     if os.path.isdir(folder) and (folder not in download_folders + paths):
+        close_archive_info()
+        directory_cache.invalidate()
         try:
             shutil.rmtree(folder)
+            download_snapshot.removed(folder)
             if not os.path.isdir(folder):
                 send_message(f"\t\t\tRemoved {folder}", discord=False)
                 result = True
@@ -3727,14 +5058,16 @@ def remove_folder(folder):
 
 # Removes a file and its associated image files.
 def remove_file(full_file_path, silent=False):
-    global grouped_notifications
-
     # Check if the file exists
     if not os.path.isfile(full_file_path):
         # Send an error message if the file doesn't exist
         send_message(f"{full_file_path} is not a file.", error=True)
         return False
 
+    # Release the file if it's open
+    close_archive_info(full_file_path)
+    directory_cache.invalidate(full_file_path)
+
     try:
         # Try to remove the file
         os.remove(full_file_path)
@@ -3774,28 +5107,30 @@ def remove_file(full_file_path, silent=False):
         )
 
         # Add it to the group of notifications
-        grouped_notifications = group_notification(
-            grouped_notifications, Embed(embed, None)
-        )
+        group_notification(Embed(embed, None))
 
     # If the file is not an image, remove associated images
     if get_file_extension(full_file_path) not in image_extensions:
         remove_images(full_file_path)
 
+    download_snapshot.removed(full_file_path)
+
     return True
 
 
 # Moves a folder and all of its contents to a new location.
 def move_folder(folder, new_location, silent=False):
-    global grouped_notifications
-
     result = False
     try:
         if os.path.isdir(folder):
             folder_name = os.path.basename(folder)
             new_file_path = os.path.join(new_location, folder_name)
             if not os.path.isdir(new_file_path):
+                close_archive_info()
+                directory_cache.invalidate()
                 shutil.move(folder, new_location)
+                download_snapshot.renamed(folder, new_file_path)
+                record_script_move(new_file_path)
                 if os.path.isdir(new_file_path):
                     result = True
                     if not silent:
@@ -3826,9 +5161,7 @@ def move_folder(folder, new_location, silent=False):
                                 },
                             ],
                         )
-                        grouped_notifications = group_notification(
-                            grouped_notifications, Embed(embed, None)
-                        )
+                        group_notification(Embed(embed, None))
             else:
                 send_message(f"\t\tFolder already exists: {new_file_path}", error=True)
     except Exception as e:
@@ -3847,10 +5180,11 @@ def move_file(
     highest_index_num="",
     is_chapter_dir=False,
 ):
-    global grouped_notifications
-
     try:
         if os.path.isfile(file.path):
+            close_archive_info(file.path)
+            directory_cache.invalidate(file.path)
+            directory_cache.invalidate(os.path.join(new_location, file.name))
             shutil.move(file.path, new_location)
             if os.path.isfile(os.path.join(new_location, file.name)):
                 if not silent:
@@ -3876,15 +5210,17 @@ def move_file(
                             },
                         ],
                     )
-                    grouped_notifications = group_notification(
-                        grouped_notifications, Embed(embed, None)
-                    )
+                    group_notification(Embed(embed, None))
                 move_images(
                     file,
                     new_location,
                     highest_index_num=highest_index_num,
                     is_chapter_dir=is_chapter_dir,
                 )
+                download_snapshot.renamed(
+                    file.path, os.path.join(new_location, file.name)
+                )
+                record_script_move(os.path.join(new_location, file.name))
                 return True
             else:
                 send_message(
@@ -3899,7 +5235,6 @@ def move_file(
 
 # Replaces an old file.
 def replace_file(old_file, new_file, highest_index_num=""):
-    global grouped_notifications
     result = False
 
     try:
@@ -3936,9 +5271,7 @@ def replace_file(old_file, new_file, highest_index_num=""):
                             },
                         ],
                     )
-                    grouped_notifications = group_notification(
-                        grouped_notifications, Embed(embed, None)
-                    )
+                    group_notification(Embed(embed, None))
                 else:
                     send_message(
                         f"\tFailed to replace: {old_file.name} with: {new_file.name}",
@@ -3980,7 +5313,7 @@ def execute_command(command):
 def remove_duplicate_releases(
     original_releases, downloaded_releases, image_similarity_match=False
 ):
-    global moved_files, grouped_notifications
+    global moved_files
 
     # Extracts and formats file tags information
     def get_file_tags_info(result):
@@ -4129,9 +5462,7 @@ def remove_duplicate_releases(
                 ),
                 fields=fields,
             )
-            grouped_notifications = group_notification(
-                grouped_notifications, Embed(embed, None)
-            )
+            group_notification(Embed(embed, None))
 
             if upgrade_status.is_upgrade:
                 if download.multi_volume and not original.multi_volume:
@@ -4228,76 +5559,364 @@ def check_and_delete_empty_folder(folder):
         send_message(str(e), error=True)
 
 
-# Writes a log file
-def write_to_file(
-    file,
-    message,
-    without_timestamp=False,
-    overwrite=False,
-    check_for_dup=False,
-    write_to=None,
-    can_write_log=log_to_file,
-):
-    write_status = False
-    logs_dir_loc = write_to or LOGS_DIR
+# The size (in bytes) changes.txt and errors.txt are rotated at, 0 = never.
+# Set through log_rotation_bytes in settings.py.
+log_rotation_bytes = getattr(settings_file, "log_rotation_bytes", 10 * 1024 * 1024)
+
+# The number of rotated changes.txt and errors.txt files kept, as changes.txt.1 and so on.
+# Set through log_rotation_backups in settings.py.
+log_rotation_backups = getattr(settings_file, "log_rotation_backups", 5)
+
+# The log files that are rotated by size
+rotated_log_files = ["changes.txt", "errors.txt"]
+
+# Removes the tabs and newlines from log messages
+log_formatting_table = str.maketrans("", "", "\t\n")
+
+
+# Keeps the log files open and buffers the lines written to them. The buffers are
+# written out flush_interval seconds after the first line waiting, once buffer_lines
+# lines are waiting, and at exit. Keeps a hashed index of the lines of the files
+# written to with check_for_dup, so duplicates are found without reading the file again.
+class LogWriter:
+    def __init__(self, flush_interval=5, buffer_lines=500):
+        self.flush_interval = flush_interval
+        self.buffer_lines = buffer_lines
+        self.lock = threading.RLock()
+        self.files = {}  # path -> {"handle", "buffer"}
+        self.indexes = {}  # path -> set of hashed stripped lines
+        self.folders = set()
+        self.buffered = 0
+        self.timer = None
+        self.rotation = True
+        self.exiting = False
+        self.registered = False
+
+    # Creates the folder if it doesn't exist yet, only checking each folder once.
+    def ensure_folder(self, folder):
+        if folder in self.folders:
+            return True
 
-    # check if the logs directory exists, if not create it
-    if not os.path.exists(logs_dir_loc):
         try:
-            os.makedirs(logs_dir_loc)
+            os.makedirs(folder, exist_ok=True)
         except OSError as e:
-            send_message(str(e), error=True)
+            send_message(str(e), error=True, log=False)
             return False
 
-    if can_write_log and logs_dir_loc:
-        # get rid of formatting
-        message = re.sub("\t|\n", "", str(message), flags=re.IGNORECASE).strip()
-        contains = False
+        self.folders.add(folder)
+        return True
+
+    def get_file(self, path, overwrite=False):
+        log_file = self.files.get(path)
+
+        if overwrite and log_file:
+            log_file["handle"].close()
+            self.buffered -= len(log_file["buffer"])
+            del self.files[path]
+            log_file = None
 
-        # check if it already contains the message
-        log_file_path = os.path.join(logs_dir_loc, file)
+        if not log_file:
+            handle = open(path, "w" if overwrite else "a", encoding="utf-8")
+            log_file = {"handle": handle, "buffer": []}
+            self.files[path] = log_file
 
-        if check_for_dup and os.path.isfile(log_file_path):
-            contains = check_text_file_for_message(log_file_path, message)
+            if not self.registered:
+                atexit.register(self.exit)
+                self.registered = True
 
-        if not contains or overwrite:
+        return log_file
+
+    # Returns the index of the lines in the file, reading the file the first time.
+    def get_index(self, path):
+        index = self.indexes.get(path)
+
+        if index is None:
+            self.flush_file(path)
+            index = set()
+            if os.path.isfile(path):
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    index = {hash(line.strip()) for line in f}
+            self.indexes[path] = index
+
+        return index
+
+    # Buffers the line to be written to the path. Returns False if dup_key is passed
+    # and is already a line in the file, or if the line couldn't be written.
+    def write(self, path, line, dup_key=None, overwrite=False):
+        with self.lock:
             try:
-                append_write = (
-                    "a" if os.path.exists(log_file_path) and not overwrite else "w"
-                )
-                try:
-                    now = datetime.now()
-                    dt_string = now.strftime("%d/%m/%Y %H:%M:%S")
+                if overwrite:
+                    self.indexes.pop(path, None)
+                    self.get_file(path, overwrite=True)
+                elif dup_key is not None and hash(dup_key) in self.get_index(path):
+                    return False
 
-                    with open(log_file_path, append_write) as f:
-                        if without_timestamp:
-                            f.write(f"\n {message}")
-                        else:
-                            f.write(f"\n{dt_string} {message}")
-                    write_status = True
+                self.get_file(path)["buffer"].append(line)
+                self.buffered += 1
 
-                except Exception as e:
-                    send_message(str(e), error=True, log=False)
+                if path in self.indexes:
+                    self.indexes[path].add(hash(line.strip()))
             except Exception as e:
                 send_message(str(e), error=True, log=False)
-    return write_status
+                return False
 
+            if self.buffered >= self.buffer_lines or self.exiting:
+                self.flush()
+            elif not self.timer:
+                self.timer = threading.Timer(self.flush_interval, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
 
-# Checks for any missing volumes between the lowest volume of a series and the highest volume.
-def check_for_missing_volumes():
-    print("\nChecking for missing volumes...")
+        return True
 
-    if not paths:
-        print("\tNo paths found.")
-        return
+    # Moves file to file.1, file.1 to file.2 and so on, dropping the oldest.
+    def rotate(self, path):
+        self.files.pop(path)["handle"].close()
 
-    for path in paths:
-        if not os.path.exists(path) or path in download_folders:
-            continue
+        for number in range(log_rotation_backups - 1, 0, -1):
+            if os.path.isfile(f"{path}.{number}"):
+                os.replace(f"{path}.{number}", f"{path}.{number + 1}")
 
-        os.chdir(path)
+        if log_rotation_backups:
+            os.replace(path, f"{path}.1")
+        else:
+            os.remove(path)
 
-        folders = get_all_folders_recursively_in_dir(path)
+        self.indexes.pop(path, None)
+        return self.get_file(path)
+
+    def flush_file(self, path):
+        log_file = self.files.get(path)
+        if not log_file or not log_file["buffer"]:
+            return
+
+        data = "".join(log_file["buffer"])
+        self.buffered -= len(log_file["buffer"])
+        log_file["buffer"] = []
+
+        try:
+            if (
+                self.rotation
+                and log_rotation_bytes
+                and os.path.basename(path) in rotated_log_files
+            ):
+                # the size on disk includes the lines the worker processes wrote
+                size = os.fstat(log_file["handle"].fileno()).st_size
+                if size and size + len(data) > log_rotation_bytes:
+                    log_file = self.rotate(path)
+
+            log_file["handle"].write(data)
+            log_file["handle"].flush()
+        except Exception as e:
+            send_message(str(e), error=True, log=False)
+
+    def flush(self):
+        with self.lock:
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+
+            for path in list(self.files):
+                self.flush_file(path)
+
+    # Flushes and closes every file, they're reopened on the next write.
+    def close(self):
+        with self.lock:
+            self.flush()
+            for log_file in self.files.values():
+                log_file["handle"].close()
+            self.files = {}
+
+    # Closes the files at exit. The exit handlers registered before this one run
+    # after it, so anything they log is written out straight away.
+    def exit(self):
+        with self.lock:
+            self.exiting = True
+            self.close()
+
+    # Forgets the files and buffers inherited from the parent process, without
+    # writing them out, so a forked worker process doesn't write them twice.
+    def detach(self):
+        # the lock may have been held by another of the parent's threads
+        self.lock = threading.RLock()
+        self.files = {}
+        self.indexes = {}
+        self.buffered = 0
+        self.timer = None
+
+
+log_writer = LogWriter()
+
+
+# Writes a log file
+def write_to_file(
+    file,
+    message,
+    without_timestamp=False,
+    overwrite=False,
+    check_for_dup=False,
+    write_to=None,
+    can_write_log=log_to_file,
+):
+    logs_dir_loc = write_to or LOGS_DIR
+
+    # check if the logs directory exists, if not create it
+    if not log_writer.ensure_folder(logs_dir_loc):
+        return False
+
+    if not can_write_log or not logs_dir_loc:
+        return False
+
+    # get rid of formatting
+    message = str(message).translate(log_formatting_table).strip()
+
+    if without_timestamp:
+        line = f"\n {message}"
+    else:
+        line = f"\n{datetime.now().strftime('%d/%m/%Y %H:%M:%S')} {message}"
+
+    return log_writer.write(
+        os.path.join(logs_dir_loc, file),
+        line,
+        dup_key=message if check_for_dup else None,
+        overwrite=overwrite,
+    )
+
+
+# Returns a signature for the folder built from the folder's modification time
+# and the name, size, modification time and inode of each file within it.
+def get_folder_signature(folder):
+    try:
+        entries = []
+        with os.scandir(folder) as it:
+            for entry in it:
+                if not entry.is_file():
+                    continue
+                stat = entry.stat()
+                entries.append(
+                    f"{entry.name}|{stat.st_size}|{stat.st_mtime_ns}|{stat.st_ino}"
+                )
+        entries.sort()
+        entries.insert(0, str(os.stat(folder).st_mtime_ns))
+        return hashlib.sha1("\n".join(entries).encode("utf-8")).hexdigest()
+    except OSError:
+        return None
+
+
+# A persisted record of which library folders were processed by each stage,
+# and the folder signature at the time. Used for skipping unchanged folders
+# on subsequent runs. Each stage can store a small JSON result alongside it.
+class LibraryManifest:
+    def __init__(self, manifest_path=None):
+        self.manifest_path = manifest_path
+        self.stages = {}
+        self.loaded = False
+        self.dirty = False
+
+    def load(self):
+        self.loaded = True
+
+        if not self.manifest_path or not os.path.isfile(self.manifest_path):
+            return False
+
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+            if data.get("script_version") == list(script_version):
+                self.stages = data.get("stages", {})
+            return True
+        except Exception as e:
+            send_message(f"Failed to load {self.manifest_path}: {e}", error=True)
+            return False
+
+    # Returns the folders for the stage, resetting them if the
+    # settings that affect the stage have changed.
+    def get_stage(self, stage, fingerprint=""):
+        if not self.loaded:
+            self.load()
+
+        fingerprint = str(fingerprint)
+        stage_data = self.stages.get(stage)
+
+        if not stage_data or stage_data.get("fingerprint") != fingerprint:
+            stage_data = {"fingerprint": fingerprint, "folders": {}}
+            self.stages[stage] = stage_data
+            self.dirty = True
+
+        return stage_data["folders"]
+
+    # Returns (True, result) if the folder hasn't changed since it was last
+    # processed by the stage, otherwise (False, None).
+    def get(self, stage, folder, fingerprint="", signature=None):
+        if full_rescan_toggle:
+            return False, None
+
+        entry = self.get_stage(stage, fingerprint).get(folder)
+        if not entry:
+            metrics.cache_result("library_manifest", False)
+            return False, None
+
+        signature = signature or get_folder_signature(folder)
+        if not signature or entry["signature"] != signature:
+            metrics.cache_result("library_manifest", False)
+            return False, None
+
+        metrics.cache_result("library_manifest", True)
+        return True, entry.get("result")
+
+    # Records the folder as processed by the stage.
+    def set(self, stage, folder, result=None, fingerprint="", signature=None):
+        signature = signature or get_folder_signature(folder)
+        folders = self.get_stage(stage, fingerprint)
+
+        if not signature:
+            folders.pop(folder, None)
+            return
+
+        folders[folder] = {"signature": signature, "result": result}
+        self.dirty = True
+
+    def save(self):
+        if not self.manifest_path or not self.dirty or not log_to_file:
+            return False
+
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path), exist_ok=True)
+            temp_path = f"{self.manifest_path}.tmp"
+
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"script_version": list(script_version), "stages": self.stages},
+                    f,
+                )
+
+            os.replace(temp_path, self.manifest_path)
+            self.dirty = False
+            return True
+        except Exception as e:
+            send_message(f"Failed to save {self.manifest_path}: {e}", error=True)
+            return False
+
+
+library_manifest = LibraryManifest(os.path.join(LOGS_DIR, "library_manifest.json"))
+
+
+# Checks for any missing volumes between the lowest volume of a series and the highest volume.
+def check_for_missing_volumes():
+    print("\nChecking for missing volumes...")
+
+    if not paths:
+        print("\tNo paths found.")
+        return
+
+    for path in paths:
+        if not os.path.exists(path) or path in download_folders:
+            continue
+
+        os.chdir(path)
+
+        folders = get_all_folders_recursively_in_dir(path)
 
         for folder in folders:
             root = folder["root"]
@@ -4311,74 +5930,88 @@ def check_for_missing_volumes():
             if not filtered_files:
                 continue
 
-            # Upgrade the existing directory to a list of Volume objects.
-            volumes = upgrade_to_volume_class(
-                upgrade_to_file_class(
-                    [
-                        f
-                        for f in filtered_files
-                        if os.path.isfile(os.path.join(root, f))
-                    ],
-                    root,
-                ),
-                skip_release_year=True,
-                skip_release_group=True,
-                skip_extras=True,
-                skip_publisher=True,
-                skip_premium_content=True,
-                skip_subtitle=True,
+            # Reuse the result if the folder hasn't changed since the last run
+            unchanged, volume_num_range = library_manifest.get(
+                "check_for_missing_volumes", root
             )
+            if not unchanged:
+                volume_num_range = get_missing_volume_numbers(root, filtered_files)
+                library_manifest.set(
+                    "check_for_missing_volumes", root, volume_num_range
+                )
 
-            # Filter out volumes that don't have a valid volume number.
-            volumes = [
-                volume
-                for volume in volumes
-                if isinstance(volume.volume_number, (int, float, list))
-            ]
-
-            # Skip if there are less than 2 volumes in the directory.
-            if len(volumes) < 2:
+            if not volume_num_range:
                 continue
 
-            # Extract volume numbers from the existing volumes.
-            volume_numbers = {
-                num
-                for volume in volumes
-                for num in (
-                    range(
-                        int(min(volume.volume_number)),
-                        int(max(volume.volume_number)) + 1,
-                    )
-                    if isinstance(volume.volume_number, list)
-                    else [volume.volume_number]
-                )
-                if num != ""
-            }
+            print(f"\t{root}")
 
-            # Sort and remove duplicate volume numbers.
-            volume_numbers_second = sorted(volume_numbers)
+            for number in volume_num_range:
+                print(f"\t\tVolume {number}")
 
-            if len(volume_numbers_second) < 2:
-                continue
+    library_manifest.save()
 
-            # Get the lowest and highest volume numbers.
-            lowest_volume_number = 1
-            highest_volume_number = int(max(volume_numbers_second))
 
-            # Create a range of volume numbers between the lowest and highest.
-            volume_num_range = [
-                num
-                for num in range(lowest_volume_number, highest_volume_number + 1)
-                if num not in volume_numbers_second
-            ]
+# Returns the volume numbers missing between volume one and the highest volume
+# number in the passed folder.
+def get_missing_volume_numbers(root, filtered_files):
+    # Upgrade the existing directory to a list of Volume objects.
+    volumes = upgrade_to_volume_class(
+        upgrade_to_file_class(
+            [f for f in filtered_files if os.path.isfile(os.path.join(root, f))],
+            root,
+        ),
+        skip_release_year=True,
+        skip_release_group=True,
+        skip_extras=True,
+        skip_publisher=True,
+        skip_premium_content=True,
+        skip_subtitle=True,
+    )
 
-            if not volume_num_range:
-                continue
+    # Filter out volumes that don't have a valid volume number.
+    volumes = [
+        volume
+        for volume in volumes
+        if isinstance(volume.volume_number, (int, float, list))
+    ]
 
-            print(f"\t{root}")
+    # Skip if there are less than 2 volumes in the directory.
+    if len(volumes) < 2:
+        return []
 
-            for number in volume_num_range:
-                print(f"\t\tVolume {number}")
+    # Extract volume numbers from the existing volumes.
+    volume_numbers = {
+        num
+        for volume in volumes
+        for num in (
+            range(
+                int(min(volume.volume_number)),
+                int(max(volume.volume_number)) + 1,
+            )
+            if isinstance(volume.volume_number, list)
+            else [volume.volume_number]
+        )
+        if num != ""
+    }
+
+    # Sort and remove duplicate volume numbers.
+    volume_numbers_second = sorted(volume_numbers)
+
+    if len(volume_numbers_second) < 2:
+        return []
+
+    # Get the lowest and highest volume numbers.
+    lowest_volume_number = 1
+    highest_volume_number = int(max(volume_numbers_second))
+
+    # Create a range of volume numbers between the lowest and highest.
+    volume_num_range = [
+        num
+        for num in range(lowest_volume_number, highest_volume_number + 1)
+        if num not in volume_numbers_second
+    ]
+
+    return volume_num_range
 
 
 # Renames the file.
@@ -4388,6 +6021,9 @@ def rename_file(src, dest, silent=False):
         root = os.path.dirname(src)
         if not silent:
             print(f"\n\t\tRenaming {src}")
+        close_archive_info(src)
+        directory_cache.invalidate(src)
+        directory_cache.invalidate(dest)
         try:
             os.rename(src, dest)
         except Exception as e:
@@ -4396,6 +6032,8 @@ def rename_file(src, dest, silent=False):
                 error=True,
             )
             return result
+        download_snapshot.renamed(src, dest)
+        record_script_move(dest)
         if os.path.isfile(dest):
             result = True
             if not silent:
@@ -4429,10 +6067,14 @@ def rename_folder(src, dest):
     result = None
     if os.path.isdir(src):
         if not os.path.isdir(dest):
+            close_archive_info()
+            directory_cache.invalidate()
             try:
                 os.rename(src, dest)
             except Exception as e:
                 send_message(str(e), error=True)
+            download_snapshot.renamed(src, dest)
+            record_script_move(dest)
             if os.path.isdir(dest):
                 send_message(
                     f"\n\t\t{os.path.basename(src)} was renamed to {os.path.basename(dest)}\n",
@@ -4517,23 +6159,12 @@ def get_internal_metadata(file_path, extension):
     try:
         if extension in manga_extensions:
             if contains_comic_info(file_path):
-                comicinfo = get_file_from_zip(
-                    file_path, ["comicinfo.xml"], ".xml", allow_base=False
-                )
+                comicinfo = get_archive_info(file_path).comic_info
                 if comicinfo:
                     comicinfo = comicinfo.decode("utf-8")
                     metadata = parse_comicinfo_xml(comicinfo)
         elif extension in novel_extensions:
-            regex_searches = [
-                r"content.opf",
-                r"contents.opf",
-                r"package.opf",
-                r"standard.opf",
-                r"volume.opf",
-                r"metadata.opf",
-                r"978.*.opf",
-            ]
-            opf = get_file_from_zip(file_path, regex_searches, ".opf")
+            opf = get_archive_info(file_path).opf
             if opf:
                 metadata = parse_html_tags(opf)
             if not metadata:
@@ -4572,7 +6203,7 @@ def contains_unicode(input_str):
 
 # Rebuilds the file name by cleaning up, adding, and moving some parts around.
 def reorganize_and_rename(files, dir):
-    global transferred_files, grouped_notifications
+    global transferred_files
 
     modifiers = {
         ext: (
@@ -4812,9 +6443,7 @@ def reorganize_and_rename(files, dir):
                                             },
                                         ],
                                     )
-                                    grouped_notifications = group_notification(
-                                        grouped_notifications, Embed(embed, None)
-                                    )
+                                    group_notification(Embed(embed, None))
                             else:
                                 print(
                                     f"\t\tFile already exists, skipping rename of {file.name} to {rename} and deleting {file.name}"
@@ -4857,12 +6486,87 @@ def remove_dual_space(s):
     return dual_space_pattern.sub(" ", s)
 
 
-# Removes common words to improve string matching accuracy between a series_name
-# from a file name, and a folder name, useful for when releasers sometimes include them,
-# and sometimes don't.
-@lru_cache(maxsize=3500)
-def normalize_str(
-    s,
+# The words removed by normalize_str(), in the order they're removed.
+normalize_str_common_words = [
+    "the",
+    "a",
+    "à",
+    "and",
+    "&",
+    "I",
+    "of",
+]
+
+normalize_str_editions = [
+    "Collection",
+    "Master Edition",
+    "(2|3|4|5)-in-1 Edition",
+    "Edition",
+    "Exclusive",
+    "Anniversary",
+    "Deluxe",
+    # "Omnibus",
+    "Digital",
+    "Official",
+    "Anthology",
+    "Limited",
+    "Complete",
+    "Collector",
+    "Ultimate",
+    "Special",
+]
+
+# (?<!^) = Cannot start with this word.
+# EX: "Book Girl" light novel series.
+normalize_str_type_keywords = [
+    "(?<!^)Novel",
+    "(?<!^)Light Novel",
+    "(?<!^)Manga",
+    "(?<!^)Comic",
+    "(?<!^)LN",
+    "(?<!^)Series",
+    "(?<!^)Volume",
+    "(?<!^)Chapter",
+    "(?<!^)Book",
+    "(?<!^)MANHUA",
+]
+
+normalize_str_japanese_particles = [
+    "wa",
+    "o",
+    "mo",
+    "ni",
+    "e",
+    "de",
+    "ga",
+    "kara",
+    "to",
+    "ya",
+    r"no(?!\.)",
+    "ne",
+    "yo",
+]
+
+normalize_str_misc_words = [r"((\d+)([-_. ]+)?th)", "x", "×", "HD"]
+
+normalize_str_storefront_keywords = [
+    r"Book(\s+)?walker",
+]
+
+# The text that has to be in the (casefolded) string for the regex words to match,
+# any other word is used as is.
+normalize_str_word_hints = {
+    "(2|3|4|5)-in-1 Edition": "-in-1 edition",
+    r"no(?!\.)": "no",
+    r"((\d+)([-_. ]+)?th)": "th",
+    r"Book(\s+)?walker": "walker",
+}
+
+
+# Compiles the words removed by normalize_str() for the passed skip flags,
+# returns a tuple of (compiled pattern, hint) in removal order.
+@lru_cache(maxsize=None)
+def get_normalize_str_patterns(
     skip_common_words=False,
     skip_editions=False,
     skip_type_keywords=False,
@@ -4870,94 +6574,78 @@ def normalize_str(
     skip_misc_words=False,
     skip_storefront_keywords=False,
 ):
-    if len(s) <= 1:
-        return s
-
-    words_to_remove = []
+    words = []
 
     if not skip_common_words:
-        common_words = [
-            "the",
-            "a",
-            "à",
-            "and",
-            "&",
-            "I",
-            "of",
-        ]
-        words_to_remove.extend(common_words)
+        words.extend(normalize_str_common_words)
 
     if not skip_editions:
-        editions = [
-            "Collection",
-            "Master Edition",
-            "(2|3|4|5)-in-1 Edition",
-            "Edition",
-            "Exclusive",
-            "Anniversary",
-            "Deluxe",
-            # "Omnibus",
-            "Digital",
-            "Official",
-            "Anthology",
-            "Limited",
-            "Complete",
-            "Collector",
-            "Ultimate",
-            "Special",
-        ]
-        words_to_remove.extend(editions)
+        words.extend(normalize_str_editions)
 
     if not skip_type_keywords:
-        # (?<!^) = Cannot start with this word.
-        # EX: "Book Girl" light novel series.
-        type_keywords = [
-            "(?<!^)Novel",
-            "(?<!^)Light Novel",
-            "(?<!^)Manga",
-            "(?<!^)Comic",
-            "(?<!^)LN",
-            "(?<!^)Series",
-            "(?<!^)Volume",
-            "(?<!^)Chapter",
-            "(?<!^)Book",
-            "(?<!^)MANHUA",
-        ]
-        words_to_remove.extend(type_keywords)
+        words.extend(normalize_str_type_keywords)
 
     if not skip_japanese_particles:
-        japanese_particles = [
-            "wa",
-            "o",
-            "mo",
-            "ni",
-            "e",
-            "de",
-            "ga",
-            "kara",
-            "to",
-            "ya",
-            r"no(?!\.)",
-            "ne",
-            "yo",
-        ]
-        words_to_remove.extend(japanese_particles)
+        words.extend(normalize_str_japanese_particles)
 
     if not skip_misc_words:
-        misc_words = [r"((\d+)([-_. ]+)?th)", "x", "×", "HD"]
-        words_to_remove.extend(misc_words)
+        words.extend(normalize_str_misc_words)
 
     if not skip_storefront_keywords:
-        storefront_keywords = [
-            r"Book(\s+)?walker",
-        ]
-        words_to_remove.extend(storefront_keywords)
+        words.extend(normalize_str_storefront_keywords)
+
+    patterns = []
+    for word in words:
+        if word in normalize_str_type_keywords:
+            pattern = rf"{word}\s"
+            hint = word.replace("(?<!^)", "")
+        else:
+            pattern = rf"\b{word}\b"
+            hint = normalize_str_word_hints.get(word, word)
+
+        patterns.append((re.compile(pattern, re.IGNORECASE), hint.casefold()))
+
+    return tuple(patterns)
+
+
+# Removes common words to improve string matching accuracy between a series_name
+# from a file name, and a folder name, useful for when releasers sometimes include them,
+# and sometimes don't.
+@lru_cache(maxsize=3500)
+def normalize_str(
+    s,
+    skip_common_words=False,
+    skip_editions=False,
+    skip_type_keywords=False,
+    skip_japanese_particles=False,
+    skip_misc_words=False,
+    skip_storefront_keywords=False,
+):
+    if len(s) <= 1:
+        return s
+
+    patterns = get_normalize_str_patterns(
+        skip_common_words,
+        skip_editions,
+        skip_type_keywords,
+        skip_japanese_particles,
+        skip_misc_words,
+        skip_storefront_keywords,
+    )
+
+    # The words are removed one at a time, so each one sees the string the
+    # previous removals left behind. A word whose hint isn't in the string
+    # can't match, so its regex is skipped.
+    folded = None
+    for index, (pattern, hint) in enumerate(patterns):
+        if index and hint not in folded:
+            continue
 
-    for word in words_to_remove:
-        pattern = rf"\b{word}\b" if word not in type_keywords else rf"{word}\s"
-        s = re.sub(pattern, " ", s, flags=re.IGNORECASE).strip()
+        result, count = pattern.subn(" ", s)
 
-        s = remove_dual_space(s)
+        if count or not index:
+            s = remove_dual_space(result.strip())
+            folded = s.casefold()
 
     return s.strip()
 
@@ -5040,7 +6728,7 @@ def clean_str(
 
 # Creates folders for our stray volumes sitting in the root of the download folder.
 def create_folders_for_items_in_download_folder():
-    global transferred_files, transferred_dirs, grouped_notifications
+    global transferred_files, transferred_dirs
 
     print("\nCreating folders for lone items in download folder...")
 
@@ -5056,7 +6744,7 @@ def create_folders_for_items_in_download_folder():
             continue
 
         try:
-            for root, dirs, files in scandir.walk(download_folder):
+            for root, dirs, files in download_snapshot.walk(download_folder):
                 files, dirs = process_files_and_folders(
                     root,
                     files,
@@ -5110,14 +6798,12 @@ def create_folders_for_items_in_download_folder():
                                     # create file object
                                     new_file_obj = File(
                                         new_file_name,
-                                        get_extensionless_name(new_file_name),
                                         get_series_name_from_volume(
                                             new_file_name, root
                                         ),
                                         get_file_extension(new_file_name),
                                         root,
                                         new_file_path,
-                                        get_extensionless_name(new_file_path),
                                         None,
                                         None,
                                         get_header_extension(new_file_path),
@@ -5281,43 +6967,42 @@ class Result:
 def contains_premium_content(file):
     bonus_content_found = False
     try:
-        with zipfile.ZipFile(file, "r") as zf:
-            lower_list = str(zf.namelist()).lower()
-            if (
-                "bonus" in lower_list
-                and "/signup" in lower_list
-                and re.search(
-                    r"((bonus)_?([0-9]+)?\.xhtml)",
-                    lower_list,
-                    re.IGNORECASE,
-                )
-            ):
-                bonus_content_found = True
+        zf = get_archive_info(file)
+        lower_list = str(zf.names).lower()
+        if (
+            "bonus" in lower_list
+            and "/signup" in lower_list
+            and re.search(
+                r"((bonus)_?([0-9]+)?\.xhtml)",
+                lower_list,
+                re.IGNORECASE,
+            )
+        ):
+            bonus_content_found = True
 
-            if not bonus_content_found:
-                for name in zf.namelist():
-                    base_name = os.path.basename(name)
-                    if base_name not in ["toc.xhtml", "copyright.xhtml"]:
-                        continue
+        if not bonus_content_found:
+            for name in zf.names:
+                base_name = os.path.basename(name)
+                if base_name not in ["toc.xhtml", "copyright.xhtml"]:
+                    continue
 
-                    with zf.open(name) as file:
-                        file_contents = file.read().decode("utf-8")
-                        if base_name == "toc.xhtml":
-                            if "j-novel" in file_contents.lower() and re.search(
-                                r"(Bonus\s+((Color\s+)?Illustrations?|(Short\s+)?Stories))",
-                                file_contents,
-                                re.IGNORECASE,
-                            ):
-                                bonus_content_found = True
-                                break
-                        elif base_name == "copyright.xhtml":
-                            if "premium" in file_contents.lower() and re.search(
-                                r"(Premium(\s)+(E?-?Book|Epub))",
-                                file_contents,
-                                re.IGNORECASE,
-                            ):
-                                bonus_content_found = True
-                                break
+                file_contents = zf.read(name).decode("utf-8")
+                if base_name == "toc.xhtml":
+                    if "j-novel" in file_contents.lower() and re.search(
+                        r"(Bonus\s+((Color\s+)?Illustrations?|(Short\s+)?Stories))",
+                        file_contents,
+                        re.IGNORECASE,
+                    ):
+                        bonus_content_found = True
+                        break
+                elif base_name == "copyright.xhtml":
+                    if "premium" in file_contents.lower() and re.search(
+                        r"(Premium(\s)+(E?-?Book|Epub))",
+                        file_contents,
+                        re.IGNORECASE,
+                    ):
+                        bonus_content_found = True
+                        break
     except Exception as e:
         send_message(str(e), error=True)
     return bonus_content_found
@@ -5345,7 +7030,7 @@ def check_upgrade(
     image=False,
     test_mode=False,
 ):
-    global moved_files, messages_to_send, grouped_notifications
+    global moved_files, messages_to_send
 
     # Gets the percentage of files that match a file_type or extension in a folder.
     def get_percent_and_print(existing_files, file, file_type=None):
@@ -5383,9 +7068,7 @@ def check_upgrade(
 
     existing_dir = os.path.join(existing_root, dir)
 
-    clean_existing = [
-        entry.name for entry in os.scandir(existing_dir) if entry.is_file()
-    ]
+    clean_existing = directory_cache.get_files(existing_dir)
 
     clean_existing = upgrade_to_file_class(
         clean_existing,
@@ -5548,9 +7231,7 @@ def check_upgrade(
                 ),
                 fields=fields,
             )
-            grouped_notifications = group_notification(
-                grouped_notifications, Embed(embed, None)
-            )
+            group_notification(Embed(embed, None))
 
         clean_existing, download_dir_volumes = remove_duplicate_releases(
             clean_existing,
@@ -5634,7 +7315,6 @@ def check_upgrade(
                 if move_status:
                     check_and_delete_empty_folder(volume.root)
                     volume.path = os.path.join(existing_dir, volume.name)
-                    volume.extensionless_path = get_extensionless_name(volume.path)
                     volume.root = existing_dir
                     moved_files.append(volume.path)
 
@@ -5666,9 +7346,7 @@ def check_upgrade(
                             passed_webhook=new_volume_webhook,
                         )
                 else:
-                    grouped_notifications = group_notification(
-                        grouped_notifications, Embed(embed, cover)
-                    )
+                    group_notification(Embed(embed, cover))
 
                 return True
         else:
@@ -5688,13 +7366,8 @@ def remove_duplicates(items):
 EOCD_SIGNATURE = b"\x50\x4b\x05\x06"
 
 
-# Return the zip comment for the passed zip file (cached)
-# Used on existing library files.
-@lru_cache(maxsize=None)
-def get_zip_comment_cache(zip_file):
-    """
-    Quickly reads a ZIP file's comment by reading only the end of the file.
-    """
+# Quickly reads a ZIP file's comment by reading only the end of the file.
+def read_zip_comment(zip_file):
     comment = ""
     try:
         with open(zip_file, "rb") as f:
@@ -5726,47 +7399,440 @@ def get_zip_comment_cache(zip_file):
     return comment
 
 
+# Return the zip comment for the passed zip file (cached)
+# Used on existing library files.
+@lru_cache(maxsize=None)
+def get_zip_comment_cache(zip_file):
+    return read_zip_comment(zip_file)
+
+
 # Return the zip comment for the passed zip file (no cache)
 # Used on downloaded files. (more likely to change, hence no cache)
 def get_zip_comment(zip_file):
-    """
-    Quickly reads a ZIP file's comment by reading only the end of the file.
-    """
-    comment = ""
-    try:
-        with open(zip_file, "rb") as f:
-            # Seek to the end of the file to get its size.
-            f.seek(0, os.SEEK_END)
-            file_size = f.tell()
+    # Reuse the already parsed archive if it's open
+    info = get_archive_info(zip_file, open_if_missing=False)
+    if info:
+        return info.comment
 
-            # Read a buffer large enough for the max comment size + EOCD record.
-            buffer_size = min(file_size, 65535 + 22)
-            f.seek(file_size - buffer_size, os.SEEK_SET)
-            end_data = f.read()
+    return read_zip_comment(zip_file)
 
-            # Search backwards for the EOCD signature.
-            sig_pos = end_data.rfind(EOCD_SIGNATURE)
 
-            if sig_pos > -1:
-                comment_len_pos = sig_pos + 20
-                comment_len = struct.unpack(
-                    "<H", end_data[comment_len_pos : comment_len_pos + 2]
-                )[0]
-                comment_pos = sig_pos + 22
+# The max number of archives kept open by get_archive_info()
+archive_info_cache_size = 8
 
-                if comment_len == len(end_data) - comment_pos:
-                    comment = end_data[comment_pos:].decode("utf-8")
-    except Exception as e:
-        send_message(
-            f"\tFailed to get zip comment for: {zip_file} - Error: {e}", error=True
+# The max number of bytes of member data kept in memory per archive
+archive_info_member_cache_bytes = 32 * 1024 * 1024
+
+# The searches used to find the .opf file within a novel
+opf_regex_searches = [
+    r"content.opf",
+    r"contents.opf",
+    r"package.opf",
+    r"standard.opf",
+    r"volume.opf",
+    r"metadata.opf",
+    r"978.*.opf",
+]
+
+
+# A zip based archive (.cbz/.epub) that's opened once and shared between all the
+# helpers that inspect it, so its central directory is only parsed once per file.
+class ArchiveInfo:
+    def __init__(self, path):
+        self.path = path
+        self.stat_key = get_archive_stat_key(path)
+        self.zip_file = zipfile.ZipFile(path, "r")
+        metrics.count("archives_opened")
+        self.names = self.zip_file.namelist()
+        self.sorted_names = sorted(self.names)
+        self.lower_names = {name.lower() for name in self.names}
+        self.image_names = [
+            name
+            for name in self.sorted_names
+            if name.lower().endswith(tuple(image_extensions))
+        ]
+        self.members = {}
+        self.members_size = 0
+        self.lookups = {}
+
+    # The archive comment, decoded
+    @property
+    def comment(self):
+        try:
+            return self.zip_file.comment.decode("utf-8")
+        except UnicodeDecodeError as e:
+            send_message(
+                f"\tFailed to get zip comment for: {self.path} - Error: {e}",
+                error=True,
+            )
+            return ""
+
+    # Reads the member, keeping it in memory for the next caller
+    def read(self, name):
+        metrics.cache_result("archive_members", name in self.members)
+        if name in self.members:
+            return self.members[name]
+
+        data = self.zip_file.read(name)
+        metrics.count("bytes_read", len(data))
+
+        if self.members_size + len(data) <= archive_info_member_cache_bytes:
+            self.members[name] = data
+            self.members_size += len(data)
+
+        return data
+
+    # Returns the data of the first file in the archive, if it's an image
+    @property
+    def first_image_data(self):
+        if not self.sorted_names:
+            return None
+
+        first_file = self.sorted_names[0]
+        if get_file_extension(first_file) not in image_extensions:
+            return None
+
+        return self.read(first_file)
+
+    # The ComicInfo.xml data, if present
+    @property
+    def comic_info(self):
+        if "comic_info" not in self.lookups:
+            self.lookups["comic_info"] = (
+                get_file_from_zip(
+                    self.path, ["comicinfo.xml"], ".xml", allow_base=False
+                )
+                if "comicinfo.xml" in self.lower_names
+                else None
+            )
+        return self.lookups["comic_info"]
+
+    # The .opf data, if present
+    @property
+    def opf(self):
+        if "opf" not in self.lookups:
+            self.lookups["opf"] = get_file_from_zip(
+                self.path, opf_regex_searches, ".opf"
+            )
+        return self.lookups["opf"]
+
+    def close(self):
+        self.members = {}
+        self.members_size = 0
+        self.zip_file.close()
+
+
+# The currently open archives, least recently used first
+archive_infos = {}
+
+
+# Returns the size and modification time used to tell if an archive changed
+def get_archive_stat_key(path):
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+
+# Returns the shared ArchiveInfo for the passed path, opening it if needed.
+def get_archive_info(path, open_if_missing=True):
+    info = archive_infos.pop(path, None)
+
+    if info:
+        try:
+            stat_key = get_archive_stat_key(path)
+        except OSError:
+            stat_key = None
+
+        # The file was changed since it was opened
+        if info.stat_key != stat_key:
+            info.close()
+            info = None
+
+    metrics.cache_result("archive_info", info is not None)
+
+    if not info:
+        if not open_if_missing:
+            return None
+        info = ArchiveInfo(path)
+
+    archive_infos[path] = info
+
+    while len(archive_infos) > archive_info_cache_size:
+        oldest = next(iter(archive_infos))
+        archive_infos.pop(oldest).close()
+
+    return info
+
+
+# Closes the open archive for the passed path, or every open archive
+# if no path is passed. Called before the script moves or removes files.
+def close_archive_info(path=None):
+    for key in [path] if path else list(archive_infos):
+        info = archive_infos.pop(key, None)
+        if info:
+            info.close()
+
+
+# Caches a scandir() snapshot of each directory, so the callers that check the
+# same directory for every file in it only scan it once. A snapshot is only reused
+# while the directory's mtime is unchanged, and the script's own file operations
+# drop the snapshots they affect.
+class DirectoryCache:
+    # Directories modified within this many seconds of being scanned aren't kept,
+    # filesystems with coarse timestamps could change them without a new mtime.
+    settle_time = 2
+
+    def __init__(self):
+        self.snapshots = {}
+
+    # Returns the snapshot for the folder, scanning it if needed.
+    # Raises OSError like os.scandir() if the folder can't be read.
+    def get_snapshot(self, folder):
+        folder = folder or "."
+        mtime = os.stat(folder).st_mtime_ns
+        snapshot = self.snapshots.get(folder)
+
+        if snapshot and snapshot["mtime"] == mtime:
+            metrics.cache_result("directory_cache", True)
+            return snapshot
+
+        metrics.cache_result("directory_cache", False)
+
+        entries = {}
+        with os.scandir(folder) as it:
+            for entry in it:
+                try:
+                    entries[entry.name] = entry.is_file()
+                except OSError:
+                    entries[entry.name] = False
+
+        snapshot = {"mtime": mtime, "entries": entries, "derived": {}}
+
+        if time.time_ns() - mtime > self.settle_time * 1_000_000_000:
+            self.snapshots[folder] = snapshot
+        else:
+            self.snapshots.pop(folder, None)
+
+        return snapshot
+
+    # Same as os.listdir()
+    def listdir(self, folder):
+        return list(self.get_snapshot(folder)["entries"])
+
+    # Returns the names of the files in the folder
+    def get_files(self, folder):
+        return [
+            name
+            for name, is_file in self.get_snapshot(folder)["entries"].items()
+            if is_file
+        ]
+
+    # Same as os.path.exists(), answered from the parent folder's snapshot
+    def exists(self, path):
+        try:
+            snapshot = self.get_snapshot(os.path.dirname(path))
+        except OSError:
+            return False
+
+        name = os.path.basename(path)
+        if name in snapshot["entries"]:
+            return True
+
+        derived = snapshot["derived"]
+        if "lower_names" not in derived:
+            derived["lower_names"] = {entry.lower() for entry in snapshot["entries"]}
+
+        # Only differs by case, which only the filesystem can answer
+        # (case-insensitive on windows and macOS by default, but not always)
+        if name.lower() in derived["lower_names"]:
+            return os.path.exists(path)
+
+        return False
+
+    # Returns function(listing) for the folder, reusing the result
+    # for as long as the folder's snapshot is.
+    def get_derived(self, folder, key, function):
+        snapshot = self.get_snapshot(folder)
+
+        if key not in snapshot["derived"]:
+            snapshot["derived"][key] = function(list(snapshot["entries"]))
+
+        return snapshot["derived"][key]
+
+    # Drops the snapshots for the path and its parent folder,
+    # or every snapshot if no path is passed.
+    def invalidate(self, path=None):
+        if not path:
+            self.snapshots = {}
+            return
+
+        self.snapshots.pop(path, None)
+        self.snapshots.pop(os.path.dirname(path), None)
+
+
+directory_cache = DirectoryCache()
+
+
+# An in-memory snapshot of the download folders, shared by the stages of main()
+# so the download folders are walked and their files parsed once per run instead
+# of once or twice per stage.
+#
+# Each folder is scanned the first time it's walked and kept along with the File
+# objects parsed from it. A folder is only scanned again when the script changes
+# it through renamed()/removed()/added(), which rename_file(), move_file() and
+# the like call, or when its mtime shows something else changed it.
+class DownloadFolderSnapshot:
+    def __init__(self):
+        self.folders = []
+        self.listings = (
+            {}
+        )  # normalized root -> {"mtime", "dirs", "files", "links", "objects"}
+
+    # Starts a snapshot of the passed folders, replacing any previous one.
+    def start(self, folders):
+        self.folders = [os.path.normpath(folder) for folder in folders if folder]
+        self.listings = {}
+
+    def clear(self):
+        self.folders = []
+        self.listings = {}
+
+    # Returns whether the path is within the snapshot
+    def covers(self, path):
+        if not self.folders or not path:
+            return False
+
+        path = os.path.normpath(path)
+        return any(
+            path == folder or path.startswith(folder + os.sep)
+            for folder in self.folders
         )
-    return comment
+
+    def scan(self, key, mtime):
+        dirs, files, links = [], [], set()
+
+        with os.scandir(key) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+
+                if is_dir:
+                    dirs.append(entry.name)
+                    try:
+                        if entry.is_symlink():
+                            links.add(entry.name)
+                    except OSError:
+                        pass
+                else:
+                    files.append(entry.name)
+
+        listing = {
+            "mtime": mtime,
+            "dirs": dirs,
+            "files": files,
+            "links": links,
+            "objects": {},
+        }
+        self.listings[key] = listing
+        return listing
+
+    # Returns the listing of the folder, scanning it if it's new or has changed,
+    # or None if it can't be read.
+    def get_listing(self, root):
+        key = os.path.normpath(root)
+
+        try:
+            mtime = os.stat(key).st_mtime_ns
+            listing = self.listings.get(key)
+
+            if listing and listing["mtime"] == mtime:
+                metrics.cache_result("download_snapshot", True)
+                return listing
+
+            metrics.cache_result("download_snapshot", False)
+            self.drop(key, keep_root=True)
+            return self.scan(key, mtime)
+        except OSError:
+            self.drop(key)
+            return None
+
+    # Same as scandir.walk(), answered from the snapshot for the download folders.
+    # Like scandir.walk(), removing names from dirs in place skips those folders.
+    def walk(self, top):
+        if not self.covers(top):
+            yield from scandir.walk(top)
+            return
+
+        listing = self.get_listing(top)
+        if listing is None:
+            return
+
+        dirs = list(listing["dirs"])
+        yield top, dirs, list(listing["files"])
+
+        for name in dirs:
+            if name not in listing["links"]:
+                yield from self.walk(os.path.join(top, name))
+
+    # Returns the File objects parsed from the folder's files, keyed by file name,
+    # or None if the folder isn't in the snapshot. They're dropped if the release
+    # groups or publishers the parsers rely on have been added to since.
+    def get_objects(self, root):
+        if not self.folders:
+            return None
+
+        listing = self.listings.get(os.path.normpath(root))
+        if not listing:
+            return None
+
+        state = (len(release_groups), len(publishers))
+        if listing.get("state") != state:
+            listing["objects"] = {}
+            listing["state"] = state
+
+        return listing["objects"]
+
+    # Drops the listings of the folder and everything within it
+    def drop(self, key, keep_root=False):
+        prefix = key + os.sep
+        for listing_key in list(self.listings):
+            if listing_key.startswith(prefix) or (listing_key == key and not keep_root):
+                del self.listings[listing_key]
+
+    # Rescans the folders containing the paths, if they're in the snapshot,
+    # and drops the paths' own listings for the ones that were folders.
+    def refresh(self, *paths):
+        if not self.folders:
+            return
+
+        keys = [os.path.normpath(path) for path in paths if path]
+        for key in keys:
+            self.drop(key)
+
+        for parent in dict.fromkeys(os.path.dirname(key) for key in keys):
+            if parent in self.listings:
+                del self.listings[parent]
+                self.get_listing(parent)
+
+    # Records that the script renamed or moved src to dest
+    def renamed(self, src, dest):
+        self.refresh(src, dest)
+
+    # Records that the script removed the path
+    def removed(self, path):
+        self.refresh(path)
+
+    # Records that the script created the path
+    def added(self, path):
+        self.refresh(path)
+
+
+download_snapshot = DownloadFolderSnapshot()
 
 
 # Checks for any duplicate releases and deletes the lower ranking one.
 def check_for_duplicate_volumes(paths_to_search=[]):
-    global grouped_notifications
-
     if not paths_to_search:
         return
 
@@ -5777,7 +7843,7 @@ def check_for_duplicate_volumes(paths_to_search=[]):
                 continue
 
             print(f"\nSearching {p} for duplicate releases...")
-            for root, dirs, files in scandir.walk(p):
+            for root, dirs, files in download_snapshot.walk(p):
                 print(f"\t{root}")
                 files, dirs = process_files_and_folders(
                     root,
@@ -5919,12 +7985,7 @@ def check_for_duplicate_volumes(paths_to_search=[]):
                                                         },
                                                     ],
                                                 )
-                                                grouped_notifications = (
-                                                    group_notification(
-                                                        grouped_notifications,
-                                                        Embed(embed, None),
-                                                    )
-                                                )
+                                                group_notification(Embed(embed, None))
                                                 user_input = (
                                                     get_input_from_user(
                                                         f'\t\t\tDelete "{duplicate_file.name}"',
@@ -5974,11 +8035,8 @@ def check_for_duplicate_volumes(paths_to_search=[]):
                                                             },
                                                         ],
                                                     )
-                                                    grouped_notifications = (
-                                                        group_notification(
-                                                            grouped_notifications,
-                                                            Embed(embed, None),
-                                                        )
+                                                    group_notification(
+                                                        Embed(embed, None)
                                                     )
                                                     # Delete the compare file
                                                     remove_file(
@@ -6015,11 +8073,8 @@ def check_for_duplicate_volumes(paths_to_search=[]):
                                                             },
                                                         ],
                                                     )
-                                                    grouped_notifications = (
-                                                        group_notification(
-                                                            grouped_notifications,
-                                                            Embed(embed, None),
-                                                        )
+                                                    group_notification(
+                                                        Embed(embed, None)
                                                     )
                                                     print("\t\t\t\t\tSkipping...")
                                 except Exception as e:
@@ -6206,6 +8261,205 @@ def move_strings_to_top(target_item, item_array):
     return item_array
 
 
+# A persistent lookup of the user's existing series folders, keyed by their
+# clean_str() name, the words within that name, and the character trigrams
+# within that name. Used by check_for_existing_series() to get an exact match
+# in O(1) and to narrow down the folders that are worth running similar() on.
+class SeriesIndex:
+    def __init__(self, index_path=None, ngram_size=3):
+        self.index_path = index_path
+        self.ngram_size = ngram_size
+        self.names = {}  # path -> clean name
+        self.exact = {}  # clean name -> set of paths
+        self.tokens = {}  # word -> set of paths
+        self.ngrams = {}  # trigram -> set of paths
+        self.dirty = False
+
+    def __contains__(self, path):
+        return path in self.names
+
+    def __len__(self):
+        return len(self.names)
+
+    # The name used as the key, identical to what the cache check compares against.
+    @staticmethod
+    def get_clean_name(path):
+        return clean_str(os.path.basename(path), skip_bracket=True).lower().strip()
+
+    def get_keys(self, name):
+        tokens = set(name.split())
+        padded = f" {name} "
+        ngrams = {
+            padded[i : i + self.ngram_size]
+            for i in range(len(padded) - self.ngram_size + 1)
+        }
+        return tokens, ngrams
+
+    def add(self, path, name=None):
+        if path in self.names:
+            return
+
+        name = name if name is not None else self.get_clean_name(path)
+        self.names[path] = name
+
+        if not name:
+            return
+
+        self.exact.setdefault(name, set()).add(path)
+        tokens, ngrams = self.get_keys(name)
+        for token in tokens:
+            self.tokens.setdefault(token, set()).add(path)
+        for ngram in ngrams:
+            self.ngrams.setdefault(ngram, set()).add(path)
+        self.dirty = True
+
+    def remove(self, path):
+        name = self.names.pop(path, None)
+
+        if name is None:
+            return
+
+        self.dirty = True
+
+        if not name:
+            return
+
+        tokens, ngrams = self.get_keys(name)
+        for key, table in [(name, self.exact)] + [
+            (key, table)
+            for keys, table in [(tokens, self.tokens), (ngrams, self.ngrams)]
+            for key in keys
+        ]:
+            if key in table:
+                table[key].discard(path)
+                if not table[key]:
+                    del table[key]
+
+    # Brings the index in line with the passed paths, adding any new ones
+    # and dropping any that are no longer present.
+    def sync(self, paths_to_index):
+        paths_to_index = set(paths_to_index)
+
+        for path in [p for p in self.names if p not in paths_to_index]:
+            self.remove(path)
+
+        for path in paths_to_index:
+            self.add(path)
+
+    # Returns the paths whose clean name matches exactly.
+    def get_exact_matches(self, name):
+        return sorted(self.exact.get(name.lower().strip(), []))
+
+    # Returns the paths that could reach the required similarity score,
+    # exact matches first, followed by the rest in order of shared keys.
+    #
+    # Anything that doesn't share a word or trigram with the name is left out,
+    # and anything that can't reach the required score according to the
+    # SequenceMatcher upper bounds never makes it to the similar() call.
+    def get_candidates(self, name, required_score):
+        name = name.lower().strip()
+
+        if not name:
+            return []
+
+        exact_matches = self.get_exact_matches(name)
+        tokens, ngrams = self.get_keys(name)
+        shared_counts = {}
+
+        for keys, table in [(tokens, self.tokens), (ngrams, self.ngrams)]:
+            for key in keys:
+                for path in table.get(key, []):
+                    shared_counts[path] = shared_counts.get(path, 0) + 1
+
+        # the name is seq2, which SequenceMatcher caches, the folder names vary as seq1
+        matcher = SequenceMatcher(None, b=name)
+        candidates = []
+
+        for path, count in shared_counts.items():
+            if path in exact_matches:
+                continue
+
+            matcher.set_seq1(self.names[path])
+            if (
+                matcher.real_quick_ratio() >= required_score
+                and matcher.quick_ratio() >= required_score
+            ):
+                candidates.append((path, count))
+
+        candidates.sort(key=lambda item: (-item[1], item[0]))
+
+        return exact_matches + [path for path, count in candidates]
+
+    def load(self):
+        if not self.index_path or not os.path.isfile(self.index_path):
+            return False
+
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+            if data.get("script_version") != list(script_version):
+                return False
+
+            for path, name in data.get("names", {}).items():
+                self.add(path, name)
+            self.dirty = False
+            return True
+        except Exception as e:
+            send_message(f"Failed to load {self.index_path}: {e}", error=True)
+            return False
+
+    def save(self):
+        if not self.index_path or not self.dirty or not log_to_file:
+            return False
+
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            temp_path = f"{self.index_path}.tmp"
+
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"script_version": list(script_version), "names": self.names},
+                    f,
+                )
+
+            os.replace(temp_path, self.index_path)
+            self.dirty = False
+            return True
+        except Exception as e:
+            send_message(f"Failed to save {self.index_path}: {e}", error=True)
+            return False
+
+
+series_index = SeriesIndex(os.path.join(LOGS_DIR, "series_index.json"))
+
+
+# Returns the top-level series folders for each library path
+def get_library_series_folders(
+    paths=paths, paths_with_types=paths_with_types, download_folders=download_folders
+):
+    series_folders = []
+    library_paths = remove_duplicates(paths + [p.path for p in paths_with_types])
+
+    for path in library_paths:
+        if path in download_folders or not os.path.isdir(path):
+            continue
+
+        try:
+            with os.scandir(path) as entries:
+                series_folders.extend(
+                    entry.path
+                    for entry in entries
+                    if entry.is_dir()
+                    and not entry.name.startswith(".")
+                    and not entry.name.startswith("_")
+                )
+        except Exception as e:
+            send_message(str(e), error=True)
+
+    return series_folders
+
+
 # Checks for an existing series by pulling the series name from each elidable file in the downloads_folder
 # and comparing it to an existin folder within the user's library.
 def check_for_existing_series(
@@ -6215,7 +8469,7 @@ def check_for_existing_series(
     test_paths_with_types=paths_with_types,
     test_cached_paths=cached_paths,
 ):
-    global cached_paths, cached_identifier_results, messages_to_send, grouped_notifications
+    global cached_paths, cached_identifier_results, messages_to_send
 
     # Groups messages by their series
     def group_similar_series(messages_to_send):
@@ -6357,11 +8611,7 @@ def check_for_existing_series(
 
         img_volumes = upgrade_to_volume_class(
             upgrade_to_file_class(
-                [
-                    f
-                    for f in os.listdir(file_root)
-                    if os.path.isfile(join(file_root, f))
-                ],
+                directory_cache.get_files(file_root),
                 file_root,
                 clean=True,
             )
@@ -6376,27 +8626,92 @@ def check_for_existing_series(
             print("\t\t\tNo matching volumes found for alternative match.")
             return 0, None
 
+        # The covers are compared as they're stored in the files, which is
+        # also what the cover fingerprint index was built from.
         downloaded_volume_cover_data = find_and_extract_cover(
             file,
             return_data_only=True,
             silent=True,
             blank_image_check=True,
+            compress_data=False,
         )
 
-        if not downloaded_volume_cover_data:
+        downloaded_fingerprint = (
+            CoverFingerprint.from_image_data(downloaded_volume_cover_data)
+            if downloaded_volume_cover_data
+            else None
+        )
+
+        if not downloaded_fingerprint:
             print("\t\t\tNo downloaded volume cover data found.")
             return 0, None
 
+        # The cover data of the volumes extracted along the way
+        existing_cover_data = {}
+
+        # Group the volumes by the hamming distance of their cover's hashes,
+        # only extracting the covers that aren't in the index yet.
+        candidates = {}
         for matching_volume in matching_volumes:
+            fingerprint = cover_fingerprint_index.get(matching_volume.path)
+
+            if not fingerprint:
+                existing_volume_cover_data = find_and_extract_cover(
+                    matching_volume,
+                    return_data_only=True,
+                    silent=True,
+                    blank_image_check=True,
+                    compress_data=False,
+                )
+                existing_cover_data[matching_volume.path] = existing_volume_cover_data
+                fingerprint = (
+                    cover_fingerprint_index.add(
+                        matching_volume.path, existing_volume_cover_data
+                    )
+                    if existing_volume_cover_data
+                    else None
+                )
+
+            if not fingerprint:
+                print(
+                    f"\t\t\tNo existing volume cover data found for {matching_volume.name}"
+                )
+                continue
+
+            distance = downloaded_fingerprint.distance(fingerprint)
+            if distance <= cover_hash_max_distance:
+                candidates.setdefault(distance, []).append(
+                    (matching_volume, fingerprint)
+                )
+
+        # The index only orders the candidates, the closest distance first and the
+        # best thumbnail ssim within it. Thumbnails of different covers sharing the
+        # same artwork can score well above the full size covers, so every candidate
+        # at a distance is checked through the full ssim before moving on.
+        ordered_candidates = [
+            (distance, matching_volume)
+            for distance in sorted(candidates)
+            for matching_volume, fingerprint in sorted(
+                candidates[distance],
+                key=lambda x: downloaded_fingerprint.compare(x[1]),
+                reverse=True,
+            )
+        ]
+
+        for distance, matching_volume in ordered_candidates:
             print(
                 f"\t\t\tMatching volume:\n\t\t\t\t{matching_volume.name}\n\t\t\t\t{file.name}"
             )
+            print(f"\t\t\tCover Hash Distance: {distance}")
 
-            existing_volume_cover_data = find_and_extract_cover(
+            existing_volume_cover_data = existing_cover_data.get(
+                matching_volume.path
+            ) or find_and_extract_cover(
                 matching_volume,
                 return_data_only=True,
                 silent=True,
                 blank_image_check=True,
+                compress_data=False,
             )
 
             if not existing_volume_cover_data:
@@ -6435,6 +8750,12 @@ def check_for_existing_series(
         print("\nNo download folders specified, skipping check_for_existing_series.")
         return
 
+    # Bring the series index in line with the cached paths and the library's series folders
+    series_index.sync(
+        cached_paths
+        + get_library_series_folders(paths, paths_with_types, download_folders)
+    )
+
     print("\nChecking download folders for items to match to existing library...")
     for download_folder in download_folders:
         if not os.path.exists(download_folder) and not test_mode:
@@ -6596,46 +8917,19 @@ def check_for_existing_series(
                             if done:
                                 continue
 
-                    if cached_paths:
-                        if exclude:
-                            cached_paths = organize_by_first_letter(
-                                cached_paths, file.name, 1, exclude
-                            )
-                        else:
-                            cached_paths = organize_by_first_letter(
-                                cached_paths, file.name, 1
-                            )
-
                     downloaded_file_series_name = clean_str(
                         file.series_name, skip_bracket=True
                     )
 
-                    # organize the cached paths
-                    if cached_paths and file.name != downloaded_file_series_name:
-                        if exclude:
-                            cached_paths = organize_by_first_letter(
-                                cached_paths,
-                                downloaded_file_series_name,
-                                2,
-                                exclude,
-                            )
-                        else:
-                            cached_paths = organize_by_first_letter(
-                                cached_paths,
-                                downloaded_file_series_name,
-                                2,
-                            )
-
-                    # Move paths matching the first three words to the top of the list
-                    if cached_paths:
-                        cached_paths = move_strings_to_top(
-                            file.series_name, cached_paths
+                    # 2 - Use the series index built from the cached paths
+                    if series_index:
+                        candidate_paths = series_index.get_candidates(
+                            downloaded_file_series_name, required_similarity_score
                         )
-
-                    # 2 - Use the cached paths
-                    if cached_paths:
-                        print("\n\tChecking path types...")
-                        for cached_path_index, p in enumerate(cached_paths[:], start=1):
+                        print(
+                            f"\n\tChecking {len(candidate_paths)} of {len(series_index)} indexed paths..."
+                        )
+                        for cached_path_index, p in enumerate(candidate_paths, start=1):
                             if (
                                 not os.path.exists(p)
                                 or not os.path.isdir(p)
@@ -6667,9 +8961,7 @@ def check_for_existing_series(
                                     )
                                     continue
 
-                            successful_series_name = clean_str(
-                                os.path.basename(p), skip_bracket=True
-                            )
+                            successful_series_name = series_index.names[p]
 
                             successful_similarity_score = (
                                 1
@@ -6681,7 +8973,7 @@ def check_for_existing_series(
                             )
 
                             print(
-                                f"\n\t\t-(CACHE)- {cached_path_index} of {len(cached_paths)} - "
+                                f"\n\t\t-(CACHE)- {cached_path_index} of {len(candidate_paths)} - "
                                 f'"{file.name}"\n\t\tCHECKING: {downloaded_file_series_name}\n\t\tAGAINST:  {successful_series_name}\n\t\tSCORE:    {successful_similarity_score}'
                             )
                             if successful_similarity_score >= required_similarity_score:
@@ -6729,6 +9021,10 @@ def check_for_existing_series(
                     directories_found = []
                     matched_ids = []
 
+                    # The indexed folders that can still reach the required score,
+                    # any other indexed folder is passed over in the library walk below
+                    indexed_candidates = set(candidate_paths) if series_index else set()
+
                     for path_position, path in enumerate(paths, start=1):
                         if done or not os.path.exists(path) or path in download_folders:
                             continue
@@ -6818,7 +9114,8 @@ def check_for_existing_series(
                                 print(f"Looking inside: {folder_accessor.root}")
                                 if (
                                     folder_accessor.dirs
-                                    and root not in cached_paths + download_folders
+                                    and root not in cached_paths
+                                    and root not in download_folders
                                 ):
                                     if done:
                                         break
@@ -6830,28 +9127,47 @@ def check_for_existing_series(
                                         if done:
                                             break
 
+                                        file_root = os.path.join(
+                                            folder_accessor.root, inner_dir
+                                        )
                                         existing_series_folder_from_library = clean_str(
                                             inner_dir
                                         )
 
+                                        # Indexed under the same name, but the index
+                                        # found it can't reach the required score
+                                        ruled_out = (
+                                            file_root not in indexed_candidates
+                                            and series_index.names.get(file_root)
+                                            == existing_series_folder_from_library.lower().strip()
+                                        )
+
+                                        # Only a cover image match could still place it
+                                        if (
+                                            ruled_out
+                                            and not match_through_image_similarity
+                                        ):
+                                            continue
+
                                         similarity_score = (
-                                            1
-                                            if (
-                                                existing_series_folder_from_library.lower()
-                                                == downloaded_file_series_name.lower()
-                                            )
-                                            else similar(
-                                                existing_series_folder_from_library,
-                                                downloaded_file_series_name,
+                                            0
+                                            if ruled_out
+                                            else (
+                                                1
+                                                if (
+                                                    existing_series_folder_from_library.lower()
+                                                    == downloaded_file_series_name.lower()
+                                                )
+                                                else similar(
+                                                    existing_series_folder_from_library,
+                                                    downloaded_file_series_name,
+                                                )
                                             )
                                         )
 
                                         print(
                                             f'\n\t\t-(NOT CACHE)- {dir_position} of {len(folder_accessor.dirs)} - path {path_position} of {len(paths)} - "{file.name}"\n\t\tCHECKING: {downloaded_file_series_name}\n\t\tAGAINST:  {existing_series_folder_from_library}\n\t\tSCORE:    {similarity_score}'
                                         )
-                                        file_root = os.path.join(
-                                            folder_accessor.root, inner_dir
-                                        )
                                         if (
                                             similarity_score
                                             >= required_similarity_score
@@ -7086,7 +9402,6 @@ def check_for_existing_series(
             for folder in folders:
                 check_and_delete_empty_folder(folder["root"])
 
-    series_notifications = []
     webhook_to_use = pick_webhook(None, new_volume_webhook)
 
     if messages_to_send:
@@ -7109,18 +9424,7 @@ def check_for_existing_series(
                         fields=message.fields,
                     )
 
-                    if new_volume_webhook:
-                        series_notifications = group_notification(
-                            series_notifications,
-                            Embed(embed, cover),
-                            webhook_to_use,
-                        )
-                    else:
-                        grouped_notifications = group_notification(
-                            grouped_notifications,
-                            Embed(embed, cover),
-                            webhook_to_use,
-                        )
+                    group_notification(Embed(embed, cover), webhook_to_use)
                     group_messages.remove(message)
             else:
                 group_numbers = []
@@ -7173,25 +9477,7 @@ def check_for_existing_series(
                         fields=new_fields,
                     )
 
-                    if new_volume_webhook:
-                        series_notifications = group_notification(
-                            series_notifications,
-                            Embed(embed, None),
-                            webhook_to_use,
-                        )
-                    else:
-                        grouped_notifications = group_notification(
-                            grouped_notifications,
-                            Embed(embed, None),
-                            webhook_to_use,
-                        )
-
-    if series_notifications:
-        send_discord_message(
-            None,
-            series_notifications,
-            passed_webhook=webhook_to_use,
-        )
+                    group_notification(Embed(embed, None), webhook_to_use)
 
     # clear lru_cache for parse_words()
     parse_words.cache_clear()
@@ -7226,8 +9512,6 @@ def get_series_name(dir):
 # If volume releases are available, it will rename based on those.
 # Otherwise it will fallback to just cleaning the name of any brackets.
 def rename_dirs_in_download_folder(paths_to_process=download_folders):
-    global grouped_notifications
-
     # Processes the passed folder
     def process_folder(download_folder):
         # Renames the root folder based on the volumes
@@ -7600,31 +9884,33 @@ def rename_dirs_in_download_folder(paths_to_process=download_folders):
         process_folder(path)
 
 
-# Retrieves any bracketed information in the name that isn't the release year.
-def get_extras(file_name, chapter=False, series_name="", subtitle="", extension=""):
+# The premium and year groups left out by get_extras()
+extras_exclusion_regex = (
+    r"((\{|\(|\[)(Premium|J-Novel Club Premium)(\]|\)|\}))|(\((\d{4})\))"
+)
+
+# Pre-compiled get_extras() bracketed group search
+extras_bracket_pattern = re.compile(r"((?:\{|\(|\[).*?(?:\]|\)|\}))")
+
+# Pre-compiled get_extras() exclusions, by whether it's a chapter,
+# chapters also leave out their part groups.
+extras_exclusion_patterns = {
+    False: re.compile(extras_exclusion_regex, re.IGNORECASE),
+    True: re.compile(
+        extras_exclusion_regex + r"|((\{|\(|\[)Part([-_. ]|)([0-9]+)(\]|\)|\}))",
+        re.IGNORECASE,
+    ),
+}
+
+
+# Retrieves any bracketed information in the name that isn't the release year.
+def get_extras(file_name, chapter=False, series_name="", subtitle="", extension=""):
     # Helper function to remove matching patterns from text
     def remove_matching(text, pattern):
         return re.sub(
             rf"\b{re.escape(pattern)}\b", "", text, flags=re.IGNORECASE
         ).strip()
 
-    # Helper function to extract unique patterns from text
-    def extract_unique_patterns(text):
-        results = re.findall(
-            r"((?:\{|\(|\[).*?(?:\]|\)|\}))", text, flags=re.IGNORECASE
-        )
-        return results
-
-    # Helper function to remove specific patterns from a list
-    def remove_patterns(items, patterns):
-        pattern_combined_regex = "|".join(patterns)
-        items = [
-            item
-            for item in items
-            if not re.search(pattern_combined_regex, item, re.IGNORECASE)
-        ]
-        return items
-
     # Get the file extension
     extension = extension or get_file_extension(file_name)
 
@@ -7635,21 +9921,13 @@ def get_extras(file_name, chapter=False, series_name="", subtitle="", extension=
     if subtitle:
         file_name = remove_matching(file_name, subtitle)
 
-    # Extract unique patterns from the file name
-    results = extract_unique_patterns(file_name)
-
-    # Define patterns and exclude patterns for removal
-    patterns = [
-        r"((\{|\(|\[)(Premium|J-Novel Club Premium)(\]|\)|\}))",
-        r"(\((\d{4})\))",
+    # The bracketed groups of the file name, minus the excluded ones
+    results = [
+        group
+        for group in extras_bracket_pattern.findall(file_name)
+        if not extras_exclusion_patterns[bool(chapter)].search(group)
     ]
 
-    if chapter:
-        patterns.append(r"((\{|\(|\[)Part([-_. ]|)([0-9]+)(\]|\)|\}))")
-
-    # Remove specified patterns from the results
-    results = remove_patterns(results, patterns)
-
     # Remove any possible dupcliates
     results = remove_duplicates(results)
 
@@ -7718,9 +9996,8 @@ def isint(x):
 def contains_comic_info(zip_file):
     result = False
     try:
-        with zipfile.ZipFile(zip_file, "r") as zip_ref:
-            if "comicinfo.xml" in map(str.lower, zip_ref.namelist()):
-                result = True
+        if "comicinfo.xml" in get_archive_info(zip_file).lower_names:
+            result = True
     except (zipfile.BadZipFile, FileNotFoundError) as e:
         send_message(f"\tFile: {zip_file}\n\t\tERROR: {e}", error=True)
     return result
@@ -7730,77 +10007,71 @@ def contains_comic_info(zip_file):
 def get_file_from_zip(zip_file, searches, extension=None, allow_base=True):
     result = None
     try:
-        with zipfile.ZipFile(zip_file, "r") as z:
-            # Filter out any item that doesn't end in the specified extension
-            file_list = [
-                item
-                for item in z.namelist()
-                if item.endswith(extension) or not extension
-            ]
-
-            if not file_list:
-                return None
+        z = get_archive_info(zip_file)
+        # Filter out any item that doesn't end in the specified extension
+        file_list = [
+            item for item in z.names if item.endswith(extension) or not extension
+        ]
 
-            # Search the file list paths for a non-regex match first
-            found = next(
-                (
-                    item
-                    for item in file_list
-                    if any(
-                        search.lower()
-                        in (
-                            os.path.basename(item).lower()
-                            if allow_base
-                            else (
-                                item.replace(os.path.basename(item), "").lower()
-                                if item.replace(os.path.basename(item), "").lower()
-                                else item.lower()
-                            )
-                        )
-                        for search in searches
-                    )
-                ),
-                None,
-            )
+        if not file_list:
+            return None
 
-            if found:
-                result = z.read(found)
-            else:
-                # Interate through it
-                for path in file_list:
-                    # if allow_base, then change it to the base name of the file
-                    # otherwise purge the base name
-                    mod_file_name = (
-                        os.path.basename(path).lower()
+        # Search the file list paths for a non-regex match first
+        found = next(
+            (
+                item
+                for item in file_list
+                if any(
+                    search.lower()
+                    in (
+                        os.path.basename(item).lower()
                         if allow_base
                         else (
-                            path.replace(os.path.basename(path), "").lower()
-                            if path.replace(os.path.basename(path), "").lower()
-                            else path.lower()
+                            item.replace(os.path.basename(item), "").lower()
+                            if item.replace(os.path.basename(item), "").lower()
+                            else item.lower()
                         )
                     )
-                    # Low-compute search without regex
+                    for search in searches
+                )
+            ),
+            None,
+        )
+
+        if found:
+            result = z.read(found)
+        else:
+            # Interate through it
+            for path in file_list:
+                # if allow_base, then change it to the base name of the file
+                # otherwise purge the base name
+                mod_file_name = (
+                    os.path.basename(path).lower()
+                    if allow_base
+                    else (
+                        path.replace(os.path.basename(path), "").lower()
+                        if path.replace(os.path.basename(path), "").lower()
+                        else path.lower()
+                    )
+                )
+                # Low-compute search without regex
+                found = any(
+                    (item for item in searches if item.lower() in mod_file_name.lower())
+                )
+
+                # Regex search if not found
+                if not found:
                     found = any(
                         (
                             item
                             for item in searches
-                            if item.lower() in mod_file_name.lower()
+                            if re.search(item, mod_file_name, re.IGNORECASE)
                         )
                     )
 
-                    # Regex search if not found
-                    if not found:
-                        found = any(
-                            (
-                                item
-                                for item in searches
-                                if re.search(item, mod_file_name, re.IGNORECASE)
-                            )
-                        )
-
-                    if found:
-                        result = z.read(path)
-                        break
+                if found:
+                    result = z.read(path)
+                    break
     except (zipfile.BadZipFile, FileNotFoundError) as e:
         send_message(f"Attempted to read file: {zip_file}\nERROR: {e}", error=True)
     return result
@@ -7833,7 +10104,7 @@ def parse_html_tags(html):
 def rename_files(
     only_these_files=[], download_folders=download_folders, test_mode=False
 ):
-    global transferred_files, grouped_notifications
+    global transferred_files
 
     print("\nSearching for files to rename...")
 
@@ -7849,7 +10120,7 @@ def rename_files(
             )
             continue
 
-        for root, dirs, files in scandir.walk(path):
+        for root, dirs, files in download_snapshot.walk(path):
             if test_mode:
                 if root not in download_folders:
                     return
@@ -8435,11 +10706,8 @@ def rename_files(
                                                             },
                                                         ],
                                                     )
-                                                    grouped_notifications = (
-                                                        group_notification(
-                                                            grouped_notifications,
-                                                            Embed(embed, None),
-                                                        )
+                                                    group_notification(
+                                                        Embed(embed, None)
                                                     )
                                                 # Replaces the file object with an updated one with the replacement values
                                                 volume_index = volumes.index(file)
@@ -8507,8 +10775,6 @@ def check_for_exception_keywords(file_name, exception_keywords):
 
 # Deletes chapter files from the download folder.
 def delete_chapters_from_downloads():
-    global grouped_notifications
-
     print("\nSearching for chapter files to delete...")
 
     if not download_folders:
@@ -8524,7 +10790,7 @@ def delete_chapters_from_downloads():
                 continue
 
             os.chdir(path)
-            for root, dirs, files in scandir.walk(path):
+            for root, dirs, files in download_snapshot.walk(path):
                 files, dirs = process_files_and_folders(
                     root,
                     files,
@@ -8574,11 +10840,9 @@ def delete_chapters_from_downloads():
                                     },
                                 ],
                             )
-                            grouped_notifications = group_notification(
-                                grouped_notifications, Embed(embed, None)
-                            )
+                            group_notification(Embed(embed, None))
                             remove_file(os.path.join(root, file))
-            for root, dirs, files in scandir.walk(path):
+            for root, dirs, files in download_snapshot.walk(path):
                 files, dirs = process_files_and_folders(
                     root,
                     files,
@@ -8608,11 +10872,13 @@ def get_novel_cover_path(file):
 
 
 # Finds and extracts the internal cover from a manga or novel file.
+# With return_data_only, the cover data is compressed unless compress_data is False.
 def find_and_extract_cover(
     file,
     return_data_only=False,
     silent=False,
     blank_image_check=compare_detected_cover_to_blank_images,
+    compress_data=True,
 ):
     # Helper function to filter and sort files in the zip archive
     def filter_files(zip_list):
@@ -8627,8 +10893,7 @@ def find_and_extract_cover(
 
     # Helper function to read image data from the zip file
     def get_image_data(image_path):
-        with zip_ref.open(image_path) as image_file_ref:
-            return image_file_ref.read()
+        return zip_ref.read(image_path)
 
     # Helper function to save image data to a file
     def save_image_data(image_path, image_data):
@@ -8653,112 +10918,102 @@ def find_and_extract_cover(
                 return result if result else output_path
             return output_path
         elif image_data:
+            if not compress_data:
+                return image_data
             compressed_data = compress_image(output_path, raw_data=image_data)
             return compressed_data if compressed_data else image_data
         return None
 
     # Helper function to check if an image is blank
     def is_blank_image(image_data):
-        ssim_score_white = prep_images_for_similarity(
-            blank_white_image_path, image_data, silent=silent
-        )
-        ssim_score_black = prep_images_for_similarity(
-            blank_black_image_path, image_data, silent=silent
-        )
-
-        return (
-            ssim_score_white is not None
-            and ssim_score_black is not None
-            and (
-                ssim_score_white >= blank_cover_required_similarity_score
-                or ssim_score_black >= blank_cover_required_similarity_score
-            )
-        )
+        return is_blank_cover(image_data, silent=silent)
 
     # Check if the file exists
     if not os.path.isfile(file.path):
         send_message(f"\nFile: {file.path} does not exist.", error=True)
         return None
 
-    # Check if the input file is a valid zip file
-    if not zipfile.is_zipfile(file.path):
+    # Open the zip file, or reuse it if it's already open
+    try:
+        zip_ref = get_archive_info(file.path)
+    except zipfile.BadZipFile:
         send_message(f"\nFile: {file.path} is not a valid zip file.", error=True)
         return None
+    except OSError as e:
+        send_message(f"\nFile: {file.path} could not be read: {e}", error=True)
+        return None
 
     # Get the novel cover path if the file has a novel extension
     novel_cover_path = (
         get_novel_cover_path(file) if file.extension in novel_extensions else ""
     )
 
-    # Open the zip file
-    with zipfile.ZipFile(file.path, "r") as zip_ref:
-        # Filter and sort files in the zip archive
-        zip_list = filter_files(zip_ref.namelist())
-        zip_list = sorted(zip_list)
-
-        # Move the novel cover to the front of the list, if it exists
-        if novel_cover_path:
-            novel_cover_basename = os.path.basename(novel_cover_path)
-            for i, item in enumerate(zip_list):
-                if os.path.basename(item) == novel_cover_basename:
-                    zip_list.pop(i)
-                    zip_list.insert(0, item)
-                    break
+    # Filter and sort files in the zip archive
+    zip_list = filter_files(zip_ref.sorted_names)
+
+    # Move the novel cover to the front of the list, if it exists
+    if novel_cover_path:
+        novel_cover_basename = os.path.basename(novel_cover_path)
+        for i, item in enumerate(zip_list):
+            if os.path.basename(item) == novel_cover_basename:
+                zip_list.pop(i)
+                zip_list.insert(0, item)
+                break
 
-        # Set of blank images
-        blank_images = set()
+    # Set of blank images
+    blank_images = set()
 
-        # Iterate through the files in the zip archive
-        for pattern in compiled_cover_patterns:
-            # Check if the file matches any cover pattern
-            for image_file in zip_list:
-                image_basename = os.path.basename(image_file)
-                is_novel_cover = novel_cover_path and image_basename == novel_cover_path
+    # Iterate through the files in the zip archive
+    for pattern in compiled_cover_patterns:
+        # Check if the file matches any cover pattern
+        for image_file in zip_list:
+            image_basename = os.path.basename(image_file)
+            is_novel_cover = novel_cover_path and image_basename == novel_cover_path
 
+            if (
+                is_novel_cover
+                or file.extension in manga_extensions
+                or pattern.pattern == image_basename
+                or pattern.search(image_basename)
+            ):
+                # Check if the image is blank
                 if (
-                    is_novel_cover
-                    or file.extension in manga_extensions
-                    or pattern.pattern == image_basename
-                    or pattern.search(image_basename)
+                    blank_image_check
+                    and blank_white_image_path
+                    and blank_black_image_path
                 ):
-                    # Check if the image is blank
-                    if (
-                        blank_image_check
-                        and blank_white_image_path
-                        and blank_black_image_path
-                    ):
-                        image_data = get_image_data(image_file)
-                        if is_blank_image(image_data):
-                            blank_images.add(image_file)
-                            break
                     image_data = get_image_data(image_file)
-                    result = process_cover_image(image_file, image_data)
-                    if result:
-                        return result
+                    if is_blank_image(image_data):
+                        blank_images.add(image_file)
+                        break
+                image_data = get_image_data(image_file)
+                result = process_cover_image(image_file, image_data)
+                if result:
+                    return result
 
-        # Find a non-blank default cover
-        default_cover_path = None
-        for test_file in zip_list:
-            if test_file in blank_images:
-                continue
+    # Find a non-blank default cover
+    default_cover_path = None
+    for test_file in zip_list:
+        if test_file in blank_images:
+            continue
 
-            image_data = get_image_data(test_file)
+        image_data = get_image_data(test_file)
 
-            # Check if the user has enabled the option to compare detected covers to blank images
-            if blank_image_check:
-                if not is_blank_image(image_data):
-                    default_cover_path = test_file
-                    break
-            else:
+        # Check if the user has enabled the option to compare detected covers to blank images
+        if blank_image_check:
+            if not is_blank_image(image_data):
                 default_cover_path = test_file
                 break
+        else:
+            default_cover_path = test_file
+            break
 
-        # Process the default cover if found
-        if default_cover_path:
-            image_data = get_image_data(default_cover_path)
-            result = process_cover_image(default_cover_path, image_data)
-            if result:
-                return result
+    # Process the default cover if found
+    if default_cover_path:
+        image_data = get_image_data(default_cover_path)
+        result = process_cover_image(default_cover_path, image_data)
+        if result:
+            return result
 
     return False
 
@@ -8800,9 +11055,9 @@ def print_execution_time(start_time, function_name):
     print(f"\nExecution time for: {function_name}: {time.time() - start_time} seconds")
 
 
-# Extracts the covers out from our manga and novel files.
-def extract_covers(paths_to_process=paths):
-    global checked_series, root_modification_times
+# Extracts the covers for the files within a single folder,
+# returns the volume_paths for the next folder.
+def extract_covers_from_folder(root, files, dirs, volume_paths=[]):
     global series_cover_path
 
     # Finds the series cover image in the given folder
@@ -8811,7 +11066,9 @@ def extract_covers(paths_to_process=paths):
             (
                 os.path.join(folder_accessor.root, f"cover{ext}")
                 for ext in image_extensions
-                if os.path.exists(os.path.join(folder_accessor.root, f"cover{ext}"))
+                if directory_cache.exists(
+                    os.path.join(folder_accessor.root, f"cover{ext}")
+                )
             ),
             None,
         )
@@ -8844,26 +11101,21 @@ def extract_covers(paths_to_process=paths):
         paths_with_types,
     ):
         base_name = None
+        matching_volume_paths = []
 
         if copy_existing_volume_covers_toggle and is_chapter_directory:
-            # Set the value of volume_paths
+            # Set the value of volume_paths, if extract_covers() didn't pass them in
             if not volume_paths and paths_with_types:
-                volume_paths = [
-                    x
-                    for x in paths_with_types
-                    if "volume" in x.path_formats
-                    and files[0].extension in x.path_extensions
-                ]
-                for v_path in volume_paths:
-                    # Get all the folders in v_path.path
-                    volume_series_folders = [
-                        x for x in os.listdir(v_path.path) if not x.startswith(".")
-                    ]
-                    v_path.series_folders = volume_series_folders
+                volume_paths = get_volume_paths(paths_with_types)
+
+            # Only the volume libraries that hold this folder's extension
+            matching_volume_paths = [
+                x for x in volume_paths if files[0].extension in x.path_extensions
+            ]
 
             base_name = clean_str(os.path.basename(root))
 
-        return base_name, volume_paths
+        return base_name, volume_paths, matching_volume_paths
 
     # Checks if the folder contains multiple volume ones
     def contains_multiple_volume_ones(
@@ -8885,6 +11137,219 @@ def extract_covers(paths_to_process=paths):
             result = volume_ones > 1
         return result
 
+    contains_subfolders = dirs
+
+    global folder_accessor
+
+    print(f"\nRoot: {root}")
+    print(f"Files: {files}")
+
+    if not files:
+        return volume_paths
+
+    # Upgrade files to file classes
+    file_objects = upgrade_to_file_class(files, root)
+
+    # Upgrade file objects to a volume classes
+    volume_objects = upgrade_to_volume_class(
+        file_objects,
+        skip_release_year=True,
+        skip_release_group=True,
+        skip_extras=True,
+        skip_publisher=True,
+        skip_premium_content=True,
+        skip_subtitle=True,
+        skip_multi_volume=True,
+    )
+
+    # Create a folder accessor object
+    folder_accessor = create_folder_obj(root, dirs, volume_objects)
+
+    # Get the series cover
+    series_cover_path = find_series_cover(folder_accessor, image_extensions)
+    series_cover_extension = (
+        get_file_extension(series_cover_path) if series_cover_path else ""
+    )
+
+    if series_cover_extension and (
+        (output_covers_as_webp and series_cover_extension != ".webp")
+        or (not output_covers_as_webp and series_cover_extension == ".webp")
+    ):
+        # Remove the existing series cover image
+        remove_status = remove_file(series_cover_path, silent=True)
+        if remove_status:
+            series_cover_path = ""
+
+    # Set the directory type
+    is_chapter_directory = folder_accessor.files[0].file_type == "chapter"
+
+    # Check if all the series_name values are the same for all volumes
+    same_series_name = check_same_series_name(folder_accessor.files)
+
+    # Used when filtering the series_folders of each paths_with_types
+    # by the first letter of a cleaned up name
+    clean_basename, volume_paths, matching_volume_paths = process_volume_paths(
+        folder_accessor.files,
+        folder_accessor.root,
+        copy_existing_volume_covers_toggle,
+        is_chapter_directory,
+        volume_paths,
+        paths_with_types,
+    )
+
+    # Get the highest volume number and part number
+    highest_index_number = (
+        get_highest_release(
+            tuple(
+                [
+                    (
+                        item.index_number
+                        if not isinstance(item.index_number, list)
+                        else tuple(item.index_number)
+                    )
+                    for item in folder_accessor.files
+                ]
+            ),
+            is_chapter_directory=is_chapter_directory,
+        )
+        if not is_chapter_directory
+        else ""
+    )
+
+    if highest_index_number:
+        print(f"\n\t\tHighest Index Number: {highest_index_number}")
+
+    # Check if it contains multiple volume ones
+    has_multiple_volume_ones = contains_multiple_volume_ones(
+        folder_accessor.files,
+        use_latest_volume_cover_as_series_cover,
+        is_chapter_directory,
+    )
+
+    # Process cover extraction for each file
+    [
+        process_cover_extraction(
+            file,
+            has_multiple_volume_ones,
+            highest_index_number,
+            is_chapter_directory,
+            matching_volume_paths,
+            clean_basename,
+            same_series_name,
+            contains_subfolders,
+        )
+        for file in folder_accessor.files
+        if file.file_type == "volume"
+        or (file.file_type == "chapter" and extract_chapter_covers)
+    ]
+
+    return volume_paths
+
+
+# The shared state that worker processes need from the main process,
+# since anything passed in through the CLI isn't present in a fresh process.
+def get_worker_state():
+    return {
+        "paths": paths,
+        "download_folders": download_folders,
+        "paths_with_types": paths_with_types,
+        "compress_image_option": compress_image_option,
+        "image_quality": image_quality,
+        "output_covers_as_webp": output_covers_as_webp,
+        "log_to_file": log_to_file,
+        "watchdog_toggle": watchdog_toggle,
+        "discord_webhook_url": discord_webhook_url,
+        "metrics_format": metrics_format,
+    }
+
+
+# Sets up a worker process.
+def init_worker(state):
+    globals().update(state)
+
+    # Don't share any archive handles inherited from the parent
+    archive_infos.clear()
+
+    # The workers append to the parent's log files, only the parent rotates them
+    log_writer.detach()
+    log_writer.rotation = False
+
+    # The counters are returned with each result, for the main process to merge in
+    if metrics_format:
+        enable_metrics()
+
+
+# Returns the volume paths in paths_with_types, with the series folders of each listed.
+# Used for copying existing volume covers from a volume library to a chapter library.
+def get_volume_paths(paths_with_types=paths_with_types):
+    volume_paths = [x for x in paths_with_types if "volume" in x.path_formats]
+
+    for v_path in volume_paths:
+        # Get all the folders in v_path.path
+        v_path.series_folders = tuple(
+            x for x in os.listdir(v_path.path) if not x.startswith(".")
+        )
+
+    return volume_paths
+
+
+# Runs extract_covers_from_folder() in a worker process and returns
+# everything the main process needs to merge the results back in.
+def extract_covers_from_folder_worker(root, files, dirs, volume_paths):
+    global image_count, file_counters, checked_series
+
+    image_count = 0
+    file_counters = {x: 0 for x in file_extensions}
+    checked_series = []
+    errors_start = len(errors)
+    items_changed_start = len(items_changed)
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), metrics.stage("worker"):
+        extract_covers_from_folder(root, files, dirs, volume_paths)
+
+    # the worker can be stopped once its results are in
+    discord_dispatcher.flush()
+    log_writer.flush()
+
+    return {
+        "output": output.getvalue(),
+        "image_count": image_count,
+        "file_counters": file_counters,
+        "checked_series": checked_series,
+        "errors": errors[errors_start:],
+        "items_changed": items_changed[items_changed_start:],
+        "cover_fingerprints": cover_fingerprint_index.pop_new_entries(),
+        "metrics": metrics.pop_stage("worker"),
+    }
+
+
+# Merges the result of extract_covers_from_folder_worker() into the main process
+def merge_cover_extraction_result(result):
+    global image_count, checked_series
+
+    print(result["output"], end="")
+
+    image_count += result["image_count"]
+
+    for extension, count in result["file_counters"].items():
+        file_counters[extension] = file_counters.get(extension, 0) + count
+
+    checked_series.extend(
+        root for root in result["checked_series"] if root not in checked_series
+    )
+    errors.extend(result["errors"])
+    items_changed.extend(result["items_changed"])
+    cover_fingerprint_index.merge(result["cover_fingerprints"])
+    metrics.merge(result["metrics"])
+
+
+# Extracts the covers out from our manga and novel files.
+def extract_covers(paths_to_process=paths, workers=None):
+    global checked_series, root_modification_times
+
+    workers = workers or cover_extraction_workers
+
     if not paths_to_process:
         print("\nNo paths to process.")
         return
@@ -8893,8 +11358,13 @@ def extract_covers(paths_to_process=paths):
 
     # Only volume defined paths in the paths_with_types list
     # Used for copying existing volume covers from a
-    # volume library to a chapter library
-    volume_paths = []
+    # volume library to a chapter library.
+    # Listed once here, instead of by each worker.
+    volume_paths = (
+        get_volume_paths(paths_with_types)
+        if copy_existing_volume_covers_toggle and paths_with_types
+        else []
+    )
 
     # contains cleaned basenames of folders that have been moved
     moved_folder_names = (
@@ -8910,151 +11380,138 @@ def extract_covers(paths_to_process=paths):
         else []
     )
 
-    # Iterate over each path
-    for path in paths_to_process:
-        if not os.path.exists(path):
-            print(f"\nERROR: {path} is an invalid path.\n")
-            continue
+    # Unchanged folders are skipped through the library manifest, unless watchdog
+    # is handling it, or covers are being copied from another library.
+    use_manifest = not watchdog_toggle and not copy_existing_volume_covers_toggle
+
+    # The settings that change the outcome of a folder's cover extraction
+    manifest_fingerprint = (
+        output_covers_as_webp,
+        compress_image_option,
+        image_quality,
+        use_latest_volume_cover_as_series_cover,
+        compare_detected_cover_to_blank_images,
+        extract_chapter_covers,
+        match_through_image_similarity,
+    )
+    unchanged_count = 0
+
+    # Each folder is handed off to a worker process, results are merged back
+    # in the order the folders were found to keep the output deterministic.
+    executor = (
+        concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(get_worker_state(),),
+        )
+        if workers > 1
+        else None
+    )
 
-        checked_series = []
-        os.chdir(path)
+    try:
+        # Iterate over each path
+        for path in paths_to_process:
+            if not os.path.exists(path):
+                print(f"\nERROR: {path} is an invalid path.\n")
+                continue
 
-        # Traverse the directory tree rooted at the path
-        for root, dirs, files in scandir.walk(path):
-            if watchdog_toggle:
-                if not moved_folder_names or (
-                    clean_str(
-                        os.path.basename(root),
-                        skip_bracket=True,
-                        skip_underscore=True,
-                    )
-                    not in moved_folder_names
-                ):
-                    root_mod_time = get_modification_date(root)
-                    if root in root_modification_times:
-                        # Modification time hasn't changed; continue to the next iteration
-                        if root_modification_times[root] == root_mod_time:
-                            continue
+            checked_series = []
+            os.chdir(path)
+            futures = []
+
+            # Traverse the directory tree rooted at the path
+            for root, dirs, files in scandir.walk(path):
+                if watchdog_toggle:
+                    if not moved_folder_names or (
+                        clean_str(
+                            os.path.basename(root),
+                            skip_bracket=True,
+                            skip_underscore=True,
+                        )
+                        not in moved_folder_names
+                    ):
+                        root_mod_time = get_modification_date(root)
+                        if root in root_modification_times:
+                            # Modification time hasn't changed; continue to the next iteration
+                            if root_modification_times[root] == root_mod_time:
+                                continue
+                            else:
+                                # update the modification time for the root
+                                root_modification_times[root] = root_mod_time
                         else:
-                            # update the modification time for the root
+                            # Store the modification time for the root
                             root_modification_times[root] = root_mod_time
-                    else:
-                        # Store the modification time for the root
-                        root_modification_times[root] = root_mod_time
-
-            files, dirs = process_files_and_folders(
-                root,
-                files,
-                dirs,
-                just_these_files=transferred_files,
-                just_these_dirs=transferred_dirs,
-            )
-
-            contains_subfolders = dirs
-
-            global folder_accessor
-
-            print(f"\nRoot: {root}")
-            print(f"Files: {files}")
-
-            if not files:
-                continue
 
-            # Upgrade files to file classes
-            file_objects = upgrade_to_file_class(files, root)
-
-            # Upgrade file objects to a volume classes
-            volume_objects = upgrade_to_volume_class(
-                file_objects,
-                skip_release_year=True,
-                skip_release_group=True,
-                skip_extras=True,
-                skip_publisher=True,
-                skip_premium_content=True,
-                skip_subtitle=True,
-                skip_multi_volume=True,
-            )
+                files, dirs = process_files_and_folders(
+                    root,
+                    files,
+                    dirs,
+                    just_these_files=transferred_files,
+                    just_these_dirs=transferred_dirs,
+                )
 
-            # Create a folder accessor object
-            folder_accessor = create_folder_obj(root, dirs, volume_objects)
+                if (
+                    use_manifest
+                    and files
+                    and library_manifest.get(
+                        "extract_covers", root, manifest_fingerprint
+                    )[0]
+                ):
+                    unchanged_count += 1
+                    continue
 
-            # Get the series cover
-            series_cover_path = find_series_cover(folder_accessor, image_extensions)
-            series_cover_extension = (
-                get_file_extension(series_cover_path) if series_cover_path else ""
-            )
+                if executor:
+                    futures.append(
+                        (
+                            root,
+                            executor.submit(
+                                extract_covers_from_folder_worker,
+                                root,
+                                files,
+                                dirs,
+                                volume_paths,
+                            ),
+                        )
+                    )
+                else:
+                    errors_start = len(errors)
+                    volume_paths = extract_covers_from_folder(
+                        root, files, dirs, volume_paths
+                    )
 
-            if series_cover_extension and (
-                (output_covers_as_webp and series_cover_extension != ".webp")
-                or (not output_covers_as_webp and series_cover_extension == ".webp")
-            ):
-                # Remove the existing series cover image
-                remove_status = remove_file(series_cover_path, silent=True)
-                if remove_status:
-                    series_cover_path = ""
-
-            # Set the directory type
-            is_chapter_directory = folder_accessor.files[0].file_type == "chapter"
-
-            # Check if all the series_name values are the same for all volumes
-            same_series_name = check_same_series_name(folder_accessor.files)
-
-            # Used when filtering the series_folders of each paths_with_types
-            # by the first letter of a cleaned up name
-            clean_basename, volume_paths = process_volume_paths(
-                folder_accessor.files,
-                folder_accessor.root,
-                copy_existing_volume_covers_toggle,
-                is_chapter_directory,
-                volume_paths,
-                paths_with_types,
-            )
+                    # Folders with errors are processed again on the next run
+                    if use_manifest and files and len(errors) == errors_start:
+                        library_manifest.set(
+                            "extract_covers", root, fingerprint=manifest_fingerprint
+                        )
 
-            # Get the highest volume number and part number
-            highest_index_number = (
-                get_highest_release(
-                    tuple(
-                        [
-                            (
-                                item.index_number
-                                if not isinstance(item.index_number, list)
-                                else tuple(item.index_number)
-                            )
-                            for item in folder_accessor.files
-                        ]
-                    ),
-                    is_chapter_directory=is_chapter_directory,
-                )
-                if not is_chapter_directory
-                else ""
-            )
+            for root, future in futures:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    send_message(
+                        f"Error extracting covers from {root}: {e}", error=True
+                    )
+                    continue
 
-            if highest_index_number:
-                print(f"\n\t\tHighest Index Number: {highest_index_number}")
+                merge_cover_extraction_result(result)
 
-            # Check if it contains multiple volume ones
-            has_multiple_volume_ones = contains_multiple_volume_ones(
-                folder_accessor.files,
-                use_latest_volume_cover_as_series_cover,
-                is_chapter_directory,
-            )
+                # Folders with errors are processed again on the next run
+                if use_manifest and not result["errors"]:
+                    library_manifest.set(
+                        "extract_covers", root, fingerprint=manifest_fingerprint
+                    )
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+        library_manifest.save()
+        cover_fingerprint_index.save()
 
-            # Process cover extraction for each file
-            [
-                process_cover_extraction(
-                    file,
-                    has_multiple_volume_ones,
-                    highest_index_number,
-                    is_chapter_directory,
-                    volume_paths,
-                    clean_basename,
-                    same_series_name,
-                    contains_subfolders,
-                )
-                for file in folder_accessor.files
-                if file.file_type == "volume"
-                or (file.file_type == "chapter" and extract_chapter_covers)
-            ]
+    if unchanged_count:
+        print(
+            f"\nSkipped {unchanged_count} unchanged folders. (use --full-rescan to include them)"
+        )
 
 
 # Converts the passed path of a .webp file to a .jpg file
@@ -9135,7 +11592,7 @@ def process_cover_extraction(
             (
                 f"{file.extensionless_path}{extension}"
                 for extension in image_extensions
-                if os.path.exists(f"{file.extensionless_path}{extension}")
+                if directory_cache.exists(f"{file.extensionless_path}{extension}")
             ),
             "",
         )
@@ -9197,6 +11654,24 @@ def process_cover_extraction(
             else:
                 print("\t\tCover not found.")
 
+        # Index the cover for matching downloads through image similarity.
+        # Fingerprints the same cover check_for_existing_series() picks, as it's stored
+        # in the file, instead of the written cover, which may be compressed or a webp.
+        if (
+            match_through_image_similarity
+            and cover
+            and not cover_fingerprint_index.get(file.path)
+        ):
+            cover_data = find_and_extract_cover(
+                file,
+                return_data_only=True,
+                silent=True,
+                blank_image_check=True,
+                compress_data=False,
+            )
+            if cover_data:
+                cover_fingerprint_index.add(file.path, cover_data)
+
         if (
             file.file_type == "volume"
             and not is_chapter_directory
@@ -9263,7 +11738,7 @@ def process_cover_extraction(
             and clean_basename
         ):
             for v_path in volume_paths:
-                if not (hasattr(v_path, "series_folders") and v_path.series_folders):
+                if not v_path.series_folders:
                     continue
 
                 filtered_series = v_path.series_folders
@@ -9504,8 +11979,6 @@ def print_stats():
 
 # Deletes any file with an extension in unacceptable_keywords from the download_folders
 def delete_unacceptable_files():
-    global grouped_notifications
-
     print("\nSearching for unacceptable files...")
 
     if not download_folders:
@@ -9527,7 +12000,7 @@ def delete_unacceptable_files():
                 continue
 
             os.chdir(path)
-            for root, dirs, files in scandir.walk(path):
+            for root, dirs, files in download_snapshot.walk(path):
                 files, dirs = process_files_and_folders(
                     root,
                     files,
@@ -9575,13 +12048,10 @@ def delete_unacceptable_files():
                                     },
                                 ],
                             )
-                            grouped_notifications = group_notification(
-                                grouped_notifications,
-                                Embed(embed, None),
-                            )
+                            group_notification(Embed(embed, None))
                             remove_file(file_path)
                             break
-            for root, dirs, files in scandir.walk(path):
+            for root, dirs, files in download_snapshot.walk(path):
                 files, dirs = process_files_and_folders(
                     root,
                     files,
@@ -9633,13 +12103,13 @@ class BookwalkerSeries:
         self.book_type = book_type
 
 
-# our session objects, one for each domain
+# our session objects, one for each domain and thread
 session_objects = {}
 
 
 # Returns a session object for the given URL
 def get_session_object(url):
-    domain = urlparse(url).netloc.split(":")[0]
+    domain = (urlparse(url).netloc.split(":")[0], threading.get_ident())
     if domain not in session_objects:
         # Create a new session object and set a default User-Agent header
         session_object = requests.Session()
@@ -9652,34 +12122,329 @@ def get_session_object(url):
     return session_objects[domain]
 
 
-# Makes a GET request to the given URL using a reusable session object,
-# and returns a BeautifulSoup object representing the parsed HTML response.
-def scrape_url(url, strainer=None, headers=None, cookies=None, proxy=None):
-    try:
-        session_object = get_session_object(url)
+# Closes the session objects, once the threads they were made for are done
+def close_session_objects():
+    for session_object in list(session_objects.values()):
+        session_object.close()
+    session_objects.clear()
+
+
+# A thread-safe token bucket, each request takes a token and the tokens refill at
+# a fixed rate. Being rate-limited pauses every request for a back-off period,
+# which doubles each time it happens again after the last one ended.
+class RateLimiter:
+    def __init__(self, rate, burst=1, backoff_time=30, max_backoff_time=600):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = self.burst
+        self.backoff_time = backoff_time
+        self.max_backoff_time = max_backoff_time
+        self.backoffs = 0
+        self.paused_until = 0
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
 
-        # Create a dictionary of request parameters with only non-None values
-        request_params = {
-            "url": url,
-            "headers": headers,
-            "cookies": cookies,
-            "proxies": proxy,
-            "timeout": 10,
-        }
-        response = session_object.get(
-            **{k: v for k, v in request_params.items() if v is not None}
-        )
+    # Waits until a request can be sent.
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+
+                if self.rate <= 0:
+                    wait = self.paused_until - now
+                    if wait <= 0:
+                        return
+                else:
+                    self.tokens = min(
+                        self.burst, self.tokens + (now - self.updated) * self.rate
+                    )
+                    self.updated = now
+
+                    if now >= self.paused_until and self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+
+                    wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+
+            time.sleep(wait)
+
+    # Pauses every request, returns the time paused for.
+    def backoff(self):
+        with self.lock:
+            now = time.monotonic()
+
+            # requests that were already in flight when the pause
+            # started don't extend it any further
+            if now < self.paused_until:
+                return self.paused_until - now
+
+            delay = min(self.backoff_time * 2**self.backoffs, self.max_backoff_time)
+            self.backoffs += 1
+            self.paused_until = now + delay
+            self.tokens = 0
+            return delay
+
+    # Called after a successful request, resets the back-off period.
+    def reset(self):
+        with self.lock:
+            self.backoffs = 0
+
+
+# Fetched pages, stored in the cache_dir (when logging to a file) and the
+# most recently used ones in memory. Pages older than the ttl are revalidated
+# through their ETag or Last-Modified headers before being used again.
+class ResponseCache:
+    def __init__(self, cache_dir=None, ttl=43200, memory_entries=256):
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_key(url, cookies=None):
+        return hashlib.sha1(
+            repr((url, sorted((cookies or {}).items()))).encode("utf-8")
+        ).hexdigest()
+
+    def get_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.cache")
+
+    # Returns the entry for the key, or None if there isn't one.
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry:
+                self.entries[key] = entry
+                return entry
+
+        if not self.cache_dir or not os.path.isfile(self.get_path(key)):
+            return None
+
+        # the metadata is on the first line, followed by the page itself
+        try:
+            with open(self.get_path(key), "rb") as f:
+                entry = json.loads(f.readline())
+                entry["content"] = f.read()
+        except Exception:
+            return None
+
+        self.remember(key, entry)
+        return entry
+
+    # Whether the entry is younger than the ttl, the cache's own if none is passed.
+    def is_fresh(self, entry, ttl=None):
+        return time.time() - entry["fetched"] < (self.ttl if ttl is None else ttl)
+
+    def set(self, key, url, content, etag=None, last_modified=None):
+        entry = {
+            "url": url,
+            "fetched": time.time(),
+            "etag": etag,
+            "last_modified": last_modified,
+            "content": content,
+        }
+        self.remember(key, entry)
+        self.write(key, entry)
+        return entry
+
+    # Marks an entry as fetched again, after the server said it hasn't changed.
+    def touch(self, key, entry):
+        entry["fetched"] = time.time()
+        self.remember(key, entry)
+        self.write(key, entry)
+
+    def remember(self, key, entry):
+        with self.lock:
+            self.entries.pop(key, None)
+            self.entries[key] = entry
+
+            while len(self.entries) > self.memory_entries:
+                del self.entries[next(iter(self.entries))]
+
+    def write(self, key, entry):
+        if not self.cache_dir or not log_to_file:
+            return
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self.get_path(key)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+
+            with open(temp_path, "wb") as f:
+                f.write(
+                    json.dumps(
+                        {k: v for k, v in entry.items() if k != "content"}
+                    ).encode("utf-8")
+                )
+                f.write(b"\n")
+                f.write(entry["content"])
+
+            os.replace(temp_path, path)
+        except Exception as e:
+            send_message(f"Failed to cache {entry['url']}: {e}", error=True)
+
+    # Removes the cached pages that haven't been fetched within max_age seconds.
+    def prune(self, max_age):
+        if not self.cache_dir or not os.path.isdir(self.cache_dir):
+            return
+
+        cutoff = time.time() - max_age
+        for entry in os.scandir(self.cache_dir):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+
+# Fetches pages through the response cache and the rate limiter, a ttl passed
+# for a page is used instead of the cache's own.
+# Pages can also be fetched ahead of time on a bounded pool of threads,
+# a page that's already being fetched is waited on instead of fetched twice.
+class PageFetcher:
+    def __init__(self, limiter, cache, workers=4, max_retries=3):
+        self.limiter = limiter
+        self.cache = cache
+        self.workers = workers
+        self.max_retries = max_retries
+        self.pending = {}
+        self.executor = None
+        self.lock = threading.Lock()
+
+    # Returns the content of the page.
+    def fetch(self, url, headers=None, cookies=None, proxy=None, ttl=None):
+        key = self.cache.get_key(url, cookies)
+
+        with self.lock:
+            future = self.pending.get(key)
+            owner = future is None
+            if owner:
+                future = self.pending[key] = concurrent.futures.Future()
+
+        if not owner:
+            try:
+                return future.result()
+            except Exception:
+                # retry it ourselves
+                return self.download(url, key, headers, cookies, proxy, ttl)
+
+        try:
+            content = self.download(url, key, headers, cookies, proxy, ttl)
+            future.set_result(content)
+            return content
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                self.pending.pop(key, None)
+
+    def download(self, url, key, headers, cookies, proxy, ttl=None):
+        entry = self.cache.get(key)
+        if entry and self.cache.is_fresh(entry, ttl):
+            metrics.cache_result("page_cache", True)
+            return entry["content"]
+
+        metrics.cache_result("page_cache", False)
+
+        headers = dict(headers or {})
+        if entry and entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry and entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        # Create a dictionary of request parameters with only non-None values
+        request_params = {
+            "url": url,
+            "headers": headers or None,
+            "cookies": cookies,
+            "proxies": proxy,
+            "timeout": 10,
+        }
+
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
 
-        # Raise an exception if the status code indicates rate limiting
-        if response.status_code == 403:
-            raise Exception("Too many requests, we're being rate-limited!")
+            response = get_session_object(url).get(
+                **{k: v for k, v in request_params.items() if v is not None}
+            )
+            metrics.count("http_requests")
+
+            # Back off and try again if we're being rate-limited
+            if response.status_code == 403:
+                if attempt == self.max_retries:
+                    raise Exception("Too many requests, we're being rate-limited!")
+
+                delay = self.limiter.backoff()
+                print(f"\t\t\tRate-limited, waiting {delay:.0f}s before retrying...")
+                continue
+
+            self.limiter.reset()
+
+            if response.status_code == 304 and entry:
+                metrics.count("http_not_modified")
+                self.cache.touch(key, entry)
+                return entry["content"]
+
+            if response.ok:
+                self.cache.set(
+                    key,
+                    url,
+                    response.content,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                )
+            return response.content
+
+    # Runs the function on the fetcher's threads, so the pages it
+    # fetches are ready by the time they're needed.
+    def submit(self, function, *args, **kwargs):
+        if self.workers <= 1:
+            return None
+
+        with self.lock:
+            if not self.executor:
+                self.executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.workers
+                )
+            return self.executor.submit(function, *args, **kwargs)
+
+    def shutdown(self):
+        with self.lock:
+            executor, self.executor = self.executor, None
+
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+        close_session_objects()
+
+
+bookwalker_fetcher = PageFetcher(
+    RateLimiter(
+        bookwalker_requests_per_second,
+        bookwalker_request_burst,
+        backoff_time=bookwalker_backoff_time,
+    ),
+    ResponseCache(os.path.join(LOGS_DIR, "bookwalker_cache"), bookwalker_cache_ttl),
+    workers=bookwalker_workers,
+)
+
+
+# Makes a GET request to the given URL through the bookwalker fetcher,
+# and returns a BeautifulSoup object representing the parsed HTML response.
+def scrape_url(url, strainer=None, headers=None, cookies=None, proxy=None, ttl=None):
+    try:
+        content = bookwalker_fetcher.fetch(
+            url, headers=headers, cookies=cookies, proxy=proxy, ttl=ttl
+        )
 
         soup = None
         if strainer:
             # Use the strainer to parse only specific parts of the HTML document
-            soup = BeautifulSoup(response.content, "lxml", parse_only=strainer)
+            soup = BeautifulSoup(content, "lxml", parse_only=strainer)
         else:
-            soup = BeautifulSoup(response.content, "lxml")
+            soup = BeautifulSoup(content, "lxml")
 
         return soup
     except requests.exceptions.RequestException as e:
@@ -9877,6 +12642,84 @@ def get_subtitle_from_title(file, publisher=None):
     return subtitle
 
 
+# The base url of a bookwalker search
+bookwalker_search_url = "https://global.bookwalker.jp/search/?word="
+
+# Enables NSFW Search Results
+bookwalker_cookies = {
+    "glSafeSearch": "1",
+    "safeSearch": "111",
+}
+bookwalker_headers = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/87.0.4280.88 Safari/537.36"
+}
+
+
+# Returns the url of a page of the bookwalker search for the query,
+# or the url of the series only search when no page is passed.
+def get_bookwalker_search_url(
+    query, search_type=None, page=None, alternative_search=False
+):
+    url = f"{bookwalker_search_url}{urllib.parse.quote(query)}"
+
+    if page is None:
+        return f"{url}&np=0"
+
+    category = ""
+    if search_type.lower() == "m":
+        category = "&qcat=2" if not alternative_search else "&qcat=11"
+    elif search_type.lower() == "l":
+        category = "&qcat=3"
+
+    return f"{url}&page={page}{category}"
+
+
+# Fetches the search pages search_bookwalker() will request for the query,
+# so they're already cached by the time it gets to them.
+def prefetch_bookwalker_search(
+    query, search_type, shortened_search=False, total_pages_to_scrape=5
+):
+    series_page = bookwalker_fetcher.fetch(
+        get_bookwalker_search_url(query),
+        headers=bookwalker_headers,
+        cookies=bookwalker_cookies,
+        ttl=bookwalker_search_cache_ttl,
+    )
+
+    # shortened searches stop unless the query matches exactly one series
+    if shortened_search:
+        series_list_ul = BeautifulSoup(
+            series_page, "lxml", parse_only=SoupStrainer("ul", class_="o-tile-list")
+        ).find("ul", class_="o-tile-list")
+        if (
+            not series_list_ul
+            or len(series_list_ul.find_all("li", class_="o-tile")) != 1
+        ):
+            return
+
+    page_count = 1
+    while page_count < total_pages_to_scrape + 1:
+        page = bookwalker_fetcher.fetch(
+            get_bookwalker_search_url(query, search_type, page_count),
+            headers=bookwalker_headers,
+            cookies=bookwalker_cookies,
+            ttl=bookwalker_search_cache_ttl,
+        )
+
+        if page_count == 1:
+            pager_area = BeautifulSoup(
+                page, "lxml", parse_only=SoupStrainer("div", class_="pager-area")
+            )
+            page_numbers = [
+                int(li.text) for li in pager_area.find_all("li") if li.text.isdigit()
+            ]
+            total_pages_to_scrape = min(
+                total_pages_to_scrape, max(page_numbers, default=1)
+            )
+
+        page_count += 1
+
+
 # Searches bookwalker with the user inputted query and returns the results.
 def search_bookwalker(
     query,
@@ -9903,32 +12746,18 @@ def search_bookwalker(
     # Errors encountered while scraping
     errors = []
 
-    bookwalker_manga_category = "&qcat=2"
-    bookwalker_light_novel_category = "&qcat=3"
-    bookwalker_intll_manga_category = "&qcat=11"
-
     done = False
     search_type = type
     count = 0
 
     page_count = 1
-    page_count_url = f"&page={page_count}"
 
-    search = urllib.parse.quote(query)
-    base_url = "https://global.bookwalker.jp/search/?word="
     chapter_exclusion_url = "&np=1&qnot%5B%5D=Chapter&x=13&y=16"
-    series_only = "&np=0"
-    series_url = f"{base_url}{search}{series_only}"
+    series_url = get_bookwalker_search_url(query)
     original_similarity_score = required_similarity_score
 
-    # Enables NSFW Search Results
-    default_cookies = {
-        "glSafeSearch": "1",
-        "safeSearch": "111",
-    }
-    default_headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/87.0.4280.88 Safari/537.36"
-    }
+    default_cookies = bookwalker_cookies
+    default_headers = bookwalker_headers
 
     if not alternative_search:
         keyword = "\t\tSearch: " if not shortened_search else "\n\t\tShortened Search: "
@@ -9941,6 +12770,7 @@ def search_bookwalker(
         series_url,
         cookies=default_cookies,
         headers=default_headers,
+        ttl=bookwalker_search_cache_ttl,
     )
 
     series_list_li = []
@@ -9956,21 +12786,9 @@ def search_bookwalker(
         required_similarity_score = original_similarity_score - 0.03
 
     while page_count < total_pages_to_scrape + 1:
-        page_count_url = f"&page={page_count}"
-        url = f"{base_url}{search}{page_count_url}"
-        category = ""
-
-        if search_type.lower() == "m":
-            category = (
-                bookwalker_manga_category
-                if not alternative_search
-                else bookwalker_intll_manga_category
-            )
-        elif search_type.lower() == "l":
-            category = bookwalker_light_novel_category
-
-        url += category
-        series_url += category
+        url = get_bookwalker_search_url(
+            query, search_type, page_count, alternative_search=alternative_search
+        )
 
         if shortened_search and series_list_li != 1:
             print("\t\t\t- search does not contain exactly one series, skipping...\n")
@@ -9984,6 +12802,7 @@ def search_bookwalker(
             url,
             cookies=default_cookies,
             headers=default_headers,
+            ttl=bookwalker_search_cache_ttl,
         )
 
         if not page:
@@ -9993,6 +12812,7 @@ def search_bookwalker(
                     url,
                     cookies=default_cookies,
                     headers=default_headers,
+                    ttl=bookwalker_search_cache_ttl,
                 )
             if not alternate_page:
                 print("\t\t\tError: Empty page")
@@ -10034,7 +12854,6 @@ def search_bookwalker(
                 alternate_result = search_bookwalker(
                     query, type, print_info, alternative_search=True
                 )
-                time.sleep(sleep_timer_bk / 2)
             if alternate_result:
                 return alternate_result
             if not alternative_search:
@@ -10053,9 +12872,9 @@ def search_bookwalker(
             f"\t\t\tPage: {page_count - 1} of {total_pages_to_scrape} ({url})\n\t\t\t\tItems: {len(o_tile_list)}"
         )
 
+        matched_items = []
+
         for item in o_tile_list:
-            preview_image_url = None
-            description = ""
             try:
                 o_tile_book_info = item.find("div", class_="o-tile-book-info")
                 o_tile_thumb_box = o_tile_book_info.find(
@@ -10280,7 +13099,44 @@ def search_bookwalker(
                     required_similarity_score = original_similarity_score
                     continue
 
-                # html from url
+                # The book's page is fetched in the background, and parsed
+                # once every item on the page has been matched.
+                matched_items.append(
+                    (
+                        url,
+                        title,
+                        original_title,
+                        volume_number,
+                        part,
+                        thumbnail,
+                        book_type,
+                        required_similarity_score,
+                        clean_query,
+                        clean_shortened_query,
+                    )
+                )
+                bookwalker_fetcher.submit(bookwalker_fetcher.fetch, url)
+            except Exception as e:
+                send_message(str(e), error=True)
+                errors.append(url)
+                continue
+
+        for (
+            url,
+            title,
+            original_title,
+            volume_number,
+            part,
+            thumbnail,
+            book_type,
+            item_similarity_score,
+            clean_query,
+            clean_shortened_query,
+        ) in matched_items:
+            preview_image_url = None
+            description = ""
+            try:
+                # html from url, usually already fetched in the background
                 page_two = scrape_url(url)
 
                 # parse html
@@ -10356,7 +13212,7 @@ def search_bookwalker(
                         # Check similarity with the clean_query and clean_shortened_query
                         if not similar(
                             series_title, clean_query
-                        ) >= required_similarity_score and not similar(
+                        ) >= item_similarity_score and not similar(
                             series_title, clean_shortened_query
                         ):
                             continue
@@ -10418,9 +13274,6 @@ def search_bookwalker(
     series_list = combine_series(series_list)
     required_similarity_score = original_similarity_score
 
-    # print(f"\t\tSleeping for {sleep_timer_bk} to avoid being rate-limited...")
-    time.sleep(sleep_timer_bk)
-
     if len(series_list) == 1 and len(series_list[0].books) > 0:
         return series_list[0].books
     elif len(series_list) > 1:
@@ -10463,8 +13316,6 @@ def check_for_new_volumes_on_bookwalker():
 
     # Creates a Discord embed for the item
     def create_embed(item, color, webhook_index):
-        global grouped_notifications
-
         embed = handle_fields(
             DiscordEmbed(
                 title=f"{item.title} Volume {item.volume_number}",
@@ -10505,8 +13356,7 @@ def check_for_new_volumes_on_bookwalker():
             )
 
         if bookwalker_webhook_urls and len(bookwalker_webhook_urls) == 2:
-            grouped_notifications = group_notification(
-                grouped_notifications,
+            group_notification(
                 Embed(embed, None),
                 passed_webhook=bookwalker_webhook_urls[webhook_index],
             )
@@ -10522,14 +13372,6 @@ def check_for_new_volumes_on_bookwalker():
             log_item_info(item, file_name)
             create_embed(item, color, webhook_index)
 
-        if grouped_notifications:
-            if bookwalker_webhook_urls and len(bookwalker_webhook_urls) == 2:
-                send_discord_message(
-                    None,
-                    grouped_notifications,
-                    passed_webhook=bookwalker_webhook_urls[webhook_index],
-                )
-
     # Gets the volume type based on the extensions in the folder
     def determine_volume_type(volumes):
         if get_folder_type([f.name for f in volumes], manga_extensions) >= 70:
@@ -10652,12 +13494,91 @@ def check_for_new_volumes_on_bookwalker():
         process_items(released, "Released", grey_color, 0)
         process_items(pre_orders, "Pre-orders", preorder_blue_color, 1)
 
+    # The parts of an existing volume that are compared against bookwalker,
+    # rebuilt from the library manifest for unchanged folders.
+    class ManifestVolume:
+        def __init__(self, volume_number, volume_part):
+            self.volume_number = volume_number
+            self.volume_part = volume_part
+
+    # Returns the series, volume type, and existing volumes for the folder,
+    # reusing the summary from the last run when the folder hasn't changed.
+    def get_folder_summary(root, files):
+        unchanged, summary = library_manifest.get(
+            "check_for_new_volumes_on_bookwalker", root
+        )
+        if unchanged and summary:
+            return (
+                summary["series"],
+                summary["volume_type"],
+                [ManifestVolume(*volume) for volume in summary["volumes"]],
+            )
+
+        series = unidecode(
+            normalize_str(
+                os.path.basename(root),
+                skip_common_words=True,
+                skip_japanese_particles=True,
+                skip_misc_words=True,
+                skip_editions=True,
+            )
+        )
+
+        volumes = upgrade_to_volume_class(
+            upgrade_to_file_class(
+                [f for f in files if os.path.isfile(os.path.join(root, f))],
+                root,
+            )
+        )
+        volume_type = determine_volume_type(volumes) if volumes else None
+
+        library_manifest.set(
+            "check_for_new_volumes_on_bookwalker",
+            root,
+            result={
+                "series": series,
+                "volume_type": volume_type,
+                "volumes": [
+                    [volume.volume_number, volume.volume_part] for volume in volumes
+                ],
+            },
+        )
+        return series, volume_type, volumes
+
+    # Queues the searches of the passed folder summaries on the bookwalker fetcher
+    def prefetch_searches(summaries):
+        for series, volume_type, volumes in summaries:
+            if not volumes or not volume_type or not series:
+                continue
+
+            searches = [(series, False)]
+            shortened_series_title = get_shortened_title(series)
+            if shortened_series_title:
+                searches.append((shortened_series_title, True))
+
+            for query, shortened_search in searches:
+                if (query, volume_type, shortened_search) in prefetched_searches:
+                    continue
+
+                prefetched_searches.add((query, volume_type, shortened_search))
+                bookwalker_fetcher.submit(
+                    prefetch_bookwalker_search,
+                    query,
+                    volume_type,
+                    shortened_search=shortened_search,
+                )
+
     original_limit = discord_embed_limit
     discord_embed_limit = 1
 
     pre_orders = []
     released = []
 
+    # The searches already queued on the bookwalker fetcher, and how many
+    # folders ahead of the current one are queued.
+    prefetched_searches = set()
+    prefetch_window = bookwalker_workers * 2
+
     print("\nChecking for new volumes on bookwalker...")
 
     # Remove any paths that are in the download folders list
@@ -10678,42 +13599,32 @@ def check_for_new_volumes_on_bookwalker():
         # sort the folders by "root"
         folders = sorted(folders, key=lambda k: k["root"])
 
-        for dir_index, folder in enumerate(folders, start=1):
+        # Summarize the folders up front, so the searches of the
+        # upcoming folders can be fetched ahead of the current one.
+        summaries = []
+        for folder in folders:
             root = folder["root"]
-            dirs = folder["dirs"]
             files = clean_and_sort(root, folder["files"], chapters=False, sort=True)[0]
+            summaries.append(
+                get_folder_summary(root, files) if files else (None, None, [])
+            )
+
+        for dir_index, folder in enumerate(folders, start=1):
+            root = folder["root"]
 
             print(
                 f"\n\t[Folder {dir_index} of {len(folders)} - Path {path_index} of {len(paths_clean)}]"
             )
             print(f"\tPath: {root}")
 
-            if not files:
-                continue
-
-            base_name = os.path.basename(root)
-
-            series = normalize_str(
-                base_name,
-                skip_common_words=True,
-                skip_japanese_particles=True,
-                skip_misc_words=True,
-                skip_editions=True,
-            )
-            series = unidecode(series)
+            prefetch_searches(summaries[dir_index - 1 : dir_index + prefetch_window])
 
-            volumes = upgrade_to_volume_class(
-                upgrade_to_file_class(
-                    [f for f in files if os.path.isfile(os.path.join(root, f))],
-                    root,
-                )
-            )
+            series, volume_type, volumes = summaries[dir_index - 1]
 
             if not volumes:
                 continue
 
             bookwalker_volumes = []
-            volume_type = determine_volume_type(volumes)
 
             if not volume_type or not series:
                 continue
@@ -10766,6 +13677,9 @@ def check_for_new_volumes_on_bookwalker():
             print("\t\tNew/Upcoming Releases on Bookwalker:")
             print_releases(bookwalker_volumes, released, pre_orders)
 
+    bookwalker_fetcher.shutdown()
+    bookwalker_fetcher.cache.prune(bookwalker_cache_ttl * 14)
+    library_manifest.save()
     sort_and_log_releases(released, pre_orders)
     discord_embed_limit = original_limit
 
@@ -10796,6 +13710,7 @@ def cache_existing_library_paths(
                 send_message("\nERROR: Path cannot be empty.", error=True)
             else:
                 print(f"\nERROR: {path} is an invalid path.\n")
+    cached_paths.flush()
     print("\tdone")
 
     if paths_cached:
@@ -11320,323 +14235,888 @@ def prep_images_for_similarity(
     return score
 
 
-# Extracts a supported archive to a temporary directory.
-def extract(file_path, temp_dir, extension):
-    successfull = False
-    try:
-        if extension in rar_extensions:
-            with rarfile.RarFile(file_path) as rar:
-                rar.extractall(temp_dir)
-                successfull = True
-        elif extension in seven_zip_extensions:
-            with py7zr.SevenZipFile(file_path, "r") as archive:
-                archive.extractall(temp_dir)
-                successfull = True
-    except Exception as e:
-        send_message(f"Error extracting {file_path}: {e}", error=True)
-    return successfull
+# The ssim constants used by structural_similarity() with a data_range of 1.0
+ssim_c1 = (0.01 * 1.0) ** 2
 
 
-# Compresses a directory to a CBZ archive.
-def compress(temp_dir, cbz_filename):
-    successfull = False
-    try:
-        with zipfile.ZipFile(cbz_filename, "w") as zip:
-            for root, dirs, files in scandir.walk(temp_dir):
-                for file in files:
-                    zip.write(
-                        os.path.join(root, file),
-                        os.path.join(root[len(temp_dir) + 1 :], file),
-                    )
-            successfull = True
-    except Exception as e:
-        send_message(f"Error compressing {temp_dir}: {e}", error=True)
-    return successfull
+# Returns the highest mean ssim luminance term an image with the given mean can reach
+# against a flat image of the given value, as the points of a piecewise-linear bound.
+#
+# The ssim score is the mean of l * cs over every window, where cs is at most 1 and
+# l only depends on the window's mean. The concave envelope of l over [0, 1] bounds
+# the mean of l for any spread of window means averaging out to the image's mean.
+@lru_cache(maxsize=None)
+def get_ssim_mean_bound(value, points=1001):
+    means = np.linspace(0, 1, points)
+    scores = (2 * value * means + ssim_c1) / (value**2 + means**2 + ssim_c1)
+
+    # upper hull of the (mean, score) points
+    hull = []
+    for point in zip(means, scores):
+        while len(hull) >= 2:
+            (x1, y1), (x2, y2) = hull[-2], hull[-1]
+            if (x2 - x1) * (point[1] - y1) - (y2 - y1) * (point[0] - x1) < 0:
+                break
+            hull.pop()
+        hull.append(point)
 
+    return tuple(x for x, _ in hull), tuple(y for _, y in hull)
 
-# Converts supported archives to CBZ.
-def convert_to_cbz():
-    global transferred_files, grouped_notifications
 
-    print("\nLooking for archives to convert to CBZ...")
+# A blank image (blank_white.jpg or blank_black.png) that has already been
+# loaded, resized to the comparison size and preprocessed for ssim.
+class BlankCoverReference:
+    def __init__(self, path, size=None):
+        size = tuple(size or blank_cover_comparison_size)
+        image = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if image is None:
+            raise ValueError(f"Unable to read blank image: {path}")
 
-    if not download_folders:
-        print("\tNo download folders specified.")
-        return
+        self.path = path
+        self.image = preprocess_image(
+            cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        )
 
-    for folder in download_folders:
-        if not os.path.isdir(folder):
-            print(f"\t{folder} is not a valid directory.")
-            continue
+        # A flat reference lets us rule out candidates by their mean alone.
+        self.mean_bound = (
+            get_ssim_mean_bound(float(self.image.mean()))
+            if float(self.image.std()) == 0
+            else None
+        )
 
-        print(f"\t{folder}")
-        for root, dirs, files in scandir.walk(folder):
-            files, dirs = process_files_and_folders(
-                root,
-                files,
-                dirs,
-                just_these_files=transferred_files,
-                just_these_dirs=transferred_dirs,
-                skip_remove_unaccepted_file_types=True,
-                keep_images_in_just_these_files=True,
-            )
+    # The highest ssim score a candidate with the given mean could reach.
+    def get_max_score(self, candidate_mean):
+        if not self.mean_bound:
+            return 1.0
+        return float(np.interp(candidate_mean, *self.mean_bound))
 
-            for entry in files:
-                try:
-                    extension = get_file_extension(entry)
-                    file_path = os.path.join(root, entry)
+    # Returns the ssim score of the preprocessed candidate against the reference.
+    def compare(self, candidate, silent=False):
+        score = ssim(self.image, candidate, data_range=1.0)
 
-                    if not os.path.isfile(file_path):
-                        continue
+        if not silent:
+            print(f"\t\t\t{os.path.basename(self.path)} SSIM: {score}")
 
-                    print(f"\t\t{entry}")
+        return score
 
-                    if extension in convertable_file_extensions:
-                        source_file = file_path
-                        repacked_file = f"{get_extensionless_name(source_file)}.cbz"
 
-                        # check that the cbz file doesn't already exist
-                        if os.path.isfile(repacked_file):
-                            # if the file is zero bytes, delete it and continue, otherwise skip
-                            if get_file_size(repacked_file) == 0:
-                                send_message(
-                                    "\t\t\tCBZ file is zero bytes, deleting...",
-                                    discord=False,
-                                )
-                                remove_file(repacked_file)
-                            elif not zipfile.is_zipfile(repacked_file):
-                                send_message(
-                                    "\t\t\tCBZ file is not a valid zip file, deleting...",
-                                    discord=False,
-                                )
-                                remove_file(repacked_file)
-                            else:
-                                send_message(
-                                    "\t\t\tCBZ file already exists, skipping...",
-                                    discord=False,
-                                )
-                                continue
+# Returns the preloaded blank image references, loaded once per comparison size.
+@lru_cache(maxsize=None)
+def get_blank_cover_references(size=None):
+    size = tuple(size or blank_cover_comparison_size)
+    references = []
 
-                        temp_dir = tempfile.mkdtemp("_source2cbz")
+    for path in [blank_white_image_path, blank_black_image_path]:
+        if not path:
+            continue
+        try:
+            references.append(BlankCoverReference(path, size))
+        except Exception as e:
+            send_message(str(e), error=True)
 
-                        # if there's already contents in the temp directory, delete it
-                        if os.listdir(temp_dir):
-                            send_message(
-                                f"\t\t\tTemp directory {temp_dir} is not empty, deleting...",
-                                discord=False,
-                            )
-                            remove_folder(temp_dir)
-                            # recreate the temp directory
-                            temp_dir = tempfile.mkdtemp("source2cbz")
+    return tuple(references)
 
-                        if not os.path.isdir(temp_dir):
-                            send_message(
-                                f"\t\t\tFailed to create temp directory {temp_dir}",
-                                error=True,
-                            )
-                            continue
 
-                        send_message(
-                            f"\t\t\tCreated temp directory {temp_dir}",
-                            discord=False,
-                        )
+# Decodes an image as grayscale and resizes it to the given size.
+# JPEGs are decoded at a reduced scale when they're still at least headroom
+# times the size afterwards.
+def load_image_for_comparison(image_data, size, headroom=1):
+    width, height = size
+    flag = cv2.IMREAD_GRAYSCALE
 
-                        # Extract the archive to the temp directory
-                        extract_status = extract(source_file, temp_dir, extension)
+    try:
+        with Image.open(io.BytesIO(image_data)) as image:
+            image_width, image_height = image.size
+
+        for scale, reduced_flag in [
+            (8, cv2.IMREAD_REDUCED_GRAYSCALE_8),
+            (4, cv2.IMREAD_REDUCED_GRAYSCALE_4),
+            (2, cv2.IMREAD_REDUCED_GRAYSCALE_2),
+        ]:
+            if (
+                image_width // scale >= width * headroom
+                and image_height // scale >= height * headroom
+            ):
+                flag = reduced_flag
+                break
+    except Exception:
+        pass
 
-                        if not extract_status:
-                            send_message(
-                                f"\t\t\tFailed to extract {source_file}",
-                                error=True,
-                            )
-                            # remove temp directory
-                            remove_folder(temp_dir)
-                            continue
+    image = cv2.imdecode(np.frombuffer(image_data, np.uint8), flag)
+    if image is None:
+        return None
 
-                        print(f"\t\t\tExtracted contents to {temp_dir}")
+    return cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
 
-                        # Get hashes of all files in archive
-                        hashes = []
-                        for root2, dirs2, files2 in scandir.walk(temp_dir):
-                            for file2 in files2:
-                                path = os.path.join(root2, file2)
-                                hashes.append(get_file_hash(path))
 
-                        compress_status = compress(temp_dir, repacked_file)
+# Checks if the image matches one of the blank images.
+# Candidates whose mean rules out the required score against a
+# flat blank image skip the ssim comparison for it entirely.
+def is_blank_cover(image_data, silent=False, size=None):
+    size = tuple(size or blank_cover_comparison_size)
+    references = get_blank_cover_references(size)
+    if not references:
+        return False
 
-                        if not compress_status:
-                            # remove temp directory
-                            remove_folder(temp_dir)
-                            continue
+    try:
+        candidate = load_image_for_comparison(image_data, size)
+        if candidate is None:
+            return False
 
-                        print(f"\t\t\tCompressed to {repacked_file}")
-
-                        # Check that the number of files in both archives is the same
-                        # Print any files that aren't shared between the two archives
-                        source_file_list = []
-                        repacked_file_list = []
-
-                        if os.path.isfile(source_file):
-                            if extension in rar_extensions:
-                                with rarfile.RarFile(source_file) as rar:
-                                    for file in rar.namelist():
-                                        if get_file_extension(file):
-                                            source_file_list.append(file)
-                            elif extension in seven_zip_extensions:
-                                with py7zr.SevenZipFile(source_file) as seven_zip:
-                                    for file in seven_zip.getnames():
-                                        if get_file_extension(file):
-                                            source_file_list.append(file)
-
-                        if os.path.isfile(repacked_file):
-                            with zipfile.ZipFile(repacked_file) as zip:
-                                for file in zip.namelist():
-                                    if get_file_extension(file):
-                                        repacked_file_list.append(file)
-
-                        # sort them
-                        source_file_list.sort()
-                        repacked_file_list.sort()
-
-                        # print any files that aren't shared between the two archives
-                        if (source_file_list and repacked_file_list) and (
-                            source_file_list != repacked_file_list
-                        ):
-                            print(
-                                "\t\t\tVerifying that all files are present in both archives..."
-                            )
-                            for file in source_file_list:
-                                if file not in repacked_file_list:
-                                    print(f"\t\t\t\t{file} is not in {repacked_file}")
-                            for file in repacked_file_list:
-                                if file not in source_file_list:
-                                    print(f"\t\t\t\t{file} is not in {source_file}")
+        candidate = preprocess_image(candidate)
+        candidate_mean = float(candidate.mean())
+
+        for reference in references:
+            if (
+                reference.get_max_score(candidate_mean)
+                < blank_cover_required_similarity_score
+            ):
+                continue
+
+            if (
+                reference.compare(candidate, silent=silent)
+                >= blank_cover_required_similarity_score
+            ):
+                return True
+    except Exception as e:
+        send_message(str(e), error=True)
+
+    return False
+
+
+# The highest combined pHash + dHash hamming distance (out of 128 bits)
+# for two covers to be considered for an image similarity match.
+cover_hash_max_distance = 20
+
+
+# Packs an array of booleans into an int.
+def pack_hash_bits(bits):
+    return int.from_bytes(np.packbits(bits.flatten()).tobytes(), "big")
+
+
+# A cover's perceptual hashes (pHash and dHash) and a small grayscale
+# thumbnail, used to compare covers without extracting them again.
+class CoverFingerprint:
+    thumbnail_size = (32, 48)
+
+    # What's fingerprinted, the cover as it's stored in the file
+    source = "uncompressed_cover_data"
+
+    def __init__(self, phash, dhash, thumbnail):
+        self.phash = phash
+        self.dhash = dhash
+        self.thumbnail = thumbnail
+
+    @classmethod
+    def from_image_data(cls, image_data):
+        # a closer reduced decode skews the thumbnails compared through ssim
+        thumbnail = load_image_for_comparison(
+            image_data, cls.thumbnail_size, headroom=4
+        )
+        if thumbnail is None:
+            return None
+
+        # pHash: the low frequencies of the dct compared to their median
+        dct = cv2.dct(
+            cv2.resize(thumbnail, (32, 32), interpolation=cv2.INTER_AREA).astype(
+                np.float32
+            )
+        )[:8, :8]
+
+        # dHash: whether each pixel is brighter than the one to its left
+        gradient = cv2.resize(thumbnail, (9, 8), interpolation=cv2.INTER_AREA).astype(
+            np.int16
+        )
+
+        return cls(
+            pack_hash_bits(dct > np.median(dct)),
+            pack_hash_bits(gradient[:, 1:] > gradient[:, :-1]),
+            thumbnail,
+        )
+
+    @classmethod
+    def from_entry(cls, entry):
+        phash, dhash, thumbnail = entry
+        width, height = cls.thumbnail_size
+
+        return cls(
+            int(phash, 16),
+            int(dhash, 16),
+            np.frombuffer(base64.b64decode(thumbnail), np.uint8).reshape(height, width),
+        )
+
+    def to_entry(self):
+        return [
+            f"{self.phash:016x}",
+            f"{self.dhash:016x}",
+            base64.b64encode(self.thumbnail.tobytes()).decode("ascii"),
+        ]
+
+    # The number of differing bits across both hashes.
+    def distance(self, other):
+        return bin(self.phash ^ other.phash).count("1") + bin(
+            self.dhash ^ other.dhash
+        ).count("1")
+
+    # The ssim score of the two thumbnails.
+    def compare(self, other):
+        return ssim(
+            preprocess_image(self.thumbnail),
+            preprocess_image(other.thumbnail),
+            data_range=1.0,
+        )
+
+
+# A persistent index of the cover fingerprints of the library's files,
+# keyed by path and validated against the file's size and modification time.
+# Filled in by extract_covers() and used by the image similarity matching
+# in check_for_existing_series().
+class CoverFingerprintIndex:
+    def __init__(self, index_path=None, max_entries=100000):
+        self.index_path = index_path
+        self.max_entries = max_entries
+        self.entries = {}
+        self.new_entries = {}
+        self.loaded = False
+        self.dirty = False
+
+    def __len__(self):
+        return len(self.entries)
+
+    def load(self):
+        self.loaded = True
+
+        if not self.index_path or not os.path.isfile(self.index_path):
+            return False
+
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+
+            if (
+                data.get("script_version") == list(script_version)
+                and data.get("thumbnail_size") == list(CoverFingerprint.thumbnail_size)
+                and data.get("source") == CoverFingerprint.source
+            ):
+                self.entries.update(
+                    {
+                        path: entry
+                        for path, entry in data.get("entries", {}).items()
+                        if path not in self.entries
+                    }
+                )
+            return True
+        except Exception as e:
+            send_message(f"Failed to load {self.index_path}: {e}", error=True)
+            return False
+
+    # Returns the stamp used to validate the entry for the file,
+    # or None if the file can't be indexed.
+    @staticmethod
+    def get_stamp(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        return [stat.st_size, stat.st_mtime_ns]
+
+    # Returns the fingerprint for the file if it's still current.
+    def get(self, path):
+        if not self.loaded:
+            self.load()
+
+        entry = self.entries.get(path)
+        if not entry or entry[0] != self.get_stamp(path):
+            metrics.cache_result("cover_fingerprint_index", False)
+            return None
+
+        metrics.cache_result("cover_fingerprint_index", True)
+
+        try:
+            return CoverFingerprint.from_entry(entry[1])
+        except Exception:
+            return None
+
+    def set(self, path, fingerprint):
+        stamp = self.get_stamp(path)
+        if not stamp:
+            return
+
+        if not self.loaded:
+            self.load()
+
+        # re-insert to keep the most recently indexed entries at the end
+        self.entries.pop(path, None)
+        self.entries[path] = self.new_entries[path] = [stamp, fingerprint.to_entry()]
+        self.dirty = True
+
+    # Fingerprints the cover data and indexes it under the file's path.
+    def add(self, path, image_data):
+        fingerprint = CoverFingerprint.from_image_data(image_data)
+        if fingerprint:
+            self.set(path, fingerprint)
+        return fingerprint
+
+    # Returns and clears the entries set since the last call,
+    # used to hand them back from a worker process.
+    def pop_new_entries(self):
+        new_entries, self.new_entries = self.new_entries, {}
+        return new_entries
+
+    # Adds the entries returned by pop_new_entries() in another process.
+    def merge(self, entries):
+        if not entries:
+            return
 
-                            # remove temp directory
-                            remove_folder(temp_dir)
+        if not self.loaded:
+            self.load()
 
-                            # remove cbz file
-                            remove_file(repacked_file)
+        for path, entry in entries.items():
+            self.entries.pop(path, None)
+            self.entries[path] = entry
+        self.dirty = True
+
+    def save(self):
+        if not self.index_path or not self.dirty or not log_to_file:
+            return False
+
+        # drop the least recently indexed entries
+        if len(self.entries) > self.max_entries:
+            for path in list(self.entries)[: len(self.entries) - self.max_entries]:
+                del self.entries[path]
+
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            temp_path = f"{self.index_path}.tmp"
 
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "script_version": list(script_version),
+                        "thumbnail_size": list(CoverFingerprint.thumbnail_size),
+                        "source": CoverFingerprint.source,
+                        "entries": self.entries,
+                    },
+                    f,
+                )
+
+            os.replace(temp_path, self.index_path)
+            self.dirty = False
+            self.new_entries = {}
+            return True
+        except Exception as e:
+            send_message(f"Failed to save {self.index_path}: {e}", error=True)
+            return False
+
+
+cover_fingerprint_index = CoverFingerprintIndex(
+    os.path.join(LOGS_DIR, "cover_fingerprints.json")
+)
+
+
+# Writes a single member of the cbz being repacked, keeping track of
+# the size and CRC-32 of everything written to it.
+# Also used as the py7zr writer, so it can be streamed into directly.
+class CbzMemberWriter(py7zr.io.Py7zIO):
+    def __init__(self, zip_file, name, date_time=None):
+        info = zipfile.ZipInfo(name, date_time=date_time or time.localtime()[:6])
+        self.handle = zip_file.open(info, "w")
+        self.crc = 0
+        self.length = 0
+
+    def write(self, data):
+        self.crc = zlib.crc32(data, self.crc)
+        self.length += len(data)
+        return self.handle.write(data)
+
+    def read(self, size=None):
+        raise io.UnsupportedOperation("read")
+
+    def seek(self, offset, whence=0):
+        return self.length
+
+    def flush(self):
+        pass
+
+    def size(self):
+        return self.length
+
+    def close(self):
+        self.handle.close()
+
+
+# Hands py7zr a CbzMemberWriter for each member it extracts,
+# members are extracted one after the other.
+class CbzWriterFactory(py7zr.io.WriterFactory):
+    def __init__(self, zip_file, date_times):
+        self.zip_file = zip_file
+        self.date_times = date_times
+        self.writers = {}
+        self.current = None
+
+    def create(self, filename):
+        self.close()
+        self.current = CbzMemberWriter(
+            self.zip_file, filename, self.date_times.get(filename)
+        )
+        self.writers[filename] = self.current
+        return self.current
+
+    def close(self):
+        if self.current:
+            self.current.close()
+            self.current = None
+
+
+# Returns the zip date_time of an archive member's datetime,
+# zip can't store dates before 1980.
+def get_zip_date_time(date_time):
+    if not date_time or date_time[0] < 1980:
+        return None
+    return tuple(date_time[:6])
+
+
+# Streams every member of a rar/7z archive straight into a new cbz without
+# extracting it to disk, reading the source once and writing the cbz once.
+# Returns {member name: (size, crc32)}, with the CRC-32 the source archive recorded
+# for the member (or of the data read, if it didn't record one), or None if the repack failed.
+def repack_to_cbz(source_file, repacked_file, extension, buffer_size=1024 * 1024):
+    digests = {}
+
+    try:
+        with zipfile.ZipFile(repacked_file, "w") as zip_file:
+            if extension in rar_extensions:
+                with rarfile.RarFile(source_file) as rar:
+                    for info in rar.infolist():
+                        if info.is_dir():
                             continue
-                        else:
-                            print("\t\t\tAll files are present in both archives.")
 
-                        hashes_verified = False
+                        writer = CbzMemberWriter(
+                            zip_file,
+                            info.filename,
+                            get_zip_date_time(info.date_time),
+                        )
+                        with rar.open(info) as member:
+                            while True:
+                                data = member.read(buffer_size)
+                                if not data:
+                                    break
+                                writer.write(data)
+                        writer.close()
+                        digests[info.filename] = (
+                            writer.length,
+                            info.CRC if info.CRC is not None else writer.crc,
+                        )
+            elif extension in seven_zip_extensions:
+                with py7zr.SevenZipFile(source_file, "r") as archive:
+                    members = [info for info in archive.list() if not info.is_directory]
+                    date_times = {
+                        info.filename: get_zip_date_time(
+                            info.creationtime.astimezone().timetuple()
+                            if info.creationtime
+                            else None
+                        )
+                        for info in members
+                    }
+                    crcs = {info.filename: info.crc32 for info in members}
+                    factory = CbzWriterFactory(zip_file, date_times)
+                    try:
+                        archive.extractall(factory=factory)
+                    finally:
+                        factory.close()
+
+                    digests = {
+                        name: (
+                            writer.length,
+                            crcs[name] if crcs[name] is not None else writer.crc,
+                        )
+                        for name, writer in factory.writers.items()
+                        if name in date_times
+                    }
+            else:
+                return None
+    except Exception as e:
+        send_message(f"Error repacking {source_file}: {e}", error=True)
+        return None
 
-                        # Verify hashes of all files inside the cbz file
-                        with zipfile.ZipFile(repacked_file) as zip:
-                            for file in zip.namelist():
-                                if get_file_extension(file):
-                                    hash = get_file_hash(repacked_file, True, file)
-                                    if hash and hash not in hashes:
-                                        print(f"\t\t\t\t{file} hash did not match")
-                                        break
-                            else:
-                                hashes_verified = True
+    metrics.count("archives_opened")
+    metrics.count("bytes_read", sum(size for size, _ in digests.values()))
+    return digests
+
+
+# Returns {member name: (size, crc32)} as recorded in the zip's central directory,
+# after reading the written zip back in full to check each member against it.
+# Raises zipfile.BadZipFile if a member doesn't match.
+def get_zip_digests(zip_path):
+    metrics.count("archives_opened")
+    with zipfile.ZipFile(zip_path) as zip_file:
+        bad_member = zip_file.testzip()
+        if bad_member:
+            raise zipfile.BadZipFile(f"{bad_member} is corrupted in {zip_path}")
+
+        return {
+            info.filename: (info.file_size, info.CRC)
+            for info in zip_file.infolist()
+            if not info.is_dir()
+        }
 
-                        # Remove temp directory
-                        remove_folder(temp_dir)
 
-                        if hashes_verified:
-                            send_message("\t\t\tHashes verified.", discord=False)
-                            send_message(
-                                f"\t\t\tConverted {source_file} to {repacked_file}",
-                                discord=False,
-                            )
-                            embed = handle_fields(
-                                DiscordEmbed(
-                                    title="Converted to CBZ",
-                                    color=grey_color,
-                                ),
-                                fields=[
-                                    {
-                                        "name": "From",
-                                        "value": f"```{os.path.basename(source_file)}```",
-                                        "inline": False,
-                                    },
-                                    {
-                                        "name": "To",
-                                        "value": f"```{os.path.basename(repacked_file)}```",
-                                        "inline": False,
-                                    },
-                                    {
-                                        "name": "Location",
-                                        "value": f"```{os.path.dirname(repacked_file)}```",
-                                        "inline": False,
-                                    },
-                                ],
-                            )
-                            grouped_notifications = group_notification(
-                                grouped_notifications, Embed(embed, None)
-                            )
+# Runs repack_to_cbz() in a worker process, returning its output
+# along with the results so the main process can print them in order.
+def repack_to_cbz_worker(source_file, repacked_file, extension):
+    errors_start = len(errors)
 
-                            # remove the source file
-                            remove_file(source_file)
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), metrics.stage("worker"):
+        digests = repack_to_cbz(source_file, repacked_file, extension)
 
-                            if watchdog_toggle:
-                                if source_file in transferred_files:
-                                    transferred_files.remove(source_file)
-                                if repacked_file not in transferred_files:
-                                    transferred_files.append(repacked_file)
-                        else:
-                            send_message("\t\t\tHashes did not verify", error=True)
-                            # remove cbz file
-                            remove_file(repacked_file)
+    # the worker can be stopped once its results are in
+    discord_dispatcher.flush()
+    log_writer.flush()
 
-                    elif extension == ".zip" and rename_zip_to_cbz:
-                        header_extension = get_header_extension(file_path)
-                        # if it's a zip file, then rename it to cbz
-                        if (
-                            zipfile.is_zipfile(file_path)
-                            or header_extension in manga_extensions
-                        ):
-                            rename_path = f"{get_extensionless_name(file_path)}.cbz"
+    return {
+        "digests": digests,
+        "output": output.getvalue(),
+        "errors": errors[errors_start:],
+        "metrics": metrics.pop_stage("worker"),
+    }
+
+
+# Verifies a repacked cbz against its source archive, then replaces the source
+# with it, or removes the cbz if it didn't verify.
+def finish_cbz_conversion(source_file, repacked_file, source_digests):
+    global transferred_files
+
+    try:
+        if source_digests is None:
+            send_message(
+                f"\t\t\tFailed to convert {source_file}",
+                error=True,
+            )
+            if os.path.isfile(repacked_file):
+                remove_file(repacked_file)
+            return False
+
+        print(f"\t\t\tRepacked to {repacked_file}")
+
+        # Check that every file in the source archive made it into the cbz
+        # with the same size and CRC-32, and that nothing else did.
+        repacked_digests = get_zip_digests(repacked_file)
+        hashes_verified = bool(source_digests) and (source_digests == repacked_digests)
+
+        if not hashes_verified:
+            print("\t\t\tVerifying that all files are present in both archives...")
+            for file, digest in source_digests.items():
+                if file not in repacked_digests:
+                    print(f"\t\t\t\t{file} is not in {repacked_file}")
+                elif repacked_digests[file] != digest:
+                    print(f"\t\t\t\t{file} hash did not match")
+            for file in repacked_digests:
+                if file not in source_digests:
+                    print(f"\t\t\t\t{file} is not in {source_file}")
+        else:
+            print("\t\t\tAll files are present in both archives.")
+
+        if hashes_verified:
+            send_message("\t\t\tHashes verified.", discord=False)
+            send_message(
+                f"\t\t\tConverted {source_file} to {repacked_file}",
+                discord=False,
+            )
+            embed = handle_fields(
+                DiscordEmbed(
+                    title="Converted to CBZ",
+                    color=grey_color,
+                ),
+                fields=[
+                    {
+                        "name": "From",
+                        "value": f"```{os.path.basename(source_file)}```",
+                        "inline": False,
+                    },
+                    {
+                        "name": "To",
+                        "value": f"```{os.path.basename(repacked_file)}```",
+                        "inline": False,
+                    },
+                    {
+                        "name": "Location",
+                        "value": f"```{os.path.dirname(repacked_file)}```",
+                        "inline": False,
+                    },
+                ],
+            )
+            group_notification(Embed(embed, None))
+
+            # remove the source file
+            remove_file(source_file)
+
+            if watchdog_toggle:
+                if source_file in transferred_files:
+                    transferred_files.remove(source_file)
+                if repacked_file not in transferred_files:
+                    transferred_files.append(repacked_file)
+            return True
+        else:
+            send_message("\t\t\tHashes did not verify", error=True)
+            # remove cbz file
+            remove_file(repacked_file)
+    except Exception as e:
+        send_message(
+            f"Error when converting {source_file}: {e}",
+            error=True,
+        )
+
+        # if the cbz file exists, remove it
+        if os.path.isfile(repacked_file):
+            remove_file(repacked_file)
+
+    return False
+
+
+# Renames a zip file to cbz, asking first when manual_rename is on.
+# Returns True if it was renamed.
+def rename_zip_file(file_path, rename_path):
+    global transferred_files
+
+    user_input = (
+        get_input_from_user(
+            "\t\t\tRename to CBZ",
+            ["y", "n"],
+            ["y", "n"],
+        )
+        if manual_rename
+        else "y"
+    )
+
+    if user_input != "y":
+        print("\t\t\t\tSkipping...")
+        return False
+
+    rename_file(
+        file_path,
+        rename_path,
+    )
+    if os.path.isfile(rename_path) and not os.path.isfile(file_path):
+        if watchdog_toggle:
+            if file_path in transferred_files:
+                transferred_files.remove(file_path)
+            if rename_path not in transferred_files:
+                transferred_files.append(rename_path)
+        return True
+
+    return False
+
+
+# Converts supported archives to CBZ.
+#
+# The archives in each download folder are repacked across archive_conversion_workers
+# worker processes, and verified/reported back in the main process in the
+# order they were found.
+def convert_to_cbz(workers=None):
+    global transferred_files
+
+    workers = workers or archive_conversion_workers
+
+    print("\nLooking for archives to convert to CBZ...")
+
+    if not download_folders:
+        print("\tNo download folders specified.")
+        return
+
+    executor = None
+    if workers > 1:
+        executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+            initargs=(get_worker_state(),),
+        )
+
+    try:
+        for folder in download_folders:
+            if not os.path.isdir(folder):
+                print(f"\t{folder} is not a valid directory.")
+                continue
+
+            print(f"\t{folder}")
+
+            # (entry, source_file, repacked_file, future, extension, fallbacks)
+            conversions = []
+
+            # The cbz files the queued conversions will write to, and the other
+            # archives tried in order if the conversion fails,
+            # X.cbr and X.7z would both be repacked to X.cbz
+            queued_targets = {}
+
+            for root, dirs, files in download_snapshot.walk(folder):
+                files, dirs = process_files_and_folders(
+                    root,
+                    files,
+                    dirs,
+                    just_these_files=transferred_files,
+                    just_these_dirs=transferred_dirs,
+                    skip_remove_unaccepted_file_types=True,
+                    keep_images_in_just_these_files=True,
+                )
+
+                for entry in files:
+                    try:
+                        extension = get_file_extension(entry)
+                        file_path = os.path.join(root, entry)
+
+                        if not os.path.isfile(file_path):
+                            continue
+
+                        if extension in convertable_file_extensions:
+                            source_file = file_path
+                            repacked_file = f"{get_extensionless_name(source_file)}.cbz"
 
-                            user_input = (
-                                get_input_from_user(
-                                    "\t\t\tRename to CBZ",
-                                    ["y", "n"],
-                                    ["y", "n"],
+                            fallbacks = queued_targets.get(
+                                os.path.normcase(repacked_file)
+                            )
+                            if fallbacks is not None:
+                                print(f"\t\t{entry}")
+                                send_message(
+                                    f"\t\t\t{os.path.basename(repacked_file)} is already being converted from another archive, trying this one if that fails...",
+                                    discord=False,
+                                )
+                                fallbacks.append((entry, source_file, extension))
+                                continue
+
+                            # check that the cbz file doesn't already exist
+                            if os.path.isfile(repacked_file):
+                                print(f"\t\t{entry}")
+
+                                # if the file is zero bytes, delete it and continue, otherwise skip
+                                if get_file_size(repacked_file) == 0:
+                                    send_message(
+                                        "\t\t\tCBZ file is zero bytes, deleting...",
+                                        discord=False,
+                                    )
+                                    remove_file(repacked_file)
+                                elif not zipfile.is_zipfile(repacked_file):
+                                    send_message(
+                                        "\t\t\tCBZ file is not a valid zip file, deleting...",
+                                        discord=False,
+                                    )
+                                    remove_file(repacked_file)
+                                else:
+                                    send_message(
+                                        "\t\t\tCBZ file already exists, skipping...",
+                                        discord=False,
+                                    )
+                                    continue
+
+                            # Stream the archive's contents into the cbz
+                            fallbacks = queued_targets[
+                                os.path.normcase(repacked_file)
+                            ] = []
+                            conversions.append(
+                                (
+                                    entry,
+                                    source_file,
+                                    repacked_file,
+                                    (
+                                        executor.submit(
+                                            repack_to_cbz_worker,
+                                            source_file,
+                                            repacked_file,
+                                            extension,
+                                        )
+                                        if executor
+                                        else None
+                                    ),
+                                    extension,
+                                    fallbacks,
                                 )
-                                if manual_rename
-                                else "y"
                             )
+                            continue
 
-                            if user_input == "y":
-                                rename_file(
-                                    file_path,
-                                    rename_path,
+                        print(f"\t\t{entry}")
+
+                        if extension == ".zip" and rename_zip_to_cbz:
+                            header_extension = get_header_extension(file_path)
+                            # if it's a zip file, then rename it to cbz
+                            if (
+                                zipfile.is_zipfile(file_path)
+                                or header_extension in manga_extensions
+                            ):
+                                rename_path = f"{get_extensionless_name(file_path)}.cbz"
+
+                                fallbacks = queued_targets.get(
+                                    os.path.normcase(rename_path)
                                 )
-                                if os.path.isfile(rename_path) and not os.path.isfile(
-                                    file_path
-                                ):
-                                    if watchdog_toggle:
-                                        if file_path in transferred_files:
-                                            transferred_files.remove(file_path)
-                                        if rename_path not in transferred_files:
-                                            transferred_files.append(rename_path)
-                            else:
-                                print("\t\t\t\tSkipping...")
-                except Exception as e:
-                    send_message(
-                        f"Error when correcting extension: {entry}: {e}",
-                        error=True,
+                                if fallbacks is not None:
+                                    send_message(
+                                        f"\t\t\t{os.path.basename(rename_path)} is already being converted from another archive, trying this one if that fails...",
+                                        discord=False,
+                                    )
+                                    fallbacks.append((entry, file_path, extension))
+                                    continue
+
+                                rename_zip_file(file_path, rename_path)
+                    except Exception as e:
+                        send_message(
+                            f"Error when correcting extension: {entry}: {e}",
+                            error=True,
+                        )
+
+            for (
+                entry,
+                source_file,
+                repacked_file,
+                future,
+                extension,
+                fallbacks,
+            ) in conversions:
+                print(f"\t\t{entry}")
+
+                if future:
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        send_message(f"Error repacking {source_file}: {e}", error=True)
+                        result = {"digests": None, "output": "", "errors": []}
+
+                    print(result["output"], end="")
+                    errors.extend(result["errors"])
+                    metrics.merge(result.get("metrics"))
+                    source_digests = result["digests"]
+                else:
+                    source_digests = repack_to_cbz(
+                        source_file, repacked_file, extension
                     )
 
-                    # if the tempdir exists, remove it
-                    if os.path.isdir(temp_dir):
-                        remove_folder(temp_dir)
+                converted = finish_cbz_conversion(
+                    source_file, repacked_file, source_digests
+                )
+
+                # Try the other archives that would've been converted to the same cbz
+                for entry, source_file, extension in fallbacks:
+                    if converted:
+                        break
 
-                    # if the cbz file exists, remove it
-                    if os.path.isfile(repacked_file):
-                        remove_file(repacked_file)
+                    print(f"\t\t{entry}")
+
+                    if extension == ".zip":
+                        converted = rename_zip_file(source_file, repacked_file)
+                    else:
+                        converted = finish_cbz_conversion(
+                            source_file,
+                            repacked_file,
+                            repack_to_cbz(source_file, repacked_file, extension),
+                        )
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
 
 
 # Goes through each file in download_folders and checks for an incorrect file extension
 # based on the file header. If the file extension is incorrect, it will rename the file.
 def correct_file_extensions():
-    global transferred_files, grouped_notifications
+    global transferred_files
 
     print("\nChecking for incorrect file extensions...")
 
@@ -11650,7 +15130,7 @@ def correct_file_extensions():
             continue
 
         print(f"\t{folder}")
-        for root, dirs, files in scandir.walk(folder):
+        for root, dirs, files in download_snapshot.walk(folder):
             files, dirs = process_files_and_folders(
                 root,
                 files,
@@ -11716,10 +15196,7 @@ def correct_file_extensions():
                                         },
                                     ],
                                 )
-                                grouped_notifications = group_notification(
-                                    grouped_notifications,
-                                    Embed(embed, None),
-                                )
+                                group_notification(Embed(embed, None))
                                 if watchdog_toggle:
                                     if volume.path in transferred_files:
                                         transferred_files.remove(volume.path)
@@ -11732,7 +15209,6 @@ def correct_file_extensions():
 # Checks existing series within existing libraries to see if their type matches the library they're in
 # If not, it moves the series to the appropriate library
 def move_series_to_correct_library(paths_to_search=paths_with_types):
-    global grouped_notifications
     global moved_folders, moved_files
     global libraries_to_scan
     global komga_libraries
@@ -11883,9 +15359,7 @@ def move_series_to_correct_library(paths_to_search=paths_with_types):
                     )
 
                     # Add it to the group of notifications
-                    grouped_notifications = group_notification(
-                        grouped_notifications, Embed(embed, None)
-                    )
+                    group_notification(Embed(embed, None))
 
                     if not send_scan_request_to_komga_libraries_toggle:
                         continue
@@ -11965,6 +15439,15 @@ def main():
     skipped_release_group_files = []
     skipped_publisher_files = []
 
+    # Start a fresh set of metrics for this run
+    if metrics_format:
+        enable_metrics()
+        metrics.reset()
+
+    # Load the blank images used by find_and_extract_cover() once up front
+    if compare_detected_cover_to_blank_images:
+        get_blank_cover_references()
+
     # Determines when the cover_extraction should be run
     if download_folders and paths:
         for folder in download_folders:
@@ -11978,14 +15461,8 @@ def main():
         and check_for_existing_series_toggle
         and not cached_paths
     ):
-        cached_paths = get_lines_from_file(
-            cached_paths_path,
-            ignore=paths + download_folders,
-            check_paths=True,
-        )
-
-        # get rid of non-valid paths
-        cached_paths = [x for x in cached_paths if os.path.isdir(x)]
+        with pipeline_stage("load_cached_paths"):
+            cached_paths.load(ignore=set(paths + download_folders), check_paths=True)
 
     # Cache the paths if the user doesn't have a cached_paths.txt file
     if (
@@ -11997,10 +15474,15 @@ def main():
         and check_for_existing_series_toggle
         and not cached_paths
     ):
-        cache_existing_library_paths()
+        with pipeline_stage("cache_existing_library_paths"):
+            cache_existing_library_paths()
         if cached_paths:
             print(f"\n\tLoaded {len(cached_paths)} cached paths")
 
+    # Load series_index.json into series_index
+    if check_for_existing_series_toggle and not series_index and series_index.load():
+        print(f"\tLoaded {len(series_index)} indexed series from series_index.json")
+
     # Load release_groups.txt into release_groups
     if os.path.isfile(release_groups_path):
         release_groups_read = get_lines_from_file(release_groups_path)
@@ -12029,21 +15511,28 @@ def main():
         rf"(?<=[\(\[\{{])({release_groups_joined})(?=[\)\]\}}])", re.IGNORECASE
     )
 
+    # Walk and parse the download folders once, for all of the stages below
+    download_snapshot.start(download_folders)
+
     # Correct any incorrect file extensions
     if correct_file_extensions_toggle:
-        correct_file_extensions()
+        with pipeline_stage("correct_file_extensions"):
+            correct_file_extensions()
 
     # Convert any non-cbz supported file to cbz
     if convert_to_cbz_toggle:
-        convert_to_cbz()
+        with pipeline_stage("convert_to_cbz"):
+            convert_to_cbz()
 
     # Delete any files with unacceptable keywords in their name
     if delete_unacceptable_files_toggle:
-        delete_unacceptable_files()
+        with pipeline_stage("delete_unacceptable_files"):
+            delete_unacceptable_files()
 
     # Delete any chapters from the downloads folder
     if delete_chapters_from_downloads_toggle:
-        delete_chapters_from_downloads()
+        with pipeline_stage("delete_chapters_from_downloads"):
+            delete_chapters_from_downloads()
 
     # Generate the release group list
     if (
@@ -12074,32 +15563,40 @@ def main():
                 print(
                     f"\tLoaded {len(skipped_publisher_files)} skipped publisher files from skipped_publisher_files.txt"
                 )
-        generate_rename_lists(skipped_release_group_files, skipped_publisher_files)
+        with pipeline_stage("generate_rename_lists"):
+            generate_rename_lists(skipped_release_group_files, skipped_publisher_files)
 
     # Rename the files in the download folders
     if rename_files_in_download_folders_toggle:
-        rename_files()
+        with pipeline_stage("rename_files"):
+            rename_files()
 
     # Create folders for items in the download folder
     if create_folders_for_items_in_download_folder_toggle:
-        create_folders_for_items_in_download_folder()
+        with pipeline_stage("create_folders_for_items_in_download_folder"):
+            create_folders_for_items_in_download_folder()
 
     # Checks for duplicate volumes/chapters in the download folders
     if check_for_duplicate_volumes_toggle and download_folders:
-        check_for_duplicate_volumes(download_folders)
+        with pipeline_stage("check_for_duplicate_volumes"):
+            check_for_duplicate_volumes(download_folders)
 
     # Extract the covers from the files in the download folders
     if extract_covers_toggle and paths and download_folder_in_paths:
-        extract_covers()
+        with pipeline_stage("extract_covers"):
+            extract_covers()
         print_stats()
 
     # Match the files in the download folders to the files in the library
     if check_for_existing_series_toggle and download_folders and paths:
-        check_for_existing_series()
+        with pipeline_stage("check_for_existing_series"):
+            check_for_existing_series()
+            series_index.save()
 
     # Rename the root directory folders in the download folder
     if rename_dirs_in_download_folder_toggle and download_folders:
-        rename_dirs_in_download_folder()
+        with pipeline_stage("rename_dirs_in_download_folder"):
+            rename_dirs_in_download_folder()
 
     if watchdog_toggle:
         # remove any deleted/renamed/moved files
@@ -12116,10 +15613,8 @@ def main():
         and paths_with_types
         and moved_files
     ):
-        move_series_to_correct_library()
-
-    if grouped_notifications and not watchdog_toggle:
-        send_discord_message(None, grouped_notifications)
+        with pipeline_stage("move_series_to_correct_library"):
+            move_series_to_correct_library()
 
     # Extract the covers from the files in the library
     if extract_covers_toggle and paths and not download_folder_in_paths:
@@ -12139,22 +15634,22 @@ def main():
                             continue
 
                 if paths_to_trigger:
-                    extract_covers(paths_to_process=paths_to_trigger)
+                    with pipeline_stage("extract_covers"):
+                        extract_covers(paths_to_process=paths_to_trigger)
             else:
-                if profile_code == "extract_covers()":
-                    cProfile.run(profile_code, sort="cumtime")
-                    exit()
-                else:
+                with pipeline_stage("extract_covers"):
                     extract_covers()
                 print_stats()
 
     # Check for missing volumes in the library (local solution)
     if check_for_missing_volumes_toggle:
-        check_for_missing_volumes()
+        with pipeline_stage("check_for_missing_volumes"):
+            check_for_missing_volumes()
 
     # Check for missing volumes in the library (bookwalker solution)
     if bookwalker_check and not watchdog_toggle:
-        check_for_new_volumes_on_bookwalker()
+        with pipeline_stage("check_for_new_volumes_on_bookwalker"):
+            check_for_new_volumes_on_bookwalker()
 
     # Sends a scan request to Komga for each library that had a file moved into it.
     if (
@@ -12186,15 +15681,40 @@ def main():
 
         # Send scan requests to each komga library
         if libraries_to_scan:
-            for library in libraries_to_scan:
-                scan_komga_library(library.id, library.name)
+            with pipeline_stage("scan_komga_library"):
+                for library in libraries_to_scan:
+                    scan_komga_library(library.id, library.name)
 
     # Reset libraries_to_scan
     libraries_to_scan = []
 
+    with pipeline_stage("save_caches"):
+        # Write any newly cached paths to cached_paths.txt
+        cached_paths.flush()
+
+        # Write the parsed file cache to parsed_files.json
+        parsed_file_cache.save()
+
+        # Write the cover fingerprints to cover_fingerprints.json
+        cover_fingerprint_index.save()
+
+        # Write out the buffered log lines
+        log_writer.flush()
+
     # clear lru_cache for contains_comic_info()
     contains_comic_info.cache_clear()
 
+    # Close any archives left open
+    close_archive_info()
+
+    # The next run starts with fresh directory snapshots
+    directory_cache.invalidate()
+    download_snapshot.clear()
+
+    # Write the metrics of this run, each watchdog run replaces the last
+    if metrics_format:
+        metrics.save()
+
 
 # Checks that the user has the required settings in settings.py
 # Will become obselete once I figure out an automated way of
@@ -12239,9 +15759,5 @@ if __name__ == "__main__":
             watch = Watcher()
             watch.run()
     else:
-        if profile_code == "main()":
-            # run with cprofile and sort by cumulative time
-            cProfile.run(profile_code, sort="cumtime")
-            exit()
-        else:
+        with stage_profiler.profile("main"):
             main()
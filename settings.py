@@ -148,6 +148,64 @@ ignored_folder_names = []
 # Outputs errors and changes to a log file
 log_to_file = False
 
+# The size (in bytes) changes.txt and errors.txt are rotated at, 0 = never.
+# The rotated files are kept as changes.txt.1, changes.txt.2 and so on.
+log_rotation_bytes = 10 * 1024 * 1024
+log_rotation_backups = 5
+
+# The number of worker processes used when extracting covers.
+# Each series folder is handed off to a worker, 1 = no worker processes.
+# Can also be passed in via --workers in the cli.
+cover_extraction_workers = 1
+
+# The number of worker processes used when converting rar/7z archives to cbz.
+# Each archive is repacked by a worker, 1 = no worker processes.
+# Can also be passed in via --conversion_workers in the cli.
+archive_conversion_workers = 1
+
+# The number of threads used when reading file headers to correct file extensions.
+# Can also be passed in via --header_workers in the cli.
+header_sniffing_workers = 4
+
+# The maximum number of bookwalker pages fetched at the same time by --bookwalker_check.
+# The searches of the upcoming series are fetched while the current one is being checked.
+bookwalker_workers = 4
+
+# The number of requests per second sent to bookwalker, and how many can be sent at once.
+# When bookwalker starts rate-limiting, every request is paused for a while before retrying.
+bookwalker_requests_per_second = 0.5
+bookwalker_request_burst = 1
+
+# How long (in seconds) a fetched bookwalker book page is reused before checking it for changes.
+# Pages are cached in logs/bookwalker_cache, requires log_to_file = True.
+bookwalker_cache_ttl = 43200
+
+# How long (in seconds) a fetched bookwalker search page is reused before checking it for changes.
+# Kept short so newly listed volumes show up.
+bookwalker_search_cache_ttl = 3600
+
+# Records the wall time, files examined, archives opened, bytes read, regex calls
+# and cache hit rates of each stage of a run, "json" or "prometheus" ("" = off).
+# Written at the end of every run, or every watchdog run, replacing the last one.
+# Can also be passed in via --metrics in the cli.
+metrics_format = ""
+
+# Where the metrics are written, logs/metrics.json or logs/metrics.prom when empty.
+# For Prometheus, point it into node_exporter's textfile collector directory.
+metrics_path = ""
+
+# The stages of the run to profile, written as .pstats files into logs/profiles.
+# The stage names are those in the metrics, "main" for the whole run,
+# "watchdog" for each whole watchdog run, or "all" for every stage.
+# Can also be passed in via --profile in the cli.
+profile_stages = []
+
+# "cprofile" records every call, "sampling" records the call stack every
+# profile_sampling_interval seconds instead, which is cheap enough to leave on.
+# Can also be passed in via --profile_mode in the cli.
+profile_mode = "cprofile"
+profile_sampling_interval = 0.01
+
 # Any keywords/regexes within this array that are found within a file name,
 # will be automatically deleted from the download_folders by delete_unacceptable_files()
 # Case is ignored.
@@ -182,6 +240,10 @@ preferred_chapter_renaming_format = "c"
 # is moved to the library.
 output_chapter_covers_to_discord = False
 
+# The number of discord messages that can be waiting to be sent in the background,
+# any sent while it's full are dropped.
+discord_queue_size = 1000
+
 # Renames the chapter number in releases with the preferred chapter keyword.
 rename_chapters_with_preferred_chapter_keyword = False
 
@@ -190,7 +252,18 @@ extract_chapter_covers = False
 
 # When the program has detected a cover image file within the manga or novel file, it will compare that image
 # against a blank white image and a blank black image to avoid picking the wrong cover.
-compare_detected_cover_to_blank_images = False  # WILL INCREASE PROCESSING TIME
+# The blank images are loaded once and covers are compared against them at blank_cover_comparison_size,
+# covers that clearly aren't blank are ruled out without a full comparison.
+compare_detected_cover_to_blank_images = False
+
+# The (width, height) used when comparing a detected cover to the blank images.
+# Larger sizes are slower but compare finer detail.
+blank_cover_comparison_size = (200, 300)
+
+# The longest side the first image of a file is sampled down to before checking if it's black and white,
+# which is part of telling chapters from one-shots. Faster on large images, but a sampled check can
+# come out differently than a check of every pixel. None = check every pixel.
+black_and_white_sample_size = None
 
 # Uses the latest volume cover as the series cover, when extracting covers, instead of the first volumes' cover.
 # Using modification date and hashing for matching, it can automatically switch your covers back and forth
@@ -1,5 +1,8 @@
 #!/usr/bin/env python3
 import csv
+import os
+import tempfile
+import zipfile
 
 from komga_cover_extractor import *
 
@@ -1015,6 +1018,16 @@ def test_remove_dual_space():
 def test_normalize_str():
     assert normalize_str("The Sword Saint") == "Sword Saint"
 
+    # words are removed in order, each one seeing what the previous ones left
+    assert normalize_str("The Manga Series X") == "Manga"
+    assert (
+        normalize_str("Sword Art Online Light Novel Volume")
+        == "Sword Art Online Light Volume"
+    )
+    assert normalize_str("A&B no Koto") == "&B Koto"
+    assert normalize_str("Spy×Family 10th Anniversary Edition") == "Spy Family"
+    assert normalize_str("Book Girl Bookwalker Digital") == "Book Girl"
+
 
 # test def clean_str(string):
 def test_clean_str():
@@ -1929,6 +1942,970 @@ def test_contains_brackets():
     assert contains_brackets("test()[]{} test") == True
 
 
+# tests SeriesIndex lookups
+def test_series_index():
+    index = SeriesIndex()
+    index.sync(
+        [
+            "/library/Spy x Family",
+            "/library/Mushoku Tensei - Jobless Reincarnation",
+            "/library/Mushoku Tensei - Jobless Reincarnation (Light Novel)",
+            "/library/Vinland Saga",
+            "/library/Chainsaw Man",
+        ]
+    )
+    assert len(index) == 5
+    assert "/library/Vinland Saga" in index
+
+    # exact matches come first
+    name = clean_str("Vinland Saga", skip_bracket=True)
+    assert index.get_exact_matches(name) == ["/library/Vinland Saga"]
+    assert index.get_candidates(name, 0.9790)[0] == "/library/Vinland Saga"
+
+    # unrelated folders never reach similar()
+    assert "/library/Spy x Family" not in index.get_candidates(name, 0.9790)
+
+    # near matches are kept as candidates
+    near_name = clean_str("Chainsaw Men", skip_bracket=True)
+    assert not index.get_exact_matches(near_name)
+    assert similar(near_name, index.names["/library/Chainsaw Man"]) >= 0.9
+    candidates = index.get_candidates(near_name, 0.9)
+    assert candidates == ["/library/Chainsaw Man"]
+
+    # anything that would've matched through similar() is kept as a candidate
+    for name in [
+        "chainsaw men",
+        "vinland sagaa",
+        "spy x familly",
+        "mushoku tensei jobless reincarnations",
+        "mushoku tensei jobless reincarnation light novels",
+    ]:
+        for path in index.names:
+            if similar(index.names[path], name) >= 0.9:
+                assert path in index.get_candidates(name, 0.9)
+
+    index.sync(["/library/Spy x Family"])
+    assert len(index) == 1
+    assert not index.get_exact_matches(name)
+    assert not index.get_candidates(name, 0.9)
+
+
+# tests CachedPathStore
+def test_cached_path_store():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "cached_paths.txt")
+        series_path = os.path.join(temp_dir, "Vinland Saga")
+        os.mkdir(series_path)
+
+        # duplicates and missing paths are dropped when loading
+        with open(file_path, "w") as f:
+            f.write(f"\n {temp_dir}\n {temp_dir}\n {temp_dir}/missing")
+
+        store = CachedPathStore(file_path).load()
+        assert list(store) == [temp_dir]
+        assert temp_dir in store
+
+        assert store.append(series_path)
+        assert not store.append(series_path)
+        assert store + ["/downloads"] == [temp_dir, series_path, "/downloads"]
+
+        # reordering an existing path doesn't write it again
+        store.remove(series_path)
+        store.insert(0, series_path)
+        assert list(store) == [series_path, temp_dir]
+        assert store.pending == [series_path]
+
+        assert store.flush(can_write_log=True)
+        assert not store.pending
+        assert list(CachedPathStore(file_path).load()) == [temp_dir, series_path]
+
+        # paths skipped when loading aren't written to the file again
+        store = CachedPathStore(file_path).load(ignore={series_path})
+        os.mkdir(os.path.join(temp_dir, "missing"))
+        assert store.append(series_path)
+        assert store.append(os.path.join(temp_dir, "missing"))
+        assert not store.pending
+
+
+# tests ArchiveInfo and the helpers sharing it
+def test_archive_info():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "Series v01.cbz")
+        image = io.BytesIO()
+        Image.new("RGB", (20, 30), (255, 255, 255)).save(image, "PNG")
+
+        with zipfile.ZipFile(file_path, "w") as zf:
+            zf.writestr("002.png", image.getvalue())
+            zf.writestr("001.png", image.getvalue())
+            zf.writestr("ComicInfo.xml", "<ComicInfo><Year>2020</Year></ComicInfo>")
+            zf.comment = b"Identifiers: isbn:123"
+
+        info = get_archive_info(file_path)
+        assert get_archive_info(file_path) is info
+        assert info.sorted_names == ["001.png", "002.png", "ComicInfo.xml"]
+        assert info.image_names == ["001.png", "002.png"]
+        assert info.first_image_data == image.getvalue()
+        assert info.comment == "Identifiers: isbn:123"
+
+        assert contains_comic_info(file_path)
+        assert count_images_in_cbz(file_path) == 2
+        assert is_first_image_black_and_white(file_path)
+        assert get_internal_metadata(file_path, ".cbz") == {"Year": "2020"}
+        assert get_zip_comment(file_path) == "Identifiers: isbn:123"
+
+        close_archive_info(file_path)
+        assert get_archive_info(file_path, open_if_missing=False) is None
+        assert get_zip_comment(file_path) == "Identifiers: isbn:123"
+        contains_comic_info.cache_clear()
+
+
+# tests LibraryManifest
+def test_library_manifest():
+    import komga_cover_extractor
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        series_path = os.path.join(temp_dir, "Berserk")
+        os.mkdir(series_path)
+        with open(os.path.join(series_path, "Berserk v01.cbz"), "w") as f:
+            f.write("a")
+
+        manifest = LibraryManifest(os.path.join(temp_dir, "library_manifest.json"))
+        assert manifest.get("stage", series_path) == (False, None)
+
+        manifest.set("stage", series_path, result=[2, 3])
+        assert manifest.get("stage", series_path) == (True, [2, 3])
+
+        # changing the settings fingerprint resets the stage
+        assert manifest.get("stage", series_path, fingerprint=(True,)) == (
+            False,
+            None,
+        )
+        manifest.set("stage", series_path, result=[2, 3])
+
+        komga_cover_extractor.full_rescan_toggle = True
+        try:
+            assert manifest.get("stage", series_path) == (False, None)
+        finally:
+            komga_cover_extractor.full_rescan_toggle = False
+
+        # any change to the folder's files is picked up
+        with open(os.path.join(series_path, "Berserk v02.cbz"), "w") as f:
+            f.write("ab")
+        assert manifest.get("stage", series_path) == (False, None)
+
+
+# tests that extract_covers() only records the folders it processed without errors
+def test_extract_covers_manifest():
+    import komga_cover_extractor
+
+    original_manifest = komga_cover_extractor.library_manifest
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        good_path = os.path.join(temp_dir, "Berserk")
+        broken_path = os.path.join(temp_dir, "Vinland Saga")
+        os.mkdir(good_path)
+        os.mkdir(broken_path)
+
+        with zipfile.ZipFile(os.path.join(good_path, "Berserk v01.cbz"), "w") as zf:
+            zf.writestr("001.jpg", b"a")
+        with zipfile.ZipFile(
+            os.path.join(broken_path, "Vinland Saga v01.cbz"), "w"
+        ) as zf:
+            zf.writestr("001.jpg", b"a")
+
+        # cut the archive short so it can't be read
+        broken_file = os.path.join(broken_path, "Vinland Saga v01.cbz")
+        with open(broken_file, "r+b") as f:
+            f.truncate(os.path.getsize(broken_file) - 10)
+
+        manifest = LibraryManifest(os.path.join(temp_dir, "library_manifest.json"))
+        komga_cover_extractor.library_manifest = manifest
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                extract_covers([temp_dir], workers=1)
+        finally:
+            komga_cover_extractor.library_manifest = original_manifest
+            os.chdir(ROOT_DIR)
+
+        folders = manifest.stages["extract_covers"]["folders"]
+        assert good_path in folders
+        assert broken_path not in folders
+
+
+# tests that volumes rebuilt from ParsedFileCache match freshly parsed ones
+def test_parsed_file_cache():
+    import komga_cover_extractor
+
+    original_cache = komga_cover_extractor.parsed_file_cache
+    komga_cover_extractor.parsed_file_cache = ParsedFileCache()
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            series_path = os.path.join(temp_dir, "Mushoku Tensei")
+            os.mkdir(series_path)
+            files = [
+                "Mushoku Tensei v01 (2019) (Digital) (danke-Empire).epub",
+                "Mushoku Tensei v02 Part 2 - Subtitle (2019) (Digital).epub",
+                "Mushoku Tensei c012-013 (2020).cbz",
+            ]
+            for file in files:
+                open(os.path.join(series_path, file), "w").close()
+
+            def get_volumes():
+                return [
+                    {field: getattr(volume, field) for field in type(volume).__slots__}
+                    | {"publisher": str(volume.publisher)}
+                    for volume in upgrade_to_volume_class(
+                        upgrade_to_file_class(files, series_path),
+                        skip_release_year=True,
+                        skip_publisher=True,
+                        skip_premium_content=True,
+                    )
+                ]
+
+            parsed = get_volumes()
+            assert len(komga_cover_extractor.parsed_file_cache) == len(files) * 2
+            assert get_volumes() == parsed
+
+            # adding a file to the folder invalidates its entries
+            open(os.path.join(series_path, "Mushoku Tensei v03.epub"), "w").close()
+            cache_key = f"file|{os.path.join(series_path, files[0])}"
+            assert not komga_cover_extractor.parsed_file_cache.get(
+                cache_key,
+                ParsedFileCache.get_stamp(os.path.join(series_path, files[0]), {}),
+            )
+    finally:
+        komga_cover_extractor.parsed_file_cache = original_cache
+
+
+# tests is_image_black_and_white
+def test_is_image_black_and_white():
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    gray = rng.integers(0, 256, (300, 200), dtype=np.uint8)
+    rgb = np.stack([gray] * 3, axis=-1)
+
+    assert is_image_black_and_white(Image.fromarray(gray, "L"))
+    assert not is_image_black_and_white(
+        Image.fromarray(rng.integers(0, 256, (300, 200, 3), dtype=np.uint8), "RGB")
+    )
+
+    # channels within the tolerance still count as grayscale
+    rgb[..., 0] = np.clip(rgb[..., 0].astype(np.int16) + 15, 0, 255)
+    assert is_image_black_and_white(Image.fromarray(rgb, "RGB"))
+
+    # exactly 90% grayscale isn't enough, just over it is
+    rgb = np.zeros((100, 100, 3), dtype=np.uint8)
+    rgb[:10, :, 0] = 255
+    assert not is_image_black_and_white(Image.fromarray(rgb, "RGB"), rows_per_chunk=7)
+    rgb[9, 0, 0] = 0
+    assert is_image_black_and_white(Image.fromarray(rgb, "RGB"), rows_per_chunk=7)
+
+    # sampling picks existing pixels instead of blending them,
+    # so patterns finer than the sample can be skipped over
+    rgb = np.zeros((100, 100, 3), dtype=np.uint8)
+    rgb[:, ::2, 0] = 255
+    assert not is_image_black_and_white(Image.fromarray(rgb, "RGB"))
+    assert is_image_black_and_white(Image.fromarray(rgb, "RGB"), sample_size=50)
+
+
+# tests TransferTracker
+def test_transfer_tracker():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        first = os.path.join(temp_dir, "Series v01.cbz")
+        second = os.path.join(temp_dir, "Series v02.cbz")
+        ignored = os.path.join(temp_dir, "cover.jpg")
+        for path in [first, second, ignored]:
+            with open(path, "wb") as f:
+                f.write(b"a")
+
+        tracker = TransferTracker(file_quiet_period=1, batch_quiet_period=5)
+        for path in [first, second, ignored]:
+            tracker.record(path, now=0)
+
+        accept = lambda path: not path.endswith(".jpg")
+        assert tracker.poll(accept=accept, now=0) == [first, second]
+        assert not tracker.is_batch_transferred(now=1)
+
+        # still growing, the batch waits on it
+        with open(second, "ab") as f:
+            f.write(b"b")
+        tracker.poll(now=5)
+        assert tracker.is_file_transferred(first, now=5)
+        assert not tracker.is_file_transferred(second, now=5)
+        assert not tracker.is_batch_transferred(now=5)
+
+        # closed files don't have to wait out the quiet period
+        tracker.record(second, closed=True, now=5)
+        tracker.poll(now=5)
+        assert tracker.is_file_transferred(second, now=5)
+        assert not tracker.is_batch_transferred(now=9)
+        assert tracker.is_batch_transferred(now=10)
+
+        # deleted files are dropped
+        os.remove(first)
+        tracker.poll(now=10)
+        assert tracker.pop_batch() == [second]
+        assert not tracker.is_batch_transferred(now=20)
+
+
+# tests that watchdog passes over the files the script moved itself
+def test_watchdog_script_moves():
+    import komga_cover_extractor
+    from watchdog.events import FileMovedEvent
+
+    original_watchdog_toggle = komga_cover_extractor.watchdog_toggle
+    komga_cover_extractor.watchdog_toggle = True
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            downloaded = os.path.join(temp_dir, "Series v01.cbz.part")
+            renamed = os.path.join(temp_dir, "Series v01.cbz")
+            with open(downloaded, "wb") as f:
+                f.write(b"a")
+
+            tracker = TransferTracker()
+            handler = Handler(tracker)
+
+            # a download being moved into place is picked up
+            os.rename(downloaded, renamed)
+            handler.on_moved(FileMovedEvent(downloaded, renamed))
+            assert tracker.poll(now=0) == [renamed]
+            tracker.pop_batch()
+
+            # the script's own renames, and moves into its renamed folders, aren't
+            renamed_again = os.path.join(temp_dir, "Series v001.cbz")
+            assert rename_file(renamed, renamed_again, silent=True)
+            handler.on_moved(FileMovedEvent(renamed, renamed_again))
+
+            folder = os.path.join(temp_dir, "Series")
+            os.mkdir(os.path.join(temp_dir, "Series (2020)"))
+            open(os.path.join(temp_dir, "Series (2020)", "Series v02.cbz"), "w").close()
+            assert rename_folder(os.path.join(temp_dir, "Series (2020)"), folder)
+            handler.on_moved(
+                FileMovedEvent(
+                    os.path.join(temp_dir, "Series (2020)", "Series v02.cbz"),
+                    os.path.join(folder, "Series v02.cbz"),
+                )
+            )
+            assert tracker.poll(now=0) == []
+
+            # until the next run starts
+            script_moved_paths.clear()
+            handler.on_moved(FileMovedEvent(renamed, renamed_again))
+            assert tracker.poll(now=0) == [renamed_again]
+    finally:
+        komga_cover_extractor.watchdog_toggle = original_watchdog_toggle
+        komga_cover_extractor.script_moved_paths.clear()
+
+
+# tests DirectoryCache
+def test_directory_cache():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        volume_path = os.path.join(temp_dir, "Series v01.cbz")
+        open(volume_path, "w").close()
+        os.mkdir(os.path.join(temp_dir, "Extras"))
+
+        # backdate the folder so its snapshot is kept
+        os.utime(temp_dir, ns=(0, 0))
+
+        cache = DirectoryCache()
+        assert sorted(cache.listdir(temp_dir)) == ["Extras", "Series v01.cbz"]
+        assert cache.get_files(temp_dir) == ["Series v01.cbz"]
+        assert cache.exists(volume_path)
+        assert not cache.exists(os.path.join(temp_dir, "Series v01.jpg"))
+        assert temp_dir in cache.snapshots
+
+        # names differing only by case follow the filesystem
+        upper_path = os.path.join(temp_dir, "SERIES V01.CBZ")
+        assert cache.exists(upper_path) == os.path.exists(upper_path)
+
+        calls = []
+        derive = lambda names: calls.append(names) or len(names)
+        assert cache.get_derived(temp_dir, "count", derive) == 2
+        assert cache.get_derived(temp_dir, "count", derive) == 2
+        assert len(calls) == 1
+
+        # a changed mtime means a fresh scan
+        open(os.path.join(temp_dir, "Series v01.jpg"), "w").close()
+        assert cache.exists(os.path.join(temp_dir, "Series v01.jpg"))
+
+        # as does invalidating it
+        os.utime(temp_dir, ns=(0, 0))
+        cache.get_snapshot(temp_dir)
+        cache.invalidate(volume_path)
+        assert temp_dir not in cache.snapshots
+
+
+# tests repack_to_cbz
+def test_repack_to_cbz():
+    import py7zr
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pages = {"001.jpg": os.urandom(5000), "extra/002.jpg": b"", "003.png": b"a"}
+        source_file = os.path.join(temp_dir, "Series v01.7z")
+        repacked_file = os.path.join(temp_dir, "Series v01.cbz")
+
+        with py7zr.SevenZipFile(source_file, "w") as archive:
+            for name, data in pages.items():
+                archive.writestr(data, name)
+
+        digests = repack_to_cbz(source_file, repacked_file, ".7z")
+        assert sorted(digests) == sorted(pages)
+        assert digests == get_zip_digests(repacked_file)
+
+        with zipfile.ZipFile(repacked_file) as zip_file:
+            for name, data in pages.items():
+                assert zip_file.read(name) == data
+
+        # the written cbz is read back, so a damaged member doesn't verify
+        with open(repacked_file, "rb") as f:
+            contents = bytearray(f.read())
+        contents[contents.index(pages["001.jpg"]) + 10] ^= 0xFF
+        damaged_file = os.path.join(temp_dir, "Series v01 damaged.cbz")
+        with open(damaged_file, "wb") as f:
+            f.write(contents)
+        try:
+            get_zip_digests(damaged_file)
+            assert False, "expected BadZipFile"
+        except zipfile.BadZipFile:
+            pass
+
+        assert repack_to_cbz(repacked_file, repacked_file, ".cbz") is None
+
+
+# tests that convert_to_cbz() only converts one of the archives sharing a cbz name
+def test_convert_to_cbz_duplicate_targets():
+    import komga_cover_extractor
+    import py7zr
+
+    original_download_folders = komga_cover_extractor.download_folders
+    original_walk = komga_cover_extractor.download_snapshot.walk
+
+    # the broken .cbr can't keep the .7z from being converted,
+    # whichever of the two is found first
+    for first_extension in [".cbr", ".7z"]:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            seven_zip_file = os.path.join(temp_dir, "Series v01.7z")
+            rar_file = os.path.join(temp_dir, "Series v01.cbr")
+
+            with py7zr.SevenZipFile(seven_zip_file, "w") as archive:
+                archive.writestr(b"a", "001.jpg")
+            with open(rar_file, "wb") as f:
+                f.write(b"Rar!\x1a\x07\x00" + b"\x00" * 32)
+
+            def walk(top):
+                for root, dirs, files in original_walk(top):
+                    yield root, dirs, sorted(
+                        files, key=lambda x: not x.endswith(first_extension)
+                    )
+
+            komga_cover_extractor.download_folders = [temp_dir]
+            komga_cover_extractor.download_snapshot.walk = walk
+            output = io.StringIO()
+            try:
+                with contextlib.redirect_stdout(output):
+                    convert_to_cbz(workers=1)
+            finally:
+                komga_cover_extractor.download_folders = original_download_folders
+                komga_cover_extractor.download_snapshot.walk = original_walk
+
+            assert output.getvalue().count("is already being converted") == 1
+            assert sorted(os.listdir(temp_dir)) == [
+                "Series v01.cbr",
+                "Series v01.cbz",
+            ]
+            with zipfile.ZipFile(os.path.join(temp_dir, "Series v01.cbz")) as zf:
+                assert zf.read("001.jpg") == b"a"
+
+
+# tests that the qbit unchecker's LibraryLookup matches near-miss and nested series names
+def test_library_lookup():
+    import komga_cover_extractor
+
+    try:
+        import qbittorrentapi
+    except ImportError:
+        print("qbittorrent-api isn't installed, skipping test_library_lookup")
+        return
+
+    sys.path.insert(0, os.path.join(ROOT_DIR, "addons", "qbit_torrent_unchecker"))
+    original_argv = sys.argv
+    original_paths = list(komga_cover_extractor.paths)
+    original_paths_with_types = list(komga_cover_extractor.paths_with_types)
+    original_download_folders = komga_cover_extractor.download_folders
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        library = os.path.join(temp_dir, "library")
+        for folder in [
+            "Mushoku Tensei Jobless Reincarnation",
+            os.path.join("Seinen", "Vinland Saga"),
+        ]:
+            series_name = os.path.basename(folder)
+            os.makedirs(os.path.join(library, folder))
+            for number in range(1, 3):
+                file_path = os.path.join(
+                    library, folder, f"{series_name} v{number:02}.cbz"
+                )
+                with zipfile.ZipFile(file_path, "w") as zf:
+                    zf.writestr("001.jpg", b"a")
+
+        try:
+            sys.argv = ["qbit_torrent_unchecker.py", "-p", library]
+            with contextlib.redirect_stdout(io.StringIO()):
+                import qbit_torrent_unchecker as addon
+
+            komga_cover_extractor.paths[:] = [library]
+            komga_cover_extractor.download_folders = [
+                os.path.join(temp_dir, "downloads")
+            ]
+            addon.download_folders = komga_cover_extractor.download_folders
+
+            lookup = addon.LibraryLookup()
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                lookup.refresh()
+                torrent = type("Torrent", (), {"name": "Pack"})()
+                volumes = addon.organize_files(
+                    torrent,
+                    [
+                        "Pack/Mushoku Tensei Jobless Reincarnations v02.cbz",
+                        "Pack/Vinland Saga v01.cbz",
+                        "Pack/Spy x Family v01.cbz",
+                    ],
+                )
+                found = {
+                    volume.series_name: [x.name for x in lookup.find(volume)]
+                    for volume in volumes
+                }
+
+            # the addon shares the script's store, which cache_path() adds to
+            store = addon.load_cached_paths()
+            assert store is komga_cover_extractor.cached_paths
+            with contextlib.redirect_stdout(io.StringIO()):
+                assert cache_existing_library_paths([library], [], store) is store
+        finally:
+            sys.argv = original_argv
+            komga_cover_extractor.paths[:] = original_paths
+            komga_cover_extractor.paths_with_types[:] = original_paths_with_types
+            komga_cover_extractor.download_folders = original_download_folders
+            komga_cover_extractor.cached_paths.clear()
+
+        # a near-miss name is matched through the index
+        assert sorted(found["Mushoku Tensei Jobless Reincarnations"]) == [
+            "Mushoku Tensei Jobless Reincarnation v01.cbz",
+            "Mushoku Tensei Jobless Reincarnation v02.cbz",
+        ]
+
+        # a series below the library's series folders is found by the walk
+        assert sorted(found["Vinland Saga"]) == [
+            "Vinland Saga v01.cbz",
+            "Vinland Saga v02.cbz",
+        ]
+
+        assert found["Spy x Family"] == []
+
+
+# tests that get_header_extensions() keeps the order of the files passed in
+def test_get_header_extensions():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        files = []
+        for index in range(12):
+            file_path = os.path.join(temp_dir, f"Series v{index:02}.cbz")
+            if index % 3:
+                with zipfile.ZipFile(file_path, "w") as zf:
+                    zf.writestr("001.jpg", b"a")
+            else:
+                with open(file_path, "wb") as f:
+                    f.write(b"Rar!\x1a\x07\x00" + b"\x00" * 32)
+            files.append(file_path)
+
+        expected = [get_header_extension(file) for file in files]
+        assert expected[:3] == [".cbr", ".cbz", ".cbz"]
+        assert get_header_extensions(files, workers=4) == expected
+        assert get_header_extensions(files, workers=1) == expected
+
+
+# tests is_blank_cover against the blank images
+def test_is_blank_cover():
+    import numpy as np
+
+    def encode(image):
+        return cv2.imencode(".png", image)[1].tobytes()
+
+    white = np.full((900, 600), 255, dtype=np.uint8)
+    white[400:430, 250:350] = 0
+    assert is_blank_cover(encode(white), silent=True)
+    assert is_blank_cover(encode(255 - white), silent=True)
+
+    rng = np.random.default_rng(0)
+    noise = rng.integers(0, 256, (900, 600), dtype=np.uint8)
+    assert not is_blank_cover(encode(noise), silent=True)
+    assert not is_blank_cover(b"not an image", silent=True)
+
+    # the mean pre-test never rules out a score the full comparison would reach
+    for image in [white, 255 - white, noise, np.sort(noise, axis=1)]:
+        candidate = preprocess_image(
+            load_image_for_comparison(encode(image), blank_cover_comparison_size)
+        )
+        for reference in get_blank_cover_references():
+            assert (
+                reference.compare(candidate, silent=True)
+                <= reference.get_max_score(candidate.mean()) + 1e-9
+            )
+
+
+# tests CoverFingerprint and that CoverFingerprintIndex drops stale entries
+def test_cover_fingerprint_index():
+    import numpy as np
+
+    def encode(image, extension=".png"):
+        return cv2.imencode(extension, image)[1].tobytes()
+
+    rng = np.random.default_rng(0)
+    cover = cv2.GaussianBlur(
+        rng.integers(0, 256, (600, 400), dtype=np.uint8), (0, 0), 8
+    )
+    other = cv2.GaussianBlur(
+        rng.integers(0, 256, (600, 400), dtype=np.uint8), (0, 0), 8
+    )
+
+    fingerprint = CoverFingerprint.from_image_data(encode(cover))
+    resized = CoverFingerprint.from_image_data(
+        encode(cv2.resize(cover, (300, 450), interpolation=cv2.INTER_AREA), ".jpg")
+    )
+    different = CoverFingerprint.from_image_data(encode(other))
+
+    assert fingerprint.distance(resized) <= cover_hash_max_distance
+    assert fingerprint.distance(different) > cover_hash_max_distance
+    assert fingerprint.compare(resized) >= required_image_similarity_score
+    assert fingerprint.compare(different) < required_image_similarity_score
+    assert not CoverFingerprint.from_image_data(b"not an image")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "Mushoku Tensei v01.cbz")
+        with open(path, "wb") as f:
+            f.write(b"v1")
+
+        index = CoverFingerprintIndex(os.path.join(temp_dir, "index.json"))
+        index.add(path, encode(cover))
+        assert index.get(path).distance(fingerprint) == 0
+        assert (index.get(path).thumbnail == fingerprint.thumbnail).all()
+
+        # entries set in a worker are merged into the main index
+        worker_index = CoverFingerprintIndex()
+        worker_index.add(path, encode(other))
+        index.merge(worker_index.pop_new_entries())
+        assert index.get(path).distance(different) == 0
+        assert not worker_index.pop_new_entries()
+
+        # changing the file invalidates its entry
+        with open(path, "wb") as f:
+            f.write(b"v2 with a new size")
+        assert not index.get(path)
+
+
+# tests PageFetcher's caching, revalidation and back-off against a local stand-in
+def test_page_fetcher():
+    from benchmark import BookwalkerStandIn
+
+    with BookwalkerStandIn(latency=0, forbidden_requests=2) as stand_in:
+        url = f"{stand_in.search_url}Series&np=0"
+        limiter = RateLimiter(0, backoff_time=0.01)
+        cache = ResponseCache(ttl=3600)
+        fetcher = PageFetcher(limiter, cache, workers=2)
+
+        # the first two requests are forbidden, and retried after backing off
+        content = fetcher.fetch(url)
+        assert b"o-tile" in content
+        assert stand_in.requests == 3
+        assert limiter.backoffs == 0
+
+        # fresh pages aren't fetched again
+        assert fetcher.fetch(url) == content
+        assert stand_in.requests == 3
+
+        # expired pages are revalidated through their ETag
+        cache.entries[cache.get_key(url)]["fetched"] = 0
+        assert fetcher.fetch(url) == content
+        assert stand_in.requests == 4 and stand_in.not_modified == 1
+
+        # pages fetched ahead of time are picked up from the cache
+        other_url = f"{stand_in.search_url}Other&np=0"
+        fetcher.submit(fetcher.fetch, other_url).result()
+        assert fetcher.fetch(other_url)
+        assert stand_in.requests == 5
+        fetcher.shutdown()
+
+        # giving up after max_retries keeps the original rate-limit error
+        stand_in.forbidden_requests = stand_in.requests + 10
+        fetcher = PageFetcher(limiter, ResponseCache(), max_retries=1)
+        try:
+            fetcher.fetch(url)
+            assert False
+        except Exception as e:
+            assert "rate-limited" in str(e)
+
+
+# tests MetricsRegistry's stages, counters and output formats
+def test_metrics_registry():
+    registry = MetricsRegistry()
+
+    # nothing is recorded until it's enabled
+    with registry.stage("disabled"):
+        registry.count("files_examined")
+    assert not registry.stages
+
+    registry.enabled = True
+    similar.cache_clear()
+    with registry.stage("outer"):
+        registry.count("files_examined", 2)
+        similar("a", "b")
+        with registry.stage("inner"):
+            registry.cache_result("parsed_file_cache", True)
+            registry.cache_result("parsed_file_cache", False)
+            similar("a", "b")
+            similar("c", "d")
+        registry.merge({"archives_opened": 3})
+
+    data = registry.to_dict()
+    outer = data["stages"]["outer"]["counters"]
+    inner = data["stages"]["inner"]
+
+    # counters go to the innermost stage
+    assert outer["files_examined"] == 2 and outer["archives_opened"] == 3
+    assert "parsed_file_cache_hits" not in outer
+    assert inner["hit_rates"]["parsed_file_cache"] == 0.5
+    assert outer["similar_calls"] == 1 and outer["similar_misses"] == 1
+    assert inner["counters"]["similar_calls"] == 2
+    assert inner["counters"]["similar_hits"] == 1
+    assert data["stages"]["outer"]["runs"] == 1
+
+    prometheus = registry.to_prometheus()
+    assert 'komga_cover_extractor_stage_seconds{stage="inner"}' in prometheus
+    assert (
+        'komga_cover_extractor_stage_count{stage="outer",counter="files_examined"} 2'
+        in prometheus
+    )
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "metrics.json")
+        assert registry.save(path, "json")
+        with open(path) as f:
+            assert json.load(f)["stages"]["outer"]["counters"]["files_examined"] == 2
+
+    # the counting stand-in for the regex module behaves like it
+    counting_re = CountingRegex(re)
+    pattern = counting_re.compile(r"a", re.IGNORECASE)
+    assert counting_re.sub(pattern, "b", "aA") == "bb"
+    assert pattern.search("xa").start() == 1
+    assert pattern == re.compile(r"a", re.IGNORECASE)
+
+
+# tests that StackSampler's samples load as pstats stats
+def test_stack_sampler():
+    import pstats
+
+    def busy_loop(seconds):
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            pass
+
+    sampler = StackSampler(threading.get_ident(), interval=0.005)
+    sampler.start()
+    busy_loop(0.2)
+    sampler.stop()
+    assert sampler.samples
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "busy_loop.pstats")
+        write_marshal(path, sampler.get_stats())
+        stats = pstats.Stats(path).stats
+
+    busy = next(key for key in stats if key[2] == "busy_loop")
+    caller = next(key for key in stats if key[2] == "test_stack_sampler")
+    assert stats[busy][3] > 0.05
+    assert caller in stats[busy][4]
+    assert stats[caller][3] >= stats[busy][3]
+
+
+# tests that DiscordDispatcher packs embeds, keeps their order and honours rate limits
+def test_discord_dispatcher():
+    from benchmark import DiscordStandIn
+
+    def get_embed(title, file=None):
+        return Embed(DiscordEmbed(title=title, color=purple_color), file)
+
+    with DiscordStandIn(
+        latency=0, limit=2, window=0.3, rate_limited_requests=1
+    ) as stand_in:
+        dispatcher = DiscordDispatcher(linger=0.1)
+        for index in range(23):
+            assert dispatcher.submit(stand_in.url, embeds=[get_embed(str(index))])
+        dispatcher.submit(stand_in.url, "A message")
+        dispatcher.submit(
+            stand_in.url,
+            embeds=[get_embed("23"), get_embed("24", file=b"image data")],
+        )
+        assert dispatcher.flush(timeout=10)
+
+        messages = stand_in.messages
+        assert [len(message.get("embeds", [])) for message in messages] == [
+            10,
+            10,
+            3,
+            0,
+            2,
+        ]
+        assert messages[3]["content"] == "A message"
+        assert [
+            embed["title"]
+            for message in messages
+            for embed in message.get("embeds", [])
+        ] == [str(index) for index in range(25)]
+        assert messages[4]["embeds"][1]["image"]["url"] == "attachment://cover_2.jpg"
+
+        # only the forced 429, the rate limit headers were waited out
+        assert stand_in.rate_limited == 1
+        assert dispatcher.sent == 5 and dispatcher.failed == 0
+
+        dispatcher.shutdown()
+        assert not dispatcher.thread.is_alive()
+
+
+# tests LogWriter's buffering, duplicate index and rotation
+def test_log_writer():
+    import komga_cover_extractor
+
+    original_rotation_bytes = komga_cover_extractor.log_rotation_bytes
+    komga_cover_extractor.log_rotation_bytes = 100
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            writer = LogWriter(flush_interval=60)
+            path = os.path.join(temp_dir, "changes.txt")
+
+            assert writer.write(path, "\n first", dup_key="first")
+            assert not writer.write(path, "\n first", dup_key="first")
+            assert writer.write(path, "\n second", dup_key="second")
+
+            # nothing is written until the buffer is flushed
+            assert os.path.getsize(path) == 0
+            writer.flush()
+            with open(path) as f:
+                assert f.read() == "\n first\n second"
+
+            # the index is read from the existing file
+            reader = LogWriter(flush_interval=60)
+            assert not reader.write(path, "\n second", dup_key="second")
+            reader.close()
+
+            # overwriting drops the old lines and their index
+            assert writer.write(path, "\n third", overwrite=True)
+            assert writer.write(path, "\n first", dup_key="first")
+            writer.flush()
+            with open(path) as f:
+                assert f.read() == "\n third\n first"
+
+            # going over log_rotation_bytes moves the file to changes.txt.1
+            assert writer.write(path, "\n " + "x" * 100)
+            writer.close()
+            with open(path) as f:
+                assert f.read() == "\n " + "x" * 100
+            with open(f"{path}.1") as f:
+                assert f.read() == "\n third\n first"
+
+            # the buffer is written out flush_interval seconds after the first line
+            timed = LogWriter(flush_interval=0.05)
+            timed_path = os.path.join(temp_dir, "errors.txt")
+            assert timed.write(timed_path, "\n timed")
+            time.sleep(0.5)
+            with open(timed_path) as f:
+                assert f.read() == "\n timed"
+
+            # anything logged after the exit handler ran is written straight away
+            timed.exit()
+            assert timed.write(timed_path, "\n late")
+            with open(timed_path) as f:
+                assert f.read() == "\n timed\n late"
+            timed.close()
+    finally:
+        komga_cover_extractor.log_rotation_bytes = original_rotation_bytes
+
+
+# tests that DownloadFolderSnapshot walks like scandir.walk() and follows the script's changes
+def test_download_folder_snapshot():
+    def walk(top):
+        return [
+            (root, sorted(dirs), sorted(files))
+            for root, dirs, files in download_snapshot.walk(top)
+        ]
+
+    def os_walk(top):
+        return [
+            (root, sorted(dirs), sorted(files)) for root, dirs, files in os.walk(top)
+        ]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        series_path = os.path.join(temp_dir, "Berserk")
+        os.makedirs(series_path)
+        for name in ["Berserk v01.cbz", "Berserk v02.cbz"]:
+            open(os.path.join(series_path, name), "w").close()
+
+        download_snapshot.start([temp_dir])
+        try:
+            assert walk(temp_dir) == os_walk(temp_dir)
+
+            # the parsed File objects are reused
+            first = upgrade_to_file_class(["Berserk v01.cbz"], series_path)[0]
+            second = upgrade_to_file_class(["Berserk v01.cbz"], series_path)[0]
+            assert first is second
+            assert "Berserk v01.cbz" in download_snapshot.get_objects(series_path)
+
+            # the script's own changes are picked up
+            rename_file(
+                os.path.join(series_path, "Berserk v02.cbz"),
+                os.path.join(series_path, "Berserk v03.cbz"),
+                silent=True,
+            )
+            remove_file(os.path.join(series_path, "Berserk v01.cbz"), silent=True)
+            assert walk(temp_dir) == os_walk(temp_dir)
+            assert download_snapshot.get_objects(series_path) == {}
+
+            # as are changes made by anything else
+            time.sleep(0.01)
+            open(os.path.join(series_path, "Berserk v04.cbz"), "w").close()
+            assert walk(temp_dir) == os_walk(temp_dir)
+        finally:
+            download_snapshot.clear()
+
+        assert download_snapshot.get_objects(series_path) is None
+        assert walk(temp_dir) == os_walk(temp_dir)
+
+
+# tests that File and Volume objects are slotted and share their repeated strings
+def test_compact_file_classes():
+    files = upgrade_to_file_class(
+        ["Berserk v01.cbz", "Berserk v02.cbz"], "/library/Berserk", test_mode=True
+    )
+    assert files[0].basename is files[1].basename
+    assert files[0].extension is files[1].extension
+
+    volumes = upgrade_to_volume_class(files, test_mode=True)
+    assert volumes[0].series_name is volumes[1].series_name
+
+    for item in files + volumes:
+        assert not hasattr(item, "__dict__")
+
+    # a file can't be changed once it's been scanned
+    try:
+        files[0].volume_number = 3
+        assert False
+    except AttributeError:
+        pass
+
+
 if __name__ == "__main__":
     validate_csv()
     # test_rename_files()
@@ -1970,4 +2947,27 @@ if __name__ == "__main__":
     test_contains_unicode()
     test_contains_punctuation()
     test_contains_brackets()
+    test_series_index()
+    test_cached_path_store()
+    test_archive_info()
+    test_library_manifest()
+    test_extract_covers_manifest()
+    test_parsed_file_cache()
+    test_is_image_black_and_white()
+    test_transfer_tracker()
+    test_watchdog_script_moves()
+    test_directory_cache()
+    test_repack_to_cbz()
+    test_convert_to_cbz_duplicate_targets()
+    test_library_lookup()
+    test_get_header_extensions()
+    test_is_blank_cover()
+    test_cover_fingerprint_index()
+    test_page_fetcher()
+    test_metrics_registry()
+    test_stack_sampler()
+    test_discord_dispatcher()
+    test_log_writer()
+    test_download_folder_snapshot()
+    test_compact_file_classes()
     print("ALL TESTS PASSED!")